@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Variantes de Imágenes para Documentos
+Genera versiones reducidas de los diagramas según el destino (resolución
+de impresión para Word, tamaños responsive y WebP para HTML), en paralelo
+y guardadas en caché por huella del original y tamaño
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import CACHE_DIR, BuildCache
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ASSET_CACHE_DIR = os.path.join(CACHE_DIR, 'assets')
+
+# Resolución de las imágenes embebidas en .docx
+DOCX_DPI = 150
+
+# Anchos ofrecidos en srcset (nunca mayores que el original)
+HTML_WIDTHS = [480, 960, 1440]
+
+# Tamaño de visualización para el navegador (contenedor de 1200px)
+HTML_SIZES = '(max-width: 1200px) 100vw, 1100px'
+
+# Formatos: webp o "raster" (JPEG si es fotográfica, PNG si no)
+RASTER_EXTS = ('jpg', 'png')
+
+def available():
+    """True si Pillow está instalado"""
+    return Image is not None
+
+def _variant_base(src, digest, width):
+    """Ruta de la variante en caché, sin extensión"""
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(ASSET_CACHE_DIR, f'{stem}-{digest[:16]}-{width}')
+
+def _cached_variant(base, fmt):
+    """Variante ya generada, si existe"""
+    exts = ('webp',) if fmt == 'webp' else RASTER_EXTS
+    for ext in exts:
+        if os.path.exists(f'{base}.{ext}'):
+            return f'{base}.{ext}'
+    return None
+
+def _render_variant(job):
+    """
+    Genera una variante (se ejecuta en un proceso del pool).
+    Devuelve la ruta del archivo creado.
+    """
+    src, base, width, fmt = job
+
+    with Image.open(src) as img:
+        img.load()
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+
+        alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+
+        if fmt == 'webp':
+            dst = base + '.webp'
+            save = dict(format='WEBP', quality=85, method=6)
+        elif not alpha and img.getcolors(256) is None:
+            # Diagrama fotográfico (miles de colores): JPEG ocupa una fracción
+            dst = base + '.jpg'
+            img = img.convert('RGB')
+            save = dict(format='JPEG', quality=88, optimize=True, progressive=True)
+        else:
+            # Pocos colores: paleta exacta sin pérdida
+            dst = base + '.png'
+            if not alpha:
+                img = img.convert('P', palette=Image.ADAPTIVE, colors=256)
+            save = dict(format='PNG', optimize=True)
+
+        tmp = f'{dst}.{os.getpid()}.tmp'
+        img.save(tmp, **save)
+        os.replace(tmp, dst)
+    return dst
+
+def build_variants(specs, cache=None, jobs=None):
+    """
+    Genera las variantes pedidas que no estén en caché.
+    specs: lista de (origen, ancho_px, formato)
+    Devuelve {(origen, ancho_px, formato): ruta}
+    """
+    if not available():
+        return {}
+
+    own_cache = cache is None
+    cache = cache or BuildCache('assets')
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+
+    result = {}
+    pending = []
+    for src, width, fmt in specs:
+        if not os.path.exists(src):
+            continue
+        base = _variant_base(src, cache.file_digest(src), width)
+        path = _cached_variant(base, fmt)
+        if path:
+            result[(src, width, fmt)] = path
+        else:
+            pending.append(((src, width, fmt), (src, base, width, fmt)))
+
+    if pending:
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = pool.map(_render_variant, [job for _, job in pending])
+            for (key, _), path in zip(pending, paths):
+                result[key] = path
+
+    if own_cache:
+        cache.save()
+    return result
+
+# ========== WORD ==========
+
+def docx_width_px(width_in, dpi=DOCX_DPI):
+    """Ancho en píxeles de una imagen impresa a width_in pulgadas"""
+    return int(round(width_in * dpi))
+
+def prepare_docx_images(items, cache=None, jobs=None):
+    """
+    Genera en paralelo las variantes para Word.
+    items: lista de (origen, ancho_en_pulgadas)
+    """
+    return build_variants([(src, docx_width_px(w), 'raster') for src, w in items], cache, jobs)
+
+def docx_image(src, width_in, cache=None):
+    """Variante para Word de una imagen; el original si Pillow no está disponible"""
+    variants = prepare_docx_images([(src, width_in)], cache)
+    return variants.get((src, docx_width_px(width_in), 'raster'), src)
+
+# ========== HTML ==========
+
+def html_widths(src, widths=HTML_WIDTHS):
+    """Anchos del srcset de una imagen, limitados a su ancho real"""
+    with Image.open(src) as img:
+        native = img.width
+    return sorted({min(w, native) for w in widths})
+
+def prepare_html_images(sources, cache=None, jobs=None, widths=HTML_WIDTHS):
+    """
+    Genera en paralelo las variantes WebP y raster de cada imagen.
+    Devuelve {origen: [(ancho, ruta_webp, ruta_raster), ...]}
+    """
+    if not available():
+        return {}
+
+    sizes = {src: html_widths(src, widths) for src in sources if os.path.exists(src)}
+    specs = [(src, w, fmt) for src, ws in sizes.items() for w in ws for fmt in ('webp', 'raster')]
+    variants = build_variants(specs, cache, jobs)
+
+    return {
+        src: [(w, variants[(src, w, 'webp')], variants[(src, w, 'raster')]) for w in ws]
+        for src, ws in sizes.items()
+    }
+
+def publish_html_images(variants, output_dir, cache, subdir='img'):
+    """
+    Copia las variantes junto al HTML con nombres estables
+    (nombre-ancho.ext) y devuelve {nombre_original: [(ancho, webp, raster)]}
+    con rutas relativas a output_dir
+    """
+    published = {}
+    for src, entries in variants.items():
+        stem = os.path.splitext(os.path.basename(src))[0]
+        rows = []
+        for width, webp, raster in entries:
+            names = []
+            for path in (webp, raster):
+                name = f'{stem}-{width}{os.path.splitext(path)[1]}'
+                cache.sync_copy(path, os.path.join(output_dir, subdir, name))
+                names.append(f'{subdir}/{name}')
+            rows.append((width, names[0], names[1]))
+        published[os.path.basename(src)] = rows
+    return published
+
+def picture_html(entries, alt, indent=''):
+    """Elemento <picture> con srcset WebP y respaldo JPEG/PNG"""
+    webp = ', '.join(f'{path} {w}w' for w, path, _ in entries)
+    raster = ', '.join(f'{path} {w}w' for w, _, path in entries)
+    largest = entries[-1]
+    return (f'<picture>\n'
+            f'{indent}    <source type="image/webp" srcset="{webp}" sizes="{HTML_SIZES}">\n'
+            f'{indent}    <img src="{largest[2]}" srcset="{raster}" sizes="{HTML_SIZES}" '
+            f'alt="{alt}" loading="lazy">\n'
+            f'{indent}</picture>')
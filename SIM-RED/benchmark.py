@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Banco de Pruebas de Rendimiento
+Ejecuta los módulos de bin/ (y report_generator.pl) contra redes simuladas
+de distintos tamaños (simulador_red.py) y guarda, por módulo y tamaño, el
+tiempo real, el número de procesos creados y la memoria máxima en un JSON
+que sirve de línea base para comparar versiones.
+
+- Tiempo: mediana de las repeticiones (reloj monotónico)
+- Procesos: incremento del contador "processes" de /proc/stat durante la
+  ejecución; cuenta todo el sistema, así que la máquina debe estar en reposo
+- Memoria: ru_maxrss del proceso más grande del árbol del módulo; lo mide
+  un lanzador en Perl, porque un proceso creado directamente desde Python
+  heredaría como máximo la memoria del propio intérprete
+
+Uso: python3 benchmark.py [--tamanos 10,1000,10000] [--comparar BASE.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from simulador_red import crear_red_simulada
+
+# Módulo -> orden (relativa a la instalación simulada)
+MODULOS = {
+    'check_devices': ['bash', 'bin/check_devices.sh'],
+    'check_spoofing': ['bash', 'bin/check_spoofing.sh'],
+    'detect_anomalies': ['bash', 'bin/detect_anomalies.sh'],
+    'generate_report': ['bash', 'bin/generate_report.sh'],
+    'report_generator': ['perl', 'lib/report_generator.pl', 'data/bench_report.dat', 'reports/bench.html'],
+    'measure_latency': ['bash', 'bin/measure_latency.sh'],
+    'scan_ports': ['bash', 'bin/scan_ports.sh'],
+    'detect_vpn': ['bash', 'bin/detect_vpn.sh'],
+}
+MODULOS_POR_DEFECTO = 'check_devices,check_spoofing,detect_anomalies,generate_report,report_generator'
+
+# Directorios que los módulos modifican; se restauran antes de cada ejecución
+ESTADO = ('data', 'logs', 'reports')
+
+# Respuestas a las preguntas y pausas de los scripts ("n" a todo)
+RESPUESTAS = b'n\n' * 10
+
+# Lanzador: ejecuta la orden como hijo y escribe en el archivo indicado el
+# máximo de memoria (KB) de sus descendientes, getrusage(RUSAGE_CHILDREN).
+# Hace el fork antes de cargar nada para no inflar ese máximo.
+LANZADOR = r'''
+my $archivo = shift @ARGV;
+my $pid = fork() // die "fork: $!\n";
+unless ($pid) { exec { $ARGV[0] } @ARGV or die "$ARGV[0]: $!\n" }
+waitpid($pid, 0);
+my $estado = $?;
+if (eval { require 'syscall.ph'; 1 }) {
+    my $uso = "\0" x 144;
+    if (syscall(SYS_getrusage(), -1, $uso) == 0 && open(my $f, '>', $archivo)) {
+        print $f +(unpack('q18', $uso))[4], "\n";
+    }
+}
+exit($estado & 127 ? 128 + ($estado & 127) : $estado >> 8);
+'''
+
+# Diferencias por debajo de estos valores se consideran ruido al comparar
+RUIDO_SEGUNDOS = 0.05
+RUIDO_PROCESOS = 5
+RUIDO_RSS_KB = 1024
+
+def contador_procesos():
+    """Procesos creados desde el arranque (/proc/stat)"""
+    try:
+        with open('/proc/stat') as f:
+            for linea in f:
+                if linea.startswith('processes '):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+def version(orden):
+    """Primera línea de la versión de una herramienta"""
+    try:
+        salida = subprocess.run(orden, capture_output=True, text=True, timeout=10).stdout
+        return next((l.strip() for l in salida.splitlines() if l.strip()), '')
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def ejecutar(orden, directorio, entorno, limite):
+    """
+    Ejecuta una orden en su propio grupo de procesos.
+    Devuelve (segundos, procesos, rss_max_kb, cpu_usuario, cpu_sistema, código, salida).
+    """
+    salida = tempfile.TemporaryFile()
+    memoria = tempfile.NamedTemporaryFile('r', prefix='simred_rss_')
+    procesos_antes = contador_procesos()
+    inicio = time.perf_counter()
+
+    proceso = subprocess.Popen(['perl', '-e', LANZADOR, memoria.name] + orden, cwd=directorio, env=entorno, stdin=subprocess.PIPE,
+                               stdout=salida, stderr=subprocess.STDOUT, start_new_session=True)
+    try:
+        proceso.stdin.write(RESPUESTAS)
+        proceso.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    # wait4 da el tiempo de CPU del lanzador y de todos sus descendientes
+    def agotado(*_):
+        try:
+            os.killpg(proceso.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    signal.signal(signal.SIGALRM, agotado)
+    signal.setitimer(signal.ITIMER_REAL, limite)
+    try:
+        _, estado, uso = os.wait4(proceso.pid, 0)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    segundos = time.perf_counter() - inicio
+    proceso.returncode = os.waitstatus_to_exitcode(estado)
+
+    # El lanzador cuenta como un proceso más
+    procesos_despues = contador_procesos()
+    procesos = procesos_despues - procesos_antes - 1 if procesos_antes is not None else None
+
+    # Sin syscall.ph no hay medida de memoria
+    rss = memoria.read().strip()
+    rss_max_kb = int(rss) if rss.isdigit() else None
+    memoria.close()
+
+    salida.seek(0)
+    texto = salida.read().decode('utf-8', 'replace')
+    salida.close()
+    return segundos, procesos, rss_max_kb, uso.ru_utime, uso.ru_stime, proceso.returncode, texto
+
+def copiar_estado(origen, destino):
+    """Copia (o restaura) los directorios de estado de una instalación"""
+    for directorio in ESTADO:
+        ruta = os.path.join(destino, directorio)
+        if os.path.exists(ruta):
+            shutil.rmtree(ruta)
+        shutil.copytree(os.path.join(origen, directorio), ruta)
+
+def medir_tamano(hosts, modulos, args):
+    """Genera la red de N hosts y mide cada módulo; devuelve los resultados"""
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix='simred_bench_') as temporal:
+        arbol = os.path.join(temporal, 'sim-red')
+        inicial = os.path.join(temporal, 'estado')
+
+        print(f"🔄 Generando red simulada de {hosts} hosts...")
+        inicio = time.perf_counter()
+        entorno = dict(os.environ, TERM='dumb', LC_ALL='C.UTF-8')
+        entorno.update(crear_red_simulada(arbol, hosts, args.meses, args.semilla))
+        print(f"   Generada en {time.perf_counter() - inicio:.1f}s")
+        copiar_estado(arbol, inicial)
+
+        for modulo in modulos:
+            medidas = []
+            for _ in range(args.repeticiones):
+                copiar_estado(inicial, arbol)
+                medidas.append(ejecutar(MODULOS[modulo], arbol, entorno, args.limite))
+                if medidas[-1][5] != 0:
+                    break
+
+            segundos = [m[0] for m in medidas]
+            ultima = medidas[-1]
+            resultado = {
+                'modulo': modulo,
+                'hosts': hosts,
+                'segundos': round(statistics.median(segundos), 4),
+                'segundos_min': round(min(segundos), 4),
+                'procesos': min((m[1] for m in medidas if m[1] is not None), default=None),
+                'rss_max_kb': max((m[2] for m in medidas if m[2] is not None), default=None),
+                'cpu_usuario': round(statistics.median(m[3] for m in medidas), 4),
+                'cpu_sistema': round(statistics.median(m[4] for m in medidas), 4),
+                'codigo': ultima[5],
+            }
+            if ultima[5] != 0:
+                texto = re.sub(r'\x1b\[[0-9;]*m', '', ultima[6])
+                resultado['error'] = texto.strip().splitlines()[-5:]
+
+            resultados.append(resultado)
+            marca = '✅' if ultima[5] == 0 else '❌'
+            print(f"   {marca} {modulo:<18} {resultado['segundos']:>9.3f}s "
+                  f"{resultado['procesos'] if resultado['procesos'] is not None else '-':>7} procesos "
+                  f"{resultado['rss_max_kb'] if resultado['rss_max_kb'] is not None else '-':>8} KB")
+    return resultados
+
+def comparar(base, actual, tolerancia):
+    """Muestra las diferencias con una línea base; devuelve el número de regresiones"""
+    anteriores = {(r['modulo'], r['hosts']): r for r in base.get('resultados', [])}
+    metricas = (('segundos', RUIDO_SEGUNDOS), ('procesos', RUIDO_PROCESOS), ('rss_max_kb', RUIDO_RSS_KB))
+    regresiones = 0
+
+    print(f"\nComparación con la línea base del {base.get('fecha', '?')} (tolerancia {tolerancia}%):")
+    for r in actual['resultados']:
+        anterior = anteriores.get((r['modulo'], r['hosts']))
+        if not anterior:
+            print(f"   {r['modulo']:<18} {r['hosts']:>6} hosts   (sin línea base)")
+            continue
+
+        cambios = []
+        for metrica, ruido in metricas:
+            antes, ahora = anterior.get(metrica), r.get(metrica)
+            if antes is None or ahora is None:
+                continue
+            delta = (ahora - antes) * 100 / antes if antes else 0.0
+            regresion = ahora - antes > ruido and delta > tolerancia
+            regresiones += regresion
+            cambios.append(f"{metrica} {delta:+.1f}%{' REGRESIÓN' if regresion else ''}")
+        print(f"   {r['modulo']:<18} {r['hosts']:>6} hosts   " + ', '.join(cambios))
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide los módulos de SIM-RED sobre redes simuladas')
+    parser.add_argument('--tamanos', default='10,1000,10000',
+                        help='hosts de cada red simulada, separados por comas (por defecto, 10,1000,10000)')
+    parser.add_argument('--modulos', default=MODULOS_POR_DEFECTO,
+                        help=f'módulos a medir, separados por comas (disponibles: {", ".join(MODULOS)})')
+    parser.add_argument('--repeticiones', type=int, default=3, help='ejecuciones por módulo (por defecto, 3)')
+    parser.add_argument('--meses', type=int, default=3, help='meses de históricos (por defecto, 3)')
+    parser.add_argument('--semilla', type=int, default=1, help='semilla de los datos aleatorios')
+    parser.add_argument('--limite', type=float, default=900,
+                        help='segundos máximos por ejecución (por defecto, 900)')
+    parser.add_argument('--salida', help='archivo JSON de resultados (por defecto, data/bench/benchmark_FECHA.json)')
+    parser.add_argument('--comparar', metavar='BASE', help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=20,
+                        help='aumento permitido, en %%, antes de marcar una regresión (por defecto, 20)')
+    args = parser.parse_args()
+
+    tamanos = [int(t) for t in args.tamanos.split(',') if t.strip()]
+    modulos = [m.strip() for m in args.modulos.split(',') if m.strip()]
+    desconocidos = [m for m in modulos if m not in MODULOS]
+    if desconocidos:
+        print(f"❌ Módulos desconocidos: {', '.join(desconocidos)}")
+        return 2
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    salida = args.salida or os.path.join(base_dir, 'data', 'bench',
+                                         time.strftime('benchmark_%Y%m%d_%H%M%S.json'))
+
+    informe = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'sistema': {
+            'bash': version(['bash', '--version']),
+            'perl': version(['perl', '-e', 'print "$^V\\n"']),
+            'kernel': platform.release(),
+            'cpus': os.cpu_count(),
+        },
+        'parametros': {
+            'tamanos': tamanos,
+            'modulos': modulos,
+            'repeticiones': args.repeticiones,
+            'meses': args.meses,
+            'semilla': args.semilla,
+        },
+        'resultados': [],
+    }
+
+    for hosts in tamanos:
+        informe['resultados'].extend(medir_tamano(hosts, modulos, args))
+
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Resultados guardados en: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(json.load(f), informe, args.tolerancia)
+        if regresiones:
+            print(f"❌ {regresiones} regresiones")
+            return 1
+        print("✅ Sin regresiones")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/host_registry.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/devices.log"
 
@@ -12,13 +13,16 @@ LOG_FILE="${SCRIPT_DIR}/logs/devices.log"
 main() {
     print_header "Verificación de Dispositivos Conectados"
     
-    # Verificar herramientas requeridas
-    if ! check_required_tools arp-scan gawk; then
+    # Verificar herramientas requeridas (sin perl, el barrido lo hace arp-scan)
+    local -a tools=(gawk)
+    command_exists perl || tools+=(arp-scan)
+    if ! check_required_tools "${tools[@]}"; then
         return 1
     fi
     
-    # Verificar si se ejecuta como root (necesario para arp-scan)
-    if ! check_root; then
+    # Verificar si se ejecuta como root (necesario para el barrido ARP,
+    # no con una tabla ARP simulada)
+    if [[ -z "$SIMRED_ARP_SOURCE" ]] && ! check_root; then
         return 1
     fi
     
@@ -43,7 +47,8 @@ main() {
     local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
     local schedule_file="${SCRIPT_DIR}/config/schedule.conf"
     
-    if ! check_file "$hosts_file"; then
+    # Cargar índices de hosts y horarios (una sola lectura por ejecución)
+    if ! registry_load "$hosts_file" "$schedule_file"; then
         return 1
     fi
     
@@ -58,9 +63,13 @@ main() {
     local unknown_count=0
     local unauthorized_count=0
     
-    # Procesar cada dispositivo encontrado
-    while IFS='|' read -r ip mac; do
-        analyze_device "$ip" "$mac" "$hosts_file" "$schedule_file"
+    local -A seen_ips=()
+    
+    # Procesar todos los dispositivos encontrados en una sola consulta
+    while IFS='|' read -r ip mac hostname check_status auth_mac; do
+        seen_ips[$ip]=1
+        
+        analyze_device "$ip" "$mac" "$hostname" "$check_status" "$auth_mac"
         local status=$?
         
         case $status in
@@ -68,7 +77,7 @@ main() {
             1) ((unknown_count++)) ;;
             2) ((unauthorized_count++)) ;;
         esac
-    done <<< "$arp_data"
+    done < <(registry_check_batch <<< "$arp_data")
     
     # Verificar dispositivos autorizados que NO están conectados
     echo ""
@@ -78,14 +87,14 @@ main() {
     echo ""
     
     local disconnected_count=0
-    while IFS='|' read -r auth_ip auth_mac auth_hostname auth_desc; do
+    for auth_ip in "${REG_HOST_ORDER[@]}"; do
         # Verificar si esta IP fue encontrada en el escaneo
-        if ! echo "$arp_data" | grep -q "^${auth_ip}|"; then
+        if [[ -z "${seen_ips[$auth_ip]}" ]]; then
             printf "  ${YELLOW}%-15s %-20s %-15s${NC} [DESCONECTADO]\n" \
-                "$auth_ip" "$auth_mac" "$auth_hostname"
+                "$auth_ip" "${REG_HOST_MAC[$auth_ip]}" "${REG_HOST_NAME[$auth_ip]}"
             ((disconnected_count++))
         fi
-    done < <(load_authorized_hosts "$hosts_file")
+    done
     
     if [[ $disconnected_count -eq 0 ]]; then
         print_info "Todos los dispositivos autorizados están conectados"
@@ -109,62 +118,54 @@ main() {
     press_any_key
 }
 
-# Analizar un dispositivo individual
+# Mostrar y registrar el resultado de un dispositivo
+# Recibe el estado calculado por registry_check_batch
 analyze_device() {
     local ip="$1"
     local mac="$2"
-    local hosts_file="$3"
-    local schedule_file="$4"
+    local hostname="$3"
+    local check_status="$4"
+    local auth_mac="$5"
     
-    # Verificar si la IP está autorizada
-    if is_authorized_ip "$ip" "$hosts_file"; then
-        local auth_mac=$(get_authorized_mac "$ip" "$hosts_file")
-        local hostname=$(get_hostname_for_ip "$ip" "$hosts_file")
-        
-        # Verificar si la MAC coincide
-        if [[ "${mac,,}" != "${auth_mac,,}" ]]; then
+    case "$check_status" in
+        "MAC_MISMATCH")
             printf "  ${RED}%-15s %-20s %-15s${NC} [MAC NO COINCIDE: esperado %s]\n" \
                 "$ip" "$mac" "$hostname" "$auth_mac"
             log_message "WARNING" "MAC mismatch for $ip: found $mac, expected $auth_mac" "$LOG_FILE"
             return 2
-        fi
-        
-        # Verificar horario
-        local schedule_status=$(check_schedule "$ip" "$schedule_file")
-        
-        case "$schedule_status" in
-            "ALLOWED")
-                printf "  ${GREEN}%-15s %-20s %-15s${NC} [✓ AUTORIZADO]\n" \
-                    "$ip" "$mac" "$hostname"
-                log_message "INFO" "Authorized device: $ip ($hostname)" "$LOG_FILE"
-                return 0
-                ;;
-            "WRONG_DAY")
-                printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ FUERA DE DÍA]\n" \
-                    "$ip" "$mac" "$hostname"
-                log_message "WARNING" "Device outside allowed days: $ip ($hostname)" "$LOG_FILE"
-                return 2
-                ;;
-            "WRONG_TIME")
-                printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ FUERA DE HORARIO]\n" \
-                    "$ip" "$mac" "$hostname"
-                log_message "WARNING" "Device outside allowed hours: $ip ($hostname)" "$LOG_FILE"
-                return 2
-                ;;
-            "NO_SCHEDULE")
-                printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ SIN HORARIO DEFINIDO]\n" \
-                    "$ip" "$mac" "$hostname"
-                log_message "WARNING" "No schedule defined for: $ip ($hostname)" "$LOG_FILE"
-                return 2
-                ;;
-        esac
-    else
-        # Dispositivo desconocido
-        printf "  ${RED}%-15s %-20s %-15s${NC} [✗ DESCONOCIDO]\n" \
-            "$ip" "$mac" "???"
-        log_message "ALERT" "Unknown device detected: $ip ($mac)" "$LOG_FILE"
-        return 1
-    fi
+            ;;
+        "ALLOWED")
+            printf "  ${GREEN}%-15s %-20s %-15s${NC} [✓ AUTORIZADO]\n" \
+                "$ip" "$mac" "$hostname"
+            log_message "INFO" "Authorized device: $ip ($hostname)" "$LOG_FILE"
+            return 0
+            ;;
+        "WRONG_DAY")
+            printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ FUERA DE DÍA]\n" \
+                "$ip" "$mac" "$hostname"
+            log_message "WARNING" "Device outside allowed days: $ip ($hostname)" "$LOG_FILE"
+            return 2
+            ;;
+        "WRONG_TIME")
+            printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ FUERA DE HORARIO]\n" \
+                "$ip" "$mac" "$hostname"
+            log_message "WARNING" "Device outside allowed hours: $ip ($hostname)" "$LOG_FILE"
+            return 2
+            ;;
+        "NO_SCHEDULE")
+            printf "  ${YELLOW}%-15s %-20s %-15s${NC} [⚠ SIN HORARIO DEFINIDO]\n" \
+                "$ip" "$mac" "$hostname"
+            log_message "WARNING" "No schedule defined for: $ip ($hostname)" "$LOG_FILE"
+            return 2
+            ;;
+        *)
+            # Dispositivo desconocido
+            printf "  ${RED}%-15s %-20s %-15s${NC} [✗ DESCONOCIDO]\n" \
+                "$ip" "$mac" "???"
+            log_message "ALERT" "Unknown device detected: $ip ($mac)" "$LOG_FILE"
+            return 1
+            ;;
+    esac
 }
 
 # Ejecutar función principal
@@ -6,42 +6,52 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/dns.log"
+DNS_PROBE_TOOL="${SCRIPT_DIR}/lib/dns_probe.pl"
 
 # Función principal
 main() {
     print_header "Comprobación de Disponibilidad del DNS"
     
     # Verificar herramientas requeridas
-    if ! check_required_tools dig; then
-        print_warning "dig no está disponible, intentando con host..."
-        if ! check_required_tools host; then
-            return 1
-        fi
+    if ! check_required_tools perl; then
+        return 1
     fi
     
     # Inicializar log
     init_log "$LOG_FILE"
     
-    # Obtener servidores DNS desde configuración
+    # Obtener servidores DNS, nombres y tipos desde configuración
     local dns_servers="${DNS_SERVERS:-8.8.8.8 8.8.4.4 1.1.1.1}"
+    local test_names="${DNS_TEST_NAMES:-google.com}"
+    local test_types="${DNS_TEST_TYPES:-A}"
     
     print_info "Probando servidores DNS: $dns_servers"
+    print_info "Consultas: $test_names ($test_types), ${DNS_PROBE_ROUNDS:-3} rondas"
     echo ""
     
     print_separator
-    printf "${BOLD}%-20s %-15s %-15s %s${NC}\n" \
-        "Servidor DNS" "Estado" "Tiempo (ms)" "Resultado"
+    printf "${BOLD}%-20s %-15s %9s %9s %9s %9s  %s${NC}\n" \
+        "Servidor DNS" "Estado" "p50 (ms)" "p95 (ms)" "NXDOMAIN" "SERVFAIL" "Resultado"
     print_separator
     
-    local test_domain="google.com"
     local all_ok=true
+    local now=$(date +%s)
+    local tag server sent answered timeouts noerror nxdomain servfail other p50 p95 max answer
     
-    for dns in $dns_servers; do
-        test_dns_server "$dns" "$test_domain"
-        if [[ $? -ne 0 ]]; then
+    # Todas las consultas salen a la vez; cada una se cronometra dentro del proceso
+    while IFS='|' read -r tag server sent answered timeouts noerror nxdomain servfail other p50 p95 max answer; do
+        [[ "$tag" == "SERVER" ]] || continue
+        
+        if ! show_dns_server "$server" "$sent" "$answered" "$timeouts" "$nxdomain" "$servfail" \
+            "$p50" "$p95" "$answer" "$now"; then
             all_ok=false
         fi
-    done
+    done < <(perl "$DNS_PROBE_TOOL" \
+        --names "$test_names" \
+        --types "$test_types" \
+        --rounds "${DNS_PROBE_ROUNDS:-3}" \
+        --timeout "${DNS_TIMEOUT:-2}" \
+        $dns_servers)
     
     print_separator
     echo ""
@@ -56,59 +66,57 @@ main() {
     press_any_key
 }
 
-# Probar un servidor DNS individual
-test_dns_server() {
-    local dns="$1"
-    local domain="$2"
-    
-    # Intentar primero con dig
-    if command_exists dig; then
-        local start_time=$(date +%s%N)
-        local result=$(dig @"$dns" "$domain" +short +time=2 +tries=1 2>/dev/null)
-        local end_time=$(date +%s%N)
+# Mostrar, registrar y guardar el resultado de un servidor (línea SERVER de dns_probe.pl)
+show_dns_server() {
+    local server="$1" sent="$2" answered="$3" timeouts="$4" nxdomain="$5" servfail="$6"
+    local p50="$7" p95="$8" answer="$9" now="${10}"
+    # Los corchetes de [IPv6]:PORT no son válidos en un nombre de serie
+    local series="dns.${server//[][]/}"
+    
+    if [[ "$answered" -eq 0 ]]; then
+        printf "%-20s ${RED}%-15s${NC} %9s %9s %9s %9s  %s\n" \
+            "$server" "✗ No responde" "-" "-" "-" "-" "Timeout"
         
-        if [[ -n "$result" ]]; then
-            local time_ms=$(( (end_time - start_time) / 1000000 ))
-            
-            local color="$GREEN"
-            if [[ $time_ms -gt 1000 ]]; then
-                color="$YELLOW"
-            fi
-            
-            printf "%-20s ${GREEN}%-15s${NC} ${color}%-15s${NC} %s\n" \
-                "$dns" "✓ Disponible" "${time_ms} ms" "$(echo "$result" | head -1)"
-            
-            log_message "INFO" "DNS $dns is available (${time_ms}ms)" "$LOG_FILE"
-            return 0
-        else
-            printf "%-20s ${RED}%-15s${NC} %-15s %s\n" \
-                "$dns" "✗ No responde" "-" "Timeout"
-            
-            log_message "ERROR" "DNS $dns is not responding" "$LOG_FILE"
-            return 1
-        fi
-    # Alternativa con comando host
-    elif command_exists host; then
-        local start_time=$(date +%s%N)
-        local result=$(host -W 2 "$domain" "$dns" 2>/dev/null | grep "has address")
-        local end_time=$(date +%s%N)
+        log_message "ERROR" "DNS $server is not responding ($sent queries)" "$LOG_FILE"
         
-        if [[ -n "$result" ]]; then
-            local time_ms=$(( (end_time - start_time) / 1000000 ))
-            
-            printf "%-20s ${GREEN}%-15s${NC} %-15s %s\n" \
-                "$dns" "✓ Disponible" "${time_ms} ms" "OK"
-            
-            log_message "INFO" "DNS $dns is available (${time_ms}ms)" "$LOG_FILE"
-            return 0
-        else
-            printf "%-20s ${RED}%-15s${NC} %-15s %s\n" \
-                "$dns" "✗ No responde" "-" "Timeout"
-            
-            log_message "ERROR" "DNS $dns is not responding" "$LOG_FILE"
-            return 1
-        fi
+        # La caída también queda en el histórico (100% de timeouts)
+        tsdb_append "$series" "$now" 0 0 0 0 100
+        return 1
+    fi
+    
+    # Porcentajes sobre las consultas respondidas
+    local nx_rate=$(( nxdomain * 100 / answered ))
+    local sf_rate=$(( servfail * 100 / answered ))
+    local timeout_rate=$(( timeouts * 100 / sent ))
+    
+    local status="✓ Disponible"
+    local status_color="$GREEN"
+    local rc=0
+    if [[ "$timeouts" -gt 0 ]] || [[ "$servfail" -gt 0 ]]; then
+        status="⚠ Inestable"
+        status_color="$YELLOW"
+        rc=1
     fi
+    
+    local color="$GREEN"
+    if [[ ${p50%.*} -gt 1000 ]]; then
+        color="$YELLOW"
+    fi
+    
+    printf "%-20s ${status_color}%-15s${NC} ${color}%9s${NC} %9s %8s%% %8s%%  %s\n" \
+        "$server" "$status" "$p50" "$p95" "$nx_rate" "$sf_rate" "${answer:-Sin direcciones}"
+    
+    if [[ $rc -eq 0 ]]; then
+        log_message "INFO" "DNS $server is available (p50=${p50}ms p95=${p95}ms, nxdomain=${nx_rate}%)" "$LOG_FILE"
+    else
+        log_message "WARNING" "DNS $server is unstable (p50=${p50}ms p95=${p95}ms, servfail=${sf_rate}%, timeouts=${timeout_rate}%)" "$LOG_FILE"
+    fi
+    
+    # Histórico por servidor y detector incremental
+    tsdb_append "$series" "$now" "$p50" "$p95" "$nx_rate" "$sf_rate" "$timeout_rate"
+    echo "$series.p50 $now $p50" | anomaly_observe
+    
+    return $rc
 }
 
 # Ejecutar función principal
@@ -1,20 +1,85 @@
 #!/bin/bash
 # SIM-RED EXTENDIDO - Script de Verificación de Integridad de Archivos
-# Función 8: Verificar integridad del archivo hosts.conf
+# Función 8: Verificar integridad de la configuración, scripts y bibliotecas
+#
+# Uso: check_integrity.sh [--watch]
+#   --watch  vigila los archivos en tiempo real (inotify) sin preguntar
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/integrity.log"
-HOSTS_FILE="${SCRIPT_DIR}/config/hosts.conf"
+INTEGRITY_TOOL="${SCRIPT_DIR}/lib/integrity.pl"
+MANIFEST_FILE="${SCRIPT_DIR}/data/integrity.manifest"
+# Hash único de hosts.conf de versiones anteriores (se importa una vez)
 INTEGRITY_FILE="${SCRIPT_DIR}/data/integrity.sha256"
 
+# Opciones comunes de lib/integrity.pl
+integrity() {
+    perl "$INTEGRITY_TOOL" \
+        --manifest "$MANIFEST_FILE" \
+        --paths "${INTEGRITY_PATHS:-config/*.conf bin/*.sh lib/*}" \
+        --legacy "$INTEGRITY_FILE" \
+        "$@"
+}
+
+# Muestra y registra una línea de resultado de integrity.pl
+show_result() {
+    local status="$1" path="$2" size="$3" sha="$4"
+    
+    case "$status" in
+        MODIFIED)
+            print_error "⚠ MODIFICADO: $path"
+            echo "    Nuevo hash: $sha ($size bytes)"
+            log_message "ALERT" "File integrity check FAILED for $path (sha256 $sha)" "$LOG_FILE"
+            ;;
+        MISSING)
+            print_error "⚠ ELIMINADO: $path"
+            log_message "ALERT" "File integrity check FAILED for $path (file missing)" "$LOG_FILE"
+            ;;
+        NEW)
+            print_warning "⚠ NUEVO: $path ($size bytes)"
+            log_message "WARNING" "File not in integrity manifest: $path" "$LOG_FILE"
+            ;;
+        RESTORED)
+            print_success "✓ ÍNTEGRO de nuevo: $path"
+            log_message "INFO" "File integrity restored for $path" "$LOG_FILE"
+            ;;
+    esac
+}
+
+# Vigilancia en tiempo real hasta Ctrl+C
+watch_integrity() {
+    print_info "Vigilando cambios en tiempo real (Ctrl+C para terminar)..."
+    echo ""
+    
+    local watch_fd
+    exec {watch_fd}< <(integrity watch 2>&1)
+    WATCH_PID=$!
+    trap 'kill "$WATCH_PID" 2>/dev/null; echo ""; print_info "Vigilancia detenida"; log_flush; exit 0' INT TERM
+    
+    local status path size sha
+    while IFS='|' read -r -u "$watch_fd" status path size sha; do
+        if [[ "$status" == "READY" ]]; then
+            if [[ "$path" == "poll" ]]; then
+                print_warning "inotifywait no está disponible: revisando cada pocos segundos"
+            fi
+            print_info "Vigilando $size archivos"
+            continue
+        fi
+    
+        # Los cambios se registran al momento
+        show_result "$status" "$path" "$size" "$sha"
+        log_flush
+    done
+}
+
 # Función principal
 main() {
     print_header "Verificación de Integridad de Archivos"
     
     # Verificar herramientas requeridas
-    if ! check_required_tools sha256sum; then
+    if ! check_required_tools perl; then
         return 1
     fi
     
@@ -22,52 +87,61 @@ main() {
     init_log "$LOG_FILE"
     ensure_dir "${SCRIPT_DIR}/data"
     
-    # Verificar si el archivo hosts existe
-    if ! check_file "$HOSTS_FILE"; then
-        return 1
+    if [[ "$1" == "--watch" ]]; then
+        watch_integrity
+        return 0
     fi
     
-    print_info "Verificando integridad de: $HOSTS_FILE"
+    print_info "Verificando integridad de: ${INTEGRITY_PATHS:-config/*.conf bin/*.sh lib/*}"
     echo ""
     
-    # Calcular hash actual
-    local current_hash=$(sha256sum "$HOSTS_FILE" | awk '{print $1}')
+    local first_run=false
+    [[ -f "$MANIFEST_FILE" ]] || first_run=true
+    
+    # Solo se vuelven a leer los archivos cuyo tamaño, fecha o inodo cambió
+    local status path size sha
+    local files=0 hashed=0 modified=0 missing=0 new=0
+    while IFS='|' read -r status path size sha; do
+        if [[ "$status" == "SUMMARY" ]]; then
+            IFS='|' read -r files hashed modified missing new <<< "$path|$size|$sha"
+        elif [[ "$first_run" == false ]] || [[ "$status" != "NEW" ]]; then
+            show_result "$status" "$path" "$size" "$sha"
+        fi
+    done < <(integrity check)
     
-    print_info "Hash actual: $current_hash"
+    echo ""
+    print_info "Archivos verificados: $files (releídos: $hashed)"
+    echo ""
     
-    # Verificar si el archivo de integridad existe
-    if [[ -f "$INTEGRITY_FILE" ]]; then
-        local stored_hash=$(cat "$INTEGRITY_FILE" 2>/dev/null)
-        print_info "Hash almacenado: $stored_hash"
+    if [[ "$first_run" == true ]] && (( modified + missing == 0 )); then
+        print_warning "No existe manifiesto de integridad (primera ejecución)"
         echo ""
-        
-        # Comparar hashes
-        if [[ "$current_hash" == "$stored_hash" ]]; then
-            print_success "✓ El archivo NO ha sido modificado"
-            log_message "INFO" "File integrity check passed for hosts.conf" "$LOG_FILE"
-        else
-            print_error "⚠ El archivo HA SIDO MODIFICADO"
-            print_warning "Se detectó un cambio en el archivo de hosts autorizados"
-            log_message "ALERT" "File integrity check FAILED for hosts.conf" "$LOG_FILE"
-            
-            echo ""
-            if ask_yes_no "¿Deseas actualizar el hash almacenado?" "n"; then
-                echo "$current_hash" > "$INTEGRITY_FILE"
-                print_success "Hash actualizado"
-                log_message "INFO" "Integrity hash updated for hosts.conf" "$LOG_FILE"
-            fi
+    
+        if ask_yes_no "¿Deseas crear el manifiesto de integridad?" "y"; then
+            integrity update > /dev/null
+            print_success "✓ Manifiesto de integridad creado ($files archivos)"
+            log_message "INFO" "Integrity manifest created for $files files" "$LOG_FILE"
         fi
+    elif (( modified + missing + new == 0 )); then
+        print_success "✓ Ningún archivo ha sido modificado"
+        log_message "INFO" "File integrity check passed for $files files" "$LOG_FILE"
     else
-        print_warning "No existe hash almacenado (primera ejecución)"
+        print_error "⚠ SE DETECTARON CAMBIOS: $modified modificados, $missing eliminados, $new nuevos"
+    
         echo ""
-        
-        if ask_yes_no "¿Deseas crear el hash de integridad?" "y"; then
-            echo "$current_hash" > "$INTEGRITY_FILE"
-            print_success "✓ Hash de integridad creado"
-            log_message "INFO" "Integrity hash created for hosts.conf: $current_hash" "$LOG_FILE"
+        if ask_yes_no "¿Deseas aceptar los cambios y actualizar el manifiesto?" "n"; then
+            local updated=$(integrity update | wc -l)
+            print_success "Manifiesto actualizado"
+            log_message "INFO" "Integrity manifest updated ($updated entries)" "$LOG_FILE"
         fi
     fi
     
+    echo ""
+    if ask_yes_no "¿Deseas vigilar los archivos en tiempo real?" "n"; then
+        echo ""
+        watch_integrity
+    fi
+    
     echo ""
     press_any_key
 }
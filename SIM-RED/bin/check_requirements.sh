@@ -175,6 +175,9 @@ install_tool() {
         dig|host)
             package="dnsutils"
             ;;
+        inotifywait)
+            package="inotify-tools"
+            ;;
         ip)
             package="iproute2"
             ;;
@@ -13,7 +13,7 @@ main() {
     print_header "Verificación de Suplantación de IP/MAC (Anti-Spoofing)"
     
     # Verificar herramientas requeridas
-    if ! check_required_tools gawk; then
+    if ! check_required_tools gawk perl; then
         return 1
     fi
     
@@ -122,25 +122,31 @@ main() {
     print_separator
     echo ""
     
-    local history_file="${SCRIPT_DIR}/data/arp_history.dat"
+    local bindings_tool="${SCRIPT_DIR}/lib/arp_bindings.pl"
+    local bindings_store="${SCRIPT_DIR}/data/arp_bindings.dat"
+    local legacy_file="${SCRIPT_DIR}/data/arp_history.dat"
+    local -a bindings_opts=(--store "$bindings_store" --days "${ARP_BINDING_RETENTION_DAYS:-30}")
     ensure_dir "${SCRIPT_DIR}/data"
     
-    if [[ -f "$history_file" ]]; then
-        # Comparar con datos históricos
+    # El historial antiguo (solo la última instantánea) se importa una vez
+    if [[ ! -f "$bindings_store" ]] && [[ -s "$legacy_file" ]]; then
+        perl "$bindings_tool" "${bindings_opts[@]}" observe "$(stat -c %Y "$legacy_file")" \
+            < "$legacy_file" > /dev/null
+    fi
+    
+    if [[ -f "$bindings_store" ]]; then
         local changes_detected=false
+        local event ip old_mac new_mac old_last
         
-        while IFS='|' read -r current_ip current_mac; do
-            # Verificar si esta IP existía antes
-            local old_mac=$(grep "^${current_ip}|" "$history_file" 2>/dev/null | cut -d'|' -f2 | tail -1)
-            
-            if [[ -n "$old_mac" ]] && [[ "${old_mac,,}" != "${current_mac,,}" ]]; then
-                changes_detected=true
-                print_warning "⚠ IP $current_ip cambió de MAC:"
-                echo "    Anterior: $old_mac"
-                echo "    Actual:   $current_mac"
-                log_message "WARNING" "MAC change detected for $current_ip: $old_mac -> $current_mac" "$LOG_FILE"
-            fi
-        done <<< "$arp_data"
+        # Un solo paso sobre la instantánea: cada entrada se compara por índice
+        while IFS='|' read -r event ip old_mac new_mac old_last; do
+            [[ "$event" == "CHANGE" ]] || continue
+            changes_detected=true
+            print_warning "⚠ IP $ip cambió de MAC:"
+            echo "    Anterior: $old_mac (visto por última vez $(printf '%(%Y-%m-%d %H:%M)T' "$old_last"))"
+            echo "    Actual:   $new_mac"
+            log_message "WARNING" "MAC change detected for $ip: $old_mac -> $new_mac" "$LOG_FILE"
+        done < <(perl "$bindings_tool" "${bindings_opts[@]}" observe <<< "$arp_data")
         
         if [[ "$changes_detected" == false ]]; then
             print_success "✓ No se detectaron cambios de MAC"
@@ -148,11 +154,46 @@ main() {
             issues_found=true
         fi
     else
-        print_info "Primera ejecución - creando historial de ARP"
+        print_info "Primera ejecución - creando historial de vínculos IP/MAC"
+        perl "$bindings_tool" "${bindings_opts[@]}" observe <<< "$arp_data" > /dev/null
     fi
     
-    # Actualizar historial
-    echo "$arp_data" > "$history_file"
+    # Historial de vínculos en la ventana configurada
+    local window="${ARP_HISTORY_WINDOW:-7d}"
+    echo ""
+    print_separator
+    print_color "$CYAN" "Verificando: Historial de vínculos IP/MAC (últimos $window)"
+    print_separator
+    echo ""
+    
+    local history_found=false
+    local key count values value_a value_b first last
+    
+    while IFS='|' read -r ip count values first last; do
+        history_found=true
+        print_warning "⚠ IP $ip cambió de MAC $count veces: ${values//,/, }"
+        echo "    Entre $(printf '%(%Y-%m-%d %H:%M)T' "$first") y $(printf '%(%Y-%m-%d %H:%M)T' "$last")"
+        log_message "WARNING" "MAC flapping for $ip: $count changes ($values)" "$LOG_FILE"
+    done < <(perl "$bindings_tool" --store "$bindings_store" --since "$window" \
+        --min "${ARP_FLAP_THRESHOLD:-3}" flapping)
+    
+    while IFS='|' read -r key value_a value_b first last; do
+        history_found=true
+        print_warning "⚠ IP $key respondió con $value_a y $value_b a la vez"
+        echo "    Desde $(printf '%(%Y-%m-%d %H:%M)T' "$first") hasta $(printf '%(%Y-%m-%d %H:%M)T' "$last")"
+    done < <(perl "$bindings_tool" --store "$bindings_store" --since "$window" dup-ip)
+    
+    while IFS='|' read -r key value_a value_b first last; do
+        history_found=true
+        print_warning "⚠ MAC $key respondió por $value_a y $value_b a la vez"
+        echo "    Desde $(printf '%(%Y-%m-%d %H:%M)T' "$first") hasta $(printf '%(%Y-%m-%d %H:%M)T' "$last")"
+    done < <(perl "$bindings_tool" --store "$bindings_store" --since "$window" dup-mac)
+    
+    if [[ "$history_found" == false ]]; then
+        print_success "✓ Sin vínculos inestables ni duplicados en el historial"
+    else
+        issues_found=true
+    fi
     
     # Resumen
     echo ""
@@ -12,7 +12,7 @@ main() {
     print_header "Detección de Anomalías de Red"
     
     # Verificar herramientas requeridas
-    if ! check_required_tools gawk bc; then
+    if ! check_required_tools gawk; then
         return 1
     fi
     
@@ -62,6 +62,15 @@ main() {
         print_warning "No hay datos históricos de tráfico"
     fi
     
+    # Estado del detector incremental
+    echo ""
+    print_separator
+    print_color "$CYAN" "Detector Incremental (estadísticas acumuladas)"
+    print_separator
+    echo ""
+    
+    show_streaming_state
+    
     # Resumen
     echo ""
     print_separator
@@ -84,8 +93,11 @@ check_latency_anomalies() {
     local history_file="$1"
     local multiplier="$2"
     
+    # Últimas 31 entradas (desde el almacén binario, sin recorrer todo el archivo)
+    local recent=$(read_history_tail latency 31 "$history_file")
+    
     # Calcular promedio histórico (últimas 30 entradas, excluyendo la más reciente)
-    local stats=$(tail -31 "$history_file" | head -30 | awk -F'|' '
+    local stats=$(echo "$recent" | head -30 | awk -F'|' '
     {
         sum += $2
         count++
@@ -105,11 +117,12 @@ check_latency_anomalies() {
     local historical_avg="$stats"
     
     # Obtener latencia actual (entrada más reciente)
-    local current=$(tail -1 "$history_file" | cut -d'|' -f2)
+    local current=$(echo "$recent" | tail -1 | cut -d'|' -f2)
     
     # Comparar
-    local threshold=$(echo "$historical_avg * $multiplier" | bc)
-    local is_anomaly=$(echo "$current > $threshold" | bc)
+    local threshold is_anomaly
+    read -r threshold is_anomaly < <(awk -v c="$current" -v a="$historical_avg" -v m="$multiplier" \
+        'BEGIN {t = a * m; printf "%.2f %d\n", t, (c > t)}')
     
     printf "  Latencia histórica promedio: %.2f ms\n" "$historical_avg"
     printf "  Latencia actual:             %.2f ms\n" "$current"
@@ -132,13 +145,22 @@ check_traffic_anomalies() {
     local multiplier="$2"
     
     # Obtener interfaces únicas
-    local interfaces=$(awk -F'|' '{print $2}' "$history_file" | sort -u)
+    tsdb_import_history traffic "$history_file"
+    local interfaces
+    if tsdb_available && [[ -n "$(tsdb_query list traffic.)" ]]; then
+        interfaces=$(tsdb_query list traffic. | sed 's/^traffic\.//')
+    else
+        interfaces=$(awk -F'|' '{print $2}' "$history_file" | sort -u)
+    fi
     
     local anomaly_found=false
     
     for iface in $interfaces; do
+        # Últimas 31 entradas de esta interfaz
+        local recent=$(read_history_tail traffic 31 "$history_file" "$iface")
+        
         # Calcular promedio histórico para esta interfaz
-        local stats=$(grep "|${iface}|" "$history_file" | tail -31 | head -30 | awk -F'|' '
+        local stats=$(echo "$recent" | head -30 | awk -F'|' '
         {
             rx_sum += $3
             tx_sum += $4
@@ -160,16 +182,15 @@ check_traffic_anomalies() {
         local tx_avg=$(echo "$stats" | cut -d'|' -f2)
         
         # Obtener tráfico actual
-        local current=$(grep "|${iface}|" "$history_file" | tail -1)
+        local current=$(echo "$recent" | tail -1)
         local rx_current=$(echo "$current" | cut -d'|' -f3)
         local tx_current=$(echo "$current" | cut -d'|' -f4)
         
         # Verificar anomalías
-        local rx_threshold=$(echo "$rx_avg * $multiplier" | bc)
-        local tx_threshold=$(echo "$tx_avg * $multiplier" | bc)
-        
-        local rx_anomaly=$(echo "$rx_current > $rx_threshold" | bc)
-        local tx_anomaly=$(echo "$tx_current > $tx_threshold" | bc)
+        local rx_threshold rx_anomaly tx_threshold tx_anomaly
+        read -r rx_threshold rx_anomaly tx_threshold tx_anomaly < <(awk \
+            -v rc="$rx_current" -v ra="$rx_avg" -v tc="$tx_current" -v ta="$tx_avg" -v m="$multiplier" \
+            'BEGIN {rt = ra * m; tt = ta * m; printf "%.2f %d %.2f %d\n", rt, (rc > rt), tt, (tc > tt)}')
         
         printf "  Interfaz: %s\n" "$iface"
         printf "    RX: actual=%s, promedio=%s, umbral=%s\n" \
@@ -198,5 +219,59 @@ check_traffic_anomalies() {
     fi
 }
 
+# Mostrar el estado del detector incremental por serie
+# Las muestras se evalúan al recogerse (measure_latency.sh / measure_traffic.sh)
+show_streaming_state() {
+    if ! anomaly_available; then
+        print_warning "Detector incremental no disponible (requiere perl)"
+        return 0
+    fi
+    
+    local report=$(anomaly_tool report)
+    
+    if [[ -z "$report" ]]; then
+        print_warning "El detector aún no ha recibido muestras"
+        return 0
+    fi
+    
+    printf "${BOLD}%-28s %8s %12s %12s %12s %12s %8s${NC}\n" \
+        "Serie" "Muestras" "Media" "Desv.Est." "EWMA" "Mediana" "Z"
+    
+    local series n mean std ewma median mad last last_z last_ts
+    while IFS='|' read -r series n mean std ewma median mad last last_z last_ts; do
+        printf "%-28s %8d %12.2f %12.2f %12.2f %12.2f %8.2f\n" \
+            "$series" "$n" "$mean" "$std" "$ewma" "$median" "$last_z"
+    done <<< "$report"
+    
+    echo ""
+    print_info "Las alertas del detector se registran en: $ANOMALY_LOG"
+}
+
+# Obtener las últimas N entradas del historial en formato .dat
+# Usa el almacén binario (lectura O(N)) y recurre al archivo de texto si no existe
+read_history_tail() {
+    local kind="$1"
+    local count="$2"
+    local history_file="$3"
+    local iface="$4"
+    
+    tsdb_import_history "$kind" "$history_file"
+    
+    if [[ "$kind" == "latency" ]]; then
+        if tsdb_available && [[ -n "$(tsdb_query list latency)" ]]; then
+            tsdb_query tail latency "$count"
+        else
+            tail -n "$count" "$history_file"
+        fi
+    else
+        if tsdb_available && [[ -n "$(tsdb_query list "traffic.${iface}")" ]]; then
+            tsdb_query tail "traffic.${iface}" "$count" | \
+                awk -F'|' -v iface="$iface" '{print $1 "|" iface "|" $2 "|" $3}'
+        else
+            grep "|${iface}|" "$history_file" | tail -n "$count"
+        fi
+    fi
+}
+
 # Ejecutar función principal
 main "$@"
@@ -5,6 +5,7 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/port_scan.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/vpn.log"
 
@@ -27,6 +28,11 @@ main() {
     fi
     
     print_info "Analizando hosts autorizados para detectar uso de VPN/Proxy..."
+    
+    # Escanear puertos VPN de todos los hosts en un solo paso (o reutilizar el mapa reciente)
+    if ! port_scan_ensure "$hosts_file" "${VPN_PORTS:-1194,500,4500,1723}"; then
+        print_warning "No se pudo completar el escaneo de puertos VPN"
+    fi
     echo ""
     
     print_separator
@@ -109,16 +115,13 @@ analyze_host_for_vpn() {
         fi
     fi
     
-    # Prueba 3: Verificar puertos VPN
-    if command_exists nmap; then
-        local vpn_ports="${VPN_PORTS:-1194,500,4500,1723}"
-        local open_vpn_ports=$(nmap -p "$vpn_ports" -T4 --open "$ip" 2>/dev/null | \
-            grep "^[0-9]" | grep "open" | awk '{print $1}' | cut -d'/' -f1)
-        
-        if [[ -n "$open_vpn_ports" ]]; then
-            indicators+=("VPN_PORTS")
-            ((score += 40))
-        fi
+    # Prueba 3: Verificar puertos VPN (mapa de puertos del escaneo por lotes)
+    local vpn_ports="${VPN_PORTS:-1194,500,4500,1723}"
+    local open_vpn_ports=$(port_map_lookup "$ip" "$vpn_ports")
+    
+    if [[ -n "$open_vpn_ports" ]]; then
+        indicators+=("VPN_PORTS")
+        ((score += 40))
     fi
     
     # Calcular probabilidad
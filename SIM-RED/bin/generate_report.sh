@@ -5,6 +5,7 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/report_pipeline.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/system.log"
 REPORT_DIR="${SCRIPT_DIR}/reports"
@@ -26,15 +27,20 @@ main() {
     local report_html="${REPORT_DIR}/report_${timestamp}.html"
     local report_data="${REPORT_DIR}/report_${timestamp}.dat"
     
-    # Recopilar todos los datos
-    print_info "Analizando dispositivos..."
-    collect_device_data > "${report_data}.tmp"
+    # Recopilar todos los datos (etapas concurrentes con una sola captura ARP)
+    print_info "Analizando dispositivos, seguridad y rendimiento en paralelo..."
+    report_collect_all "$LOG_FILE" > "${report_data}.tmp"
     
-    print_info "Verificando seguridad..."
-    collect_security_data >> "${report_data}.tmp"
-    
-    print_info "Midiendo rendimiento..."
-    collect_performance_data >> "${report_data}.tmp"
+    # Tiempos de cada etapa
+    local stage seconds status
+    while IFS='|' read -r stage seconds status; do
+        if [[ "$status" == "OK" ]]; then
+            printf "  %-12s %8ss\n" "$stage" "$seconds"
+        else
+            print_color "$YELLOW" "⚠ Etapa '$stage' incompleta ($status tras ${seconds}s): datos parciales"
+        fi
+    done < <(sed -n '/^\[TIMINGS\]$/,$p' "${report_data}.tmp" | tail -n +2)
+    echo ""
     
     # Mover archivo temporal
     mv "${report_data}.tmp" "$report_data"
@@ -66,6 +72,10 @@ main() {
         echo "  - HTML: $report_html"
     fi
     
+    if [[ -f "${report_html%.html}.json" ]]; then
+        echo "  - JSON: ${report_html%.html}.json"
+    fi
+    
     print_separator
     echo ""
     
@@ -77,110 +87,6 @@ main() {
     press_any_key
 }
 
-# Recopilar datos de dispositivos
-collect_device_data() {
-    echo "[SUMMARY]"
-    
-    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
-    local total_auth=$(grep -v '^#' "$hosts_file" | grep -v '^[[:space:]]*$' | wc -l)
-    
-    echo "Total Hosts Autorizados: $total_auth"
-    
-    # Obtener dispositivos conectados
-    local connected=$(get_arp_table 2>/dev/null | wc -l)
-    echo "Dispositivos Conectados: $connected"
-    
-    echo ""
-    echo "[DEVICES]"
-    
-    # Listar dispositivos
-    while IFS='|' read -r ip mac; do
-        local hostname=$(get_hostname_for_ip "$ip" "$hosts_file")
-        
-        if [[ -z "$hostname" ]]; then
-            hostname="Desconocido"
-            echo "$ip|$mac|$hostname|WARNING"
-        else
-            echo "$ip|$mac|$hostname|OK"
-        fi
-    done < <(get_arp_table 2>/dev/null)
-}
-
-# Recopilar datos de seguridad
-collect_security_data() {
-    echo ""
-    echo "[SPOOFING]"
-    
-    # Verificar suplantación (simplificado)
-    local arp_data=$(get_arp_table 2>/dev/null)
-    
-    local spoofing=$(echo "$arp_data" | awk -F'|' '
-    {
-        ip_count[$1]++
-        mac_count[$2]++
-    }
-    END {
-        found = 0
-        for (ip in ip_count) {
-            if (ip_count[ip] > 1) {
-                print "IP duplicada: " ip
-                found = 1
-            }
-        }
-        for (mac in mac_count) {
-            if (mac_count[mac] > 1) {
-                print "MAC duplicada: " mac
-                found = 1
-            }
-        }
-        if (found == 0) {
-            print "No se detectaron anomalías"
-        }
-    }')
-    
-    echo "$spoofing"
-    
-    echo ""
-    echo "[ALERTS]"
-    
-    # Obtener alertas recientes de los logs
-    if [[ -f "${SCRIPT_DIR}/logs/spoofing.log" ]]; then
-        tail -10 "${SCRIPT_DIR}/logs/spoofing.log" | grep "ALERT" || echo "Sin alertas recientes"
-    else
-        echo "Sin alertas recientes"
-    fi
-}
-
-# Recopilar datos de rendimiento
-collect_performance_data() {
-    echo ""
-    echo "[LATENCY]"
-    
-    # Obtener datos de latencia
-    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
-    
-    while IFS='|' read -r ip mac hostname desc; do
-        local latency=$(ping_host "$ip" 4 2>/dev/null)
-        
-        if [[ -n "$latency" ]]; then
-            local min=$(echo "$latency" | cut -d'|' -f1)
-            local avg=$(echo "$latency" | cut -d'|' -f2)
-            local max=$(echo "$latency" | cut -d'|' -f3)
-            
-            local status="OK"
-            local avg_int=$(echo "$avg" | cut -d'.' -f1)
-            
-            if [[ $avg_int -gt 100 ]]; then
-                status="HIGH"
-            elif [[ $avg_int -gt 50 ]]; then
-                status="MEDIUM"
-            fi
-            
-            echo "$hostname|$min|$avg|$max|$status"
-        fi
-    done < <(load_authorized_hosts "$hosts_file" | head -5)
-}
-
 # Generar informe TXT
 generate_txt_report() {
     local data_file="$1"
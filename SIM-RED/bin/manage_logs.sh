@@ -16,6 +16,7 @@ main() {
         echo "  2) Borrar logs"
         echo "  3) Exportar logs"
         echo "  4) Estadísticas de logs"
+        echo "  5) Rotar y comprimir logs"
         echo "  0) Volver al menú principal"
         echo ""
         echo -n "Selecciona una opción: "
@@ -26,6 +27,7 @@ main() {
             2) clear_logs ;;
             3) export_logs ;;
             4) log_statistics ;;
+            5) rotate_logs ;;
             0) return 0 ;;
             *) print_error "Opción inválida" ;;
         esac
@@ -51,12 +53,12 @@ view_logs() {
     local -a log_files=()
     local i=1
     
+    # Tamaño y líneas desde el índice de cada log (sin recorrer los archivos)
     for log in $logs; do
-        local basename=$(basename "$log")
-        local size=$(du -h "$log" 2>/dev/null | cut -f1)
-        local lines=$(wc -l < "$log" 2>/dev/null)
+        log_index_read "$log"
+        bytes_to_human "${LOG_STATS[BYTES]}"
         
-        echo "  $i) $basename ($size, $lines líneas)"
+        echo "  $i) ${log##*/} ($REPLY, ${LOG_STATS[LINES]} líneas)"
         log_files+=("$log")
         ((i++))
     done
@@ -78,8 +80,15 @@ view_logs() {
         print_separator
         echo ""
         
-        # Mostrar con paginación
-        less "$selected" 2>/dev/null || cat "$selected" | more
+        echo -n "¿Mostrar solo las últimas 100 líneas? (s/N): "
+        read -r only_tail
+        
+        # Mostrar con paginación (tail lee desde el final del archivo)
+        if [[ "$only_tail" =~ ^[sSyY]$ ]]; then
+            tail -n 100 "$selected" | less 2>/dev/null || tail -n 100 "$selected"
+        else
+            less "$selected" 2>/dev/null || cat "$selected" | more
+        fi
     else
         print_error "Selección inválida"
     fi
@@ -109,9 +118,10 @@ clear_logs() {
         return
     fi
     
-    # Limpiar cada log
+    # Limpiar cada log junto con su versión JSON y su índice
     for log in $logs; do
         > "$log"
+        rm -f "${log%.log}.jsonl" "${log}.idx"
         print_success "✓ $(basename "$log") borrado"
     done
     
@@ -165,15 +175,13 @@ log_statistics() {
         "Log" "Tamaño" "Líneas" "INFO" "ALERT"
     print_separator
     
+    # Contadores acumulados en el índice de cada log
     for log in $logs; do
-        local basename=$(basename "$log")
-        local size=$(du -h "$log" 2>/dev/null | cut -f1)
-        local lines=$(wc -l < "$log" 2>/dev/null)
-        local info=$(grep -c "INFO" "$log" 2>/dev/null || echo "0")
-        local alerts=$(grep -c "ALERT" "$log" 2>/dev/null || echo "0")
+        log_index_read "$log"
+        bytes_to_human "${LOG_STATS[BYTES]}"
         
         printf "%-20s %10s %10s %10s %10s\n" \
-            "$basename" "$size" "$lines" "$info" "$alerts"
+            "${log##*/}" "$REPLY" "${LOG_STATS[LINES]}" "${LOG_STATS[INFO]:-0}" "${LOG_STATS[ALERT]:-0}"
     done
     
     print_separator
@@ -182,5 +190,35 @@ log_statistics() {
     press_any_key
 }
 
+# Rotar y comprimir logs
+rotate_logs() {
+    print_header "Rotar Logs"
+    
+    local logs=$(ls "$LOGS_DIR"/*.log 2>/dev/null)
+    
+    if [[ -z "$logs" ]]; then
+        print_warning "No hay logs para rotar"
+        press_any_key
+        return
+    fi
+    
+    # Escribir los registros pendientes antes de mover los archivos
+    log_flush
+    
+    for log in $logs; do
+        [[ -s "$log" ]] || continue
+        
+        if log_rotate "$log"; then
+            print_success "✓ $(basename "$log") rotado"
+        fi
+    done
+    
+    echo ""
+    print_info "Los archivos rotados se comprimen en segundo plano"
+    print_info "Se eliminan los comprimidos con más de ${LOG_RETENTION_DAYS:-30} días"
+    
+    press_any_key
+}
+
 # Ejecutar función principal
 main "$@"
@@ -27,15 +27,25 @@ main() {
     fi
     
     print_info "Midiendo latencia de todos los hosts autorizados..."
+    print_info "Sondeos en paralelo: ${LATENCY_PARALLEL_JOBS:-20} (límite por host: ${LATENCY_HOST_TIMEOUT:-15}s, límite total: ${LATENCY_SWEEP_DEADLINE:-120}s)"
     echo ""
     
     # Archivo temporal para resultados
     local temp_file=$(mktemp)
     
-    # Medir latencia para cada host
-    while IFS='|' read -r ip mac hostname desc; do
-        measure_host_latency "$ip" "$hostname" >> "$temp_file"
-    done < <(load_authorized_hosts "$hosts_file")
+    # Usar la medición reciente del colector si existe (la primera línea
+    # trae la hora en que se tomó); si no, medir todos los hosts de forma
+    # concurrente
+    local sample_time=""
+    if collector_query get latency --max-age "${MONITOR_INTERVAL:-60}" --updated > "$temp_file" && \
+        [[ $(wc -l < "$temp_file") -gt 1 ]]; then
+        read -r sample_time < "$temp_file"
+        sed -i '1d' "$temp_file"
+        print_info "Usando la medición reciente del servicio colector"
+    else
+        load_authorized_hosts "$hosts_file" | \
+            probe_latency_batch "${LATENCY_PING_COUNT:-10}" "$LOG_FILE" > "$temp_file"
+    fi
     
     # Ordenar por latencia promedio
     echo ""
@@ -44,7 +54,7 @@ main() {
         "IP" "Hostname" "Mín (ms)" "Prom (ms)" "Máx (ms)" "Desv"
     print_separator
     
-    sort -t'|' -k3 -n "$temp_file" | while IFS='|' read -r ip hostname min avg max mdev status; do
+    sort -t'|' -k3 -n "$temp_file" | while IFS='|' read -r ip hostname avg min max mdev status; do
         local color="$GREEN"
         
         # Color basado en latencia promedio
@@ -114,13 +124,28 @@ main() {
         printf "  Desviación estándar:  %.2f ms\n" $net_std
         echo ""
         
-        # Guardar en historial
+        # Guardar en historial con la hora de la muestra; una medición del
+        # colector que ya se registró en una ejecución anterior no se repite
         local history_file="${SCRIPT_DIR}/data/latency_history.dat"
         ensure_dir "${SCRIPT_DIR}/data"
-        echo "$(date +%s)|$net_avg|$net_min|$net_max|$net_std" >> "$history_file"
+        local now="${sample_time:-$(date +%s)}"
+        local last_time=$(tail -n 1 "$history_file" 2>/dev/null | cut -d'|' -f1)
         
-        # Registrar resultados
-        log_message "INFO" "Network latency: avg=$net_avg ms, min=$net_min ms, max=$net_max ms, stddev=$net_std ms" "$LOG_FILE"
+        if [[ "$last_time" =~ ^[0-9]+$ ]] && [[ $now -le $last_time ]]; then
+            print_info "Esta medición del colector ya está registrada en el historial"
+        else
+            echo "$now|$net_avg|$net_min|$net_max|$net_std" >> "$history_file"
+            tsdb_append latency "$now" "$net_avg" "$net_min" "$net_max" "$net_std"
+            
+            # Evaluar la muestra con el detector incremental (red completa y cada host)
+            {
+                echo "latency.avg $now $net_avg"
+                awk -F'|' -v now="$now" '$3 != "" && $3 != "N/A" {print "latency.host." $1, now, $3}' "$temp_file"
+            } | anomaly_observe
+            
+            # Registrar resultados
+            log_message "INFO" "Network latency: avg=$net_avg ms, min=$net_min ms, max=$net_max ms, stddev=$net_std ms" "$LOG_FILE"
+        fi
     fi
     
     # Limpiar
@@ -129,39 +154,5 @@ main() {
     press_any_key
 }
 
-# Medir latencia para un host individual
-measure_host_latency() {
-    local ip="$1"
-    local hostname="$2"
-    
-    # Hacer ping al host
-    local result=$(ping_host "$ip" 10)
-    
-    if [[ -n "$result" ]]; then
-        local min=$(echo "$result" | cut -d'|' -f1)
-        local avg=$(echo "$result" | cut -d'|' -f2)
-        local max=$(echo "$result" | cut -d'|' -f3)
-        local mdev=$(echo "$result" | cut -d'|' -f4)
-        
-        # Determinar estado
-        local status="OK"
-        local avg_int=$(echo "$avg" | cut -d'.' -f1)
-        
-        if [[ $avg_int -gt 100 ]]; then
-            status="HIGH"
-        elif [[ $avg_int -gt 50 ]]; then
-            status="MEDIUM"
-        fi
-        
-        echo "$ip|$hostname|$avg|$min|$max|$mdev|$status"
-        
-        # Registrar
-        log_message "INFO" "Latency for $ip ($hostname): avg=$avg ms" "$LOG_FILE"
-    else
-        echo "$ip|$hostname|N/A|N/A|N/A|N/A|UNREACHABLE"
-        log_message "WARNING" "Host unreachable: $ip ($hostname)" "$LOG_FILE"
-    fi
-}
-
 # Ejecutar función principal
 main "$@"
@@ -1,23 +1,34 @@
 #!/bin/bash
 # SIM-RED EXTENDIDO - Script de Medición de Tráfico de Red
-# Función 6: Medir tráfico de red por interfaz
+# Función 6: Medir tráfico de red por interfaz y por host (Up/Down)
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
+source "${SCRIPT_DIR}/lib/traffic_sampler.sh"
+source "${SCRIPT_DIR}/lib/network_utils.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/traffic.log"
+HOST_TRAFFIC_TOOL="${SCRIPT_DIR}/lib/host_traffic.pl"
 
 # Función principal
 main() {
-    print_header "Medición de Tráfico de Red"
-    
     # Inicializar log
     init_log "$LOG_FILE"
     
+    # Modo muestreador en segundo plano (sin interfaz)
+    if [[ "$1" == "--daemon" ]]; then
+        run_sampler_daemon
+        return $?
+    fi
+    
+    print_header "Medición de Tráfico de Red"
+    
     print_info "Selecciona el modo de medición:"
     echo ""
     echo "  1) Medición instantánea"
-    echo "  2) Monitoreo continuo (cada minuto)"
+    echo "  2) Monitoreo continuo (muestreo cada ${TRAFFIC_SAMPLE_INTERVAL:-1}s, resumen por minuto)"
+    echo "  3) Iniciar muestreador en segundo plano"
+    echo "  4) Tráfico por host (Up/Down)"
     echo ""
     echo -n "Opción: "
     read -r option
@@ -29,6 +40,12 @@ main() {
         2)
             monitor_continuous
             ;;
+        3)
+            start_sampler_daemon
+            ;;
+        4)
+            measure_hosts
+            ;;
         *)
             print_error "Opción inválida"
             return 1
@@ -74,80 +91,200 @@ measure_instant() {
 }
 
 # Monitoreo continuo
+# Muestrea /proc/net/dev cada TRAFFIC_SAMPLE_INTERVAL segundos y guarda
+# un resumen por minuto en el historial
 monitor_continuous() {
     print_header "Monitoreo Continuo de Tráfico"
     
-    print_info "Monitoreando tráfico cada minuto..."
-    print_warning "Presiona Ctrl+C para detener"
+    if [[ ! -r /proc/net/dev ]]; then
+        print_error "No se puede leer /proc/net/dev"
+        return 1
+    fi
+    
+    trap 'echo ""; print_info "Monitoreo detenido"; exit 0' INT
+    
+    # Si el muestreador ya está activo, solo mostrar sus datos
+    if traffic_sampler_running; then
+        print_info "Muestreador en segundo plano activo: mostrando sus datos"
+        view_live_traffic
+        return $?
+    fi
+    
+    ensure_dir "${SCRIPT_DIR}/data"
+    traffic_sampler_run display
+}
+
+# Mostrar los datos publicados por el muestreador en segundo plano
+view_live_traffic() {
+    local interval="${TRAFFIC_SAMPLE_INTERVAL:-1}"
+    local sleep_fd
+    
+    exec {sleep_fd}<> <(:)
+    
+    while true; do
+        traffic_live_load
+        traffic_render "$interval"
+        read -r -t "$interval" -u "$sleep_fd"
+    done
+}
+
+# Iniciar el muestreador en segundo plano
+start_sampler_daemon() {
+    if traffic_sampler_running; then
+        print_warning "El muestreador ya está en ejecución"
+        press_any_key
+        return 0
+    fi
+    
+    nohup "${SCRIPT_DIR}/bin/measure_traffic.sh" --daemon > /dev/null 2>&1 &
+    
+    print_success "Muestreador iniciado (PID: $!)"
+    print_info "Datos en vivo: $TRAFFIC_LIVE_FILE"
+    print_info "Historial por minuto: $TRAFFIC_HISTORY_FILE"
     echo ""
     
-    # Obtener interfaces
-    local interfaces=$(ls /sys/class/net/ 2>/dev/null | grep -v "^lo$")
+    press_any_key
+}
+
+# Tráfico por host (Up/Down)
+# lib/host_traffic.pl reparte los bytes de cada intervalo entre las IPs de
+# la subred; se muestran los que más tráfico generan y cada host se guarda
+# en el historial (serie host.IP)
+measure_hosts() {
+    print_header "Tráfico por Host (Up/Down)"
     
-    if [[ -z "$interfaces" ]]; then
-        print_error "No se encontraron interfaces de red"
+    if ! check_required_tools perl; then
+        return 1
+    fi
+    
+    # Verificar si se ejecuta como root (captura y conntrack lo requieren)
+    if ! check_root; then
         return 1
     fi
     
-    # Inicializar valores previos
-    declare -A prev_rx
-    declare -A prev_tx
+    local interval="${TRAFFIC_HOST_INTERVAL:-5}"
+    local promisc=0
+    [[ "${TRAFFIC_HOST_PROMISC:-no}" == "yes" ]] && promisc=1
     
-    for iface in $interfaces; do
-        prev_rx[$iface]=$(cat "/sys/class/net/$iface/statistics/rx_bytes" 2>/dev/null || echo "0")
-        prev_tx[$iface]=$(cat "/sys/class/net/$iface/statistics/tx_bytes" 2>/dev/null || echo "0")
-    done
+    print_info "Midiendo tráfico por host cada ${interval}s (Ctrl+C para terminar)..."
+    trap 'echo ""; print_info "Medición detenida"; log_flush; exit 0' INT
     
-    trap 'echo ""; print_info "Monitoreo detenido"; exit 0' INT
+    local tag record ts iface ip mac name up down up_pkts down_pkts
+    local seconds active events drops overflow
+    local rows=() series="" mode="" source_label=""
     
-    local iteration=0
+    # Cada tipo de registro tiene sus propios campos
+    while IFS='|' read -r tag record; do
+        case "$tag" in
+            READY)
+                # READY|MODE|INTERFACE
+                IFS='|' read -r mode iface <<< "$record"
+                source_label="contadores conntrack del kernel"
+                [[ "$mode" == "capture" ]] && source_label="captura de cabeceras en $iface"
+                log_message "INFO" "Per-host traffic accounting started (mode=$mode, interval=${interval}s)" "$LOG_FILE"
+                ;;
+            HOST)
+                # HOST|TS|IP|MAC|HOSTNAME|UP|DOWN|UP_PKTS|DOWN_PKTS
+                IFS='|' read -r ts ip mac name up down up_pkts down_pkts <<< "$record"
+                rows+=("$ip|$mac|$name|$up|$down|$up_pkts|$down_pkts")
+                series+="host.$ip $ts $up $down $up_pkts $down_pkts"$'\n'
+                ;;
+            INTERVAL)
+                # INTERVAL|TS|SECONDS|MODE|HOSTS|EVENTS|KERNEL_DROPS|OVERFLOW
+                IFS='|' read -r ts seconds mode active events drops overflow <<< "$record"
+                render_hosts "$seconds" "$active" "$drops" "$overflow"
+                
+                if [[ -n "$series" ]]; then
+                    printf '%s' "$series" | tsdb_append -
+                fi
+                if ((drops > 0)); then
+                    log_message "WARNING" "Host traffic capture lost $drops frames in ${seconds}s" "$LOG_FILE"
+                fi
+                log_flush_due
+                
+                rows=()
+                series=""
+                ;;
+        esac
+    done < <(perl "$HOST_TRAFFIC_TOOL" \
+        --mode "${TRAFFIC_HOST_MODE:-auto}" \
+        --interface "$(get_network_interface)" \
+        --interval "$interval" \
+        --hosts "${SCRIPT_DIR}/config/hosts.conf" \
+        --max "${TRAFFIC_HOST_MAX:-4096}" \
+        --promisc "$promisc" \
+        "$(get_local_subnet)")
     
-    while true; do
-        sleep 60
-        
-        clear
-        print_header "Monitoreo de Tráfico - Iteración $iteration"
-        
-        echo "Hora: $(date '+%Y-%m-%d %H:%M:%S')"
-        echo "Intervalo: 60 segundos"
-        echo ""
-        
-        print_separator
-        printf "${BOLD}%-15s %15s %15s %15s${NC}\n" \
-            "Interfaz" "RX/min" "TX/min" "Total/min"
-        print_separator
-        
-        for iface in $interfaces; do
-            local curr_rx=$(cat "/sys/class/net/$iface/statistics/rx_bytes" 2>/dev/null || echo "0")
-            local curr_tx=$(cat "/sys/class/net/$iface/statistics/tx_bytes" 2>/dev/null || echo "0")
-            
-            local rx_rate=$((curr_rx - prev_rx[$iface]))
-            local tx_rate=$((curr_tx - prev_tx[$iface]))
-            local total_rate=$((rx_rate + tx_rate))
-            
-            printf "%-15s %15s %15s %15s\n" \
-                "$iface" \
-                "$(format_bytes $rx_rate)" \
-                "$(format_bytes $tx_rate)" \
-                "$(format_bytes $total_rate)"
-            
-            # Actualizar valores previos
-            prev_rx[$iface]=$curr_rx
-            prev_tx[$iface]=$curr_tx
-            
-            # Registrar
-            log_message "INFO" "Traffic rate on $iface: RX=$rx_rate/min TX=$tx_rate/min" "$LOG_FILE"
-            
-            # Guardar en historial
-            local history_file="${SCRIPT_DIR}/data/traffic_history.dat"
-            ensure_dir "${SCRIPT_DIR}/data"
-            echo "$(date +%s)|$iface|$rx_rate|$tx_rate" >> "$history_file"
-        done
+    if [[ -z "$mode" ]]; then
+        print_error "No se pudo iniciar la medición por host"
+        press_any_key
+        return 1
+    fi
+}
+
+# Tabla de los hosts con más tráfico del último intervalo (variables de measure_hosts)
+render_hosts() {
+    local seconds="$1" active="$2" drops="$3" overflow="$4"
+    local top="${TRAFFIC_HOST_TOP:-10}"
+    local centis="${seconds/./}"
+    local row ip mac name up down up_pkts down_pkts now
+    
+    centis=$((10#$centis))
+    ((centis > 0)) || centis=100
+    
+    printf '\033[H\033[2J'
+    print_header "Tráfico por Host (Up/Down)"
+    
+    printf -v now '%(%Y-%m-%d %H:%M:%S)T' -1
+    echo "Hora: $now"
+    echo "Fuente: $source_label - intervalo de ${seconds}s, $active hosts activos (mostrando hasta $top)"
+    echo ""
+    
+    print_separator
+    printf "${BOLD}%-16s %-16s %-18s %11s %11s %9s %9s${NC}\n" \
+        "IP" "Hostname" "MAC" "Up/s" "Down/s" "Pkt Up" "Pkt Down"
+    print_separator
+    
+    for row in "${rows[@]:0:top}"; do
+        IFS='|' read -r ip mac name up down up_pkts down_pkts <<< "$row"
         
-        print_separator
+        bytes_to_human $((up * 100 / centis)); up=$REPLY
+        bytes_to_human $((down * 100 / centis)); down=$REPLY
         
-        ((iteration++))
+        if [[ -n "$name" ]]; then
+            printf "%-16s %-16s %-18s %11s %11s %9d %9d\n" \
+                "$ip" "$name" "${mac:--}" "$up" "$down" "$up_pkts" "$down_pkts"
+        else
+            printf "%-16s ${YELLOW}%-16s${NC} %-18s %11s %11s %9d %9d\n" \
+                "$ip" "Desconocido" "${mac:--}" "$up" "$down" "$up_pkts" "$down_pkts"
+        fi
     done
+    
+    print_separator
+    
+    if ((drops > 0)); then
+        print_warning "⚠ El kernel descartó $drops tramas (la captura no da abasto; prueba TRAFFIC_HOST_MODE=conntrack)"
+    fi
+    if ((overflow > 0)); then
+        bytes_to_human "$overflow"
+        print_warning "⚠ $REPLY de hosts que no cupieron en la tabla (TRAFFIC_HOST_MAX)"
+    fi
+}
+
+# Bucle del muestreador sin interfaz
+run_sampler_daemon() {
+    if traffic_sampler_running; then
+        log_message "WARNING" "Traffic sampler already running" "$LOG_FILE"
+        return 1
+    fi
+    
+    ensure_dir "${SCRIPT_DIR}/data" || return 1
+    echo "$$" > "$TRAFFIC_SAMPLER_PID"
+    trap 'log_flush; rm -f "$TRAFFIC_SAMPLER_PID"' EXIT
+    trap 'exit 0' INT TERM
+    
+    log_message "INFO" "Traffic sampler started (interval=${TRAFFIC_SAMPLE_INTERVAL:-1}s, PID $$)" "$LOG_FILE"
+    traffic_sampler_run daemon
 }
 
 # Ejecutar función principal
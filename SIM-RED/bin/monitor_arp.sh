@@ -5,10 +5,16 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/host_registry.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/arp.log"
 ARP_FILE="/proc/net/arp"
 
+# Tabla ARP actual: IP -> MAC
+declare -A ARP_TABLE=()
+
+MONITOR_PID=""
+
 # Función principal
 main() {
     print_header "Monitoreo ARP en Tiempo Real"
@@ -22,68 +28,201 @@ main() {
     # Inicializar log
     init_log "$LOG_FILE"
     
+    # Cargar hosts autorizados (índice por MAC)
+    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
+    if ! registry_load "$hosts_file"; then
+        return 1
+    fi
+    
     print_info "Monitoreando tabla ARP en tiempo real..."
     print_warning "Presiona Ctrl+C para detener"
     echo ""
     
-    # Cargar hosts autorizados
-    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
+    # Almacenar estado ARP inicial
+    read_arp_file ARP_TABLE
     
-    # Almacenar estado ARP previo
-    local prev_arp=$(cat "$ARP_FILE" 2>/dev/null)
+    trap 'stop_monitor' INT
     
-    trap 'echo ""; print_info "Monitoreo detenido"; exit 0' INT
+    local mode="${ARP_MONITOR_MODE:-auto}"
     
-    local iteration=0
+    # Modo por eventos: suscripción a RTM_NEWNEIGH/RTM_DELNEIGH vía rtnetlink
+    if [[ "$mode" != "poll" ]] && command_exists ip; then
+        print_info "Modo: eventos del kernel (ip monitor neigh)"
+        echo ""
+        monitor_events
+        print_warning "El monitor de eventos terminó, usando sondeo de $ARP_FILE"
+    fi
     
+    # Modo de respaldo: sondeo periódico de /proc/net/arp
+    print_info "Modo: sondeo de $ARP_FILE cada ${ARP_MONITOR_INTERVAL:-5} segundos"
+    echo ""
+    monitor_poll
+}
+
+# Detener el monitoreo
+stop_monitor() {
+    if [[ -n "$MONITOR_PID" ]]; then
+        kill "$MONITOR_PID" 2>/dev/null
+    fi
+    echo ""
+    print_info "Monitoreo detenido"
+    exit 0
+}
+
+# Leer /proc/net/arp en una tabla asociativa IP -> MAC (sin procesos externos)
+read_arp_file() {
+    local -n table="$1"
+    local ip hw_type flags mac mask device
+    
+    table=()
+    
+    while read -r ip hw_type flags mac mask device; do
+        [[ "$ip" == "IP" ]] && continue
+        [[ "$flags" == "0x0" ]] && continue
+        [[ "$mac" == "00:00:00:00:00:00" ]] && continue
+        table[$ip]="$mac"
+    done < "$ARP_FILE"
+}
+
+# Procesar eventos de la tabla de vecinos del kernel
+monitor_events() {
+    local events_fd
+    
+    exec {events_fd}< <(exec ip -4 monitor neigh 2>/dev/null)
+    MONITOR_PID=$!
+    
+    local line deleted ip mac state rc
+    local wake="${LOG_FLUSH_INTERVAL:-2}"
+    ((wake > 0)) || wake=1
+    
+    # Despertar al menos cada LOG_FLUSH_INTERVAL para escribir el log pendiente
     while true; do
-        sleep 5
+        read -r -t "$wake" -u "$events_fd" line
+        rc=$?
+        log_flush_due
+        ((rc > 128)) && continue
+        ((rc == 0)) || break
         
-        # Obtener tabla ARP actual
-        local curr_arp=$(cat "$ARP_FILE" 2>/dev/null)
+        deleted=false
+        if [[ "$line" == Deleted\ * ]]; then
+            deleted=true
+            line="${line#Deleted }"
+        fi
         
-        # Comparar con la anterior
-        if [[ "$curr_arp" != "$prev_arp" ]]; then
-            echo ""
-            print_color "$YELLOW" "[$(date '+%H:%M:%S')] Cambio detectado en tabla ARP"
-            
-            # Encontrar nuevas entradas
-            while read -r line; do
-                if ! echo "$prev_arp" | grep -qF "$line"; then
-                    local ip=$(echo "$line" | awk '{print $1}')
-                    local mac=$(echo "$line" | awk '{print $4}')
-                    
-                    if [[ "$ip" != "IP" ]] && [[ "$mac" != "00:00:00:00:00:00" ]]; then
-                        # Verificar si está autorizada
-                        if is_authorized_mac "$mac" "$hosts_file"; then
-                            print_success "Nueva entrada (autorizada): $ip -> $mac"
-                            log_message "INFO" "New authorized ARP entry: $ip -> $mac" "$LOG_FILE"
-                        else
-                            print_warning "Nueva entrada (desconocida): $ip -> $mac"
-                            log_message "ALERT" "New unknown ARP entry: $ip -> $mac" "$LOG_FILE"
-                        fi
-                    fi
-                fi
-            done <<< "$curr_arp"
-            
-            # Encontrar entradas eliminadas
-            while read -r line; do
-                if ! echo "$curr_arp" | grep -qF "$line"; then
-                    local ip=$(echo "$line" | awk '{print $1}')
-                    local mac=$(echo "$line" | awk '{print $4}')
-                    
-                    if [[ "$ip" != "IP" ]] && [[ "$mac" != "00:00:00:00:00:00" ]]; then
-                        print_info "Entrada eliminada: $ip -> $mac"
-                        log_message "INFO" "ARP entry removed: $ip -> $mac" "$LOG_FILE"
-                    fi
-                fi
-            done <<< "$prev_arp"
-            
-            prev_arp="$curr_arp"
+        # Formato: IP dev IFACE [lladdr MAC] [router] [proxy] ESTADO
+        if [[ ! "$line" =~ ^([0-9.]+)\ dev\ [^\ ]+(\ lladdr\ ([0-9A-Fa-f:]+))?.*\ ([A-Z]+)$ ]]; then
+            continue
         fi
         
-        ((iteration++))
+        ip="${BASH_REMATCH[1]}"
+        mac="${BASH_REMATCH[3]}"
+        state="${BASH_REMATCH[4]}"
+        
+        if [[ "$deleted" == true ]] || [[ "$state" == "FAILED" ]] || \
+           [[ "$state" == "INCOMPLETE" ]] || [[ -z "$mac" ]]; then
+            if [[ -n "${ARP_TABLE[$ip]}" ]]; then
+                arp_entry_removed "$ip" "${ARP_TABLE[$ip]}"
+                unset 'ARP_TABLE[$ip]'
+            fi
+        elif [[ "$mac" != "00:00:00:00:00:00" ]]; then
+            update_arp_entry "$ip" "$mac"
+        fi
     done
+    
+    exec {events_fd}<&-
+    MONITOR_PID=""
+}
+
+# Sondear /proc/net/arp y comparar tablas por IP
+monitor_poll() {
+    local interval="${ARP_MONITOR_INTERVAL:-5}"
+    local sleep_fd
+    local -A curr_arp=()
+    local ip
+    
+    # Descriptor que nunca recibe datos: permite esperar con read -t sin lanzar sleep
+    exec {sleep_fd}<> <(:)
+    
+    while true; do
+        read -r -t "$interval" -u "$sleep_fd"
+        
+        read_arp_file curr_arp
+        
+        # Entradas nuevas o modificadas
+        for ip in "${!curr_arp[@]}"; do
+            update_arp_entry "$ip" "${curr_arp[$ip]}"
+        done
+        
+        # Entradas eliminadas
+        for ip in "${!ARP_TABLE[@]}"; do
+            if [[ -z "${curr_arp[$ip]}" ]]; then
+                arp_entry_removed "$ip" "${ARP_TABLE[$ip]}"
+                unset 'ARP_TABLE[$ip]'
+            fi
+        done
+        
+        log_flush_due
+    done
+}
+
+# Registrar una entrada vista (nueva, cambiada o sin cambios)
+update_arp_entry() {
+    local ip="$1"
+    local mac="$2"
+    local old_mac="${ARP_TABLE[$ip]}"
+    
+    if [[ -z "$old_mac" ]]; then
+        ARP_TABLE[$ip]="$mac"
+        arp_entry_added "$ip" "$mac"
+    elif [[ "${old_mac,,}" != "${mac,,}" ]]; then
+        ARP_TABLE[$ip]="$mac"
+        arp_entry_changed "$ip" "$old_mac" "$mac"
+    fi
+}
+
+# Nueva entrada en la tabla ARP
+arp_entry_added() {
+    local ip="$1"
+    local mac="$2"
+    
+    print_event_time
+    
+    # Verificar si está autorizada
+    if registry_is_authorized_mac "$mac"; then
+        print_success "Nueva entrada (autorizada): $ip -> $mac"
+        log_message "INFO" "New authorized ARP entry: $ip -> $mac" "$LOG_FILE"
+    else
+        print_warning "Nueva entrada (desconocida): $ip -> $mac"
+        log_message "ALERT" "New unknown ARP entry: $ip -> $mac" "$LOG_FILE"
+    fi
+}
+
+# Entrada eliminada de la tabla ARP
+arp_entry_removed() {
+    local ip="$1"
+    local mac="$2"
+    
+    print_event_time
+    print_info "Entrada eliminada: $ip -> $mac"
+    log_message "INFO" "ARP entry removed: $ip -> $mac" "$LOG_FILE"
+}
+
+# La MAC de una IP cambió
+arp_entry_changed() {
+    local ip="$1"
+    local old_mac="$2"
+    local mac="$3"
+    
+    print_event_time
+    print_warning "Entrada modificada: $ip -> $old_mac => $mac"
+    log_message "ALERT" "ARP entry changed: $ip -> $old_mac => $mac" "$LOG_FILE"
+}
+
+# Marca de tiempo del evento
+print_event_time() {
+    local now
+    printf -v now '%(%H:%M:%S)T' -1
+    print_color "$YELLOW" "[$now] Cambio detectado en tabla ARP"
 }
 
 # Ejecutar función principal
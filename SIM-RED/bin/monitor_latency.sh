@@ -5,19 +5,240 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/term_graph.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/latency.log"
-GRAPH_AWK="${SCRIPT_DIR}/lib/graph_ascii.awk"
+ICMP_MONITOR="${SCRIPT_DIR}/lib/icmp_monitor.pl"
 
-# Función principal
-main() {
+# Mediciones que se conservan por host (una columna de la gráfica por medición)
+MAX_HISTORY=60
+
+# Hosts que se miden con ping en serie (un host caído detiene el ciclo)
+PING_MODE_HOSTS=5
+
+# Hosts monitoreados y estado de cada uno (OK, WARNING, ALERT, UNREACHABLE)
+declare -a MONITOR_IPS=()
+declare -a MONITOR_NAMES=()
+declare -a HOST_STATUS=()
+declare -a HOST_TEXT=()
+declare -A STATUS_COUNT=()
+declare -a MONITOR_GRAPHS=()
+MONITOR_ENGINE="ping"
+
+# Posición de cada elemento en pantalla y filas ya escritas
+declare -A SCREEN_ROW=()
+HOSTS_TOP=10
+VISIBLE_HOSTS=0
+FOOTER_ROW=0
+
+# Escribir una línea de color en una fila de la pantalla
+put_line() {
+    local text
+    printf -v text "${2}%s${NC}" "$3"
+    graph_at "$1" 1 "$text"
+}
+
+# Dibujar la pantalla completa: cabecera, tabla de hosts y gráficas
+# Con muchos hosts, la tabla y las barras muestran los que caben en la terminal
+draw_screen() {
+    local threshold="$1"
+    local first_ip="${MONITOR_IPS[0]}"
+    local n=${#MONITOR_IPS[@]}
+    local rows=0 graph_rows=0 per_host=1 avail
+    local row graph i
+    
+    for graph in "${MONITOR_GRAPHS[@]}"; do
+        case "$graph" in
+            line) ((graph_rows += 14)) ;;
+            hist) ((graph_rows += 13)) ;;
+            bar)  ((graph_rows += 4, per_host++)) ;;
+        esac
+    done
+    
+    read -r rows _ < <(stty size 2>/dev/null)
+    avail=$(( ${rows:-0} - HOSTS_TOP - graph_rows - 4 ))
+    VISIBLE_HOSTS=$n
+    if ((${rows:-0} > 0 && n * per_host > avail)); then
+        VISIBLE_HOSTS=$((avail / per_host))
+        ((VISIBLE_HOSTS < 1)) && VISIBLE_HOSTS=1
+    fi
+    
+    printf '\033[H\033[2J'
     print_header "Monitoreo Continuo de Latencia"
+    echo ""
+    echo "Umbral de alerta: ${threshold} ms | Motor: ${MONITOR_ENGINE}"
     
-    # Verificar herramientas requeridas
-    if ! check_required_tools ping gawk; then
-        return 1
+    # Filas de hosts ya medidos
+    SCREEN_ROW=()
+    for ((i = 0; i < VISIBLE_HOSTS; i++)); do
+        [[ -n "${HOST_TEXT[$i]}" ]] && show_host_row "$i"
+    done
+    
+    row=$((HOSTS_TOP + VISIBLE_HOSTS))
+    if ((VISIBLE_HOSTS < n)); then
+        put_line "$row" "$CYAN" "... y $((n - VISIBLE_HOSTS)) hosts más (incluidos en el resumen)"
+        ((row++))
     fi
     
+    ((row++))
+    put_line "$row" "$CYAN" "───────────────────────────────────────────────────────────────"
+    ((row += 2))
+    
+    for graph in "${MONITOR_GRAPHS[@]}"; do
+        case "$graph" in
+            line)
+                put_line "$row" "$CYAN" "Gráfica de latencia: ${MONITOR_NAMES[0]} ($first_ip)"
+                graph_widget_init latency_line line $((row + 2)) 1 "$MAX_HISTORY" 10 "$first_ip"
+                graph_widget_draw latency_line
+                ((row += 14))
+                ;;
+            bar)
+                put_line "$row" "$CYAN" "Latencia media (últimas ${MAX_HISTORY} mediciones, ms)"
+                GRAPH_W[latency_bar:stat]=avg
+                graph_widget_init latency_bar bar $((row + 1)) 1 40 0 "${MONITOR_IPS[@]:0:$VISIBLE_HOSTS}"
+                graph_widget_draw latency_bar
+                ((row += VISIBLE_HOSTS + 4))
+                ;;
+            hist)
+                put_line "$row" "$CYAN" "Distribución de latencia: ${MONITOR_NAMES[0]} ($first_ip)"
+                graph_widget_init latency_hist hist $((row + 2)) 1 40 10 "$first_ip"
+                graph_widget_draw latency_hist
+                ((row += 13))
+                ;;
+        esac
+    done
+    
+    FOOTER_ROW=$row
+    put_line "$FOOTER_ROW" "$YELLOW" "⚠ Presiona Ctrl+C para detener"
+    graph_flush
+}
+
+# Escribir la fila de un host si es visible y cambió
+show_host_row() {
+    local i="$1"
+    
+    ((i < VISIBLE_HOSTS)) || return 0
+    
+    if [[ "${SCREEN_ROW[$i]}" != "${HOST_TEXT[$i]}" ]]; then
+        SCREEN_ROW[$i]="${HOST_TEXT[$i]}"
+        graph_at $((HOSTS_TOP + i)) 1 "${HOST_TEXT[$i]}"
+    fi
+}
+
+# Registrar una medición: LATENCIA (ms, "-" sin respuesta), PÉRDIDA (%) y JITTER (ms)
+update_host() {
+    local i="$1"
+    local latency="$2"
+    local loss="$3"
+    local jitter="$4"
+    local threshold="$5"
+    local ip="${MONITOR_IPS[$i]}"
+    local hostname="${MONITOR_NAMES[$i]}"
+    local status
+    
+    # El modo ping no mide pérdida ni jitter
+    [[ "$loss" != "-" ]] && loss+="%"
+    [[ "$jitter" != "-" ]] && jitter+=" ms"
+    
+    if [[ "$latency" != "-" ]]; then
+        # Agregar al historial de los hosts que se grafican
+        ((i < VISIBLE_HOSTS)) && graph_ring_push "$ip" "$latency"
+        
+        # Mostrar valor actual
+        local color="$GREEN"
+        local label="OK"
+        status="OK"
+        
+        local lat_int="${latency%.*}"
+        if [[ $lat_int -gt $threshold ]]; then
+            color="$RED"
+            label="⚠ ALERT"
+            status="ALERT"
+            log_message "ALERT" "High latency detected on $ip ($hostname): $latency ms" "$LOG_FILE"
+        elif [[ $lat_int -gt $((threshold / 2)) ]]; then
+            color="$YELLOW"
+            label="WARNING"
+            status="WARNING"
+        fi
+        
+        printf -v "HOST_TEXT[$i]" "${color}%-15s %-15s %8.2f ms %6s %11s  %-11s${NC}" \
+            "$ip" "$hostname" "$latency" "$loss" "$jitter" "$label"
+    else
+        status="UNREACHABLE"
+        printf -v "HOST_TEXT[$i]" "${RED}%-15s %-15s %8s    %6s %11s  %-11s${NC}" \
+            "$ip" "$hostname" "N/A" "$loss" "$jitter" "UNREACHABLE"
+    fi
+    
+    if [[ "${HOST_STATUS[$i]}" != "$status" ]]; then
+        [[ -n "${HOST_STATUS[$i]}" ]] && ((STATUS_COUNT[${HOST_STATUS[$i]}]--))
+        ((STATUS_COUNT[$status]++))
+        HOST_STATUS[$i]="$status"
+    fi
+    
+    show_host_row "$i"
+}
+
+# Medir un host con ping (modo de respaldo, sin pérdida ni jitter)
+ping_host() {
+    local i="$1"
+    local threshold="$2"
+    
+    # Hacer ping una vez
+    local latency=$(ping -c 1 -W 2 "${MONITOR_IPS[$i]}" 2>/dev/null | \
+        grep -oP 'time=\K[0-9.]+' | head -1)
+    
+    update_host "$i" "${latency:--}" "-" "-" "$threshold"
+}
+
+# Reloj, resumen y partes de las gráficas que cambiaron
+render_tick() {
+    local iteration="$1"
+    local n=${#MONITOR_IPS[@]}
+    local now graph
+    local waiting=$((n - STATUS_COUNT[OK] - STATUS_COUNT[WARNING] - STATUS_COUNT[ALERT] - STATUS_COUNT[UNREACHABLE]))
+    
+    printf -v now '%(%Y-%m-%d %H:%M:%S)T' -1
+    graph_at 6 1 "Hora: $now  Iteración: $iteration"$'\033[K'
+    graph_at 8 1 "Hosts: $n | OK: ${STATUS_COUNT[OK]:-0} | Advertencia: ${STATUS_COUNT[WARNING]:-0} | Alerta: ${STATUS_COUNT[ALERT]:-0} | Sin respuesta: ${STATUS_COUNT[UNREACHABLE]:-0} | Esperando: $waiting"$'\033[K'
+    
+    # Redibujar solo las columnas y filas de las gráficas que cambiaron
+    for graph in "${MONITOR_GRAPHS[@]}"; do
+        graph_widget_update "latency_$graph"
+    done
+    
+    graph_at "$FOOTER_ROW" 1 ""
+    graph_flush
+}
+
+# Arrancar lib/icmp_monitor.pl con su salida en el descriptor ICMP_FD
+# Devuelve 1 si no pudo abrir un socket ICMP
+start_icmp_engine() {
+    local interval="$1"
+    local line
+    
+    command_exists perl || return 1
+    
+    exec {ICMP_FD}< <(exec perl "$ICMP_MONITOR" --interval "$interval" \
+        --timeout "${LATENCY_MONITOR_TIMEOUT:-2}" "${MONITOR_IPS[@]}" 2>&1)
+    
+    # Avisos (hosts que no resuelven) y después READY MODO HOSTS
+    while read -r -t 10 -u "$ICMP_FD" line; do
+        if [[ "$line" == READY* ]]; then
+            line="${line#READY }"
+            MONITOR_ENGINE="icmp (${line%% *})"
+            return 0
+        fi
+        print_warning "$line"
+    done
+    
+    exec {ICMP_FD}<&-
+    return 1
+}
+
+# Función principal
+main() {
+    print_header "Monitoreo Continuo de Latencia"
+    
     # Inicializar log
     init_log "$LOG_FILE"
     
@@ -35,119 +256,131 @@ main() {
     print_warning "Presiona Ctrl+C para detener"
     echo ""
     
-    # Seleccionar hosts a monitorear (limitar a los primeros 5 para visualización)
-    local -a monitor_ips=()
-    local -a monitor_names=()
-    local count=0
-    
-    while IFS='|' read -r ip mac hostname desc && [[ $count -lt 5 ]]; do
-        monitor_ips+=("$ip")
-        monitor_names+=("$hostname")
-        ((count++))
+    while IFS='|' read -r ip mac hostname desc; do
+        MONITOR_IPS+=("$ip")
+        MONITOR_NAMES+=("$hostname")
     done < <(load_authorized_hosts "$hosts_file")
     
-    if [[ ${#monitor_ips[@]} -eq 0 ]]; then
+    if [[ ${#MONITOR_IPS[@]} -eq 0 ]]; then
         print_error "No hay hosts para monitorear"
         return 1
     fi
     
-    # Inicializar arrays de datos
-    local -A latency_history
-    local max_history=60  # Mantener últimas 60 mediciones
+    # Gráficas bajo la tabla de hosts: line, bar y/o hist
+    for graph in ${LATENCY_MONITOR_GRAPHS:-line bar}; do
+        case "$graph" in
+            line|bar|hist) MONITOR_GRAPHS+=("$graph") ;;
+            *) print_warning "Gráfica desconocida en LATENCY_MONITOR_GRAPHS: $graph" ;;
+        esac
+    done
+    
+    # Intervalo entre ciclos (se admiten fracciones de segundo)
+    graph_value "${LATENCY_MONITOR_INTERVAL:-1}" && ((REPLY > 0)) || REPLY=100
+    local interval_us=$((REPLY * 10000))
+    graph_format "$REPLY"
+    local interval="$REPLY"
+    
+    # Motor ICMP concurrente (todos los hosts) o ping en serie (primeros hosts)
+    local mode="${LATENCY_MONITOR_MODE:-auto}"
+    if [[ "$mode" != "ping" ]] && start_icmp_engine "$interval"; then
+        mode="icmp"
+    elif [[ "$mode" == "icmp" ]]; then
+        print_error "No se pudo abrir un socket ICMP (net.ipv4.ping_group_range o root)"
+        return 1
+    else
+        mode="ping"
+        
+        # Verificar herramientas requeridas
+        if ! check_required_tools ping; then
+            return 1
+        fi
+        
+        if [[ ${#MONITOR_IPS[@]} -gt $PING_MODE_HOSTS ]]; then
+            print_warning "Modo ping: solo se monitorean los primeros $PING_MODE_HOSTS hosts"
+            MONITOR_IPS=("${MONITOR_IPS[@]:0:$PING_MODE_HOSTS}")
+            MONITOR_NAMES=("${MONITOR_NAMES[@]:0:$PING_MODE_HOSTS}")
+        fi
+    fi
     
-    for ip in "${monitor_ips[@]}"; do
-        latency_history[$ip]=""
+    # Un buffer circular por host (valores numéricos, sin cadenas que partir)
+    for i in "${!MONITOR_IPS[@]}"; do
+        graph_ring_init "${MONITOR_IPS[$i]}" "$MAX_HISTORY" "${MONITOR_NAMES[$i]}"
     done
     
     # Bucle de monitoreo
     local iteration=0
+    local redraw=1
+    local n=${#MONITOR_IPS[@]}
+    local rc field rest
+    local -a fields
     
-    trap 'echo ""; print_info "Monitoreo detenido"; exit 0' INT
+    trap 'printf "\033[?25h\033[%d;1H\n" "$FOOTER_ROW"; print_info "Monitoreo detenido"; exit 0' INT
+    trap 'redraw=1' WINCH
+    printf '\033[?25l'
     
-    while true; do
-        clear
-        print_header "Monitoreo Continuo de Latencia - Iteración $iteration"
-        
-        echo "Hora: $(date '+%Y-%m-%d %H:%M:%S')"
-        echo "Umbral de alerta: ${threshold} ms"
-        echo ""
-        
-        # Medir latencia para cada host
-        for i in "${!monitor_ips[@]}"; do
-            local ip="${monitor_ips[$i]}"
-            local hostname="${monitor_names[$i]}"
-            
-            # Hacer ping una vez
-            local latency=$(ping -c 1 -W 2 "$ip" 2>/dev/null | \
-                grep -oP 'time=\K[0-9.]+' | head -1)
+    if [[ "$mode" == "icmp" ]]; then
+        # Una línea por ciclo: TICK EPOCH LATENCIA,PÉRDIDA,JITTER por host
+        while true; do
+            read -r -u "$ICMP_FD" -a fields
+            rc=$?
+            ((rc > 128)) && continue
+            ((rc == 0)) || break
+            [[ "${fields[0]}" == "TICK" ]] || continue
             
-            if [[ -n "$latency" ]]; then
-                # Agregar al historial
-                latency_history[$ip]="${latency_history[$ip]} $latency"
-                
-                # Mantener solo los últimos max_history valores
-                local -a values=(${latency_history[$ip]})
-                if [[ ${#values[@]} -gt $max_history ]]; then
-                    latency_history[$ip]="${values[@]: -$max_history}"
-                fi
-                
-                # Mostrar valor actual
-                local color="$GREEN"
-                local status="OK"
-                
-                local lat_int=$(echo "$latency" | cut -d'.' -f1)
-                if [[ $lat_int -gt $threshold ]]; then
-                    color="$RED"
-                    status="⚠ ALERT"
-                    log_message "ALERT" "High latency detected on $ip ($hostname): $latency ms" "$LOG_FILE"
-                elif [[ $lat_int -gt $((threshold / 2)) ]]; then
-                    color="$YELLOW"
-                    status="WARNING"
-                fi
-                
-                printf "${color}%-15s %-15s %8.2f ms  %s${NC}\n" \
-                    "$ip" "$hostname" "$latency" "$status"
-            else
-                printf "${RED}%-15s %-15s %8s     %s${NC}\n" \
-                    "$ip" "$hostname" "N/A" "UNREACHABLE"
+            # Pantalla completa solo al empezar o si cambia el tamaño de la terminal
+            if ((redraw)); then
+                redraw=0
+                draw_screen "$threshold"
             fi
-        done
-        
-        echo ""
-        print_separator
-        
-        # Mostrar gráfica ASCII para el primer host
-        if [[ ${#monitor_ips[@]} -gt 0 ]]; then
-            local first_ip="${monitor_ips[0]}"
-            local first_name="${monitor_names[0]}"
-            
-            echo ""
-            print_color "$CYAN" "Gráfica de latencia: $first_name ($first_ip)"
-            echo ""
             
-            # Preparar datos para graficar
-            local values="${latency_history[$first_ip]}"
+            # "=": sin respuestas nuevas desde el ciclo anterior
+            for ((i = 0; i < n; i++)); do
+                field="${fields[i + 2]}"
+                [[ "${field%%,*}" == "=" ]] && continue
+                rest="${field#*,}"
+                update_host "$i" "${field%%,*}" "${rest%%,*}" "${rest#*,}" "$threshold"
+            done
             
-            if [[ -n "$values" ]]; then
-                # Usar AWK para generar gráfica
-                echo "$values" | tr ' ' '\n' | grep -v '^$' | \
-                    gawk -v type=line -v width=60 -v height=10 -f "$GRAPH_AWK" 2>/dev/null || \
-                    {
-                        # Gráfica simple de respaldo
-                        echo "$values" | tr ' ' '\n' | tail -20 | while read val; do
-                            local bars=$(echo "$val / 5" | bc 2>/dev/null || echo "1")
-                            printf "%6.1f ms |" "$val"
-                            for ((b=0; b<bars && b<40; b++)); do
-                                printf "█"
-                            done
-                            echo ""
-                        done
-                    }
-            fi
+            render_tick "$iteration"
+            ((iteration++))
+            log_flush_due
+        done
+        
+        printf '\033[?25h\033[%d;1H\n' "$FOOTER_ROW"
+        print_error "El monitor ICMP terminó inesperadamente"
+        return 1
+    fi
+    
+    # Descriptor que nunca recibe datos: read -t sobre él espera sin crear procesos
+    local sleep_fd now_us remaining timeout
+    local next_us="${EPOCHREALTIME/[.,]/}"
+    exec {sleep_fd}<> <(:)
+    
+    while true; do
+        if ((redraw)); then
+            redraw=0
+            draw_screen "$threshold"
         fi
         
+        # Medir latencia para cada host
+        for i in "${!MONITOR_IPS[@]}"; do
+            ping_host "$i" "$threshold"
+        done
+        
+        render_tick "$iteration"
         ((iteration++))
-        sleep 1
+        log_flush_due
+        
+        # Mantener la cadencia; si un ciclo se alargó, continuar desde ahora
+        now_us="${EPOCHREALTIME/[.,]/}"
+        ((next_us += interval_us))
+        ((next_us < now_us)) && next_us=$now_us
+        remaining=$((next_us - now_us))
+        
+        if ((remaining > 0)); then
+            printf -v timeout '%d.%06d' $((remaining / 1000000)) $((remaining % 1000000))
+            read -r -t "$timeout" -u "$sleep_fd"
+        fi
     done
 }
 
@@ -5,6 +5,7 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "${SCRIPT_DIR}/lib/common.sh"
 source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/port_scan.sh"
 
 LOG_FILE="${SCRIPT_DIR}/logs/ports.log"
 
@@ -34,6 +35,13 @@ main() {
     print_info "Velocidad de escaneo: $nmap_speed"
     echo ""
     
+    # Escanear todos los hosts y puertos en pocas ejecuciones de nmap
+    print_info "Ejecutando escaneo por lotes (lotes de ${NMAP_BATCH_SIZE:-256} hosts)..."
+    if ! port_scan_ensure "$hosts_file" "$ports"; then
+        print_warning "El escaneo no se completó correctamente"
+    fi
+    echo ""
+    
     print_separator
     printf "${BOLD}%-15s %-15s %-10s %-20s %s${NC}\n" \
         "IP" "Hostname" "Puerto" "Servicio" "Estado"
@@ -41,7 +49,7 @@ main() {
     
     # Escanear cada host autorizado
     while IFS='|' read -r ip mac hostname desc; do
-        scan_host "$ip" "$hostname" "$ports" "$nmap_speed"
+        scan_host "$ip" "$hostname" "$ports"
     done < <(load_authorized_hosts "$hosts_file")
     
     print_separator
@@ -50,16 +58,14 @@ main() {
     press_any_key
 }
 
-# Escanear un host individual
+# Mostrar los puertos abiertos de un host individual
 scan_host() {
     local ip="$1"
     local hostname="$2"
     local ports="$3"
-    local speed="$4"
     
-    # Ejecutar nmap
-    local scan_result=$(nmap -p "$ports" $speed --open "$ip" 2>/dev/null | \
-        grep -E "^[0-9]+/(tcp|udp)")
+    # Consultar el mapa de puertos del escaneo por lotes
+    local scan_result=$(port_map_lookup "$ip" "$ports")
     
     if [[ -z "$scan_result" ]]; then
         printf "%-15s %-15s %-10s %-20s %s\n" \
@@ -68,10 +74,7 @@ scan_host() {
     else
         local first=true
         
-        while read -r line; do
-            local port=$(echo "$line" | awk '{print $1}' | cut -d'/' -f1)
-            local service=$(echo "$line" | awk '{print $3}')
-            
+        while IFS='|' read -r port proto service; do
             # Determinar si el puerto es esperado
             local status="${GREEN}ESPERADO${NC}"
             
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Caché de Construcción Incremental
+Guarda la huella (sha256) de cada sección y de cada recurso usado por los
+generadores de documentación, para saltar o limitar la reconstrucción
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+# Manifiesto compartido por todos los generadores
+CACHE_DIR = os.path.join('data', 'build_cache')
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'manifest.json')
+
+# Secciones ya renderizadas, por huella
+FRAGMENT_DIR = os.path.join(CACHE_DIR, 'fragments')
+
+def text_digest(*parts):
+    """Huella de una o varias cadenas de texto"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def _hash_file(path):
+    """sha256 de un archivo leído por bloques"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class BuildCache:
+    """
+    Manifiesto de construcción de un documento.
+
+    Cada objetivo (target) registra las huellas de sus secciones y recursos
+    en la construcción anterior. Las huellas de archivos se reutilizan
+    mientras no cambien su tamaño ni su mtime, así un PNG de 600 KB solo se
+    vuelve a leer cuando realmente se modifica.
+    """
+
+    def __init__(self, target, manifest_file=MANIFEST_FILE):
+        self.target = target
+        self.manifest_file = manifest_file
+        self.manifest = {'files': {}, 'targets': {}, 'copies': {}}
+
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                self.manifest.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+        self.previous = self.manifest['targets'].get(target, {})
+        self.sections = {}
+        self.assets = {}
+
+    def file_digest(self, path):
+        """Huella de un archivo, usando la caché por tamaño y mtime"""
+        st = os.stat(path)
+        entry = self.manifest['files'].get(path)
+
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['sha256']
+
+        digest = _hash_file(path)
+        self.manifest['files'][path] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': digest
+        }
+        return digest
+
+    def section(self, name, *parts):
+        """Registra una sección; devuelve True si cambió desde la última construcción"""
+        digest = text_digest(self.target, name, *parts)
+        self.sections[name] = digest
+        return self.previous.get('sections', {}).get(name) != digest
+
+    def asset(self, path):
+        """Registra un recurso de entrada; devuelve True si cambió"""
+        digest = self.file_digest(path) if os.path.exists(path) else None
+        self.assets[path] = digest
+        return self.previous.get('assets', {}).get(path) != digest
+
+    def changed(self):
+        """Secciones y recursos nuevos, modificados o eliminados"""
+        old_sections = self.previous.get('sections', {})
+        old_assets = self.previous.get('assets', {})
+
+        names = [n for n in self.sections if old_sections.get(n) != self.sections[n]]
+        names += [n for n in old_sections if n not in self.sections]
+        names += [p for p in self.assets if old_assets.get(p) != self.assets[p]]
+        names += [p for p in old_assets if p not in self.assets]
+        return names
+
+    def up_to_date(self, output):
+        """True si la salida existe y nada de lo registrado ha cambiado"""
+        if not os.path.exists(output) or self.previous.get('output') != output:
+            return False
+
+        # La salida pudo ser modificada o sustituida a mano
+        if self.previous.get('output_sha256') != self.file_digest(output):
+            return False
+
+        return not self.changed()
+
+    def sync_copy(self, src, dst):
+        """
+        Copia src a dst solo si el contenido difiere.
+        Devuelve True si se copió el archivo.
+        """
+        src_digest = self.file_digest(src)
+
+        if os.path.exists(dst) and self.file_digest(dst) == src_digest:
+            self.manifest['copies'][dst] = src
+            return False
+
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        shutil.copy2(src, dst)
+        self.manifest['copies'][dst] = src
+        self.manifest['files'].pop(dst, None)
+        self.file_digest(dst)
+        return True
+
+    def fragment(self, name, render):
+        """
+        Texto renderizado de una sección registrada con section().
+        Solo se llama a render() si no hay un fragmento con la misma huella.
+        """
+        path = os.path.join(FRAGMENT_DIR, self.sections[name] + '.frag')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            pass
+
+        text = render()
+        os.makedirs(FRAGMENT_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+        return text
+
+    def _prune_fragments(self):
+        """Elimina fragmentos que ya no corresponden a ninguna sección"""
+        live = set()
+        for target in self.manifest['targets'].values():
+            live.update(target.get('sections', {}).values())
+
+        try:
+            names = os.listdir(FRAGMENT_DIR)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.frag') and name[:-5] not in live:
+                os.remove(os.path.join(FRAGMENT_DIR, name))
+
+    def commit(self, output):
+        """Guarda el estado de la construcción recién terminada"""
+        self.manifest['targets'][self.target] = {
+            'output': output,
+            'output_sha256': self.file_digest(output),
+            'sections': self.sections,
+            'assets': self.assets
+        }
+        self._prune_fragments()
+        self.save()
+
+    def save(self):
+        """Escribe el manifiesto de forma atómica"""
+        os.makedirs(os.path.dirname(self.manifest_file) or '.', exist_ok=True)
+        tmp_file = self.manifest_file + '.tmp'
+
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Contenido de la Documentación
+Modelo único del que se generan la documentación HTML para el profesor
+(generar_documentacion_profesor.py) y la presentación Word
+(generar_presentacion.py)
+
+Cada documento es una lista de secciones:
+    {'id': ..., 'titulo': ..., 'bloques': [...]}
+
+Bloques (tuplas, el primer elemento es el tipo):
+    ('subtitulo', texto)              Subsección (nivel 2)
+    ('apartado', texto[, 'ok'])       Encabezado de nivel 3 ('ok': en verde)
+    ('p', texto)                      Párrafo
+    ('cita', texto)                   Texto para decir en voz alta (cursiva)
+    ('nota', texto)                   Indicación para el presentador
+    ('lista', [textos])               Lista con viñetas
+    ('lista_num', [textos])           Lista numerada
+    ('checks', [textos], marca)       Lista con marca verde (✅, ✓, •)
+    ('etiquetas', [(etiqueta, texto)])  Lista "Etiqueta: texto"
+    ('codigo', [líneas])              Bloque de código
+    ('ejemplo', [líneas])             Ejemplo de archivo de configuración
+    ('aviso', tipo, título, texto)    Recuadro info/warning/success
+    ('diagrama', clave)               Diagrama de DIAGRAMAS
+    ('categorias',)                   Categorías del menú (CATEGORIAS)
+    ('opciones_menu',)                Las opciones del menú (OPCIONES_MENU)
+    ('pasos', [(título, comando, texto)])  Pasos de la demostración
+    ('faq', [(pregunta, respuesta)])  Preguntas; la respuesta es texto o bloques
+    ('tabla', [cabeceras], [filas])   Tabla de datos
+    ('grafica', título, [valores], unidad)  Gráfica de evolución (solo HTML)
+    ('destacado', texto)              Texto grande centrado
+    ('salto',)                        Salto de página (solo Word)
+
+Los textos admiten marcado en línea: <strong>, <em>, <code> y <br>.
+"""
+
+PROYECTO = {
+    'nombre': 'SIM-RED EXTENDIDO',
+    'lema': 'Sistema de Análisis y Seguridad de Red',
+    'subtitulo': 'Sistema de Monitoreo, Análisis y Seguridad para Redes Locales',
+    'curso': 'Proyecto Final - Administración de Redes',
+    'tecnologias': 'Bash, AWK, Perl',
+    'version': '1.0'
+}
+
+# Diagramas: clave -> datos (archivo en diagramas/, ancho en Word en pulgadas)
+DIAGRAMAS = {
+    'arquitectura': {
+        'archivo': 'arquitectura_sistema.png',
+        'titulo': 'Arquitectura del Sistema',
+        'pie': 'Figura 1: Arquitectura modular de SIM-RED EXTENDIDO',
+        'descripcion': 'Este diagrama muestra la estructura completa del sistema SIM-RED EXTENDIDO, incluyendo todos los módulos, bibliotecas, archivos de configuración y flujos de datos.',
+        'ancho_docx': 6.5
+    },
+    'flujo': {
+        'archivo': 'flujo_trabajo.png',
+        'titulo': 'Flujo de Trabajo Principal',
+        'pie': 'Figura 2: Flujo de trabajo del sistema',
+        'descripcion': 'Este diagrama ilustra el flujo de ejecución del sistema desde el inicio hasta la ejecución de cada módulo y el retorno al menú principal.',
+        'ancho_docx': 6.0
+    },
+    'estructura': {
+        'archivo': 'estructura_archivos.png',
+        'titulo': 'Estructura de Archivos',
+        'pie': 'Figura 3: Organización de directorios y archivos',
+        'descripcion': 'Este diagrama presenta la organización de directorios y archivos del proyecto SIM-RED.',
+        'ancho_docx': 6.5
+    }
+}
+
+TECNOLOGIAS = [
+    ('Bash:', 'Script principal y lógica de control'),
+    ('AWK (gawk):', 'Procesamiento de datos y análisis estadístico'),
+    ('Perl:', 'Generación de informes HTML y procesamiento avanzado'),
+    ('Herramientas de Red:', 'arp-scan, nmap, ping, dig, netstat')
+]
+
+# Categorías del menú principal (sim-red.sh) y opciones que agrupan
+CATEGORIAS = [
+    ('Monitoreo de Dispositivos', (1, 3),
+     'Permite verificar qué dispositivos están conectados, comparándolos con una lista de autorizados, validando horarios permitidos y detectando intrusos.'),
+    ('Análisis de Rendimiento', (4, 6),
+     'Mide latencia, tráfico de red y genera estadísticas para diagnóstico de problemas de rendimiento.'),
+    ('Seguridad', (7, 11),
+     'Detecta ataques de spoofing, monitorea la tabla ARP, escanea puertos y verifica integridad de archivos de configuración.'),
+    ('Informes y Configuración', (12, 14),
+     'Genera informes completos en HTML/TXT, gestiona logs y permite configurar el sistema de forma interactiva.'),
+    ('Sistema', (15, 15),
+     'Verifica automáticamente las dependencias y ofrece instalarlas si faltan.')
+]
+
+OPCIONES_MENU = [
+    {
+        'numero': 1,
+        'titulo': 'Verificar Dispositivos Conectados',
+        'proposito': 'Escanea la red local y compara los dispositivos encontrados con la lista de hosts autorizados.',
+        'acciones': [
+            'Usa <code>arp-scan</code> para descubrir dispositivos en la red',
+            'Compara IPs y MACs con el archivo <code>hosts.conf</code>',
+            'Verifica horarios permitidos según <code>schedule.conf</code>',
+            'Identifica dispositivos desconocidos o no autorizados'
+        ],
+        'resultado': 'Lista de dispositivos clasificados como autorizados, desconocidos o fuera de horario.'
+    },
+    {
+        'numero': 2,
+        'titulo': 'Verificar Suplantación de IP (Anti-Spoofing)',
+        'proposito': 'Detecta intentos de suplantación de identidad en la red.',
+        'acciones': [
+            'Analiza la tabla ARP en busca de anomalías',
+            'Detecta IPs con múltiples MACs (posible spoofing)',
+            'Detecta MACs con múltiples IPs (posible ataque)',
+            'Compara con historial para detectar cambios de MAC'
+        ],
+        'resultado': 'Alerta si se detectan inconsistencias en la tabla ARP.'
+    },
+    {
+        'numero': 3,
+        'titulo': 'Detectar VPN/Proxy',
+        'proposito': 'Identifica si los usuarios están usando VPN o servicios proxy.',
+        'acciones': [
+            'Analiza variaciones en el TTL (Time To Live)',
+            'Mide desviaciones en la latencia',
+            'Escanea puertos comunes de VPN (1194, 500, 4500, 1723)',
+            'Calcula probabilidad basada en múltiples indicadores'
+        ],
+        'resultado': 'Probabilidad (BAJA/MEDIA/ALTA) de uso de VPN/Proxy por cada host.'
+    },
+    {
+        'numero': 4,
+        'titulo': 'Medir Latencia Promedio',
+        'proposito': 'Mide el tiempo de respuesta de todos los hosts autorizados.',
+        'acciones': [
+            'Hace ping a cada host autorizado (10 paquetes)',
+            'Calcula latencia mínima, promedio, máxima y desviación',
+            'Genera estadísticas globales de la red',
+            'Guarda datos históricos para análisis de tendencias'
+        ],
+        'resultado': 'Tabla con latencias y estadísticas de red.'
+    },
+    {
+        'numero': 5,
+        'titulo': 'Monitoreo Continuo de Latencia',
+        'proposito': 'Supervisa la latencia en tiempo real con gráficas ASCII.',
+        'acciones': [
+            'Mide latencia cada segundo de hasta 5 hosts',
+            'Muestra valores actuales con código de colores',
+            'Genera gráfica ASCII de tendencia',
+            'Alerta cuando se supera el umbral configurado'
+        ],
+        'resultado': 'Pantalla actualizada en tiempo real con métricas y gráfica.',
+        'aviso': ('warning', '⚠️ Atención:', 'Presiona Ctrl+C para detener el monitoreo continuo.')
+    },
+    {
+        'numero': 6,
+        'titulo': 'Medir Tráfico de Red',
+        'proposito': 'Mide el tráfico de red por interfaz y por host (Up/Down).',
+        'acciones': [
+            '<strong>Modo Instantáneo:</strong> Muestra bytes RX/TX totales por interfaz',
+            '<strong>Modo Continuo:</strong> Calcula tráfico por minuto en tiempo real',
+            '<strong>Tráfico por Host:</strong> Reparte bytes y paquetes entre las IPs de la subred (conntrack o captura de cabeceras)',
+            'Guarda historial para análisis de anomalías'
+        ],
+        'resultado': 'Tabla con tráfico de red formateado (KB, MB, GB) y los hosts con más tráfico por nombre.'
+    },
+    {
+        'numero': 7,
+        'titulo': 'Monitoreo ARP en Tiempo Real',
+        'proposito': 'Detecta cambios en la tabla ARP en tiempo real.',
+        'acciones': [
+            'Monitorea <code>/proc/net/arp</code> cada 5 segundos',
+            'Detecta nuevas entradas (dispositivos que se conectan)',
+            'Detecta entradas eliminadas (dispositivos que se desconectan)',
+            'Clasifica nuevos dispositivos como autorizados o desconocidos'
+        ],
+        'resultado': 'Notificaciones en tiempo real de cambios en la red.'
+    },
+    {
+        'numero': 8,
+        'titulo': 'Verificar Integridad de Archivos',
+        'proposito': 'Detecta modificaciones no autorizadas en la configuración, los scripts y las bibliotecas.',
+        'acciones': [
+            'Mantiene un manifiesto con tamaño, fecha, inodo y hash SHA256 de cada archivo',
+            'Solo vuelve a calcular el hash de los archivos cuyo tamaño, fecha o inodo cambió',
+            'Alerta si un archivo fue modificado, eliminado o añadido',
+            'Permite actualizar el manifiesto después de cambios legítimos',
+            'Vigila los archivos en tiempo real con inotify (<code>--watch</code>)'
+        ],
+        'resultado': 'Confirmación de integridad o alerta de modificación.'
+    },
+    {
+        'numero': 9,
+        'titulo': 'Escanear Puertos',
+        'proposito': 'Identifica puertos abiertos en hosts autorizados.',
+        'acciones': [
+            'Usa <code>nmap</code> para escanear puertos configurados',
+            'Puertos por defecto: 22 (SSH), 80 (HTTP), 443 (HTTPS), 3306 (MySQL), 5432 (PostgreSQL), 8080',
+            'Identifica servicios en cada puerto',
+            'Marca servicios inesperados para revisión'
+        ],
+        'resultado': 'Lista de puertos abiertos por host con estado (ESPERADO/REVISAR).'
+    },
+    {
+        'numero': 10,
+        'titulo': 'Comprobar DNS',
+        'proposito': 'Verifica disponibilidad y rendimiento de servidores DNS.',
+        'acciones': [
+            'Prueba servidores DNS configurados (por defecto: 8.8.8.8, 8.8.4.4, 1.1.1.1)',
+            'Envía consultas UDP a todos los servidores a la vez, para varios nombres y tipos',
+            'Mide el tiempo de cada consulta (p50 y p95 por servidor)',
+            'Calcula los porcentajes de NXDOMAIN y SERVFAIL',
+            'Detecta servidores lentos, inestables o no disponibles'
+        ],
+        'resultado': 'Tabla con estado, p50/p95 y tasas de error de cada DNS.'
+    },
+    {
+        'numero': 11,
+        'titulo': 'Detectar Anomalías',
+        'proposito': 'Identifica comportamientos anormales usando análisis estadístico.',
+        'acciones': [
+            '<strong>Anomalías de Latencia:</strong> Compara latencia actual vs promedio histórico',
+            '<strong>Anomalías de Tráfico:</strong> Detecta picos inusuales de RX/TX por interfaz',
+            'Usa multiplicador configurable (por defecto 2x el promedio)',
+            'Requiere datos históricos (mínimo 30 mediciones)'
+        ],
+        'resultado': 'Alerta si se detectan valores fuera de rango normal.'
+    },
+    {
+        'numero': 12,
+        'titulo': 'Generar Informe Completo',
+        'proposito': 'Crea un informe consolidado del estado de la red.',
+        'acciones': [
+            'Recopila datos de dispositivos, seguridad y rendimiento',
+            'Genera informe en formato TXT (siempre)',
+            'Genera informe en formato HTML (si Perl está disponible)',
+            'Incluye resumen, dispositivos, alertas y latencias'
+        ],
+        'resultado': 'Archivos de informe en <code>reports/</code> con timestamp.'
+    },
+    {
+        'numero': 13,
+        'titulo': 'Gestión de Logs',
+        'proposito': 'Administra los archivos de registro del sistema.',
+        'acciones': [
+            '<strong>Ver Logs:</strong> Muestra contenido de logs con paginación',
+            '<strong>Borrar Logs:</strong> Limpia todos los archivos de log',
+            '<strong>Exportar Logs:</strong> Crea archivo .tar.gz con todos los logs',
+            '<strong>Estadísticas:</strong> Muestra tamaño, líneas, mensajes INFO y ALERT'
+        ],
+        'resultado': 'Interfaz de gestión de logs con múltiples opciones.'
+    },
+    {
+        'numero': 14,
+        'titulo': 'Configuración del Sistema',
+        'proposito': 'Modifica parámetros y configuraciones del sistema.',
+        'acciones': [
+            '<strong>Cambiar Subred:</strong> Define la red a escanear',
+            '<strong>Intervalos de Monitoreo:</strong> Ajusta frecuencia de monitoreos',
+            '<strong>Gestionar Hosts:</strong> Añadir, ver o eliminar hosts autorizados',
+            '<strong>Umbrales de Alerta:</strong> Configura límites para alertas',
+            '<strong>Ver Configuración:</strong> Muestra parámetros actuales'
+        ],
+        'resultado': 'Menú interactivo de configuración.'
+    },
+    {
+        'numero': 15,
+        'titulo': 'Verificación de Herramientas',
+        'proposito': 'Verifica e instala herramientas necesarias.',
+        'acciones': [
+            'Lee <code>requirements.txt</code> con herramientas necesarias',
+            'Verifica si cada herramienta está instalada',
+            'Ofrece instalar herramientas faltantes automáticamente',
+            'Usa <code>apt-get</code> para instalación (requiere sudo)'
+        ],
+        'resultado': 'Reporte de herramientas instaladas/faltantes con opción de instalación.'
+    }
+]
+
+# Preguntas frecuentes de uso
+FAQ = [
+    ('¿Cómo ejecuto SIM-RED EXTENDIDO?', [
+        ('p', 'Desde el directorio del proyecto, ejecuta:'),
+        ('codigo', ['sudo ./sim-red.sh']),
+        ('p', 'Se requiere <code>sudo</code> porque algunas herramientas como <code>arp-scan</code> necesitan permisos de root.')
+    ]),
+    ('¿Por qué aparece "Permission denied"?', [
+        ('p', 'Asegúrate de ejecutar con <code>sudo</code>. Si el problema persiste, verifica permisos:'),
+        ('codigo', ['chmod +x sim-red.sh', 'chmod +x bin/*.sh'])
+    ]),
+    ('¿Qué hago si faltan herramientas?', [
+        ('p', 'Ejecuta la opción 15 del menú (Verificación de Herramientas). El sistema te ofrecerá '
+              'instalar automáticamente las herramientas faltantes. También puedes instalarlas manualmente:'),
+        ('codigo', ['sudo apt-get install arp-scan nmap gawk bc perl'])
+    ]),
+    ('¿Cómo añado un nuevo dispositivo autorizado?',
+     'Tienes dos opciones:<br>'
+     '<strong>Opción 1 (Recomendada):</strong> Usa el menú → Opción 14 (Configuración) → Gestionar Hosts → Añadir Host<br>'
+     '<strong>Opción 2:</strong> Edita manualmente <code>config/hosts.conf</code> siguiendo el formato IP|MAC|HOSTNAME|DESCRIPCIÓN'),
+    ('¿Cómo configuro horarios de acceso?',
+     'Edita <code>config/schedule.conf</code> o usa la opción 14 del menú al añadir un host. '
+     'El formato es: IP|DÍAS|HORA_INICIO|HORA_FIN<br>'
+     'Ejemplo: <code>192.168.1.20|Mon-Fri|08:00|18:00</code>'),
+    ('¿Dónde se guardan los informes generados?',
+     'Los informes se guardan en la carpeta <code>reports/</code> con el formato:<br>'
+     '<code>report_YYYYMMDD_HHMMSS.txt</code> (texto plano)<br>'
+     '<code>report_YYYYMMDD_HHMMSS.html</code> (HTML, si Perl está disponible)'),
+    ('¿Cómo veo los logs del sistema?', [
+        ('p', 'Usa la opción 13 del menú (Gestión de Logs). Los logs se encuentran en <code>logs/</code>:'),
+        ('lista', [
+            '<code>devices.log</code> - Verificación de dispositivos',
+            '<code>spoofing.log</code> - Detección de spoofing',
+            '<code>latency.log</code> - Mediciones de latencia',
+            '<code>vpn.log</code> - Detección de VPN/Proxy',
+            'Y más...'
+        ])
+    ]),
+    ('¿Qué significa "FUERA DE HORARIO"?',
+     'Indica que un dispositivo está conectado fuera de su horario permitido según <code>schedule.conf</code>. '
+     'El dispositivo está autorizado, pero no en ese momento específico.'),
+    ('¿Cómo cambio la subred a escanear?',
+     'Usa la opción 14 del menú (Configuración) → Cambiar Subred. También puedes editar '
+     'manualmente <code>config/config.conf</code> y modificar la línea <code>SUBNET="..."</code>'),
+    ('¿El sistema funciona en otras distribuciones de Linux?',
+     'Sí, funciona en cualquier distribución Linux que tenga Bash, AWK y las herramientas de red necesarias. '
+     'Fue desarrollado y probado en Ubuntu, pero es compatible con Debian, CentOS, Fedora, etc.'),
+    ('¿Cómo detengo un monitoreo continuo?',
+     'Presiona <code>Ctrl+C</code> en cualquier momento para detener monitoreos continuos '
+     '(opciones 5, 6 en modo continuo, y 7).'),
+    ('¿Qué hago si detecto un dispositivo desconocido?', [
+        ('lista_num', [
+            'Verifica si es un dispositivo legítimo que olvidaste añadir',
+            'Si es legítimo, añádelo usando la opción 14 (Configuración)',
+            'Si es sospechoso, investiga la MAC y considera bloquearlo en tu router/firewall',
+            'Revisa los logs para ver cuándo apareció por primera vez'
+        ])
+    ]),
+    ('¿Cómo exporto todos los logs?',
+     'Usa la opción 13 (Gestión de Logs) → Exportar Logs. Esto creará un archivo '
+     '<code>logs_export_TIMESTAMP.tar.gz</code> con todos los logs comprimidos.'),
+    ('¿Puedo usar SIM-RED en una red corporativa grande?',
+     'SIM-RED está diseñado para redes pequeñas a medianas (hasta ~100 dispositivos). '
+     'Para redes más grandes, considera ajustar los intervalos de escaneo y usar filtros de subred.'),
+    ('¿Cómo actualizo el hash de integridad después de modificar hosts.conf?',
+     'Ejecuta la opción 8 (Verificar Integridad). Si detecta cambios, te preguntará si deseas '
+     'actualizar el manifiesto. Responde "sí" si los cambios fueron intencionales.')
+]
+
+# Banco de preguntas para la defensa del proyecto
+PREGUNTAS_GENERALES = [
+    ('P1: ¿Qué es SIM-RED EXTENDIDO y para qué sirve?',
+     'SIM-RED EXTENDIDO es un sistema de monitoreo, análisis y seguridad para redes locales. Sirve para verificar dispositivos conectados, detectar amenazas de seguridad como spoofing, medir rendimiento de red, y generar informes completos. Es útil en entornos corporativos, educativos o cualquier red que requiera control y monitoreo.'),
+    ('P2: ¿Por qué desarrollaste este proyecto en Bash/AWK/Perl en lugar de usar Python o un lenguaje moderno?',
+     'El objetivo del curso era aplicar conocimientos de administración de sistemas y habilidades en Shell scripting. Bash, AWK y Perl son herramientas nativas de Linux, no requieren instalación adicional, son muy eficientes para tareas de sistema y procesamiento de texto, y son fundamentales para cualquier administrador de sistemas. Además, demuestran dominio de herramientas tradicionales de Unix/Linux.'),
+    ('P3: ¿Qué problemas resuelve tu proyecto?',
+     'Resuelve varios problemas: 1) Control de acceso a la red (dispositivos autorizados), 2) Detección de amenazas (spoofing, dispositivos desconocidos), 3) Monitoreo de rendimiento (latencia, tráfico), 4) Auditoría de seguridad (puertos abiertos, integridad de archivos), 5) Generación de reportes para documentación, 6) Detección de uso no autorizado de VPN/Proxy.')
+]
+
+PREGUNTAS_ARQUITECTURA = [
+    ('P4: ¿Cómo está estructurado el proyecto?',
+     'El proyecto sigue una arquitectura modular: sim-red.sh (script principal con menú interactivo), bin/ (15 scripts especializados), lib/ (bibliotecas compartidas), config/ (archivos de configuración), logs/ (registros de actividad), data/ (datos históricos), reports/ (informes generados).'),
+    ('P5: ¿Por qué separaste las funciones en módulos?',
+     'Por varias razones: 1) Mantenibilidad (cada módulo es independiente), 2) Reutilización (bibliotecas comunes evitan duplicación), 3) Escalabilidad (fácil agregar funciones), 4) Debugging (errores aislados), 5) Buenas prácticas (separación de responsabilidades).'),
+    ('P6: ¿Cómo funciona el sistema de logs?',
+     'Cada módulo registra sus actividades en archivos .log específicos con formato [YYYY-MM-DD HH:MM:SS] [NIVEL] Mensaje. Los niveles son: INFO, WARNING, ERROR, ALERT. La opción 13 permite visualizar, filtrar, limpiar y exportar logs. Se retienen según configuración (por defecto 30 días).')
+]
+
+PREGUNTAS_FUNCIONALIDADES = [
+    ('P7: ¿Cómo funciona la verificación de dispositivos (Opción 1)?',
+     'Envía peticiones ARP a toda la subred desde un socket AF_PACKET (lib/arp_sweep.pl, con límite de tasa y reintentos; arp-scan como alternativa) para obtener IP, MAC y hostname. Luego: 1) Compara con hosts.conf, 2) Verifica horarios en schedule.conf, 3) Valida que la MAC coincida, 4) Clasifica dispositivos como AUTORIZADO, DESCONOCIDO, FUERA DE HORARIO, MAC NO COINCIDE, 5) Genera resumen y lo registra.'),
+    ('P8: ¿Cómo detectas ataques de spoofing (Opción 2)?',
+     'Lee la tabla ARP (/proc/net/arp) y detecta: 1) IP Spoofing (misma IP con múltiples MACs), 2) MAC Spoofing (misma MAC con múltiples IPs), 3) Cambios históricos (historial de vínculos IP/MAC indexado en arp_bindings.dat, con oscilaciones y duplicados en los últimos días). Utiliza AWK para procesar y analizar los datos eficientemente.'),
+    ('P9: ¿Cómo funciona la detección de VPN/Proxy (Opción 3)?',
+     'Analiza múltiples indicadores: 1) TTL (detecta cambios vs histórico), 2) Latencia (variaciones inusuales), 3) Puertos VPN (escanea 1194-OpenVPN, 500/4500-IPSec, 1723-PPTP), 4) Probabilidad (calcula score: BAJA/MEDIA/ALTA).'),
+    ('P10: ¿Cómo mides la latencia (Opciones 4 y 5)?',
+     'Opción 4 (Puntual): Hace ping a todos los hosts, extrae estadísticas con AWK, ordena por latencia y genera reporte. Opción 5 (Continua): Mediciones cada segundo, actualiza pantalla en tiempo real, genera gráficas ASCII, alerta cuando se superan umbrales.'),
+    ('P11: ¿Cómo generas los informes HTML (Opción 12)?',
+     'El script generate_report.sh ejecuta múltiples verificaciones y recopila resultados. Luego report_generator.pl (Perl) lee los datos, genera HTML con CSS embebido, incluye tablas y gráficas, aplica colores según severidad, y guarda con timestamp.')
+]
+
+def _grupos(grupos, marca=None, verde=False, nivel='apartado'):
+    """Bloques de varios grupos (encabezado + lista) seguidos"""
+    bloques = []
+    for titulo, items in grupos:
+        bloques.append((nivel, titulo, 'ok') if verde else (nivel, titulo))
+        bloques.append(('checks', items, marca) if marca else ('lista', items))
+    return bloques
+
+def huella(seccion):
+    """
+    Texto que identifica todo el contenido de una sección, incluidas las
+    tablas compartidas a las que hacen referencia sus bloques
+    """
+    partes = [repr(seccion)]
+    for bloque in seccion['bloques']:
+        if bloque[0] == 'opciones_menu':
+            partes.append(repr(OPCIONES_MENU))
+        elif bloque[0] == 'categorias':
+            partes.append(repr(CATEGORIAS))
+        elif bloque[0] == 'diagrama':
+            partes.append(repr(DIAGRAMAS[bloque[1]]))
+    return '\n'.join(partes)
+
+# ========== DOCUMENTACIÓN PARA EL PROFESOR (HTML) ==========
+
+DOCUMENTACION_PROFESOR = [
+    {
+        'id': 'introduccion',
+        'titulo': 'Introducción y Contexto del Proyecto',
+        'bloques': [
+            ('subtitulo', '¿Qué es SIM-RED EXTENDIDO?'),
+            ('p', '<strong>SIM-RED EXTENDIDO</strong> es un sistema completo de análisis y seguridad de red desarrollado '
+                  'íntegramente en Bash, AWK y Perl. El proyecto fue diseñado para aplicar conocimientos de administración '
+                  'de redes y scripting en un entorno práctico y funcional.'),
+            ('subtitulo', 'Objetivos del Proyecto'),
+            ('etiquetas', [
+                ('Monitoreo de Red:', 'Supervisar dispositivos conectados y su comportamiento'),
+                ('Seguridad:', 'Detectar amenazas como spoofing, dispositivos no autorizados y anomalías'),
+                ('Análisis de Rendimiento:', 'Medir latencia, tráfico y disponibilidad de servicios'),
+                ('Gestión:', 'Administrar configuraciones, logs e informes del sistema')
+            ]),
+            ('subtitulo', 'Tecnologías Utilizadas'),
+            ('etiquetas', TECNOLOGIAS),
+            ('aviso', 'info', '💡 Nota Importante:',
+             'Este proyecto fue desarrollado sin usar frameworks o lenguajes '
+             'de alto nivel, demostrando el poder y versatilidad de las herramientas nativas de Linux.')
+        ]
+    },
+    {
+        'id': 'arquitectura',
+        'titulo': 'Arquitectura del Sistema',
+        'bloques': [
+            ('subtitulo', 'Estructura General'),
+            ('p', 'SIM-RED EXTENDIDO está organizado en módulos independientes que trabajan de manera coordinada. '
+                  'Cada funcionalidad es un script separado que puede ejecutarse de forma autónoma o desde el menú principal.'),
+            ('diagrama', 'arquitectura'),
+            ('subtitulo', 'Componentes Principales'),
+            ('etiquetas', [
+                ('sim-red.sh:', 'Menú principal e interfaz de usuario'),
+                ('bin/:', '15 módulos de funcionalidades específicas'),
+                ('lib/:', 'Bibliotecas compartidas (funciones comunes, utilidades de red)'),
+                ('config/:', 'Archivos de configuración (hosts, horarios, parámetros)'),
+                ('logs/:', 'Registro de eventos y actividades'),
+                ('data/:', 'Datos históricos y cache'),
+                ('reports/:', 'Informes generados')
+            ]),
+            ('diagrama', 'flujo'),
+            ('diagrama', 'estructura')
+        ]
+    },
+    {
+        'id': 'tutoriales',
+        'titulo': 'Tutorial de Funcionalidades',
+        'bloques': [
+            ('p', 'A continuación se explica cada una de las 15 opciones del menú principal:'),
+            ('opciones_menu',)
+        ]
+    },
+    {
+        'id': 'configuracion',
+        'titulo': 'Guía de Configuración',
+        'bloques': [
+            ('subtitulo', '4.1 Configurar Hosts Autorizados (hosts.conf)'),
+            ('p', 'El archivo <code>config/hosts.conf</code> define qué dispositivos están permitidos en la red.'),
+            ('p', '<strong>Formato:</strong>'),
+            ('codigo', ['IP|MAC|HOSTNAME|DESCRIPCIÓN']),
+            ('p', '<strong>Ejemplo:</strong>'),
+            ('ejemplo', [
+                '# Servidor principal',
+                '192.168.1.10|aa:bb:cc:dd:ee:ff|servidor-web|Servidor Web Apache',
+                '',
+                '# Estación de trabajo del administrador',
+                '192.168.1.20|11:22:33:44:55:66|admin-pc|PC del Administrador',
+                '',
+                '# Impresora de red',
+                '192.168.1.30|aa:11:bb:22:cc:33|impresora-hp|Impresora HP LaserJet'
+            ]),
+            ('p', '<strong>Cómo obtener la MAC de un dispositivo:</strong>'),
+            ('codigo', ['# En Linux/Mac:', 'ip link show', '', '# En Windows:', 'ipconfig /all']),
+            ('aviso', 'info', '💡 Tip:',
+             'Puedes usar la opción 14 del menú (Configuración) para añadir hosts '
+             'de forma interactiva sin editar el archivo manualmente.'),
+            ('subtitulo', '4.2 Configurar Horarios (schedule.conf)'),
+            ('p', 'El archivo <code>config/schedule.conf</code> define cuándo cada dispositivo puede conectarse.'),
+            ('p', '<strong>Formato:</strong>'),
+            ('codigo', ['IP|DÍAS|HORA_INICIO|HORA_FIN']),
+            ('p', '<strong>Ejemplos:</strong>'),
+            ('ejemplo', [
+                '# Acceso 24/7',
+                '192.168.1.10|Mon-Sun|00:00|23:59',
+                '',
+                '# Solo horario laboral (Lunes a Viernes, 8am-6pm)',
+                '192.168.1.20|Mon-Fri|08:00|18:00',
+                '',
+                '# Solo fines de semana',
+                '192.168.1.30|Sat-Sun|10:00|22:00',
+                '',
+                '# Días específicos',
+                '192.168.1.40|Mon,Wed,Fri|09:00|17:00'
+            ]),
+            ('p', '<strong>Días válidos:</strong>'),
+            ('lista', [
+                'Mon (Lunes), Tue (Martes), Wed (Miércoles), Thu (Jueves)',
+                'Fri (Viernes), Sat (Sábado), Sun (Domingo)',
+                'Rangos: Mon-Fri, Sat-Sun, Mon-Sun',
+                'Individuales: Mon,Wed,Fri'
+            ]),
+            ('subtitulo', '4.3 Configuración General (config.conf)'),
+            ('p', 'El archivo <code>config/config.conf</code> contiene parámetros globales del sistema.'),
+            ('p', '<strong>Parámetros principales:</strong>'),
+            ('ejemplo', [
+                '# Subred a escanear',
+                'SUBNET="192.168.1.0/24"',
+                '',
+                '# Interfaz de red',
+                'NETWORK_INTERFACE="eth0"',
+                '',
+                '# Umbrales de latencia (ms)',
+                'LATENCY_THRESHOLD_MS=50',
+                'LATENCY_ALERT_MS=200',
+                '',
+                '# Multiplicador para detección de anomalías',
+                'TRAFFIC_ANOMALY_MULTIPLIER=2.0',
+                '',
+                '# Servidores DNS a probar',
+                'DNS_SERVERS="8.8.8.8 8.8.4.4 1.1.1.1"',
+                '',
+                '# Puertos a escanear',
+                'PORTS_TO_SCAN="22,80,443,3306,5432,8080"'
+            ]),
+            ('aviso', 'warning', '⚠️ Importante:',
+             'Después de modificar archivos de configuración, '
+             'usa la opción 8 (Verificar Integridad) para actualizar el hash si es necesario.')
+        ]
+    },
+    {
+        'id': 'faq',
+        'titulo': 'Preguntas Frecuentes (FAQ)',
+        'bloques': [
+            ('faq', FAQ),
+            ('aviso', 'success', '✅ ¿Más preguntas?',
+             'Revisa los logs en <code>logs/</code> para más detalles '
+             'sobre el funcionamiento del sistema, o consulta la documentación en <code>GUIA_COMPLETA.md</code>.')
+        ]
+    }
+]
+
+# ========== PRESENTACIÓN (WORD) ==========
+
+PRESENTACION = [
+    {
+        'id': 'diagramas',
+        'titulo': '📊 DIAGRAMAS DEL PROYECTO',
+        'indice': 'Diagramas del Proyecto',
+        'bloques': [
+            bloque
+            for n, clave in enumerate(DIAGRAMAS, 1)
+            for bloque in (
+                ('subtitulo', f"{n}. {DIAGRAMAS[clave]['titulo']}"),
+                ('p', DIAGRAMAS[clave]['descripcion']),
+                ('diagrama', clave),
+                ('salto',)
+            )
+        ]
+    },
+    {
+        'id': 'guion',
+        'titulo': '🎤 GUIÓN DE PRESENTACIÓN',
+        'indice': 'Guión de Presentación',
+        'bloques': [
+            ('subtitulo', 'INTRODUCCIÓN (2-3 minutos)'),
+            ('apartado', 'Saludo y Contexto:'),
+            ('cita', 'Buenos días/tardes. Hoy les presentaré SIM-RED EXTENDIDO, un sistema completo de monitoreo, análisis y seguridad para redes locales que desarrollé como proyecto final del curso de Administración de Redes.'),
+            ('apartado', 'Problema que Resuelve:'),
+            ('cita', 'En entornos de red, especialmente en empresas y centros educativos, es fundamental tener control sobre qué dispositivos se conectan, detectar amenazas de seguridad y monitorear el rendimiento. Las soluciones comerciales suelen ser costosas y complejas. SIM-RED ofrece una alternativa gratuita, ligera y efectiva.'),
+            ('apartado', 'Objetivos del Proyecto:'),
+            ('lista_num', [
+                'Aplicar conocimientos de administración de redes y sistemas',
+                'Desarrollar habilidades en Shell scripting, AWK y Perl',
+                'Crear una herramienta práctica y funcional',
+                'Implementar buenas prácticas de seguridad'
+            ]),
+            ('salto',),
+
+            ('subtitulo', 'DEMOSTRACIÓN TÉCNICA (5-7 minutos)'),
+            ('apartado', '1. Arquitectura del Sistema'),
+            ('cita', 'El sistema está construido completamente en Bash, AWK y Perl, sin dependencias de frameworks pesados. Consta de 15 módulos especializados organizados en 5 categorías.'),
+            ('nota', '[Mostrar diagrama de arquitectura]'),
+            ('apartado', '2. Tecnologías Utilizadas'),
+            ('etiquetas', TECNOLOGIAS),
+            ('apartado', '3. Funcionalidades Principales'),
+            ('categorias',),
+            ('salto',),
+
+            ('subtitulo', 'DEMOSTRACIÓN EN VIVO (3-5 minutos)'),
+            ('pasos', [
+                ('Paso 1: Iniciar el Sistema', 'sudo ./sim-red.sh',
+                 'Al iniciar, el sistema auto-detecta la configuración de red y verifica las herramientas necesarias.'),
+                ('Paso 2: Verificar Dispositivos (Opción 1)', '',
+                 'Voy a ejecutar la opción 1 para ver qué dispositivos están conectados en este momento.'),
+                ('Paso 3: Generar Informe (Opción 12)', '',
+                 'Ahora generaré un informe completo que incluye todas las verificaciones de seguridad y rendimiento.')
+            ]),
+            ('nota', '[Mostrar el informe HTML generado]'),
+            ('salto',),
+
+            ('subtitulo', 'CASOS DE USO (2 minutos)'),
+            *_grupos([
+                ('Caso 1: Red Corporativa', ['Control estricto de acceso', 'Detección de amenazas', 'Auditorías periódicas']),
+                ('Caso 2: Red Educativa', ['Control de horarios', 'Gestión de ancho de banda', 'Reportes administrativos']),
+                ('Caso 3: Servidor de Producción', ['Monitoreo 24/7', 'Detección de anomalías', 'Alta disponibilidad'])
+            ]),
+            ('salto',),
+
+            ('subtitulo', 'CONCLUSIONES (1-2 minutos)'),
+            ('apartado', 'Logros del Proyecto:'),
+            ('checks', [
+                'Sistema funcional con 15 módulos especializados',
+                'Aplicación práctica de Shell, AWK y Perl',
+                'Implementación de buenas prácticas de seguridad',
+                'Documentación completa',
+                'Código modular y mantenible'
+            ], '✅'),
+            *_grupos([
+                ('Aprendizajes:', [
+                    'Scripting avanzado en Bash',
+                    'Procesamiento de datos con AWK',
+                    'Análisis de redes y protocolos',
+                    'Gestión de logs y reportes'
+                ]),
+                ('Trabajo Futuro:', [
+                    'Dashboard web en tiempo real',
+                    'Notificaciones automáticas',
+                    'Integración con SIEM',
+                    'API REST'
+                ])
+            ]),
+            ('salto',)
+        ]
+    },
+    {
+        'id': 'preguntas',
+        'titulo': '❓ BANCO DE PREGUNTAS Y RESPUESTAS',
+        'indice': 'Banco de Preguntas y Respuestas',
+        'bloques': [
+            ('subtitulo', 'PREGUNTAS GENERALES'),
+            ('faq', PREGUNTAS_GENERALES),
+            ('salto',),
+            ('subtitulo', 'PREGUNTAS TÉCNICAS - ARQUITECTURA'),
+            ('faq', PREGUNTAS_ARQUITECTURA),
+            ('salto',),
+            ('subtitulo', 'PREGUNTAS TÉCNICAS - FUNCIONALIDADES'),
+            ('faq', PREGUNTAS_FUNCIONALIDADES),
+            ('salto',)
+        ]
+    },
+    {
+        'id': 'evaluacion',
+        'titulo': '✅ EVALUACIÓN DE COMPLETITUD DEL PROYECTO',
+        'indice': 'Evaluación de Completitud',
+        'bloques': [
+            ('subtitulo', 'Requisitos Cumplidos'),
+            *_grupos([
+                ('✅ Conocimientos de Administración de Redes', [
+                    'Escaneo de redes (arp-scan)',
+                    'Análisis de tabla ARP',
+                    'Monitoreo de puertos',
+                    'Gestión de DNS',
+                    'Medición de latencia y rendimiento',
+                    'Detección de amenazas de red',
+                    'Control de acceso basado en horarios'
+                ]),
+                ('✅ Habilidades de Shell Scripting', [
+                    'Scripts Bash complejos con funciones',
+                    'Manejo de argumentos y opciones',
+                    'Control de flujo (if/case/while/for)',
+                    'Procesamiento de archivos',
+                    'Manejo de errores',
+                    'Códigos de salida',
+                    'Variables y arrays',
+                    'Redirección y pipes'
+                ]),
+                ('✅ Habilidades de AWK', [
+                    'Procesamiento de archivos delimitados',
+                    'Cálculos estadísticos (promedio, stddev)',
+                    'Filtrado y transformación de datos',
+                    'Generación de reportes formateados',
+                    'Gráficas ASCII',
+                    'Análisis de logs'
+                ]),
+                ('✅ Habilidades de Perl', [
+                    'Generación de HTML dinámico',
+                    'Procesamiento de datos',
+                    'Formateo de reportes',
+                    'Manipulación de strings'
+                ])
+            ], marca='✓', verde=True),
+            ('salto',),
+            ('subtitulo', 'Conclusión de Evaluación'),
+            ('p', '<strong>El proyecto está COMPLETO y CUMPLE AMPLIAMENTE con los objetivos:</strong>'),
+            ('checks', [
+                'Demuestra dominio de administración de redes',
+                'Demuestra habilidades avanzadas en Shell, AWK y Perl',
+                'Es funcional y útil en entornos reales',
+                'Está bien documentado',
+                'Sigue buenas prácticas de programación'
+            ], '✅'),
+            ('destacado', 'Calificación estimada: 95-100/100'),
+            ('salto',)
+        ]
+    },
+    {
+        'id': 'consejos',
+        'titulo': '🎯 CONSEJOS PARA LA PRESENTACIÓN',
+        'indice': 'Consejos para la Presentación',
+        'bloques': [
+            *_grupos([
+                ('Antes de Presentar', [
+                    'Prueba todas las funciones para asegurarte que funcionan',
+                    'Ten el sistema ejecutándose en una VM o red de prueba',
+                    'Prepara ejemplos de informes generados',
+                    'Revisa los logs para mostrar ejemplos reales',
+                    'Ten a mano el código de 2-3 scripts para mostrar si preguntan'
+                ]),
+                ('Durante la Presentación', [
+                    'Habla con confianza, conoces tu proyecto',
+                    'Usa los diagramas para explicar la arquitectura',
+                    'Haz una demo en vivo (aunque sea breve)',
+                    'Muestra el código si preguntan, pero no te pierdas en detalles',
+                    'Controla el tiempo (10-15 minutos típicamente)'
+                ]),
+                ('Al Responder Preguntas', [
+                    'Escucha la pregunta completa antes de responder',
+                    'Si no sabes algo, sé honesto pero sugiere cómo lo investigarías',
+                    'Relaciona tus respuestas con conceptos del curso',
+                    'Usa ejemplos concretos de tu código',
+                    'Mantén la calma, es TU proyecto, tú eres el experto'
+                ])
+            ], marca='✅', nivel='subtitulo'),
+            ('subtitulo', 'Frases Útiles'),
+            ('checks', [
+                '<em>"Esa es una excelente pregunta. En mi implementación..."</em>',
+                '<em>"Consideré esa opción, pero elegí X porque..."</em>',
+                '<em>"Eso sería una mejora futura interesante..."</em>',
+                '<em>"Déjame mostrarte el código específico para eso..."</em>',
+                '<em>"Basándome en lo que aprendimos en clase sobre..."</em>'
+            ], '•'),
+            ('destacado', '¡Éxito en tu presentación! 🚀')
+        ]
+    }
+]
@@ -1,31 +1,308 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script para convertir el documento Word a PDF
+Script para convertir documentos de SIM-RED a PDF sin suite ofimática.
+
+Renderiza HTML con WeasyPrint; los .docx generados por
+generar_presentacion.py se traducen antes a HTML con python-docx.
+Convierte varios documentos en paralelo y guarda cada PDF en una caché
+indexada por el contenido, así un lote nocturno solo renderiza lo nuevo.
+
+Uso:
+    python convertir_a_pdf.py                   # presentacion_simred.docx
+    python convertir_a_pdf.py --reports         # todos los reports/*.html
+    python convertir_a_pdf.py [-j N] [-o DIR] [--force] ARCHIVO...
 """
 
-from docx2pdf import convert
+import argparse
+import base64
+import glob
+import hashlib
+import html
 import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from weasyprint import CSS, HTML, __version__ as WEASYPRINT_VERSION
+except (ImportError, OSError):
+    # OSError: WeasyPrint instalado pero sin las bibliotecas de Pango
+    HTML = None
+    WEASYPRINT_VERSION = None
+
+PDF_CACHE_DIR = os.path.join('data', 'pdf_cache')
+
+# Formato de página común a todos los documentos
+PAGE_CSS = """
+@page { size: A4; margin: 1.5cm; }
+.page-break { break-after: page; }
+"""
+
+def _sha256_file(path):
+    """sha256 de un archivo leído por bloques"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+# ========== DOCX -> HTML ==========
+
+def _run_html(run):
+    """Traduce un fragmento de texto con su formato"""
+    text = html.escape(run.text).replace('\n', '<br>')
+    if not text:
+        return ''
+    if run.bold:
+        text = f'<strong>{text}</strong>'
+    if run.italic:
+        text = f'<em>{text}</em>'
+    if run.font.color is not None and run.font.color.type is not None and run.font.color.rgb is not None:
+        text = f'<span style="color: #{run.font.color.rgb}">{text}</span>'
+    if run.font.size:
+        text = f'<span style="font-size: {run.font.size.pt:g}pt">{text}</span>'
+    return text
+
+def _paragraph_images(doc, paragraph):
+    """Imágenes embebidas en un párrafo como <img> con data URI"""
+    images = []
+    for blip in paragraph._p.xpath('.//a:blip'):
+        rid = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
+        part = doc.part.related_parts.get(rid)
+        if part is None:
+            continue
+
+        # Ancho original del documento (EMU -> pulgadas)
+        extent = paragraph._p.xpath('.//wp:extent')
+        width = f' style="width: {int(extent[0].get("cx")) / 914400:.2f}in"' if extent else ''
+        data = base64.b64encode(part.blob).decode('ascii')
+        images.append(f'<img src="data:{part.content_type};base64,{data}"{width}>')
+    return images
+
+def _table_html(table):
+    """Traduce una tabla; las celdas combinadas en horizontal usan colspan"""
+    from docx.table import _Cell
+
+    rows = []
+    for tr in table._tbl.tr_lst:
+        cells = []
+        for tc in tr.tc_lst:
+            cell = _Cell(tc, table)
+            body = '<br>'.join(''.join(_run_html(run) for run in p.runs) for p in cell.paragraphs)
+            span = f' colspan="{tc.grid_span}"' if tc.grid_span > 1 else ''
+            cells.append(f'<td{span}>{body}</td>')
+        rows.append(f'<tr>{"".join(cells)}</tr>')
+    return f'<table>{"".join(rows)}</table>'
+
+def docx_to_html(path):
+    """
+    Convierte un .docx a HTML conservando títulos, listas, tablas, formato
+    e imágenes, en el orden en que aparecen en el documento
+    """
+    from docx import Document
+    from docx.oxml.table import CT_Tbl
+    from docx.oxml.text.paragraph import CT_P
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    doc = Document(path)
+    out = ['<!DOCTYPE html><html lang="es"><head><meta charset="UTF-8">',
+           '<style>body { font-family: Calibri, Carlito, sans-serif; font-size: 11pt; }',
+           'img { max-width: 100%; } blockquote { border-left: 4px solid #0066cc; padding-left: 1em; }',
+           'table { border-collapse: collapse; margin: 0.5em 0; }',
+           'td { border: 1px solid #000; padding: 2pt 5pt; vertical-align: top; }',
+           '.center { text-align: center; }</style></head><body>']
+    open_list = None
+
+    for element in doc.element.body.iterchildren():
+        if isinstance(element, CT_Tbl):
+            if open_list:
+                out.append(f'</{open_list}>')
+                open_list = None
+            out.append(_table_html(Table(element, doc)))
+            continue
+        if not isinstance(element, CT_P):
+            continue
+
+        paragraph = Paragraph(element, doc)
+        style = paragraph.style.name if paragraph.style is not None else ''
+        list_tag = 'ul' if style.startswith('List Bullet') else 'ol' if style.startswith('List Number') else None
+
+        if open_list and open_list != list_tag:
+            out.append(f'</{open_list}>')
+            open_list = None
+
+        body = ''.join(_run_html(run) for run in paragraph.runs)
+        images = _paragraph_images(doc, paragraph)
+        page_break = bool(paragraph._p.xpath('.//w:br[@w:type="page"]'))
+        attr = ' class="center"' if paragraph.alignment is not None and int(paragraph.alignment) == 1 else ''
+
+        if page_break and not body and not images:
+            pass
+        elif list_tag:
+            if not open_list:
+                out.append(f'<{list_tag}>')
+                open_list = list_tag
+            out.append(f'<li>{body}</li>')
+        elif style == 'Title':
+            out.append(f'<h1{attr}>{body}</h1>')
+        elif style.startswith('Heading '):
+            level = min(int(style.split()[-1]) + 1, 6) if style.split()[-1].isdigit() else 2
+            out.append(f'<h{level}{attr}>{body}</h{level}>')
+        elif style == 'Intense Quote':
+            out.append(f'<blockquote>{body}</blockquote>')
+        elif images:
+            out.append(f'<p{attr}>{"".join(images)}</p>')
+        elif body:
+            out.append(f'<p{attr}>{body}</p>')
+        else:
+            out.append('<p>&nbsp;</p>')
+
+        # Salto de página explícito (add_page_break)
+        if page_break:
+            if open_list:
+                out.append(f'</{open_list}>')
+                open_list = None
+            out.append('<div class="page-break"></div>')
+
+    if open_list:
+        out.append(f'</{open_list}>')
+    out.append('</body></html>')
+    return '\n'.join(out)
+
+# ========== CONVERSIÓN ==========
+
+def _load_source(path):
+    """Devuelve el HTML de un documento de entrada"""
+    if path.lower().endswith('.docx'):
+        return docx_to_html(path)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    # Las páginas de las secciones grandes de los informes se cargan con
+    # JavaScript en el navegador; en el PDF van todas en línea
+    return re.sub(r'</?template class="page">', '', source)
+
+def _cache_key(path, source):
+    """
+    Huella del contenido que determina el PDF: HTML, CSS de página,
+    versión del motor e imágenes locales enlazadas desde el HTML
+    """
+    h = hashlib.sha256()
+    h.update(source.encode('utf-8'))
+    h.update(PAGE_CSS.encode('utf-8'))
+    h.update(str(WEASYPRINT_VERSION).encode('utf-8'))
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for ref in sorted(set(re.findall(r'src="([^":]+)"', source))):
+        ref_path = os.path.join(base_dir, ref)
+        if os.path.isfile(ref_path):
+            h.update(ref.encode('utf-8'))
+            h.update(_sha256_file(ref_path).encode('ascii'))
+    return h.hexdigest()
+
+def _convert_one(job):
+    """
+    Convierte un documento (se ejecuta en un proceso del pool).
+    Devuelve (origen, destino, estado, segundos, error).
+    """
+    src, dst, force = job
+    start = time.monotonic()
 
-def convert_to_pdf():
-    """Convierte el documento Word a PDF"""
-    input_file = 'presentacion_simred.docx'
-    output_file = 'presentacion_simred.pdf'
-    
-    if not os.path.exists(input_file):
-        print(f"❌ Error: No se encuentra el archivo {input_file}")
-        return False
-    
     try:
-        print(f"🔄 Convirtiendo {input_file} a PDF...")
-        convert(input_file, output_file)
-        print(f"✅ PDF creado exitosamente: {output_file}")
-        return True
+        source = _load_source(src)
+        key = _cache_key(src, source)
+        cached = os.path.join(PDF_CACHE_DIR, key + '.pdf')
+
+        if force or not os.path.exists(cached):
+            tmp = f'{cached}.{os.getpid()}.tmp'
+            HTML(string=source, base_url=os.path.dirname(os.path.abspath(src))).write_pdf(
+                tmp, stylesheets=[CSS(string=PAGE_CSS)])
+            os.replace(tmp, cached)
+            status = 'RENDERED'
+        else:
+            status = 'CACHED'
+
+        # Salida actualizada solo si su contenido difiere
+        if not os.path.exists(dst) or _sha256_file(dst) != _sha256_file(cached):
+            tmp = f'{dst}.{os.getpid()}.tmp'
+            with open(cached, 'rb') as fin, open(tmp, 'wb') as fout:
+                fout.write(fin.read())
+            os.replace(tmp, dst)
+        elif status == 'CACHED':
+            status = 'UNCHANGED'
+
+        return src, dst, status, time.monotonic() - start, None
     except Exception as e:
-        print(f"❌ Error al convertir a PDF: {e}")
-        import traceback
-        traceback.print_exc()
+        return src, dst, 'FAILED', time.monotonic() - start, str(e)
+
+def convert_to_pdf(inputs=None, output_dir=None, jobs=None, force=False):
+    """
+    Convierte documentos HTML/DOCX a PDF en paralelo.
+    Devuelve True si todos los documentos se convirtieron.
+    """
+    if inputs is None:
+        inputs = ['presentacion_simred.docx']
+
+    if HTML is None:
+        print("❌ Error: WeasyPrint no está disponible")
+        print("   Instálalo con: pip install weasyprint (requiere las bibliotecas de Pango)")
         return False
 
+    work = []
+    for src in inputs:
+        if not os.path.exists(src):
+            print(f"❌ Error: No se encuentra el archivo {src}")
+            continue
+        dst_dir = output_dir or os.path.dirname(src)
+        dst = os.path.join(dst_dir, os.path.splitext(os.path.basename(src))[0] + '.pdf')
+        work.append((src, dst, force))
+
+    if not work:
+        return False
+
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(work)))
+    print(f"🔄 Convirtiendo {len(work)} documento(s) a PDF con {jobs} proceso(s)...")
+
+    start = time.monotonic()
+    failed = 0
+    counts = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for src, dst, status, seconds, error in pool.map(_convert_one, work):
+            counts[status] = counts.get(status, 0) + 1
+            if status == 'FAILED':
+                failed += 1
+                print(f"❌ {src}: {error}")
+            elif status == 'RENDERED':
+                print(f"✅ {dst} ({seconds:.2f}s)")
+
+    summary = ', '.join(f"{n} {s.lower()}" for s, n in sorted(counts.items()))
+    print(f"📄 {len(work)} documento(s) en {time.monotonic() - start:.2f}s: {summary}")
+    return failed == 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Convierte documentos de SIM-RED a PDF')
+    parser.add_argument('inputs', nargs='*', help='archivos .html o .docx')
+    parser.add_argument('--reports', action='store_true', help='convertir todos los reports/*.html')
+    parser.add_argument('-o', '--output-dir', help='directorio de salida (por defecto, junto al original)')
+    parser.add_argument('-j', '--jobs', type=int, help='procesos en paralelo (por defecto, uno por CPU)')
+    parser.add_argument('--force', action='store_true', help='ignorar la caché y renderizar de nuevo')
+    args = parser.parse_args()
+
+    inputs = list(args.inputs)
+    if args.reports:
+        inputs += sorted(glob.glob(os.path.join('reports', '*.html')))
+
+    ok = convert_to_pdf(inputs or None, args.output_dir, args.jobs, args.force)
+    return 0 if ok else 1
+
 if __name__ == '__main__':
-    convert_to_pdf()
+    sys.exit(main())
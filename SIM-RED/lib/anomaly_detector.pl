@@ -0,0 +1,217 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Streaming Anomaly Detector
+# Keeps rolling statistics per series and scores every new sample as it
+# arrives: Welford mean/variance (z-score), EWMA band and a sliding
+# median/MAD window. State is persisted between runs.
+#
+# Usage:
+#   anomaly_detector.pl [options] observe [SERIES TS VALUE]
+#       Without arguments, reads "SERIES TS VALUE" lines from stdin.
+#       Prints ALERT|SERIES|TS|VALUE|KIND|DETAIL for every alert.
+#   anomaly_detector.pl [options] report
+#       Prints SERIES|N|MEAN|STDDEV|EWMA|MEDIAN|MAD|LAST|LAST_Z|LAST_TS
+#   anomaly_detector.pl [options] reset [SERIES]
+#
+# Options:
+#   --state FILE     State file (default: data/anomaly_state.dat)
+#   --z N            z-score threshold (default: 3)
+#   --alpha N        EWMA smoothing factor (default: 0.3)
+#   --band N         EWMA band width in standard deviations (default: 3)
+#   --min N          Samples required before alerting (default: 10)
+#   --window N       Median/MAD window size (default: 31)
+
+use strict;
+use warnings;
+use File::Basename qw(dirname);
+use File::Path qw(make_path);
+use Cwd qw(abs_path);
+use Fcntl qw(:flock);
+
+my $script_dir = dirname(dirname(abs_path($0)));
+
+my %opt = (
+    state  => "$script_dir/data/anomaly_state.dat",
+    z      => 3,
+    alpha  => 0.3,
+    band   => 3,
+    min    => 10,
+    window => 31,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+my $command = shift @ARGV || usage();
+
+# Serialize concurrent writers (measure_latency.sh and measure_traffic.sh)
+make_path(dirname($opt{state})) unless -d dirname($opt{state});
+open(my $lock, '>>', "$opt{state}.lock") or die "Cannot open lock file: $!\n";
+flock($lock, LOCK_EX) or die "Cannot lock state: $!\n";
+
+my $state = load_state($opt{state});
+
+if ($command eq 'observe') {
+    my @samples;
+    if (@ARGV >= 3) {
+        push @samples, [@ARGV[0 .. 2]];
+    } else {
+        while (my $line = <STDIN>) {
+            my @fields = split ' ', $line;
+            push @samples, [@fields] if @fields >= 3;
+        }
+    }
+
+    foreach my $sample (@samples) {
+        my ($series, $ts, $value) = @$sample;
+        next unless $series =~ /^[\w.:-]+$/ && $value =~ /^-?[\d.]+(?:[eE][-+]?\d+)?$/;
+        print "$_\n" foreach observe($state, $series, $ts, $value + 0);
+    }
+
+    save_state($opt{state}, $state);
+} elsif ($command eq 'report') {
+    foreach my $series (sort keys %$state) {
+        my $s = $state->{$series};
+        my ($median, $mad) = median_mad($s->{window});
+        printf "%s|%d|%.4f|%.4f|%.4f|%.4f|%.4f|%s|%.2f|%s\n",
+            $series, $s->{n}, $s->{mean}, stddev($s), $s->{ewma},
+            $median, $mad, $s->{last}, $s->{last_z}, $s->{last_ts};
+    }
+} elsif ($command eq 'reset') {
+    if (@ARGV) {
+        delete $state->{$_} foreach @ARGV;
+    } else {
+        %$state = ();
+    }
+    save_state($opt{state}, $state);
+} else {
+    usage();
+}
+
+close($lock);
+exit 0;
+
+sub usage {
+    die "Usage: $0 [options] observe|report|reset ...\n";
+}
+
+# Score a sample against the current baseline, then fold it into the state
+sub observe {
+    my ($state, $series, $ts, $value) = @_;
+    my $s = $state->{$series} ||= {
+        n => 0, mean => 0, m2 => 0, ewma => 0, ewmvar => 0,
+        last => 0, last_z => 0, last_ts => 0, window => [],
+    };
+    my @alerts;
+
+    my $std = stddev($s);
+    my $z = ($s->{n} > 1 && $std > 0) ? ($value - $s->{mean}) / $std : 0;
+
+    if ($s->{n} >= $opt{min}) {
+        if (abs($z) > $opt{z}) {
+            push @alerts, sprintf("ALERT|%s|%s|%s|ZSCORE|z=%.2f mean=%.2f std=%.2f",
+                $series, $ts, $value, $z, $s->{mean}, $std);
+        }
+
+        my $band = $opt{band} * sqrt($s->{ewmvar});
+        if ($band > 0 && abs($value - $s->{ewma}) > $band) {
+            push @alerts, sprintf("ALERT|%s|%s|%s|EWMA|ewma=%.2f band=%.2f",
+                $series, $ts, $value, $s->{ewma}, $band);
+        }
+
+        my ($median, $mad) = median_mad($s->{window});
+        if ($mad > 0) {
+            my $robust = abs($value - $median) / (1.4826 * $mad);
+            if ($robust > $opt{z}) {
+                push @alerts, sprintf("ALERT|%s|%s|%s|MAD|median=%.2f mad=%.2f score=%.2f",
+                    $series, $ts, $value, $median, $mad, $robust);
+            }
+        }
+    }
+
+    # Welford update
+    $s->{n}++;
+    my $delta = $value - $s->{mean};
+    $s->{mean} += $delta / $s->{n};
+    $s->{m2} += $delta * ($value - $s->{mean});
+
+    # EWMA mean and variance
+    if ($s->{n} == 1) {
+        $s->{ewma} = $value;
+        $s->{ewmvar} = 0;
+    } else {
+        my $diff = $value - $s->{ewma};
+        my $incr = $opt{alpha} * $diff;
+        $s->{ewma} += $incr;
+        $s->{ewmvar} = (1 - $opt{alpha}) * ($s->{ewmvar} + $diff * $incr);
+    }
+
+    # Sliding window for median/MAD (fixed size, so O(1) per sample)
+    push @{$s->{window}}, $value;
+    shift @{$s->{window}} while @{$s->{window}} > $opt{window};
+
+    $s->{last} = $value;
+    $s->{last_z} = $z;
+    $s->{last_ts} = $ts;
+
+    return @alerts;
+}
+
+sub stddev {
+    my ($s) = @_;
+    return $s->{n} > 1 ? sqrt($s->{m2} / ($s->{n} - 1)) : 0;
+}
+
+sub median {
+    my @sorted = sort { $a <=> $b } @_;
+    return 0 unless @sorted;
+    my $mid = int(@sorted / 2);
+    return @sorted % 2 ? $sorted[$mid] : ($sorted[$mid - 1] + $sorted[$mid]) / 2;
+}
+
+sub median_mad {
+    my ($window) = @_;
+    return (0, 0) unless @$window;
+    my $median = median(@$window);
+    my $mad = median(map { abs($_ - $median) } @$window);
+    return ($median, $mad);
+}
+
+# State file: SERIES|N|MEAN|M2|EWMA|EWMVAR|LAST|LAST_Z|LAST_TS|W1,W2,...
+sub load_state {
+    my ($file) = @_;
+    my %state;
+    open(my $fh, '<', $file) or return \%state;
+
+    while (my $line = <$fh>) {
+        chomp $line;
+        next if $line =~ /^#/ || $line !~ /\S/;
+        my ($series, $n, $mean, $m2, $ewma, $ewmvar, $last, $last_z, $last_ts, $window) =
+            split /\|/, $line;
+        next unless defined $last_ts;
+
+        $state{$series} = {
+            n => $n, mean => $mean, m2 => $m2, ewma => $ewma, ewmvar => $ewmvar,
+            last => $last, last_z => $last_z, last_ts => $last_ts,
+            window => [defined $window && length $window ? split(/,/, $window) : ()],
+        };
+    }
+    close($fh);
+    return \%state;
+}
+
+sub save_state {
+    my ($file, $state) = @_;
+
+    open(my $fh, '>', "$file.tmp") or die "Cannot write $file.tmp: $!\n";
+    print $fh "# SIM-RED anomaly detector state\n";
+    foreach my $series (sort keys %$state) {
+        my $s = $state->{$series};
+        print $fh join('|', $series, $s->{n},
+            map({ sprintf('%.10g', $_) } @$s{qw(mean m2 ewma ewmvar last last_z)}),
+            $s->{last_ts}, join(',', @{$s->{window}})), "\n";
+    }
+    close($fh);
+    rename("$file.tmp", $file) or die "Cannot replace $file: $!\n";
+}
@@ -0,0 +1,272 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - ARP Binding History
+# Persistent IP<->MAC binding store. Every binding is kept as a time
+# interval (first/last seen) and indexed by IP, by MAC and by pair, so
+# checking a new ARP snapshot costs one hash lookup per entry and the
+# history of any IP or MAC is available without scanning the store.
+#
+# Usage:
+#   arp_bindings.pl [options] observe [TS]
+#       Reads "IP|MAC" lines (one ARP snapshot taken at TS, default now)
+#       from stdin and updates the store. Prints one line per event:
+#         NEW|IP|MAC                     first binding ever seen for IP
+#         CHANGE|IP|OLD_MAC|NEW_MAC|OLD_LAST
+#                                        IP replaced its previous MAC
+#   arp_bindings.pl [options] history IP|MAC
+#       Prints IP|MAC|FIRST|LAST|open/closed for every binding of an IP
+#       or a MAC (oldest first)
+#   arp_bindings.pl [options] flapping
+#       Prints IP|CHANGES|MAC1,MAC2,...|FIRST|LAST for every IP that
+#       changed MAC at least --min times
+#   arp_bindings.pl [options] dup-ip
+#       Prints IP|MAC_A|MAC_B|FROM|TO for every window in which an IP
+#       was bound to two MACs at the same time
+#   arp_bindings.pl [options] dup-mac
+#       Prints MAC|IP_A|IP_B|FROM|TO for every window in which a MAC
+#       answered for two IPs at the same time
+#   arp_bindings.pl [options] prune
+#   arp_bindings.pl [options] stats
+#
+# Options:
+#   --store FILE     Store file (default: data/arp_bindings.dat)
+#   --since T        Only bindings seen since T: epoch or relative age
+#                    such as 7d, 24h or 30m (default: 0, everything)
+#   --min N          MAC changes that count as flapping (default: 3)
+#   --gap N          Seconds a binding may go unseen and still continue
+#                    the same interval (default: 86400)
+#   --days N         Closed bindings older than N days are pruned on
+#                    every observe (default: 30)
+
+use strict;
+use warnings;
+use File::Basename qw(dirname);
+use File::Path qw(make_path);
+use Cwd qw(abs_path);
+use Fcntl qw(:flock);
+
+my $script_dir = dirname(dirname(abs_path($0)));
+
+my %opt = (
+    store => "$script_dir/data/arp_bindings.dat",
+    since => 0,
+    min   => 3,
+    gap   => 86400,
+    days  => 30,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+my $command = shift @ARGV || usage();
+my $since = parse_since($opt{since});
+
+# Bindings are [IP, MAC, FIRST, LAST, OPEN]; the indexes hold references
+# to the same arrays, in the order the bindings started
+use constant { IP => 0, MAC => 1, FIRST => 2, LAST => 3, OPEN => 4 };
+
+my %by_ip;         # IP -> bindings of that IP
+my %by_mac;        # MAC -> bindings of that MAC
+my %by_pair;       # "IP|MAC" -> newest binding of the pair
+my %open;          # "IP|MAC" -> binding present in the last snapshot
+my @bindings;
+
+# Serialize concurrent runs of check_spoofing.sh
+make_path(dirname($opt{store})) unless -d dirname($opt{store});
+open(my $lock, '>>', "$opt{store}.lock") or die "Cannot open lock file: $!\n";
+flock($lock, $command eq 'observe' || $command eq 'prune' ? LOCK_EX : LOCK_SH)
+    or die "Cannot lock store: $!\n";
+
+load_store($opt{store});
+
+if ($command eq 'observe') {
+    my $ts = @ARGV ? int($ARGV[0]) : time;
+    my %snapshot;
+
+    # Snapshots are ordered: two runs in the same second must not look
+    # like bindings that coexisted
+    foreach my $binding (@bindings) {
+        $ts = $binding->[LAST] + 1 if $binding->[LAST] >= $ts;
+    }
+
+    while (my $line = <STDIN>) {
+        chomp $line;
+        my ($ip, $mac) = split /\|/, $line;
+        next unless defined $mac && $ip =~ /^\d{1,3}(?:\.\d{1,3}){3}$/;
+        $mac = lc $mac;
+        next unless $mac =~ /^[0-9a-f]{2}(?::[0-9a-f]{2}){5}$/ && $mac ne '00:00:00:00:00:00';
+        $snapshot{"$ip|$mac"} = [$ip, $mac];
+    }
+
+    # Bindings that left the table end here
+    foreach my $key (keys %open) {
+        next if $snapshot{$key};
+        $open{$key}[OPEN] = 0;
+        delete $open{$key};
+    }
+
+    foreach my $key (sort keys %snapshot) {
+        print "$_\n" foreach observe($ts, @{$snapshot{$key}});
+    }
+
+    prune($ts - $opt{days} * 86400) if $opt{days} > 0;
+    save_store($opt{store});
+} elsif ($command eq 'history') {
+    my $key = lc(shift @ARGV || usage());
+    my $list = $key =~ /:/ ? $by_mac{$key} : $by_ip{$key};
+    foreach my $binding (@{$list || []}) {
+        next if $binding->[LAST] < $since;
+        print join('|', @$binding[IP, MAC, FIRST, LAST], $binding->[OPEN] ? 'open' : 'closed'), "\n";
+    }
+} elsif ($command eq 'flapping') {
+    foreach my $ip (sort keys %by_ip) {
+        my @recent = grep { $_->[LAST] >= $since } @{$by_ip{$ip}};
+        next unless @recent > 1;
+
+        my ($changes, %seen, @macs) = (0);
+        foreach my $i (0 .. $#recent) {
+            $changes++ if $i && $recent[$i][MAC] ne $recent[$i - 1][MAC];
+            push @macs, $recent[$i][MAC] unless $seen{$recent[$i][MAC]}++;
+        }
+        next unless $changes >= $opt{min};
+
+        my $last = 0;
+        foreach my $binding (@recent) {
+            $last = $binding->[LAST] if $binding->[LAST] > $last;
+        }
+        print join('|', $ip, $changes, join(',', @macs), $recent[0][FIRST], $last), "\n";
+    }
+} elsif ($command eq 'dup-ip') {
+    print "$_\n" foreach overlaps(\%by_ip, MAC);
+} elsif ($command eq 'dup-mac') {
+    print "$_\n" foreach overlaps(\%by_mac, IP);
+} elsif ($command eq 'prune') {
+    prune(time - $opt{days} * 86400);
+    save_store($opt{store});
+} elsif ($command eq 'stats') {
+    my $oldest = 0;
+    foreach my $binding (@bindings) {
+        $oldest = $binding->[FIRST] if !$oldest || $binding->[FIRST] < $oldest;
+    }
+    printf "bindings=%d open=%d ips=%d macs=%d oldest=%d\n",
+        scalar @bindings, scalar keys %open, scalar keys %by_ip, scalar keys %by_mac, $oldest;
+} else {
+    usage();
+}
+
+close($lock);
+exit 0;
+
+sub usage {
+    die "Usage: $0 [options] observe|history|flapping|dup-ip|dup-mac|prune|stats ...\n";
+}
+
+# Epoch, or an age relative to now (30m, 24h, 7d)
+sub parse_since {
+    my ($value) = @_;
+    my %unit = (s => 1, m => 60, h => 3600, d => 86400);
+    return time - $1 * $unit{$2} if $value =~ /^(\d+)([smhd])$/;
+    return $value =~ /^\d+$/ ? $value : die "Invalid --since value: $value\n";
+}
+
+# Fold one snapshot entry into the store (hash lookups only)
+sub observe {
+    my ($ts, $ip, $mac) = @_;
+    my $key = "$ip|$mac";
+    my $pair = $by_pair{$key};
+    my $latest = $by_ip{$ip} ? $by_ip{$ip}[-1] : undef;
+
+    # Still bound, or back after a short absence with nothing in between
+    if ($pair && $ts - $pair->[LAST] <= $opt{gap} && ($pair->[OPEN] || $pair == $latest)) {
+        $pair->[LAST] = $ts if $ts > $pair->[LAST];
+        $pair->[OPEN] = 1;
+        $open{$key} = $pair;
+        return;
+    }
+
+    # Unseen for too long: the old interval ends at its last sighting
+    $pair->[OPEN] = 0 if $pair;
+
+    my @events;
+    if (!$latest) {
+        push @events, "NEW|$ip|$mac";
+    } elsif ($latest->[MAC] ne $mac && !$latest->[OPEN]) {
+        # An IP answering with two MACs at once is a duplicate, not a change
+        push @events, "CHANGE|$ip|$latest->[MAC]|$mac|$latest->[LAST]";
+    }
+
+    add_binding([$ip, $mac, $ts, $ts, 1]);
+    return @events;
+}
+
+sub add_binding {
+    my ($binding) = @_;
+    my $key = "$binding->[IP]|$binding->[MAC]";
+    push @bindings, $binding;
+    push @{$by_ip{$binding->[IP]}}, $binding;
+    push @{$by_mac{$binding->[MAC]}}, $binding;
+    $by_pair{$key} = $binding;
+    $open{$key} = $binding if $binding->[OPEN];
+}
+
+# Windows in which one key (IP or MAC) held two different values at once
+sub overlaps {
+    my ($index, $field) = @_;
+    my @windows;
+
+    foreach my $key (sort keys %$index) {
+        my @list = grep { $_->[LAST] >= $since } @{$index->{$key}};
+        next unless @list > 1;
+
+        # Sorted by start: every overlap of binding i starts before it ends
+        foreach my $i (0 .. $#list - 1) {
+            my $x = $list[$i];
+            foreach my $j ($i + 1 .. $#list) {
+                my $y = $list[$j];
+                last if $y->[FIRST] > $x->[LAST];
+                next if $x->[$field] eq $y->[$field];
+
+                my $to = $x->[LAST] < $y->[LAST] ? $x->[LAST] : $y->[LAST];
+                push @windows, join('|', $key, $x->[$field], $y->[$field], $y->[FIRST], $to);
+            }
+        }
+    }
+    return @windows;
+}
+
+# Drop closed bindings that ended before the cutoff and rebuild the indexes
+sub prune {
+    my ($cutoff) = @_;
+    my @keep = grep { $_->[OPEN] || $_->[LAST] >= $cutoff } @bindings;
+    return if @keep == @bindings;
+
+    @bindings = ();
+    %by_ip = %by_mac = %by_pair = %open = ();
+    add_binding($_) foreach @keep;
+}
+
+# Store file: IP|MAC|FIRST|LAST|OPEN, in the order the bindings started
+sub load_store {
+    my ($file) = @_;
+    open(my $fh, '<', $file) or return;
+
+    while (my $line = <$fh>) {
+        chomp $line;
+        next if $line =~ /^#/ || $line !~ /\S/;
+        my @binding = split /\|/, $line;
+        next unless @binding == 5;
+        add_binding(\@binding);
+    }
+    close($fh);
+}
+
+sub save_store {
+    my ($file) = @_;
+
+    open(my $fh, '>', "$file.tmp") or die "Cannot write $file.tmp: $!\n";
+    print $fh "# SIM-RED ARP bindings: IP|MAC|FIRST|LAST|OPEN\n";
+    print $fh join('|', @$_), "\n" foreach @bindings;
+    close($fh);
+    rename("$file.tmp", $file) or die "Cannot replace $file: $!\n";
+}
@@ -0,0 +1,180 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - ARP Sweep Engine
+# Sends an ARP request to every address of a subnet from one AF_PACKET
+# socket and collects the replies while it is still sending. The send
+# rate is capped by a token bucket, and targets that did not answer are
+# asked again on each retry pass, so the load on the wire is predictable
+# and a /20 takes a few seconds. Requires root (or CAP_NET_RAW).
+#
+# Usage:
+#   arp_sweep.pl [options] CIDR
+#
+# Output:
+#   IP|MAC lines (same format as get_arp_table), as the replies arrive.
+#   A summary goes to stderr.
+#
+# Options:
+#   --interface IF   Interface to send on (default: eth0)
+#   --rate N         Requests per second (default: 1000)
+#   --burst N        Token bucket size, requests sent back to back (default: 32)
+#   --retries N      Extra passes over the targets that did not answer (default: 1)
+#   --wait N         Seconds to wait for replies after each pass (default: 1)
+
+use strict;
+use warnings;
+use Socket qw(AF_INET SOCK_DGRAM SOCK_RAW inet_aton inet_ntoa);
+use IO::Select;
+use Time::HiRes qw(time);
+
+use constant AF_PACKET    => 17;
+use constant ETH_P_ARP    => 0x0806;
+use constant SIOCGIFADDR  => 0x8915;
+use constant ARP_REQUEST  => 1;
+use constant ARP_REPLY    => 2;
+use constant MAX_TARGETS  => 65536;
+
+my %opt = (
+    interface => 'eth0',
+    rate      => 1000,
+    burst     => 32,
+    retries   => 1,
+    wait      => 1,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+die "Usage: $0 [--interface IF] [--rate N] [--burst N] [--retries N] [--wait N] CIDR\n"
+    unless @ARGV == 1;
+die "--rate must be greater than 0\n" unless $opt{rate} > 0;
+
+my ($base, $count) = parse_cidr($ARGV[0]);
+my $iface = $opt{interface};
+
+# Interface identity: index and MAC from sysfs, IPv4 address by ioctl
+my $ifindex = read_sys("/sys/class/net/$iface/ifindex");
+my $mac_text = read_sys("/sys/class/net/$iface/address");
+die "Unknown interface: $iface\n" unless defined $ifindex && defined $mac_text;
+my $my_mac = pack('H12', $mac_text =~ s/://gr);
+my $my_ip = interface_address($iface)
+    // die "Interface $iface has no IPv4 address\n";
+
+socket(my $sock, AF_PACKET, SOCK_RAW, unpack('n', pack('S', ETH_P_ARP)))
+    or die "Cannot open an AF_PACKET socket (run as root): $!\n";
+bind($sock, pack('S n i S C C a8', AF_PACKET, ETH_P_ARP, $ifindex, 0, 0, 0, ''))
+    or die "Cannot bind to $iface: $!\n";
+
+# Targets are offsets from the network address; the replies are matched
+# against them with a bit vector (1 = answered)
+my $answered = '';
+vec($answered, $count - 1, 1) = 0;
+my $my_offset = unpack('N', $my_ip) - $base;
+vec($answered, $my_offset, 1) = 1 if $my_offset >= 0 && $my_offset < $count;
+
+my $frame_head = pack('H12', 'ff' x 6) . $my_mac . pack('n', ETH_P_ARP)
+    . pack('nnCCn', 1, 0x0800, 6, 4, ARP_REQUEST) . $my_mac . $my_ip . ("\0" x 6);
+
+my %seen;          # address . MAC pairs already printed
+my $select = IO::Select->new($sock);
+my $started = time;
+my ($sent, $found) = (0, 0);
+$| = 1;
+
+for my $pass (0 .. $opt{retries}) {
+    my $tokens = $opt{burst};
+    my $last = time;
+    my $pass_sent = 0;
+
+    for my $offset (0 .. $count - 1) {
+        next if vec($answered, $offset, 1);
+
+        # Token bucket: refill by elapsed time, wait (reading replies) when empty
+        while ($tokens < 1) {
+            my $now = time;
+            $tokens += ($now - $last) * $opt{rate};
+            $tokens = $opt{burst} if $tokens > $opt{burst};
+            $last = $now;
+            next if $tokens >= 1;
+            receive_replies() if $select->can_read((1 - $tokens) / $opt{rate});
+        }
+
+        my $frame = $frame_head . pack('N', $base + $offset);
+        $frame .= "\0" x (60 - length $frame);
+        send($sock, $frame, 0) or warn "Cannot send on $iface: $!\n";
+        $tokens--;
+        $sent++;
+        $pass_sent++;
+    }
+    last unless $pass_sent;
+
+    # Late replies of this pass
+    my $deadline = time + $opt{wait};
+    while ((my $left = $deadline - time) > 0) {
+        receive_replies() if $select->can_read($left);
+    }
+}
+
+printf STDERR "Swept %d addresses on %s in %.2fs: %d answered, %d requests sent\n",
+    $count, $iface, time - $started, $found, $sent;
+exit 0;
+
+sub read_sys {
+    my ($file) = @_;
+    open(my $fh, '<', $file) or return undef;
+    chomp(my $value = <$fh> // '');
+    close($fh);
+    return $value;
+}
+
+sub interface_address {
+    my ($name) = @_;
+    socket(my $inet, AF_INET, SOCK_DGRAM, 0) or return undef;
+    my $ifreq = pack('a16 x24', $name);
+    ioctl($inet, SIOCGIFADDR, $ifreq) or return undef;
+    close($inet);
+    return substr($ifreq, 20, 4);
+}
+
+# Network address (as an integer) and number of addresses to sweep
+sub parse_cidr {
+    my ($cidr) = @_;
+    my ($ip, $bits) = $cidr =~ m{^(\d+\.\d+\.\d+\.\d+)(?:/(\d+))?$}
+        or die "Invalid CIDR: $cidr\n";
+    $bits //= 32;
+    my $addr = inet_aton($ip);
+    die "Invalid CIDR: $cidr\n" unless defined $addr && $bits <= 32;
+
+    my $size = 2 ** (32 - $bits);
+    die "Subnet $cidr is too large (at most " . MAX_TARGETS . " addresses)\n" if $size > MAX_TARGETS;
+
+    my $network = unpack('N', $addr) & ~($size - 1) & 0xffffffff;
+    # Skip the network and broadcast addresses when the subnet has them
+    return $size > 2 ? ($network + 1, $size - 2) : ($network, $size);
+}
+
+# Read every frame waiting on the socket
+sub receive_replies {
+    while (1) {
+        my $from = recv($sock, my $frame, 1514, Socket::MSG_DONTWAIT());
+        last unless defined $from && length $frame;
+        next if length($frame) < 42;
+
+        my ($type, $htype, $ptype, $hlen, $plen, $op) = unpack('x12 n n n C C n', $frame);
+        next unless $type == ETH_P_ARP && $op == ARP_REPLY && $ptype == 0x0800
+            && $hlen == 6 && $plen == 4;
+
+        my ($sha, $spa, $tpa) = unpack('x22 a6 a4 x6 a4', $frame);
+        next unless $tpa eq $my_ip;
+
+        my $offset = unpack('N', $spa) - $base;
+        next if $offset < 0 || $offset >= $count || $seen{$spa . $sha}++;
+
+        # A second MAC answering for the same address is printed too, so
+        # the spoofing checks see both
+        $found++ unless vec($answered, $offset, 1);
+        vec($answered, $offset, 1) = 1;
+        print inet_ntoa($spa), '|', join(':', unpack('(H2)6', $sha)), "\n";
+    }
+}
@@ -0,0 +1,491 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Collector Daemon
+# Keeps ARP, latency and port state warm in memory and answers
+# queries over a Unix domain socket (one JSON object per line).
+#
+# Usage:
+#   collectord.pl start              Start in the background
+#   collectord.pl run                Run in the foreground
+#   collectord.pl stop               Stop a running daemon
+#   collectord.pl status             Show collector state
+#   collectord.pl query get KIND [--max-age SECONDS] [--updated] [--json]
+#   collectord.pl query refresh KIND
+#
+# Protocol (request -> response, one line each):
+#   {"cmd":"ping"}                              {"ok":true,"pid":N}
+#   {"cmd":"status"}                            {"ok":true,"collectors":{...}}
+#   {"cmd":"get","what":"arp","max_age":10}     {"ok":true,"updated":T,"age":S,"data":[...]}
+#   {"cmd":"refresh","what":"arp","wait":true}  response is sent when the run finishes
+#   {"cmd":"shutdown"}                          {"ok":true}
+#
+# --updated prints the epoch of the run that produced the data on the first
+# line, so clients can record a cached result under its own sample time.
+#
+# Collectors are lazy: nothing is probed until a client asks for a kind.
+# The first get or refresh of a kind starts its collector (a first get
+# waits for that run), which then repeats at its interval. A collector
+# whose kind gets no request for COLLECTOR_IDLE_TIMEOUT seconds pauses
+# again, and the daemon exits once no client has asked anything for that
+# long (0 keeps collectors and daemon running), so a menu that died
+# without stopping it does not leave ARP sweeps, pings and scans running.
+#
+# KIND: arp (IP|MAC), latency (IP|HOSTNAME|AVG|MIN|MAX|MDEV|STATUS),
+#       ports (IP|PORT|PROTO|SERVICE)
+
+use strict;
+use warnings;
+use IO::Socket::UNIX;
+use IO::Select;
+use JSON::PP;
+use POSIX qw(setsid WNOHANG);
+use Time::HiRes qw(time);
+use File::Basename qw(dirname);
+use Cwd qw(abs_path);
+
+my $script_dir = dirname(dirname(abs_path($0)));
+my $config_file = "$script_dir/config/config.conf";
+my %config = load_config($config_file);
+
+my $socket_path = $ENV{COLLECTOR_SOCKET} || "$script_dir/data/collectord.sock";
+my $pid_file = "$script_dir/data/collectord.pid";
+my $log_file = "$script_dir/logs/collector.log";
+my $json = JSON::PP->new->canonical;
+
+# Row layout of each kind, used by the client to print pipe-separated lines
+my %fields = (
+    arp     => [qw(ip mac)],
+    latency => [qw(ip hostname avg min max mdev status)],
+    ports   => [qw(ip port proto service)],
+);
+
+# Shell pipeline of each collector (run with the project libraries loaded)
+my %commands = (
+    arp     => 'get_arp_table',
+    latency => 'load_authorized_hosts | probe_latency_batch "${LATENCY_PING_COUNT:-10}"',
+    ports   => 'source "$SCRIPT_DIR/lib/port_scan.sh"; port_scan_ensure > /dev/null && '
+             . '{ grep -v "^#" "$PORT_MAP_FILE" 2>/dev/null || true; }',
+);
+
+my $command = shift @ARGV || usage();
+
+if ($command eq 'run') {
+    run_daemon();
+} elsif ($command eq 'start') {
+    start_daemon();
+} elsif ($command eq 'stop') {
+    my $reply = request({cmd => 'shutdown'});
+    die "Collector is not running\n" unless $reply && $reply->{ok};
+    print "Collector stopped\n";
+} elsif ($command eq 'status') {
+    print_status();
+} elsif ($command eq 'query') {
+    exit client_query(@ARGV);
+} else {
+    usage();
+}
+
+exit 0;
+
+sub usage {
+    die "Usage: $0 start|run|stop|status|query ...\n";
+}
+
+# Read KEY=VALUE pairs from config.conf (no shell evaluation)
+sub load_config {
+    my ($file) = @_;
+    my %conf;
+    open(my $fh, '<', $file) or return %conf;
+
+    while (my $line = <$fh>) {
+        next unless $line =~ /^\s*([A-Z_][A-Z0-9_]*)=("([^"]*)"|'([^']*)'|([^\s#]*))/;
+        $conf{$1} = defined $3 ? $3 : defined $4 ? $4 : $5;
+    }
+    close($fh);
+    return %conf;
+}
+
+sub log_line {
+    my ($level, $message) = @_;
+    my @t = localtime();
+    open(my $fh, '>>', $log_file) or return;
+    printf $fh "[%04d-%02d-%02d %02d:%02d:%02d] [%s] %s\n",
+        $t[5] + 1900, $t[4] + 1, $t[3], $t[2], $t[1], $t[0], $level, $message;
+    close($fh);
+}
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+sub request {
+    my ($req) = @_;
+    my $sock = IO::Socket::UNIX->new(Type => SOCK_STREAM, Peer => $socket_path) or return;
+    print $sock $json->encode($req), "\n";
+    my $line = <$sock>;
+    close($sock);
+    return unless defined $line;
+    return eval { $json->decode($line) };
+}
+
+sub client_query {
+    my ($cmd, $what, @args) = @_;
+    my %req = (cmd => $cmd || usage(), what => $what);
+    my $raw = 0;
+    my $with_updated = 0;
+
+    while (@args) {
+        my $arg = shift @args;
+        if ($arg eq '--max-age') {
+            $req{max_age} = shift @args;
+        } elsif ($arg eq '--updated') {
+            $with_updated = 1;
+        } elsif ($arg eq '--json') {
+            $raw = 1;
+        }
+    }
+    $req{wait} = JSON::PP::true if $cmd eq 'refresh';
+
+    my $reply = request(\%req);
+    return 1 unless $reply && $reply->{ok};
+
+    if ($raw) {
+        print $json->encode($reply), "\n";
+    } elsif ($cmd eq 'get' && $fields{$what}) {
+        print int($reply->{updated}), "\n" if $with_updated;
+        foreach my $row (@{$reply->{data}}) {
+            print join('|', map { defined $row->{$_} ? $row->{$_} : '' } @{$fields{$what}}), "\n";
+        }
+    }
+    return 0;
+}
+
+sub print_status {
+    my $reply = request({cmd => 'status'});
+    unless ($reply && $reply->{ok}) {
+        print "Collector is not running\n";
+        exit 1;
+    }
+
+    printf "Collector PID %d, up %ds\n", $reply->{pid}, $reply->{uptime};
+    printf "%-10s %8s %8s %10s %8s %s\n", 'KIND', 'EVERY', 'AGE', 'DURATION', 'ROWS', 'STATUS';
+    foreach my $kind (sort keys %{$reply->{collectors}}) {
+        my $c = $reply->{collectors}{$kind};
+        printf "%-10s %7ds %8s %9.2fs %8d %s\n", $kind, $c->{interval},
+            defined $c->{age} ? "$c->{age}s" : '-', $c->{duration} || 0, $c->{rows}, $c->{status};
+    }
+}
+
+# ---------------------------------------------------------------------------
+# Daemon side
+# ---------------------------------------------------------------------------
+
+sub start_daemon {
+    if (my $reply = request({cmd => 'ping'})) {
+        print "Collector already running (PID $reply->{pid})\n";
+        return;
+    }
+
+    defined(my $pid = fork()) or die "Cannot fork: $!\n";
+    if ($pid) {
+        # Wait until the socket answers
+        for (1 .. 50) {
+            if (my $reply = request({cmd => 'ping'})) {
+                print "Collector started (PID $reply->{pid})\n";
+                return;
+            }
+            select(undef, undef, undef, 0.1);
+        }
+        die "Collector did not start, see $log_file\n";
+    }
+
+    setsid();
+    open(STDIN, '<', '/dev/null');
+    open(STDOUT, '>', '/dev/null');
+    open(STDERR, '>>', $log_file);
+    run_daemon();
+    exit 0;
+}
+
+sub collector_intervals {
+    return (
+        arp     => $config{ARP_MONITOR_INTERVAL} || 5,
+        latency => $config{MONITOR_INTERVAL} || 60,
+        ports   => $config{PORT_MAP_MAX_AGE} || 300,
+    );
+}
+
+sub run_daemon {
+    unlink $socket_path if -S $socket_path;
+    my $server = IO::Socket::UNIX->new(
+        Type => SOCK_STREAM, Local => $socket_path, Listen => 16,
+    ) or die "Cannot listen on $socket_path: $!\n";
+    chmod 0660, $socket_path;
+
+    if (open(my $pfh, '>', $pid_file)) {
+        print $pfh "$$\n";
+        close($pfh);
+    }
+
+    my $started = time;
+    my $config_mtime = (stat $config_file)[9] || 0;
+    my $select = IO::Select->new($server);
+    my (%clients, %running, %state);
+    my %intervals = collector_intervals();
+    my $stop = 0;
+    my $last_request = $started;
+
+    foreach my $kind (keys %intervals) {
+        $state{$kind} = {next => undef, status => 'IDLE', rows => 0, data => [], waiting => []};
+    }
+
+    $SIG{TERM} = $SIG{INT} = sub { $stop = 1 };
+    $SIG{HUP} = sub { $config_mtime = 0 };
+    $SIG{PIPE} = 'IGNORE';
+
+    log_line('INFO', "Collector started on $socket_path (PID $$)");
+
+    while (!$stop) {
+        my $now = time;
+
+        # Pick up config.conf changes without restarting
+        my $mtime = (stat $config_file)[9] || 0;
+        if ($mtime != $config_mtime) {
+            %config = load_config($config_file);
+            %intervals = collector_intervals();
+            $config_mtime = $mtime;
+        }
+
+        # Pause the collectors nobody asks for, start every one that is due
+        my $idle = $config{COLLECTOR_IDLE_TIMEOUT} // 900;
+        foreach my $kind (sort keys %state) {
+            my $s = $state{$kind};
+            next if $s->{pid} || !defined $s->{next};
+
+            if ($idle > 0 && $now - $s->{requested} > $idle) {
+                $s->{next} = undef;
+                $s->{status} = 'IDLE';
+                log_line('INFO', "No requests for '$kind' in ${idle}s, pausing it");
+                next;
+            }
+            next if $now < $s->{next};
+
+            my ($pid, $fh) = spawn_collector($commands{$kind});
+            if ($pid) {
+                @$s{qw(pid fh buffer start)} = ($pid, $fh, '', $now);
+                $running{fileno $fh} = $kind;
+                $select->add($fh);
+            } else {
+                $s->{next} = $now + $intervals{$kind};
+            }
+        }
+
+        # Nobody is asking: stop collecting
+        if ($idle > 0 && $now - $last_request > $idle) {
+            log_line('INFO', "No client requests for ${idle}s, stopping");
+            last;
+        }
+
+        # Kill collectors that overran their slot
+        my $limit = $config{COLLECTOR_TIMEOUT} || 120;
+        foreach my $s (values %state) {
+            kill 'TERM', -$s->{pid} if $s->{pid} && $now - $s->{start} > $limit;
+        }
+
+        my $timeout = 1;
+        foreach my $s (values %state) {
+            next if $s->{pid} || !defined $s->{next};
+            my $wait = $s->{next} - $now;
+            $timeout = $wait if $wait < $timeout;
+        }
+        $timeout = 0.05 if $timeout < 0.05;
+
+        foreach my $fh ($select->can_read($timeout)) {
+            if ($fh == $server) {
+                my $client = $server->accept or next;
+                $client->blocking(0);
+                $clients{fileno $client} = {fh => $client, buffer => ''};
+                $select->add($client);
+            } elsif (defined(my $kind = $running{fileno $fh})) {
+                my $s = $state{$kind};
+                my $n = sysread($fh, $s->{buffer}, 65536, length $s->{buffer});
+                next if $n;
+
+                # Collector finished
+                $select->remove($fh);
+                delete $running{fileno $fh};
+                close($fh);
+                waitpid($s->{pid}, 0);
+                my $exit = $? >> 8;
+
+                my @rows = parse_rows($kind, $s->{buffer});
+                if ($exit == 0 && (@rows || $kind ne 'arp')) {
+                    $s->{data} = \@rows;
+                    $s->{updated} = time;
+                    $s->{status} = 'OK';
+                } else {
+                    # Keep the last good snapshot
+                    $s->{status} = "FAILED($exit)";
+                    log_line('WARNING', "Collector '$kind' failed (exit $exit)");
+                }
+                delete @$s{qw(pid fh buffer)};
+                finish_run($s, time, \%intervals, $kind);
+            } else {
+                my $client = $clients{fileno $fh};
+                my $n = sysread($fh, $client->{buffer}, 65536, length $client->{buffer});
+
+                while ($client->{buffer} =~ s/^([^\n]*)\n//) {
+                    $last_request = time;
+                    my $reply = handle_request($1, \%state, \%intervals, $client, $started, \$stop);
+                    send_reply($client->{fh}, $reply) if $reply;
+                }
+
+                if (!$n) {
+                    $select->remove($fh);
+                    delete $clients{fileno $fh};
+                    close($fh);
+                }
+            }
+        }
+    }
+
+    foreach my $s (values %state) {
+        kill 'TERM', -$s->{pid} if $s->{pid};
+    }
+    unlink $socket_path, $pid_file;
+    log_line('INFO', 'Collector stopped');
+}
+
+sub finish_run {
+    my ($s, $now, $intervals, $kind) = @_;
+    $s->{duration} = $s->{start} ? $now - $s->{start} : 0;
+    $s->{next} = $now + $intervals->{$kind};
+    $s->{rows} = scalar @{$s->{data}};
+
+    # Answer clients waiting on a refresh
+    foreach my $fh (@{$s->{waiting}}) {
+        send_reply($fh, data_reply($kind, $s));
+    }
+    $s->{waiting} = [];
+}
+
+# Run a pipeline in its own process group, output on a pipe
+sub spawn_collector {
+    my ($cmd) = @_;
+    pipe(my $reader, my $writer) or return;
+
+    my $pid = fork();
+    return unless defined $pid;
+
+    if ($pid == 0) {
+        close($reader);
+        setpgrp(0, 0);
+        open(STDOUT, '>&', $writer);
+        open(STDIN, '<', '/dev/null');
+        # SIMRED_COLLECTOR keeps the libraries from querying this daemon
+        $ENV{SIMRED_COLLECTOR} = 1;
+        exec('bash', '-c', 'source "$0/lib/network_utils.sh"; eval "$1"', $script_dir, $cmd);
+        exit 127;
+    }
+
+    close($writer);
+    return ($pid, $reader);
+}
+
+sub parse_rows {
+    my ($kind, $text) = @_;
+    my @rows;
+
+    foreach my $line (split /\n/, $text) {
+        next unless $line =~ /\S/;
+        my @values = split /\|/, $line, -1;
+        my %row;
+        @row{@{$fields{$kind}}} = @values;
+        push @rows, \%row;
+    }
+    return @rows;
+}
+
+sub data_reply {
+    my ($kind, $s, $max_age) = @_;
+
+    return {ok => JSON::PP::false, error => 'no data yet'} unless $s->{updated};
+
+    my $age = time - $s->{updated};
+    if (defined $max_age && $age > $max_age) {
+        return {ok => JSON::PP::false, error => 'stale', age => int($age)};
+    }
+
+    return {
+        ok      => JSON::PP::true,
+        what    => $kind,
+        updated => int($s->{updated}),
+        age     => sprintf('%.1f', $age) + 0,
+        data    => $s->{data},
+    };
+}
+
+sub handle_request {
+    my ($line, $state, $intervals, $client, $started, $stop) = @_;
+    my $req = eval { $json->decode($line) };
+
+    return {ok => JSON::PP::false, error => 'invalid json'} unless ref $req eq 'HASH';
+
+    my $cmd = $req->{cmd} || '';
+    my $kind = $req->{what} || '';
+
+    if ($cmd eq 'ping') {
+        return {ok => JSON::PP::true, pid => $$};
+    } elsif ($cmd eq 'status') {
+        my %collectors;
+        foreach my $k (keys %$state) {
+            my $s = $state->{$k};
+            $collectors{$k} = {
+                interval => $intervals->{$k} + 0,
+                status   => $s->{pid} ? 'RUNNING' : $s->{status},
+                rows     => $s->{rows},
+                duration => sprintf('%.2f', $s->{duration} || 0) + 0,
+                age      => $s->{updated} ? int(time - $s->{updated}) : undef,
+            };
+        }
+        return {ok => JSON::PP::true, pid => $$, uptime => int(time - $started),
+                collectors => \%collectors};
+    } elsif ($cmd eq 'shutdown') {
+        $$stop = 1;
+        return {ok => JSON::PP::true};
+    }
+
+    return {ok => JSON::PP::false, error => "unknown kind '$kind'"} unless $state->{$kind};
+
+    my $s = $state->{$kind};
+    $s->{requested} = time;
+
+    if ($cmd eq 'get') {
+        # Paused collector (never asked for, or idle) or first run still
+        # going: reply when the run finishes
+        if (!defined $s->{next} && !$s->{pid} || $s->{pid} && !$s->{updated}) {
+            $s->{next} = 0 unless $s->{pid};
+            push @{$s->{waiting}}, $client->{fh};
+            return;
+        }
+        return data_reply($kind, $s, $req->{max_age});
+    } elsif ($cmd eq 'refresh') {
+        $s->{next} = 0 unless $s->{pid};
+        if ($req->{wait}) {
+            push @{$s->{waiting}}, $client->{fh};
+            return;
+        }
+        return {ok => JSON::PP::true};
+    }
+
+    return {ok => JSON::PP::false, error => "unknown command '$cmd'"};
+}
+
+sub send_reply {
+    my ($fh, $reply) = @_;
+    my $out = $json->encode($reply) . "\n";
+
+    # Replies are small; finish the write even on a non-blocking socket
+    $fh->blocking(1);
+    syswrite($fh, $out);
+    $fh->blocking(0);
+}
@@ -34,16 +34,277 @@ else
     NC=''
 fi
 
+# Logging
+# Records are buffered per log file and written in batches: every
+# LOG_BUFFER_LINES records, after LOG_FLUSH_INTERVAL seconds, on any
+# ERROR/ALERT/CRITICAL record and when the process exits. The interval is
+# checked on every record and, in long-running loops, by log_flush_due. Each record is
+# also written as JSON to <name>.jsonl, and <name>.log.idx keeps running
+# line/level counters for manage_logs.sh.
+declare -gA LOG_BUFFER           # log file -> pending text records
+declare -gA LOG_JSON_BUFFER      # log file -> pending JSON records
+declare -gA LOG_LEVEL_COUNT      # "log file|LEVEL" -> pending records
+declare -gA LOG_ROTATE_CHECKED   # log file -> SECONDS of the last rotation check
+
+# Sourcing common.sh again (from another library) keeps pending records
+if [[ "$LOG_BUFFER_OWNER" != "$$" ]]; then
+    LOG_BUFFER_OWNER=$$
+    LOG_BUFFER_COUNT=0
+    LOG_LAST_FLUSH=$SECONDS
+fi
+trap 'log_flush' EXIT
+
 # Logging function
 log_message() {
     local level="$1"
     local message="$2"
     local log_file="${3:-${SCRIPT_DIR}/logs/system.log}"
     
-    local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-    echo "[$timestamp] [$level] $message" >> "$log_file"
+    local epoch timestamp json=""
+    printf -v epoch '%(%s)T' -1
+    printf -v timestamp '%(%Y-%m-%d %H:%M:%S)T' "$epoch"
+    
+    if [[ "${LOG_JSON:-yes}" == "yes" ]]; then
+        log_json_record "$epoch" "$level" "$message"
+        json="$REPLY"$'\n'
+    fi
+    
+    # Subshells never run the exit flush: write their records right away
+    if [[ "$BASHPID" != "$LOG_BUFFER_OWNER" ]]; then
+        log_write "$log_file" "[$timestamp] [$level] $message"$'\n' "$json" 1 "${level}=1"
+        return
+    fi
+    
+    LOG_BUFFER[$log_file]+="[$timestamp] [$level] $message"$'\n'
+    LOG_JSON_BUFFER[$log_file]+="$json"
+    ((LOG_LEVEL_COUNT[$log_file|$level]++))
+    ((LOG_BUFFER_COUNT++))
+    
+    if ((LOG_BUFFER_COUNT >= ${LOG_BUFFER_LINES:-50})) || \
+       ((SECONDS - LOG_LAST_FLUSH >= ${LOG_FLUSH_INTERVAL:-2})) || \
+       [[ "$level" == "ERROR" || "$level" == "ALERT" || "$level" == "CRITICAL" ]]; then
+        log_flush
+    fi
+}
+
+# Flush records that have been buffered for LOG_FLUSH_INTERVAL seconds
+# log_message only checks the interval when another record arrives, so
+# loops that may log nothing for a while call this once per cycle
+log_flush_due() {
+    if ((LOG_BUFFER_COUNT > 0 && SECONDS - LOG_LAST_FLUSH >= ${LOG_FLUSH_INTERVAL:-2})); then
+        log_flush
+    fi
+}
+
+# Build the JSON form of a record (stored in REPLY)
+# The first IP and MAC in the message and every numeric key=value pair
+# (avg=12.5, RX=1024) are extracted as structured fields
+log_json_record() {
+    local epoch="$1"
+    local level="$2"
+    local message="$3"
+    local module="${0##*/}"
+    local text="$message"
+    local rest="$message"
+    local extra="" metrics=""
+    
+    module="${module%.sh}"
+    text="${text//\\/\\\\}"
+    text="${text//\"/\\\"}"
+    text="${text//$'\t'/\\t}"
+    text="${text//$'\r'/\\r}"
+    text="${text//$'\n'/\\n}"
+    
+    if [[ "$message" =~ ([0-9]{1,3}\.){3}[0-9]{1,3} ]]; then
+        extra+=",\"ip\":\"${BASH_REMATCH[0]}\""
+    fi
+    
+    if [[ "$message" =~ ([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2} ]]; then
+        extra+=",\"mac\":\"${BASH_REMATCH[0],,}\""
+    fi
+    
+    local key value
+    while [[ "$rest" =~ ([A-Za-z_]+)=(-?[0-9]+(\.[0-9]+)?) ]]; do
+        key="${BASH_REMATCH[1]}"
+        value="${BASH_REMATCH[2]}"
+        rest="${rest#*"${BASH_REMATCH[0]}"}"
+        
+        # JSON numbers cannot have leading zeros
+        if [[ "$value" =~ ^(-?)0+([0-9].*)$ ]]; then
+            value="${BASH_REMATCH[1]}${BASH_REMATCH[2]}"
+        fi
+        metrics+="${metrics:+,}\"${key}\":${value}"
+    done
+    
+    if [[ -n "$metrics" ]]; then
+        extra+=",\"metric\":{${metrics}}"
+    fi
+    
+    printf -v REPLY '{"ts":%s,"time":"%(%Y-%m-%dT%H:%M:%S%z)T","level":"%s","module":"%s","msg":"%s"%s}' \
+        "$epoch" "$epoch" "$level" "$module" "$text" "$extra"
+}
+
+# Write pending records of every log file
+log_flush() {
+    local log_file key counts lines
+    
+    for log_file in "${!LOG_BUFFER[@]}"; do
+        [[ -n "${LOG_BUFFER[$log_file]}" ]] || continue
+        
+        counts=""
+        lines=0
+        for key in "${!LOG_LEVEL_COUNT[@]}"; do
+            [[ "${key%|*}" == "$log_file" ]] || continue
+            counts+=" ${key##*|}=${LOG_LEVEL_COUNT[$key]}"
+            ((lines += LOG_LEVEL_COUNT[$key]))
+        done
+        
+        log_write "$log_file" "${LOG_BUFFER[$log_file]}" "${LOG_JSON_BUFFER[$log_file]}" \
+            "$lines" "${counts# }"
+    done
+    
+    LOG_BUFFER=()
+    LOG_JSON_BUFFER=()
+    LOG_LEVEL_COUNT=()
+    LOG_BUFFER_COUNT=0
+    LOG_LAST_FLUSH=$SECONDS
+}
+
+# Append a batch to a log, its JSON sidecar and its index
+# Index line: EPOCH LINES BYTES LEVEL=COUNT...
+log_write() {
+    local log_file="$1"
+    local text="$2"
+    local json="$3"
+    local lines="$4"
+    local counts="$5"
+    local epoch
+    
+    # Only the owning process rotates; subshells just append
+    if [[ "$BASHPID" == "$LOG_BUFFER_OWNER" ]]; then
+        log_rotate_check "$log_file"
+    fi
+    
+    printf '%s' "$text" >> "$log_file"
+    
+    if [[ -n "$json" ]]; then
+        printf '%s' "$json" >> "${log_file%.log}.jsonl"
+    fi
+    
+    local LC_ALL=C
+    printf -v epoch '%(%s)T' -1
+    printf '%s %s %s %s\n' "$epoch" "$lines" "${#text}" "$counts" >> "${log_file}.idx"
+}
+
+# Rotate a log by size (MAX_LOG_SIZE_MB) or age (LOG_ROTATE_DAYS)
+# Checked at most every 5 minutes per log file
+log_rotate_check() {
+    local log_file="$1"
+    local last="${LOG_ROTATE_CHECKED[$log_file]}"
+    
+    if [[ -n "$last" ]] && ((SECONDS - last < 300)); then
+        return 0
+    fi
+    LOG_ROTATE_CHECKED[$log_file]=$SECONDS
+    
+    [[ -f "$log_file" ]] || return 0
+    
+    local size=$(stat -c %s "$log_file" 2>/dev/null)
+    local max_size=$(( ${MAX_LOG_SIZE_MB:-100} * 1048576 ))
+    local first="" now
+    printf -v now '%(%s)T' -1
+    
+    if [[ -f "${log_file}.idx" ]]; then
+        IFS=' ' read -r first _ < "${log_file}.idx"
+    fi
+    
+    if (( ${size:-0} >= max_size )); then
+        log_rotate "$log_file"
+    elif [[ -n "$first" ]] && (( now - first >= ${LOG_ROTATE_DAYS:-7} * 86400 )); then
+        log_rotate "$log_file"
+    fi
+}
+
+# Move the current log aside, compress it in the background and remove
+# archives older than LOG_RETENTION_DAYS
+log_rotate() {
+    local log_file="$1"
+    local stamp
+    printf -v stamp '%(%Y%m%d_%H%M%S)T' -1
+    
+    local archive="${log_file}.${stamp}"
+    local json_file="${log_file%.log}.jsonl"
+    
+    mv -f "$log_file" "$archive" 2>/dev/null || return 1
+    rm -f "${log_file}.idx"
+    
+    local -a to_compress=("$archive")
+    if [[ -f "$json_file" ]]; then
+        mv -f "$json_file" "${json_file}.${stamp}" && to_compress+=("${json_file}.${stamp}")
+    fi
+    
+    (
+        gzip -q "${to_compress[@]}"
+        find "$(dirname "$log_file")" -maxdepth 1 -name "*.gz" \
+            -mtime +"${LOG_RETENTION_DAYS:-30}" -delete
+    ) > /dev/null 2>&1 &
+}
+
+# Rebuild the index of a log written without one (single full pass)
+log_index_rebuild() {
+    local log_file="$1"
+    
+    [[ -f "$log_file" ]] || return 1
+    
+    awk -v now="$(date +%s)" '
+    {
+        lines++
+        bytes += length($0) + 1
+        if (match($0, /\] \[[A-Z]+\]/)) {
+            count[substr($0, RSTART + 3, RLENGTH - 4)]++
+        }
+    }
+    END {
+        printf "%d %d %d", now, lines, bytes
+        for (level in count) printf " %s=%d", level, count[level]
+        printf "\n"
+    }' "$log_file" > "${log_file}.idx"
 }
 
+# Read a log index: totals stored in LOG_STATS (LINES, BYTES, FIRST, LAST, levels)
+# The index is rebuilt if it no longer matches the size of the log
+log_index_read() {
+    local log_file="$1"
+    local epoch lines bytes counts pair
+    
+    LOG_STATS=([LINES]=0 [BYTES]=0 [FIRST]="" [LAST]="")
+    
+    if [[ ! -f "${log_file}.idx" ]] && [[ -s "$log_file" ]]; then
+        log_index_rebuild "$log_file"
+    fi
+    [[ -f "${log_file}.idx" ]] || return 1
+    
+    while read -r epoch lines bytes counts; do
+        [[ -z "$epoch" ]] && continue
+        [[ -z "${LOG_STATS[FIRST]}" ]] && LOG_STATS[FIRST]=$epoch
+        LOG_STATS[LAST]=$epoch
+        ((LOG_STATS[LINES] += lines))
+        ((LOG_STATS[BYTES] += bytes))
+        
+        for pair in $counts; do
+            ((LOG_STATS[${pair%%=*}] += ${pair#*=}))
+        done
+    done < "${log_file}.idx"
+    
+    # Written by something else (another tool, a cleared log): rebuild once
+    local size=$(stat -c %s "$log_file" 2>/dev/null)
+    if [[ "${size:-0}" != "${LOG_STATS[BYTES]}" ]] && [[ -z "$2" ]]; then
+        log_index_rebuild "$log_file"
+        log_index_read "$log_file" rebuilt
+    fi
+}
+declare -gA LOG_STATS=()
+
 # Print colored message
 print_color() {
     local color="$1"
@@ -333,16 +594,29 @@ get_timestamp() {
 
 # Format bytes to human readable
 format_bytes() {
-    local bytes=$1
+    bytes_to_human "$1"
+    echo "$REPLY"
+}
+
+# Human-readable size without forking (result is stored in REPLY)
+bytes_to_human() {
+    local bytes="${1%.*}"
+    local unit div
+    bytes="${bytes:-0}"
+    
     if ((bytes < 1024)); then
-        echo "${bytes}B"
+        REPLY="${bytes}B"
+        return 0
     elif ((bytes < 1048576)); then
-        echo "$(awk "BEGIN {printf \"%.2f\", $bytes/1024}")KB"
+        unit="KB" div=1024
     elif ((bytes < 1073741824)); then
-        echo "$(awk "BEGIN {printf \"%.2f\", $bytes/1048576}")MB"
+        unit="MB" div=1048576
     else
-        echo "$(awk "BEGIN {printf \"%.2f\", $bytes/1073741824}")GB"
+        unit="GB" div=1073741824
     fi
+    
+    local hundredths=$(( (bytes * 100 + div / 2) / div ))
+    printf -v REPLY '%d.%02d%s' $((hundredths / 100)) $((hundredths % 100)) "$unit"
 }
 
 # Check required tools for a specific feature
@@ -377,8 +651,137 @@ init_log() {
     fi
 }
 
+# Binary time-series store for latency/traffic history
+TSDB_TOOL="${SCRIPT_DIR}/lib/tsdb.pl"
+
+# Check if the time-series store can be used
+tsdb_available() {
+    [[ "${TSDB_ENABLED:-yes}" == "yes" ]] && command_exists perl && [[ -f "$TSDB_TOOL" ]]
+}
+
+# Append a sample to a series: tsdb_append SERIES TIMESTAMP VALUE...
+tsdb_append() {
+    if ! tsdb_available; then
+        return 0
+    fi
+    
+    perl "$TSDB_TOOL" append "$@" 2>/dev/null
+}
+
+# Run a store query (tail, range, list, info, export)
+tsdb_query() {
+    if ! tsdb_available; then
+        return 1
+    fi
+    
+    perl "$TSDB_TOOL" "$@" 2>/dev/null
+}
+
+# Import an existing .dat history once per series family
+# The import merges by timestamp, so live samples appended before it (by
+# measure_latency.sh or the traffic sampler) do not hide the older history
+tsdb_import_history() {
+    local kind="$1"
+    local history_file="$2"
+    local marker="${TSDB_DIR:-${SCRIPT_DIR}/data/tsdb}/.imported.${kind}"
+    
+    if ! tsdb_available || [[ ! -s "$history_file" ]] || [[ -f "$marker" ]]; then
+        return 0
+    fi
+    
+    perl "$TSDB_TOOL" import "$kind" "$history_file" >/dev/null 2>&1
+}
+
+# Streaming anomaly detector (rolling statistics per series)
+ANOMALY_TOOL="${SCRIPT_DIR}/lib/anomaly_detector.pl"
+ANOMALY_LOG="${SCRIPT_DIR}/logs/anomalies.log"
+
+# Check if the streaming detector can be used
+anomaly_available() {
+    [[ "${ANOMALY_STREAMING:-yes}" == "yes" ]] && command_exists perl && [[ -f "$ANOMALY_TOOL" ]]
+}
+
+# Run the detector with the configured thresholds
+anomaly_tool() {
+    perl "$ANOMALY_TOOL" \
+        --z "${ANOMALY_Z_THRESHOLD:-3}" \
+        --alpha "${ANOMALY_EWMA_ALPHA:-0.3}" \
+        --band "${ANOMALY_EWMA_BAND:-3}" \
+        --min "${ANOMALY_MIN_SAMPLES:-10}" \
+        --window "${ANOMALY_WINDOW:-31}" \
+        "$@" 2>/dev/null
+}
+
+# Score new samples as they are collected
+# Input (stdin): "SERIES TIMESTAMP VALUE" lines
+# Alerts are printed and written to the anomalies log
+# Returns 1 if any sample was flagged
+anomaly_observe() {
+    if ! anomaly_available; then
+        cat > /dev/null
+        return 0
+    fi
+    
+    local tag series ts value kind detail
+    local flagged=0
+    
+    while IFS='|' read -r tag series ts value kind detail; do
+        [[ "$tag" == "ALERT" ]] || continue
+        flagged=1
+        print_color "$RED" "⚠ Anomalía ($kind) en $series: valor=$value ($detail)"
+        log_message "ALERT" "Streaming anomaly ($kind) on $series: value=$value $detail" "$ANOMALY_LOG"
+    done < <(anomaly_tool observe)
+    
+    return $flagged
+}
+
+# Collector daemon (lib/collectord.pl) keeping network state warm
+COLLECTOR_TOOL="${SCRIPT_DIR}/lib/collectord.pl"
+COLLECTOR_SOCKET="${SCRIPT_DIR}/data/collectord.sock"
+
+# Check if a running collector can answer queries
+# Collector jobs set SIMRED_COLLECTOR so they never query themselves
+collector_available() {
+    [[ -z "$SIMRED_COLLECTOR" ]] && [[ "${COLLECTOR_ENABLED:-yes}" == "yes" ]] && \
+        [[ -S "$COLLECTOR_SOCKET" ]] && command_exists perl
+}
+
+# Query the collector: collector_query get KIND [--max-age SECONDS]
+# Prints pipe-separated rows; fails if the daemon is down or data is stale
+collector_query() {
+    if ! collector_available; then
+        return 1
+    fi
+    
+    COLLECTOR_SOCKET="$COLLECTOR_SOCKET" perl "$COLLECTOR_TOOL" query "$@" 2>/dev/null
+}
+
+# Start the collector in the background (no-op if already running)
+collector_start() {
+    if [[ "${COLLECTOR_ENABLED:-yes}" != "yes" ]] || ! command_exists perl; then
+        return 1
+    fi
+    
+    ensure_dir "${SCRIPT_DIR}/data" && ensure_dir "${SCRIPT_DIR}/logs" || return 1
+    COLLECTOR_SOCKET="$COLLECTOR_SOCKET" perl "$COLLECTOR_TOOL" start
+}
+
+# Stop the collector (fails if it was not running)
+collector_stop() {
+    if ! command_exists perl || [[ ! -S "$COLLECTOR_SOCKET" ]]; then
+        return 1
+    fi
+    
+    COLLECTOR_SOCKET="$COLLECTOR_SOCKET" perl "$COLLECTOR_TOOL" stop
+}
+
 # Export functions for use in subshells
 export -f log_message
+export -f log_json_record
+export -f log_flush
+export -f log_write
+export -f log_rotate_check
+export -f log_rotate
 export -f print_color
 export -f print_success
 export -f print_error
@@ -394,3 +797,16 @@ export -f detect_network_subnet
 export -f detect_network_gateway
 export -f auto_detect_network
 export -f update_network_config
+export -f tsdb_available
+export -f tsdb_append
+export -f tsdb_query
+export -f anomaly_available
+export -f anomaly_tool
+export -f anomaly_observe
+export -f collector_available
+export -f collector_query
+
+# Optional span tracing (SIMRED_TRACE), see lib/trace.sh
+if [[ -n "$SIMRED_TRACE" ]]; then
+    source "${SCRIPT_DIR}/lib/trace.sh"
+fi
@@ -0,0 +1,239 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Concurrent DNS Probe
+# Sends DNS queries over UDP to every server at once from one socket and
+# matches the answers by transaction id and question, so a dead server
+# only costs the timeout once. Each query is timed in-process with the
+# monotonic clock (no resolver process start-up in the measurement).
+#
+# Usage:
+#   dns_probe.pl [options] SERVER[:PORT]...
+#       SERVER is an IPv4 or IPv6 address or a host name; an IPv6 address
+#       with a port is written [ADDRESS]:PORT
+#
+# Output:
+#   QUERY|SERVER|NAME|TYPE|RCODE|MS|ANSWER      one line per query; RCODE is
+#                                               NOERROR, NXDOMAIN, SERVFAIL,
+#                                               REFUSED, ... or TIMEOUT; ANSWER
+#                                               is the first address (or the
+#                                               number of answer records)
+#   SERVER|SERVER|SENT|ANSWERED|TIMEOUT|NOERROR|NXDOMAIN|SERVFAIL|OTHER|P50|P95|MAX|ANSWER
+#                                               one line per server; times in
+#                                               ms over the answered queries
+#                                               ("-" when none answered)
+#
+# Options:
+#   --names LIST     Space-separated names to query (default: google.com)
+#   --types LIST     Space-separated record types (default: A)
+#   --rounds N       Queries per server, name and type (default: 3)
+#   --timeout N      Seconds to wait for the answers of a round (default: 2)
+#   --port N         Port for servers given without one (default: 53)
+
+use strict;
+use warnings;
+use Socket qw(AF_INET AF_INET6 SOCK_DGRAM inet_ntoa inet_ntop getaddrinfo
+              sockaddr_family unpack_sockaddr_in unpack_sockaddr_in6);
+use IO::Select;
+use Time::HiRes qw(clock_gettime CLOCK_MONOTONIC);
+
+my %opt = (
+    names   => 'google.com',
+    types   => 'A',
+    rounds  => 3,
+    timeout => 2,
+    port    => 53,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+die "Usage: $0 [--names LIST] [--types LIST] [--rounds N] [--timeout N] [--port N] SERVER[:PORT]...\n"
+    unless @ARGV;
+
+my %TYPES = (A => 1, NS => 2, CNAME => 5, SOA => 6, PTR => 12, MX => 15,
+             TXT => 16, AAAA => 28, SRV => 33, ANY => 255);
+my @RCODES = qw(NOERROR FORMERR SERVFAIL NXDOMAIN NOTIMP REFUSED);
+
+my @names = split ' ', $opt{names};
+my @types = map { uc } split ' ', $opt{types};
+foreach my $type (@types) {
+    die "Unknown record type: $type\n" unless $TYPES{$type};
+}
+
+# Per-server state, indexed like the arguments
+my @servers = @ARGV;
+my @dest;          # packed sockaddr (undef if it does not resolve)
+my @peer;          # address|port of the server, to match the answers
+my @times;         # answer times (ms)
+my @count;         # {sent, answered, TIMEOUT, NOERROR, NXDOMAIN, SERVFAIL, other}
+my @answer;        # first address seen in an answer
+
+my %sock;          # address family -> UDP socket
+my $select = IO::Select->new();
+
+for my $i (0 .. $#servers) {
+    my ($host, $port) = ($servers[$i], $opt{port});
+    if ($servers[$i] =~ /^\[([^\]]+)\](?::(\d+))?$/) {
+        ($host, $port) = ($1, $2 // $opt{port});
+    } elsif ($servers[$i] =~ /^([^:]+):(\d+)$/) {
+        ($host, $port) = ($1, $2);
+    }
+
+    my ($err, $ai) = getaddrinfo($host, $port, {socktype => SOCK_DGRAM});
+    if ($err || !$ai) {
+        warn "Cannot resolve $servers[$i]\n";
+    } elsif (!$sock{$ai->{family}}) {
+        # One socket per address family, opened on first use
+        if (socket(my $sock, $ai->{family}, SOCK_DGRAM, 0)) {
+            $sock{$ai->{family}} = $sock;
+            $select->add($sock);
+        } else {
+            warn "Cannot open a UDP socket for $servers[$i]: $!\n";
+        }
+    }
+    if ($ai && $sock{$ai->{family}}) {
+        $dest[$i] = $ai->{addr};
+        $peer[$i] = peer_key($ai->{addr});
+    }
+    $times[$i] = [];
+    $count[$i] = {map { $_ => 0 } qw(sent answered TIMEOUT NOERROR NXDOMAIN SERVFAIL other)};
+}
+$| = 1;
+
+for (1 .. $opt{rounds}) {
+    my %pending;   # id -> [server, name, type, question, send time]
+
+    # Round-robin over the servers so each one gets its first query at once
+    foreach my $name (@names) {
+        foreach my $type (@types) {
+            for my $i (0 .. $#servers) {
+                next unless defined $dest[$i];
+
+                my $id;
+                do { $id = int(rand(65536)) } while $pending{$id};
+                my $question = encode_name($name) . pack('nn', $TYPES{$type}, 1);
+                my $query = pack('nnnnnn', $id, 0x0100, 1, 0, 0, 0) . $question;
+
+                $pending{$id} = [$i, $name, $type, $question, clock_gettime(CLOCK_MONOTONIC)];
+                send($sock{sockaddr_family($dest[$i])}, $query, 0, $dest[$i])
+                    or warn "Cannot send to $servers[$i]: $!\n";
+                $count[$i]{sent}++;
+            }
+        }
+    }
+
+    my $deadline = clock_gettime(CLOCK_MONOTONIC) + $opt{timeout};
+    while (%pending) {
+        my $wait = $deadline - clock_gettime(CLOCK_MONOTONIC);
+        last if $wait <= 0;
+        my @ready = $select->can_read($wait) or last;
+
+        foreach my $sock (@ready) {
+            while (defined(my $from = recv($sock, my $packet, 4096, Socket::MSG_DONTWAIT()))) {
+                my $now = clock_gettime(CLOCK_MONOTONIC);
+                last unless length $packet;
+                next if length($packet) < 12;
+
+                my ($id, $flags) = unpack('nn', $packet);
+                my $query = $pending{$id} or next;
+                my ($i, $name, $type, $question, $sent) = @$query;
+
+                # Same server, a response, and the question we asked (servers
+                # may echo the name with its case changed)
+                next unless peer_key($from) eq $peer[$i] && $flags & 0x8000
+                    && lc(substr($packet, 12, length $question)) eq lc($question);
+                delete $pending{$id};
+
+                my $rcode = $RCODES[$flags & 0x0f] // 'RCODE' . ($flags & 0x0f);
+                my $ms = ($now - $sent) * 1000;
+                my $first = first_answer($packet, 12 + length $question);
+                $answer[$i] //= $first if $first =~ /[.:]/;
+
+                push @{$times[$i]}, $ms;
+                $count[$i]{answered}++;
+                $count[$i]{exists $count[$i]{$rcode} ? $rcode : 'other'}++;
+                printf "QUERY|%s|%s|%s|%s|%.2f|%s\n", $servers[$i], $name, $type, $rcode, $ms, $first;
+            }
+        }
+    }
+
+    foreach my $query (values %pending) {
+        my ($i, $name, $type) = @$query;
+        $count[$i]{TIMEOUT}++;
+        print "QUERY|$servers[$i]|$name|$type|TIMEOUT|-|\n";
+    }
+}
+
+for my $i (0 .. $#servers) {
+    my @sorted = sort { $a <=> $b } @{$times[$i]};
+    my @stats = @sorted
+        ? map { sprintf('%.2f', $_) } percentile(\@sorted, 50), percentile(\@sorted, 95), $sorted[-1]
+        : ('-', '-', '-');
+
+    print join('|', 'SERVER', $servers[$i],
+        @{$count[$i]}{qw(sent answered TIMEOUT NOERROR NXDOMAIN SERVFAIL other)},
+        @stats, $answer[$i] // ''), "\n";
+}
+
+exit 0;
+
+# Address and port of a packed sockaddr (IPv4 or IPv6), comparable
+# whatever the flow label or padding of the received address
+sub peer_key {
+    my ($sockaddr) = @_;
+    if (sockaddr_family($sockaddr) == AF_INET6) {
+        my ($port, $addr) = unpack_sockaddr_in6($sockaddr);
+        return "$addr|$port";
+    }
+    my ($port, $addr) = unpack_sockaddr_in($sockaddr);
+    return "$addr|$port";
+}
+
+# Nearest-rank percentile of a sorted list
+sub percentile {
+    my ($sorted, $p) = @_;
+    my $rank = int(@$sorted * $p / 100 + 0.999999);
+    $rank = 1 if $rank < 1;
+    return $sorted->[$rank - 1];
+}
+
+sub encode_name {
+    my ($name) = @_;
+    $name =~ s/\.$//;
+    return join('', map { chr(length $_) . $_ } split /\./, $name) . "\0";
+}
+
+# Offset just after a (possibly compressed) name
+sub skip_name {
+    my ($packet, $offset) = @_;
+    while ($offset < length $packet) {
+        my $len = ord(substr($packet, $offset, 1));
+        return $offset + 2 if $len >= 0xc0;
+        return $offset + 1 if $len == 0;
+        $offset += $len + 1;
+    }
+    return undef;
+}
+
+# First A/AAAA address of the answer section (which starts at OFFSET,
+# right after the question), or the number of answer records
+sub first_answer {
+    my ($packet, $offset) = @_;
+    my $ancount = unpack('n', substr($packet, 6, 2));
+
+    for (1 .. $ancount) {
+        $offset = skip_name($packet, $offset);
+        last unless defined $offset && $offset + 10 <= length $packet;
+
+        my ($type, $class, $ttl, $rdlength) = unpack('nnNn', substr($packet, $offset, 10));
+        $offset += 10;
+        last if $offset + $rdlength > length $packet;
+
+        my $rdata = substr($packet, $offset, $rdlength);
+        return inet_ntoa($rdata) if $type == 1 && $rdlength == 4;
+        return inet_ntop(AF_INET6, $rdata) if $type == 28 && $rdlength == 16;
+        $offset += $rdlength;
+    }
+    return $ancount;
+}
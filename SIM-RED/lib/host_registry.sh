@@ -0,0 +1,256 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - Host/Schedule Registry
+# Parses hosts.conf and schedule.conf once into in-memory indexes and
+# answers authorization, MAC and schedule checks without re-reading files
+
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+source "${SCRIPT_DIR}/lib/common.sh"
+
+REGISTRY_CACHE="${SCRIPT_DIR}/data/registry.cache"
+
+# Indexes (filled by registry_load)
+declare -gA REG_HOST_MAC=()      # IP -> authorized MAC (as written in hosts.conf)
+declare -gA REG_HOST_NAME=()     # IP -> hostname
+declare -gA REG_MAC_IP=()        # lowercase MAC -> IP
+declare -gA REG_SCHEDULE=()      # IP -> "DAYMASK:START:END ..." rules
+declare -ga REG_HOST_ORDER=()    # IPs in hosts.conf order
+REG_CACHE_KEY=""
+REG_CACHE_HASH=""
+REG_LOADED_KEY=""
+
+# Day name -> bit position (Mon = 0 ... Sun = 6)
+declare -gA REG_DAY_BIT=([Mon]=0 [Tue]=1 [Wed]=2 [Thu]=3 [Fri]=4 [Sat]=5 [Sun]=6)
+
+# Compile a DAYS field (Mon-Fri, Sat-Sun, Mon,Wed, Mon-Sun, *) into a bitmap
+# Result is stored in REPLY
+registry_compile_days() {
+    local days="$1"
+    local mask=0
+    local token first last bit
+    
+    if [[ "$days" == "*" ]]; then
+        REPLY=127
+        return 0
+    fi
+    
+    local IFS=','
+    for token in $days; do
+        token="${token//[[:space:]]/}"
+        
+        if [[ "$token" == *-* ]]; then
+            first="${REG_DAY_BIT[${token%%-*}]}"
+            last="${REG_DAY_BIT[${token##*-}]}"
+            [[ -z "$first" || -z "$last" ]] && continue
+            
+            # Ranges may wrap around the week (Fri-Mon)
+            bit=$first
+            while true; do
+                ((mask |= 1 << bit))
+                ((bit == last)) && break
+                bit=$(( (bit + 1) % 7 ))
+            done
+        elif [[ -n "${REG_DAY_BIT[$token]}" ]]; then
+            ((mask |= 1 << REG_DAY_BIT[$token]))
+        fi
+    done
+    
+    REPLY=$mask
+}
+
+# Convert HH:MM into minutes since midnight (stored in REPLY)
+registry_compile_time() {
+    local time="${1//[[:space:]]/}"
+    
+    if [[ "$time" =~ ^([0-9]{1,2}):([0-9]{2})$ ]]; then
+        REPLY=$(( 10#${BASH_REMATCH[1]} * 60 + 10#${BASH_REMATCH[2]} ))
+        return 0
+    fi
+    
+    REPLY=""
+    return 1
+}
+
+# Parse both configuration files into the in-memory indexes
+registry_compile() {
+    local hosts_file="$1"
+    local schedule_file="$2"
+    local ip mac hostname desc days start_time end_time start end
+    
+    REG_HOST_MAC=()
+    REG_HOST_NAME=()
+    REG_MAC_IP=()
+    REG_SCHEDULE=()
+    REG_HOST_ORDER=()
+    
+    while IFS='|' read -r ip mac hostname desc; do
+        [[ "$ip" =~ ^[[:space:]]*(#|$) ]] && continue
+        ip="${ip//[[:space:]]/}"
+        mac="${mac//[[:space:]]/}"
+        
+        [[ -z "${REG_HOST_NAME[$ip]+set}" ]] && REG_HOST_ORDER+=("$ip")
+        REG_HOST_MAC[$ip]="$mac"
+        REG_HOST_NAME[$ip]="$hostname"
+        [[ -n "$mac" ]] && REG_MAC_IP[${mac,,}]="$ip"
+    done < "$hosts_file"
+    
+    if [[ -f "$schedule_file" ]]; then
+        while IFS='|' read -r ip days start_time end_time; do
+            [[ "$ip" =~ ^[[:space:]]*(#|$) ]] && continue
+            ip="${ip//[[:space:]]/}"
+            
+            registry_compile_days "${days//[[:space:]]/}"
+            local mask=$REPLY
+            registry_compile_time "$start_time" || continue
+            start=$REPLY
+            registry_compile_time "${end_time%%#*}" || continue
+            end=$REPLY
+            
+            # Several lines for the same IP add more allowed windows
+            REG_SCHEDULE[$ip]="${REG_SCHEDULE[$ip]:+${REG_SCHEDULE[$ip]} }${mask}:${start}:${end}"
+        done < "$schedule_file"
+    fi
+}
+
+# Save the compiled indexes so later runs can skip parsing
+registry_save_cache() {
+    local cache_file="$1"
+    local decl
+    
+    ensure_dir "$(dirname "$cache_file")" || return 1
+    
+    {
+        printf 'REG_CACHE_KEY=%q\n' "$REG_CACHE_KEY"
+        printf 'REG_CACHE_HASH=%q\n' "$REG_CACHE_HASH"
+        for decl in REG_HOST_MAC REG_HOST_NAME REG_MAC_IP REG_SCHEDULE REG_HOST_ORDER; do
+            decl=$(declare -p "$decl")
+            echo "${decl/declare -/declare -g}"
+        done
+    } > "${cache_file}.tmp" 2>/dev/null && mv -f "${cache_file}.tmp" "$cache_file"
+}
+
+# Load the registry, reusing the in-process indexes or the on-disk cache
+# unless hosts.conf/schedule.conf changed (mtime first, then content hash)
+registry_load() {
+    local hosts_file="${1:-${SCRIPT_DIR}/config/hosts.conf}"
+    local schedule_file="${2:-${SCRIPT_DIR}/config/schedule.conf}"
+    local cache_file="${3:-$REGISTRY_CACHE}"
+    
+    if ! check_file "$hosts_file"; then
+        return 1
+    fi
+    
+    local -a files=("$hosts_file")
+    [[ -f "$schedule_file" ]] && files+=("$schedule_file")
+    
+    local key="${hosts_file}|${schedule_file}|$(stat -c '%Y.%s' "${files[@]}" 2>/dev/null | tr '\n' ':')"
+    
+    # Already loaded in this process
+    if [[ "$REG_LOADED_KEY" == "$key" ]]; then
+        return 0
+    fi
+    
+    # Try the on-disk cache
+    if [[ -f "$cache_file" ]]; then
+        source "$cache_file"
+        
+        if [[ "$REG_CACHE_KEY" == "$key" ]]; then
+            REG_LOADED_KEY="$key"
+            return 0
+        fi
+    fi
+    
+    # mtime changed: only recompile if the content changed too
+    local hash=$(sha256sum "${files[@]}" 2>/dev/null | awk '{printf "%s:", $1}')
+    
+    if [[ -f "$cache_file" ]] && [[ "$REG_CACHE_HASH" == "$hash" ]]; then
+        REG_CACHE_KEY="$key"
+        REG_LOADED_KEY="$key"
+        registry_save_cache "$cache_file"
+        return 0
+    fi
+    
+    registry_compile "$hosts_file" "$schedule_file"
+    REG_CACHE_KEY="$key"
+    REG_CACHE_HASH="$hash"
+    REG_LOADED_KEY="$key"
+    registry_save_cache "$cache_file"
+    return 0
+}
+
+# Evaluate the schedule for an IP at a given day bit and minute of day
+# Result (ALLOWED, WRONG_DAY, WRONG_TIME or NO_SCHEDULE) is stored in REPLY
+registry_schedule_status() {
+    local ip="$1"
+    local day_bit="$2"
+    local minute="$3"
+    local rules="${REG_SCHEDULE[$ip]}"
+    local rule mask start end
+    
+    if [[ -z "$rules" ]]; then
+        REPLY="NO_SCHEDULE"
+        return 1
+    fi
+    
+    REPLY="WRONG_DAY"
+    for rule in $rules; do
+        mask="${rule%%:*}"
+        end="${rule##*:}"
+        start="${rule#*:}"
+        start="${start%:*}"
+        
+        if (( (mask >> day_bit) & 1 )); then
+            if ((minute >= start && minute <= end)); then
+                REPLY="ALLOWED"
+                return 0
+            fi
+            REPLY="WRONG_TIME"
+        fi
+    done
+    
+    return 1
+}
+
+# Check a whole scan in one call
+# Input (stdin): IP|MAC lines
+# Output: IP|MAC|HOSTNAME|STATUS|AUTHORIZED_MAC
+# STATUS: ALLOWED, WRONG_DAY, WRONG_TIME, NO_SCHEDULE, MAC_MISMATCH, UNKNOWN
+registry_check_batch() {
+    local now_day now_hour now_min
+    printf -v now_day '%(%u)T' -1
+    printf -v now_hour '%(%H)T' -1
+    printf -v now_min '%(%M)T' -1
+    
+    local day_bit=$((now_day - 1))
+    local minute=$((10#$now_hour * 60 + 10#$now_min))
+    local ip mac auth_mac
+    
+    while IFS='|' read -r ip mac; do
+        [[ -z "$ip" ]] && continue
+        
+        if [[ -z "${REG_HOST_NAME[$ip]+set}" ]]; then
+            echo "$ip|$mac||UNKNOWN|"
+            continue
+        fi
+        
+        auth_mac="${REG_HOST_MAC[$ip]}"
+        
+        if [[ "${mac,,}" != "${auth_mac,,}" ]]; then
+            echo "$ip|$mac|${REG_HOST_NAME[$ip]}|MAC_MISMATCH|$auth_mac"
+            continue
+        fi
+        
+        registry_schedule_status "$ip" "$day_bit" "$minute"
+        echo "$ip|$mac|${REG_HOST_NAME[$ip]}|$REPLY|$auth_mac"
+    done
+}
+
+# Check if a MAC belongs to an authorized host (no file access)
+registry_is_authorized_mac() {
+    [[ -n "${REG_MAC_IP[${1,,}]+set}" ]]
+}
+
+# Check if an IP belongs to an authorized host (no file access)
+registry_is_authorized_ip() {
+    [[ -n "${REG_HOST_NAME[$1]+set}" ]]
+}
@@ -0,0 +1,363 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Per-Host Traffic Accounting
+# Attributes bytes and packets to every LAN address (up = sent by the host,
+# down = received by it) and prints the totals of each interval, largest
+# first. Two sources:
+#   conntrack  kernel per-connection counters from /proc/net/nf_conntrack
+#              (net.netfilter.nf_conntrack_acct=1); no per-packet work,
+#              so the load does not grow with the traffic. Sees the
+#              traffic this host routes or terminates.
+#   capture    AF_PACKET socket on the interface. A socket filter keeps
+#              IPv4 frames only and truncates them to the headers in the
+#              kernel, so payloads are never copied. Sizes come from the
+#              IP header. Sees whatever reaches the interface (own
+#              traffic, or the whole LAN on a mirror port with --promisc).
+# The counters live in a table of at most --max entries that is
+# emptied after every interval; bytes of hosts that do not fit are
+# reported as overflow. Requires root.
+#
+# Usage:
+#   host_traffic.pl [options] CIDR
+#
+# Output:
+#   READY|MODE|INTERFACE
+#   HOST|TS|IP|MAC|HOSTNAME|UP_BYTES|DOWN_BYTES|UP_PKTS|DOWN_PKTS
+#                       one line per active host, largest total first
+#   INTERVAL|TS|SECONDS|MODE|HOSTS|EVENTS|KERNEL_DROPS|OVERFLOW_BYTES
+#                       closes each interval; EVENTS is frames captured or
+#                       connections read, KERNEL_DROPS frames the socket
+#                       lost (capture mode)
+#
+# Options:
+#   --mode MODE      auto, conntrack or capture (default: auto, conntrack
+#                    when its accounting is enabled)
+#   --interface IF   Interface to capture on (default: eth0)
+#   --interval N     Seconds between flushes (default: 5)
+#   --duration N     Stop after N seconds, 0 = until killed (default: 0)
+#   --hosts FILE     hosts.conf used to name the hosts (by IP, then MAC)
+#   --max N          Size of the accounting table (default: 4096)
+#   --snaplen N      Bytes of each frame copied in capture mode (default: 64)
+#   --promisc N      1 = put the interface in promiscuous mode (default: 0)
+
+use strict;
+use warnings;
+use Socket qw(SOL_SOCKET SOCK_RAW SO_RCVBUF inet_aton inet_ntoa);
+use IO::Select;
+use Time::HiRes qw(time);
+
+use constant AF_PACKET          => 17;
+use constant ETH_P_ALL          => 0x0003;
+use constant SOL_PACKET         => 263;
+use constant PACKET_ADD_MEMBERSHIP => 1;
+use constant PACKET_STATISTICS  => 6;
+use constant PACKET_MR_PROMISC  => 1;
+use constant SO_ATTACH_FILTER   => 26;
+use constant SO_RCVBUFFORCE    => 33;
+use constant RECV_BUFFER       => 8 << 20;
+use constant CAPTURE_BATCH     => 4096;
+use constant CONNTRACK_FILE     => '/proc/net/nf_conntrack';
+use constant CONNTRACK_ACCT     => '/proc/sys/net/netfilter/nf_conntrack_acct';
+
+# Accounting table entry: [MAC, UP_BYTES, DOWN_BYTES, UP_PKTS, DOWN_PKTS]
+use constant { MAC => 0, UP => 1, DOWN => 2, UP_PKTS => 3, DOWN_PKTS => 4 };
+
+my %opt = (
+    mode      => 'auto',
+    interface => 'eth0',
+    interval  => 5,
+    duration  => 0,
+    hosts     => '',
+    max       => 4096,
+    snaplen   => 64,
+    promisc   => 0,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+die "Usage: $0 [--mode auto|conntrack|capture] [--interface IF] [--interval N] [--duration N]"
+    . " [--hosts FILE] [--max N] [--snaplen N] [--promisc 0|1] CIDR\n"
+    unless @ARGV == 1;
+die "--interval must be greater than 0\n" unless $opt{interval} > 0;
+
+my ($net, $mask) = parse_cidr($ARGV[0]);
+my ($names_by_ip, $names_by_mac) = load_hosts($opt{hosts});
+
+my $mode = $opt{mode};
+if ($mode eq 'auto') {
+    $mode = conntrack_usable() ? 'conntrack' : 'capture';
+} elsif ($mode eq 'conntrack') {
+    die "Conntrack accounting is not available (load nf_conntrack and set "
+        . "net.netfilter.nf_conntrack_acct=1)\n" unless conntrack_usable();
+} elsif ($mode ne 'capture') {
+    die "Unknown mode: $mode\n";
+}
+
+my %hosts;             # IP (integer) -> table entry
+my $overflow = 0;      # bytes of hosts that did not fit in the table
+my $events = 0;
+keys(%hosts) = $opt{max};
+
+my $stop = 0;
+$SIG{TERM} = $SIG{INT} = sub { $stop = 1 };
+$| = 1;
+
+print "READY|$mode|", ($mode eq 'capture' ? $opt{interface} : 'conntrack'), "\n";
+if ($mode eq 'capture') {
+    run_capture();
+} else {
+    run_conntrack();
+}
+exit 0;
+
+# Network address and mask (integers) of the LAN
+sub parse_cidr {
+    my ($cidr) = @_;
+    my ($ip, $bits) = $cidr =~ m{^(\d+\.\d+\.\d+\.\d+)(?:/(\d+))?$}
+        or die "Invalid CIDR: $cidr\n";
+    $bits //= 32;
+    my $addr = inet_aton($ip);
+    die "Invalid CIDR: $cidr\n" unless defined $addr && $bits <= 32;
+
+    my $mask = $bits ? (0xffffffff << (32 - $bits)) & 0xffffffff : 0;
+    return (unpack('N', $addr) & $mask, $mask);
+}
+
+# hosts.conf: IP|MAC|HOSTNAME|DESCRIPTION
+sub load_hosts {
+    my ($file) = @_;
+    my (%by_ip, %by_mac);
+    return (\%by_ip, \%by_mac) unless $file && open(my $fh, '<', $file);
+
+    while (my $line = <$fh>) {
+        next if $line =~ /^\s*#/;
+        chomp $line;
+        my ($ip, $mac, $name) = split /\|/, $line;
+        next unless defined $name && length $name;
+        $by_ip{$ip} = $name;
+        $by_mac{lc $mac} = $name if $mac;
+    }
+    close($fh);
+    return (\%by_ip, \%by_mac);
+}
+
+sub conntrack_usable {
+    return 0 unless -r CONNTRACK_FILE && open(my $fh, '<', CONNTRACK_ACCT);
+    my $acct = <$fh> // 0;
+    close($fh);
+    return $acct =~ /^\s*1/;
+}
+
+# MAC of each address from the kernel neighbour cache (conntrack has none)
+sub arp_cache {
+    my %mac;
+    open(my $fh, '<', '/proc/net/arp') or return \%mac;
+    <$fh>;
+    while (my $line = <$fh>) {
+        my ($ip, undef, $flags, $hw) = split ' ', $line;
+        $mac{$ip} = $hw if hex($flags) & 2;
+    }
+    close($fh);
+    return \%mac;
+}
+
+# Print the table, largest total first, and start a new interval
+sub flush {
+    my ($seconds, $drops) = @_;
+    my $now = int(time);
+    my $macs = $mode eq 'conntrack' ? arp_cache() : undef;
+
+    foreach my $ip (sort { $hosts{$b}[UP] + $hosts{$b}[DOWN] <=> $hosts{$a}[UP] + $hosts{$a}[DOWN]
+                           || $a <=> $b } keys %hosts) {
+        my $entry = $hosts{$ip};
+        my $addr = inet_ntoa(pack('N', $ip));
+        my $mac = $macs ? $macs->{$addr} // ''
+            : defined $entry->[MAC] ? join(':', unpack('(H2)6', $entry->[MAC])) : '';
+        my $name = $names_by_ip->{$addr} // ($mac ? $names_by_mac->{$mac} : undef) // '';
+
+        print join('|', 'HOST', $now, $addr, $mac, $name, @$entry[UP, DOWN, UP_PKTS, DOWN_PKTS]), "\n";
+    }
+    printf "INTERVAL|%d|%.2f|%s|%d|%d|%d|%d\n",
+        $now, $seconds, $mode, scalar(keys %hosts), $events, $drops, $overflow;
+
+    %hosts = ();
+    keys(%hosts) = $opt{max};
+    ($events, $overflow) = (0, 0);
+}
+
+# Capture
+
+sub run_capture {
+    my $iface = $opt{interface};
+    my $ifindex = read_sys("/sys/class/net/$iface/ifindex")
+        // die "Unknown interface: $iface\n";
+
+    socket(my $sock, AF_PACKET, SOCK_RAW, unpack('n', pack('S', ETH_P_ALL)))
+        or die "Cannot open an AF_PACKET socket (run as root): $!\n";
+
+    # Classic BPF: accept IPv4 frames cut to snaplen, drop everything else
+    my $filter = pack('(S C C L)4',
+        0x28, 0, 0, 12,                # ldh [12]          (EtherType)
+        0x15, 0, 1, 0x0800,            # jeq #0x800        else drop
+        0x06, 0, 0, $opt{snaplen},     # ret #snaplen
+        0x06, 0, 0, 0);                # ret #0
+    setsockopt($sock, SOL_SOCKET, SO_ATTACH_FILTER, pack('S x![P] P', 4, $filter))
+        or die "Cannot attach the socket filter: $!\n";
+    # Room for bursts while the table is being flushed (past rmem_max as root)
+    setsockopt($sock, SOL_SOCKET, SO_RCVBUFFORCE, RECV_BUFFER)
+        or setsockopt($sock, SOL_SOCKET, SO_RCVBUF, RECV_BUFFER);
+    bind($sock, pack('S n i S C C a8', AF_PACKET, ETH_P_ALL, $ifindex, 0, 0, 0, ''))
+        or die "Cannot bind to $iface: $!\n";
+    if ($opt{promisc}) {
+        setsockopt($sock, SOL_PACKET, PACKET_ADD_MEMBERSHIP,
+            pack('i S S a8', $ifindex, PACKET_MR_PROMISC, 0, ''))
+            or warn "Cannot enable promiscuous mode on $iface: $!\n";
+    }
+    kernel_drops($sock);
+
+    $sock->blocking(0);
+    my $select = IO::Select->new($sock);
+    my $frame = '';
+    my $snaplen = $opt{snaplen};
+    my $max = $opt{max};
+    my $started = time;
+    my $last = $started;
+    my $next = $started + $opt{interval};
+
+    until ($stop) {
+        my $wait = $next - time;
+        if ($wait > 0 && $select->can_read($wait)) {
+            # Drain the socket in batches, so a busy link still gets its
+            # flushes on time; this loop is the per-packet cost
+            for (1 .. CAPTURE_BATCH) {
+                defined sysread($sock, $frame, $snaplen) or last;
+                next if length($frame) < 34;
+                $events++;
+
+                my ($dmac, $smac, $size, $src, $dst) = unpack('a6 a6 x4 n x8 N N', $frame);
+                $size += 14;
+
+                if (($src & $mask) == $net) {
+                    my $entry = $hosts{$src};
+                    if ($entry || keys(%hosts) < $max) {
+                        $entry //= $hosts{$src} = [$smac, 0, 0, 0, 0];
+                        $entry->[UP] += $size;
+                        $entry->[UP_PKTS]++;
+                    } else {
+                        $overflow += $size;
+                    }
+                }
+                if (($dst & $mask) == $net) {
+                    my $entry = $hosts{$dst};
+                    if ($entry || keys(%hosts) < $max) {
+                        $entry //= $hosts{$dst} = [$dmac, 0, 0, 0, 0];
+                        $entry->[DOWN] += $size;
+                        $entry->[DOWN_PKTS]++;
+                    } else {
+                        $overflow += $size;
+                    }
+                }
+            }
+        }
+
+        my $now = time;
+        last if $opt{duration} > 0 && $now - $started >= $opt{duration};
+        next if $now < $next;
+
+        flush($now - $last, kernel_drops($sock));
+        $last = $now;
+        $next += $opt{interval};
+        $next = $now + $opt{interval} if $next <= $now;
+    }
+    flush(time - $last, kernel_drops($sock)) if time - $last >= 0.5;
+}
+
+# Frames dropped by the socket since the last call (reading resets them)
+sub kernel_drops {
+    my ($sock) = @_;
+    my $stats = getsockopt($sock, SOL_PACKET, PACKET_STATISTICS) // return 0;
+    return (unpack('L L', $stats))[1];
+}
+
+sub read_sys {
+    my ($file) = @_;
+    open(my $fh, '<', $file) or return undef;
+    chomp(my $value = <$fh> // '');
+    close($fh);
+    return $value;
+}
+
+# Conntrack
+
+sub run_conntrack {
+    my %previous;      # connection -> [ORIG_PKTS, ORIG_BYTES, REPLY_PKTS, REPLY_BYTES]
+    my $started = time;
+    my $last = $started;
+
+    # The first read only sets the baseline of the open connections
+    read_conntrack(\%previous, 0);
+
+    until ($stop) {
+        my $deadline = $last + $opt{interval};
+        $deadline = $started + $opt{duration} if $opt{duration} > 0 && $started + $opt{duration} < $deadline;
+        while (!$stop && (my $left = $deadline - time) > 0) {
+            select(undef, undef, undef, $left);
+        }
+
+        read_conntrack(\%previous, 1);
+        my $now = time;
+        flush($now - $last, 0);
+        $last = $now;
+        last if $opt{duration} > 0 && $now - $started >= $opt{duration};
+    }
+}
+
+# Add the counter growth of every connection since the previous read. The
+# original direction goes from the initiator to the responder; the reply
+# tuple names the real responder when the connection is NATed.
+sub read_conntrack {
+    my ($previous, $count) = @_;
+    my %current;
+
+    open(my $fh, '<', CONNTRACK_FILE) or die "Cannot read " . CONNTRACK_FILE . ": $!\n";
+    while (my $line = <$fh>) {
+        my ($proto, $tuple, $client, $opkts, $obytes, $server, $rpkts, $rbytes) = $line =~
+            /^ipv4\s+\d+\s+(\S+)\s.*?(src=(\S+) dst=\S+ .*?)packets=(\d+) bytes=(\d+) (?:\[\w+\] )?src=(\S+) .*?packets=(\d+) bytes=(\d+)/
+            or next;
+        my $key = "$proto $tuple";
+
+        my $now = $current{$key} = [$opkts, $obytes, $rpkts, $rbytes];
+        next unless $count;
+        $events++;
+
+        # A connection seen for the first time counts from zero; counters
+        # that went down belong to a new connection with the same tuple
+        my $before = $previous->{$key};
+        my @delta = map { !$before || $now->[$_] < $before->[$_] ? $now->[$_] : $now->[$_] - $before->[$_] } 0 .. 3;
+        next unless $delta[0] || $delta[2];
+
+        account_flow($client, $delta[1], $delta[3], $delta[0], $delta[2]);
+        account_flow($server, $delta[3], $delta[1], $delta[2], $delta[0]);
+    }
+    close($fh);
+    %$previous = %current;
+}
+
+sub account_flow {
+    my ($addr, $up, $down, $up_pkts, $down_pkts) = @_;
+    my $ip = unpack('N', inet_aton($addr) // return);
+    return unless ($ip & $mask) == $net;
+
+    my $entry = $hosts{$ip};
+    if (!$entry && keys(%hosts) >= $opt{max}) {
+        $overflow += $up + $down;
+        return;
+    }
+    $entry //= $hosts{$ip} = [undef, 0, 0, 0, 0];
+    $entry->[UP] += $up;
+    $entry->[DOWN] += $down;
+    $entry->[UP_PKTS] += $up_pkts;
+    $entry->[DOWN_PKTS] += $down_pkts;
+}
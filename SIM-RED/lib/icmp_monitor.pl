@@ -0,0 +1,264 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Concurrent ICMP Latency Monitor
+# Sends one echo request per host every tick from a single socket and
+# matches the replies by identifier and sequence, so hundreds of hosts
+# are probed at once and a dead host never delays the others.
+# Per-host RTT, loss and jitter are kept in parallel arrays.
+#
+# Uses an unprivileged ICMP datagram socket (net.ipv4.ping_group_range)
+# and falls back to a raw socket (root or CAP_NET_RAW).
+#
+# Usage:
+#   icmp_monitor.pl [options] HOST...
+#
+# Output (one line per tick, hosts in argument order):
+#   READY MODE HOSTS                    once, MODE is dgram or raw
+#   TICK EPOCH RTT,LOSS,JITTER ...      RTT in ms, or "-" when the host
+#                                       is not answering, or "=" when no
+#                                       reply arrived since the last tick;
+#                                       LOSS in % of the last --window
+#                                       probes; JITTER in ms (RFC 3550)
+#
+# Options:
+#   --interval N     Seconds between ticks (default: 1)
+#   --timeout N      Seconds before a probe counts as lost (default: 2)
+#   --window N       Probes used for the loss percentage (default: 100)
+#   --count N        Stop after N ticks (default: 0, run until killed)
+#   --size N         Payload bytes (default: 16)
+
+use strict;
+use warnings;
+use Socket qw(AF_INET SOCK_DGRAM SOCK_RAW SOL_SOCKET SO_RCVBUF INADDR_ANY inet_aton pack_sockaddr_in unpack_sockaddr_in);
+use IO::Select;
+use Time::HiRes qw(time);
+
+use constant IPPROTO_ICMP => 1;
+use constant ICMP_ECHOREPLY => 0;
+use constant ICMP_ECHO => 8;
+
+my %opt = (
+    interval => 1,
+    timeout  => 2,
+    window   => 100,
+    count    => 0,
+    size     => 16,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+die "Usage: $0 [--interval N] [--timeout N] [--window N] [--count N] [--size N] HOST...\n"
+    unless @ARGV;
+die "--interval must be greater than 0\n" unless $opt{interval} > 0;
+
+# Per-host state, indexed like the arguments
+my @hosts = @ARGV;
+my @addr;          # packed IPv4 address (undef if it does not resolve)
+my @rtt;           # RTT of the newest reply (ms)
+my @fresh;         # a reply arrived since the last tick
+my @down;          # the newest probe that ended was lost
+my @jitter;        # smoothed RTT variation (ms)
+my @lossbits;      # bit string of the last --window probes (1 = lost)
+my @losspos;       # next bit to write
+my @lossfill;      # probes recorded, up to --window
+my @lost;          # lost probes among them
+
+for my $i (0 .. $#hosts) {
+    $addr[$i] = inet_aton($hosts[$i]);
+    warn "Cannot resolve $hosts[$i]\n" unless defined $addr[$i];
+    ($rtt[$i], $fresh[$i], $down[$i], $jitter[$i]) = (undef, 0, 0, 0);
+    ($lossbits[$i], $losspos[$i], $lossfill[$i], $lost[$i]) = ('', 0, 0, 0);
+}
+
+# Outstanding probes, indexed by sequence number
+my @pend_host;
+my @pend_time;
+my @rounds;        # [send time, first sequence, probes] of each tick
+my $seq = 0;
+
+my ($sock, $mode) = open_socket();
+die "Cannot open an ICMP socket (enable net.ipv4.ping_group_range or run as root)\n"
+    unless $sock;
+
+# Datagram sockets get their identifier from the kernel (the local port)
+my $ident = $mode eq 'dgram'
+    ? (unpack_sockaddr_in(getsockname($sock)))[0]
+    : $$ & 0xffff;
+
+# Every reply of a round arrives in one burst (raw sockets on the same
+# host also see the requests): room for a few KB per host, capped by
+# net.core.rmem_max
+setsockopt($sock, SOL_SOCKET, SO_RCVBUF, 4096 * @hosts) if 4096 * @hosts > 262144;
+
+my $payload = 'S' x $opt{size};
+my $select = IO::Select->new($sock);
+$| = 1;
+
+print "READY $mode ", scalar(@hosts), "\n";
+
+my $ticks = 0;
+my $next_tick = time();
+
+while (1) {
+    my $now = time();
+
+    if ($now >= $next_tick) {
+        expire_probes($now);
+        print_tick() if $ticks;
+        last if $opt{count} && $ticks >= $opt{count};
+        send_round($now);
+        $ticks++;
+
+        # Keep a fixed cadence; resynchronize if a tick overran
+        $next_tick += $opt{interval};
+        $next_tick = $now + $opt{interval} if $next_tick < $now;
+    }
+
+    my $wait = $next_tick - time();
+    receive_replies() if $select->can_read($wait > 0 ? $wait : 0);
+}
+
+exit 0;
+
+sub open_socket {
+    my $sock;
+    # Binding assigns the identifier now instead of on the first send
+    return ($sock, 'dgram') if socket($sock, AF_INET, SOCK_DGRAM, IPPROTO_ICMP)
+        && bind($sock, pack_sockaddr_in(0, INADDR_ANY));
+    return ($sock, 'raw') if socket($sock, AF_INET, SOCK_RAW, IPPROTO_ICMP);
+    return;
+}
+
+sub checksum {
+    my ($data) = @_;
+    $data .= "\0" if length($data) % 2;
+    my $sum = 0;
+    $sum += $_ for unpack('n*', $data);
+    $sum = ($sum >> 16) + ($sum & 0xffff) while $sum >> 16;
+    return ~$sum & 0xffff;
+}
+
+# One echo request to every host
+sub send_round {
+    my ($now) = @_;
+    my $first = $seq;
+    my $sent = 0;
+
+    for my $i (0 .. $#hosts) {
+        next unless defined $addr[$i];
+
+        my $packet = pack('CCnnn', ICMP_ECHO, 0, 0, $ident, $seq) . $payload;
+        substr($packet, 2, 2) = pack('n', checksum($packet));
+
+        $pend_host[$seq] = $i;
+        $pend_time[$seq] = time();
+        send($sock, $packet, 0, pack_sockaddr_in(0, $addr[$i]));
+
+        $seq = ($seq + 1) & 0xffff;
+        $sent++;
+
+        # Take early replies while sending so they are not timed late
+        receive_replies() unless $sent % 16;
+    }
+
+    push @rounds, [$now, $first, $sent];
+}
+
+# Read every reply waiting on the socket
+sub receive_replies {
+    while (1) {
+        my $from = recv($sock, my $packet, 1500, Socket::MSG_DONTWAIT());
+        last unless defined $from && length($packet);
+        my $now = time();
+
+        # Raw sockets also return the IP header
+        if ($mode eq 'raw') {
+            my $ihl = (ord($packet) & 0x0f) * 4;
+            next if length($packet) < $ihl + 8;
+            $packet = substr($packet, $ihl);
+        }
+
+        my ($type, $code, $sum, $id, $n) = unpack('CCnnn', $packet);
+        next unless $type == ICMP_ECHOREPLY && $id == $ident;
+
+        my $i = $pend_host[$n];
+        next unless defined $i && defined $pend_time[$n];
+
+        # The sequence must belong to the host that answered
+        my ($port, $ip) = unpack_sockaddr_in($from);
+        next unless $ip eq $addr[$i];
+
+        record_reply($i, ($now - $pend_time[$n]) * 1000);
+        undef $pend_time[$n];
+    }
+}
+
+sub record_reply {
+    my ($i, $ms) = @_;
+
+    # RFC 3550 interarrival jitter: J += (|D| - J) / 16
+    $jitter[$i] += (abs($ms - $rtt[$i]) - $jitter[$i]) / 16 if defined $rtt[$i];
+
+    $rtt[$i] = $ms;
+    $fresh[$i] = 1;
+    $down[$i] = 0;
+    record_probe($i, 0);
+}
+
+# Add one probe outcome to the loss window of a host
+sub record_probe {
+    my ($i, $lost) = @_;
+    my $pos = $losspos[$i];
+
+    if ($lossfill[$i] == $opt{window}) {
+        $lost[$i] -= vec($lossbits[$i], $pos, 1);
+    } else {
+        $lossfill[$i]++;
+    }
+
+    vec($lossbits[$i], $pos, 1) = $lost;
+    $lost[$i] += $lost;
+    $losspos[$i] = ($pos + 1) % $opt{window};
+}
+
+# Count the probes of finished rounds that never got a reply
+sub expire_probes {
+    my ($now) = @_;
+
+    while (@rounds && $rounds[0][0] + $opt{timeout} <= $now) {
+        my ($time, $first, $count) = @{ shift @rounds };
+
+        for my $k (0 .. $count - 1) {
+            my $n = ($first + $k) & 0xffff;
+            next unless defined $pend_time[$n];
+
+            my $i = $pend_host[$n];
+            undef $pend_time[$n];
+            $down[$i] = 1;
+            record_probe($i, 1);
+        }
+    }
+}
+
+sub print_tick {
+    my @fields;
+
+    for my $i (0 .. $#hosts) {
+        my $value;
+        if ($fresh[$i]) {
+            $value = sprintf('%.2f', $rtt[$i]);
+        } elsif ($down[$i] || !defined $addr[$i]) {
+            $value = '-';
+        } else {
+            $value = '=';
+        }
+
+        my $loss = $lossfill[$i] ? int($lost[$i] * 100 / $lossfill[$i] + 0.5) : 0;
+        push @fields, sprintf('%s,%d,%.2f', $value, $loss, $jitter[$i]);
+        $fresh[$i] = 0;
+    }
+
+    print 'TICK ', int(time()), ' ', join(' ', @fields), "\n";
+}
@@ -0,0 +1,325 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - File Integrity Monitor
+# Keeps a manifest with size, mtime, inode and sha256 of every file of the
+# install tree. A check only stats the files: a file is read and hashed
+# again only when its stat metadata no longer matches the manifest, so
+# checking the whole tree costs one stat per file. The watch mode gets
+# inotify events (inotifywait) and checks each file as soon as it changes.
+#
+# Usage:
+#   integrity.pl [options] check
+#       Compares the tree against the manifest, prints one line per
+#       problem and a summary:
+#         MODIFIED|PATH|SIZE|SHA256      content differs from the manifest
+#         MISSING|PATH                   file in the manifest is gone
+#         NEW|PATH|SIZE                  file not in the manifest yet
+#         SUMMARY|FILES|HASHED|MODIFIED|MISSING|NEW
+#   integrity.pl [options] update [PATH...]
+#       Accepts the current content of PATH (default: the whole tree)
+#       into the manifest. Prints UPDATED|PATH for every entry changed.
+#   integrity.pl [options] watch
+#       Prints the current problems and READY|MODE|FILES (MODE is inotify
+#       or poll), then the check lines as changes happen, plus
+#       RESTORED|PATH when a reported file matches the manifest again
+#       (content restored or accepted by update). Runs until killed.
+#       Refreshed metadata is kept in memory only.
+#   integrity.pl [options] list
+#       Prints PATH|SIZE|MTIME|INODE|SHA256 for every manifest entry
+#
+# Options:
+#   --manifest FILE  Manifest file (default: data/integrity.manifest)
+#   --paths LIST     Space-separated globs relative to the install
+#                    directory (default: "config/*.conf bin/*.sh lib/*")
+#   --legacy FILE    Single-digest file of the old hosts.conf check; seeds
+#                    the hosts.conf entry when there is no manifest yet.
+#                    The seed stays in memory: check does not save it, so
+#                    the manifest is first written by update, for the
+#                    whole tree
+#   --interval N     Seconds between full checks in watch mode (default: 2
+#                    when polling, 60 with inotify as a safety net)
+
+use strict;
+use warnings;
+use File::Basename qw(dirname);
+use File::Path qw(make_path);
+use Cwd qw(abs_path);
+use Fcntl qw(:flock);
+use Digest::SHA;
+use IO::Select;
+use Time::HiRes qw(time stat);
+
+my $script_dir = dirname(dirname(abs_path($0)));
+
+my %opt = (
+    manifest => "$script_dir/data/integrity.manifest",
+    paths    => 'config/*.conf bin/*.sh lib/*',
+    legacy   => '',
+    interval => 0,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+my $command = shift @ARGV || usage();
+my @patterns = split ' ', $opt{paths};
+
+# Manifest entries: PATH -> [SIZE, MTIME, INODE, SHA256]
+use constant { SIZE => 0, MTIME => 1, INODE => 2, SHA => 3 };
+my %manifest;
+my $dirty = 0;
+my $seeded = 0;    # %manifest holds only the legacy seed, no manifest file yet
+
+make_path(dirname($opt{manifest})) unless -d dirname($opt{manifest});
+open(my $lock, '>>', "$opt{manifest}.lock") or die "Cannot open lock file: $!\n";
+$| = 1;
+
+if ($command eq 'check') {
+    lock_manifest(LOCK_EX);
+    my %count = (files => 0, hashed => 0, MODIFIED => 0, MISSING => 0, NEW => 0);
+
+    foreach my $result (check_tree(\%count)) {
+        $count{$result->[0]}++;
+        print join('|', @$result), "\n";
+    }
+
+    print join('|', 'SUMMARY', @count{qw(files hashed MODIFIED MISSING NEW)}), "\n";
+    save_manifest() if $dirty && !$seeded;
+} elsif ($command eq 'update') {
+    lock_manifest(LOCK_EX);
+    my @paths = @ARGV ? @ARGV : (tree_files(), keys %manifest);
+    my %done;
+
+    foreach my $path (grep { !$done{$_}++ } @paths) {
+        my @st = stat("$script_dir/$path");
+        if (!@st || !-f _) {
+            print "UPDATED|$path\n" if delete $manifest{$path};
+            next;
+        }
+
+        my $entry = $manifest{$path};
+        next if $entry && stat_matches($entry, \@st);
+
+        my $sha = hash_file("$script_dir/$path") // next;
+        print "UPDATED|$path\n" unless $entry && $entry->[SHA] eq $sha;
+        $manifest{$path} = [$st[7], mtime(\@st), $st[1], $sha];
+    }
+    save_manifest();
+} elsif ($command eq 'watch') {
+    lock_manifest(LOCK_SH);
+    flock($lock, LOCK_UN);
+    watch();
+} elsif ($command eq 'list') {
+    lock_manifest(LOCK_SH);
+    foreach my $path (sort keys %manifest) {
+        print join('|', $path, @{$manifest{$path}}), "\n";
+    }
+} else {
+    usage();
+}
+
+exit 0;
+
+sub usage {
+    die "Usage: $0 [options] check|update|watch|list ...\n";
+}
+
+sub lock_manifest {
+    my ($mode) = @_;
+    flock($lock, $mode) or die "Cannot lock manifest: $!\n";
+    load_manifest();
+}
+
+# Files matched by the globs, relative to the install directory
+sub tree_files {
+    my %seen;
+    return grep { -f "$script_dir/$_" && !$seen{$_}++ }
+        map { substr($_, length($script_dir) + 1) } map { glob("$script_dir/$_") } @patterns;
+}
+
+sub hash_file {
+    my ($file) = @_;
+    open(my $fh, '<:raw', $file) or return undef;
+    my $sha = Digest::SHA->new(256)->addfile($fh)->hexdigest;
+    close($fh);
+    return $sha;
+}
+
+# Sub-second mtime, formatted so that it compares equal after a reload
+sub mtime {
+    my ($st) = @_;
+    return sprintf('%.6f', $st->[9]);
+}
+
+sub stat_matches {
+    my ($entry, $st) = @_;
+    return $entry->[SIZE] == $st->[7] && $entry->[MTIME] eq mtime($st) && $entry->[INODE] == $st->[1];
+}
+
+# Check one file against the manifest. Returns the problem line fields, or
+# nothing when the content still matches. Hashes only if the stat changed.
+sub check_file {
+    my ($path, $count) = @_;
+    my $entry = $manifest{$path};
+    my @st = stat("$script_dir/$path");
+
+    return $entry ? (['MISSING', $path]) : () unless @st && -f _;
+    return (['NEW', $path, $st[7]]) unless $entry;
+    return () if stat_matches($entry, \@st);
+
+    $count->{hashed}++ if $count;
+    my $sha = hash_file("$script_dir/$path") // return (['MISSING', $path]);
+    return (['MODIFIED', $path, $st[7], $sha]) if $sha ne $entry->[SHA];
+
+    # Same content (touched, copied back, restored by an editor): remember
+    # the new metadata so the next check does not read it again
+    @$entry[SIZE, MTIME, INODE] = ($st[7], mtime(\@st), $st[1]);
+    $dirty = 1;
+    return ();
+}
+
+sub check_tree {
+    my ($count) = @_;
+    my @files = tree_files();
+    my %seen = map { $_ => 1 } @files;
+    my @results;
+
+    $count->{files} = @files if $count;
+    foreach my $path (sort(@files), sort grep { !$seen{$_} } keys %manifest) {
+        push @results, check_file($path, $count);
+    }
+    return @results;
+}
+
+# Directories to watch and a regex for the files that belong to the tree
+sub watch_targets {
+    my (%dirs, @regex);
+    foreach my $pattern (@patterns) {
+        $dirs{dirname("$script_dir/$pattern")} = 1;
+        my $re = quotemeta($pattern);
+        $re =~ s/\\\*/[^\/]*/g;
+        $re =~ s/\\\?/[^\/]/g;
+        push @regex, $re;
+    }
+    my $match = join('|', @regex);
+    return ([grep { -d } sort keys %dirs], qr/^(?:$match)$/);
+}
+
+sub watch {
+    my ($dirs, $match) = watch_targets();
+    my %state;         # PATH -> last status printed (OK unless reported)
+    my $loaded_mtime = (stat $opt{manifest})[9] // 0;
+    my ($events, $mode, $buffer) = (undef, 'poll', '');
+
+    if (grep { -x "$_/inotifywait" } split /:/, $ENV{PATH} || '') {
+        # Editors replace files by rename, so the directories are watched
+        my $pid = open($events, '-|', 'inotifywait', '-m', '-q',
+            '-e', 'close_write,attrib,create,delete,moved_to,moved_from',
+            '--format', '%w%f', map { "$_/" } @$dirs);
+        $mode = 'inotify' if $pid;
+    }
+
+    my $interval = $opt{interval} || ($mode eq 'inotify' ? 60 : 2);
+    my $select = IO::Select->new();
+    $select->add($events) if $mode eq 'inotify';
+
+    # Print a file only when its status (or its modified content) changes
+    my $report = sub {
+        my ($path, @result) = @_;
+        my $status = !@result ? 'OK'
+            : $result[0][0] eq 'MODIFIED' ? "MODIFIED|$result[0][3]" : $result[0][0];
+        return if $status eq ($state{$path} // 'OK');
+
+        $state{$path} = $status;
+        print @result ? join('|', @{$result[0]}) : "RESTORED|$path", "\n";
+    };
+
+    # Current state first, so only new changes are reported afterwards
+    my %count;
+    $report->($_->[1], $_) foreach check_tree(\%count);
+    print "READY|$mode|$count{files}\n";
+
+    my $next_scan = time + $interval;
+    while (1) {
+        my $wait = $next_scan - time;
+        my @ready = $select->count ? $select->can_read($wait > 0 ? $wait : 0) : ();
+        select(undef, undef, undef, $wait) if !$select->count && $wait > 0;
+
+        if (@ready) {
+            my $n = sysread($events, $buffer, 65536, length $buffer);
+            die "inotifywait stopped\n" unless $n;
+
+            # Let a burst of events from one save settle before checking
+            my %changed;
+            while (1) {
+                while ($buffer =~ s/^([^\n]*)\n//) {
+                    my $path = $1;
+                    next unless substr($path, 0, length($script_dir) + 1) eq "$script_dir/";
+                    $path = substr($path, length($script_dir) + 1);
+                    $changed{$path} = 1 if $path =~ $match;
+                }
+                last unless $select->can_read(0.2);
+                sysread($events, $buffer, 65536, length $buffer) or last;
+            }
+
+            $report->($_, check_file($_)) foreach sort keys %changed;
+        }
+
+        # An update accepted new content: compare against it right away
+        my $manifest_mtime = (stat $opt{manifest})[9] // 0;
+        if ($manifest_mtime != $loaded_mtime) {
+            lock_manifest(LOCK_SH);
+            flock($lock, LOCK_UN);
+            $loaded_mtime = $manifest_mtime;
+            $next_scan = 0;
+        }
+
+        if (time >= $next_scan) {
+            my %seen;
+            foreach my $result (check_tree()) {
+                $seen{$result->[1]} = 1;
+                $report->($result->[1], $result);
+            }
+            $report->($_) foreach grep { !$seen{$_} && $state{$_} ne 'OK' } keys %state;
+            $next_scan = time + $interval;
+        }
+    }
+}
+
+# Manifest file: PATH|SIZE|MTIME|INODE|SHA256
+sub load_manifest {
+    %manifest = ();
+    $seeded = 0;
+
+    if (open(my $fh, '<', $opt{manifest})) {
+        while (my $line = <$fh>) {
+            chomp $line;
+            next if $line =~ /^#/ || $line !~ /\S/;
+            my ($path, @entry) = split /\|/, $line;
+            $manifest{$path} = \@entry if @entry == 4;
+        }
+        close($fh);
+    } elsif ($opt{legacy} && open(my $legacy, '<', $opt{legacy})) {
+        # Old single digest of hosts.conf: no metadata, so it is hashed once
+        my ($sha) = split ' ', <$legacy> // '';
+        close($legacy);
+        if ($sha && $sha =~ /^[0-9a-f]{64}$/) {
+            $manifest{'config/hosts.conf'} = [0, 0, 0, $sha];
+            $seeded = 1;
+        }
+    }
+}
+
+sub save_manifest {
+    my $file = $opt{manifest};
+
+    open(my $fh, '>', "$file.tmp") or die "Cannot write $file.tmp: $!\n";
+    print $fh "# SIM-RED integrity manifest: PATH|SIZE|MTIME|INODE|SHA256\n";
+    foreach my $path (sort keys %manifest) {
+        print $fh join('|', $path, @{$manifest{$path}}), "\n";
+    }
+    close($fh);
+    rename("$file.tmp", $file) or die "Cannot replace $file: $!\n";
+    $dirty = 0;
+}
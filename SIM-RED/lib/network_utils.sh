@@ -49,7 +49,35 @@ get_network_interface() {
 }
 
 # Read ARP table
+# SIMRED_ARP_SOURCE replaces every source with a file of IP|MAC lines
+# (synthetic networks for benchmarks, see simulador_red.py)
 get_arp_table() {
+    if [[ -n "$SIMRED_ARP_SOURCE" ]]; then
+        cat "$SIMRED_ARP_SOURCE"
+        return
+    fi
+    
+    # Warm snapshot from the collector daemon, if it is running
+    if collector_query get arp --max-age "$(( ${ARP_MONITOR_INTERVAL:-5} * 2 ))"; then
+        return 0
+    fi
+    
+    # Built-in sweeper: one AF_PACKET socket, rate-limited, with retries (root)
+    if [[ "${ARP_SWEEP_ENABLED:-yes}" == "yes" ]] && [[ $EUID -eq 0 ]] && command_exists perl; then
+        local swept=$(perl "${SCRIPT_DIR}/lib/arp_sweep.pl" \
+            --interface "$(get_network_interface)" \
+            --rate "${ARP_SWEEP_RATE:-1000}" \
+            --retries "${ARP_SWEEP_RETRIES:-1}" \
+            --wait "${ARP_SWEEP_WAIT:-1}" \
+            "$(get_local_subnet)" 2>/dev/null)
+        
+        # Nothing answered (wrong SUBNET or interface): try the other sources
+        if [[ -n "$swept" ]]; then
+            echo "$swept"
+            return 0
+        fi
+    fi
+    
     if command_exists arp-scan; then
         # Use arp-scan for more reliable results (requires root)
         local subnet=$(get_local_subnet)
@@ -194,19 +222,124 @@ is_authorized_mac() {
 }
 
 # Ping host and get latency
+# Optional third argument: deadline in seconds for the whole ping run
 ping_host() {
     local host="$1"
     local count="${2:-4}"
+    local deadline="$3"
     
     if ! command_exists ping; then
         echo "ERROR: ping command not found"
         return 1
     fi
     
+    local -a ping_opts=(-c "$count" -W 2)
+    if [[ -n "$deadline" ]]; then
+        ping_opts+=(-w "$deadline")
+    fi
+    
     # Ping and extract statistics
-    ping -c "$count" -W 2 "$host" 2>/dev/null | \
+    ping "${ping_opts[@]}" "$host" 2>/dev/null | \
         grep -E 'rtt min/avg/max/mdev' | \
-        awk -F'[=/]' '{print $2"|"$3"|"$4"|"$5}'
+        awk -F' = ' '{sub(/ ms.*/, "", $2); split($2, v, "/"); print v[1]"|"v[2]"|"v[3]"|"v[4]}'
+}
+
+# Measure latency for a single host
+# Output: IP|HOSTNAME|AVG|MIN|MAX|MDEV|STATUS
+probe_host_latency() {
+    local ip="$1"
+    local hostname="$2"
+    local count="${3:-10}"
+    local deadline="$4"
+    local log_file="$5"
+    
+    local result=$(ping_host "$ip" "$count" "$deadline")
+    
+    if [[ -n "$result" ]]; then
+        local min avg max mdev
+        IFS='|' read -r min avg max mdev <<< "$result"
+        
+        # Determine status
+        local status="OK"
+        local avg_int="${avg%%.*}"
+        
+        if [[ $avg_int -gt 100 ]]; then
+            status="HIGH"
+        elif [[ $avg_int -gt 50 ]]; then
+            status="MEDIUM"
+        fi
+        
+        echo "$ip|$hostname|$avg|$min|$max|$mdev|$status"
+        
+        if [[ -n "$log_file" ]]; then
+            log_message "INFO" "Latency for $ip ($hostname): avg=$avg ms" "$log_file"
+        fi
+    else
+        echo "$ip|$hostname|N/A|N/A|N/A|N/A|UNREACHABLE"
+        
+        if [[ -n "$log_file" ]]; then
+            log_message "WARNING" "Host unreachable: $ip ($hostname)" "$log_file"
+        fi
+    fi
+}
+
+# Probe many hosts concurrently with bounded parallelism
+# Input (stdin): IP|MAC|HOSTNAME|DESCRIPTION lines (hosts.conf format)
+# Output: IP|HOSTNAME|AVG|MIN|MAX|MDEV|STATUS rows, in input order
+# Each host gets at most LATENCY_HOST_TIMEOUT seconds and the whole sweep
+# never runs past LATENCY_SWEEP_DEADLINE seconds.
+probe_latency_batch() {
+    local count="${1:-${LATENCY_PING_COUNT:-10}}"
+    local log_file="$2"
+    local max_jobs="${LATENCY_PARALLEL_JOBS:-20}"
+    local host_timeout="${LATENCY_HOST_TIMEOUT:-15}"
+    local end_time=$((SECONDS + ${LATENCY_SWEEP_DEADLINE:-120}))
+    
+    ((max_jobs < 1)) && max_jobs=1
+    
+    local work_dir=$(mktemp -d)
+    local running=0
+    local index=0
+    local ip mac hostname desc slot remaining
+    
+    while IFS='|' read -r ip mac hostname desc; do
+        [[ -z "$ip" ]] && continue
+        
+        # One result file per host keeps the output in input order
+        printf -v slot '%s/%06d' "$work_dir" "$index"
+        ((index++))
+        
+        # Wait for a free slot
+        if ((running >= max_jobs)); then
+            wait -n
+            ((running--))
+        fi
+        
+        remaining=$((end_time - SECONDS))
+        
+        if ((remaining <= 0)); then
+            echo "$ip|$hostname|N/A|N/A|N/A|N/A|UNREACHABLE" > "$slot"
+            if [[ -n "$log_file" ]]; then
+                log_message "WARNING" "Latency probe skipped, sweep deadline reached: $ip ($hostname)" "$log_file"
+            fi
+            continue
+        fi
+        
+        ((remaining > host_timeout)) && remaining=$host_timeout
+        
+        probe_host_latency "$ip" "$hostname" "$count" "$remaining" "$log_file" \
+            > "$slot" < /dev/null &
+        ((running++))
+    done
+    
+    # Every probe is bounded by its own deadline
+    wait
+    
+    if ((index > 0)); then
+        cat "$work_dir"/*
+    fi
+    
+    rm -rf "$work_dir"
 }
 
 # Get TTL for host
@@ -228,4 +361,6 @@ export -f get_hostname_for_ip
 export -f is_authorized_ip
 export -f is_authorized_mac
 export -f ping_host
+export -f probe_host_latency
+export -f probe_latency_batch
 export -f get_ttl
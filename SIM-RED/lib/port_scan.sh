@@ -0,0 +1,238 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - Batched Port Scanner
+# Merges every target and port set into a few nmap runs and keeps the
+# results in a per-host port map shared by scan_ports.sh and detect_vpn.sh
+
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+source "${SCRIPT_DIR}/lib/common.sh"
+
+PORT_MAP_FILE="${SCRIPT_DIR}/data/port_map.dat"
+
+# Port map (filled by port_map_load)
+declare -gA PORT_MAP=()          # IP -> "PORT/PROTO/SERVICE ..." (open ports only)
+declare -gA PORT_MAP_TARGETS=()  # IP -> 1 for every host included in the scan
+PORT_MAP_PORTS=""                # Ports covered by the stored scan
+
+# Merge several comma-separated port lists, keeping the first occurrence
+merge_port_lists() {
+    local -A seen=()
+    local -a merged=()
+    local list port
+    
+    for list in "$@"; do
+        local IFS=','
+        for port in $list; do
+            port="${port//[[:space:]]/}"
+            [[ -z "$port" || -n "${seen[$port]}" ]] && continue
+            seen[$port]=1
+            merged+=("$port")
+        done
+    done
+    
+    local IFS=','
+    echo "${merged[*]}"
+}
+
+# Parse nmap grepable output (-oG) into IP|PORT|PROTO|SERVICE lines
+parse_nmap_grepable() {
+    awk -F'\t' '
+    /^Host: .*Ports: / {
+        split($1, host, " ")
+        for (i = 2; i <= NF; i++) {
+            if ($i !~ /^Ports: /) continue
+            sub(/^Ports: /, "", $i)
+            n = split($i, ports, ", ")
+            for (j = 1; j <= n; j++) {
+                split(ports[j], f, "/")
+                if (f[2] == "open") {
+                    print host[2] "|" f[1] "|" f[3] "|" (f[5] == "" ? "unknown" : f[5])
+                }
+            }
+        }
+    }'
+}
+
+# Run the batched scan
+# Targets: one IP per line in targets_file; results are written to PORT_MAP_FILE
+port_scan_run() {
+    local targets_file="$1"
+    local ports="$2"
+    local batch_size="${NMAP_BATCH_SIZE:-256}"
+    local max_batches="${NMAP_PARALLEL_BATCHES:-2}"
+    local speed="${NMAP_SPEED:--T4}"
+    
+    if ! command_exists nmap; then
+        print_error "nmap no está disponible"
+        return 1
+    fi
+    
+    ((batch_size < 1)) && batch_size=1
+    ((max_batches < 1)) && max_batches=1
+    
+    local work_dir=$(mktemp -d)
+    split -l "$batch_size" -d -a 4 "$targets_file" "${work_dir}/batch_"
+    
+    local running=0
+    local batch
+    
+    # Un proceso nmap por lote de hosts, con todos los puertos a la vez
+    for batch in "${work_dir}"/batch_*; do
+        [[ -f "$batch" ]] || continue
+        
+        if ((running >= max_batches)); then
+            wait -n
+            ((running--))
+        fi
+        
+        (
+            nmap -n -p "$ports" $speed --open --min-hostgroup "$batch_size" \
+                -iL "$batch" -oG - 2> "${batch}.err" | parse_nmap_grepable > "${batch}.out"
+            echo "${PIPESTATUS[0]}" > "${batch}.rc"
+        ) &
+        ((running++))
+    done
+    
+    wait
+    
+    # Un lote fallido o interrumpido no se guarda como "sin puertos abiertos":
+    # se conserva el mapa anterior
+    local rc
+    for batch in "${work_dir}"/batch_*; do
+        [[ "${batch##*/}" == *.* ]] && continue
+        rc=""
+        [[ -f "${batch}.rc" ]] && rc=$(< "${batch}.rc")
+        if [[ "$rc" != "0" ]]; then
+            print_error "nmap falló (código ${rc:-desconocido}): $(head -n 1 "${batch}.err" 2>/dev/null)"
+            rm -rf "$work_dir"
+            return 1
+        fi
+    done
+    
+    ensure_dir "$(dirname "$PORT_MAP_FILE")" || { rm -rf "$work_dir"; return 1; }
+    
+    {
+        echo "#PORTS=$ports"
+        echo "#TARGETS=$(tr '\n' ' ' < "$targets_file")"
+        cat "${work_dir}"/batch_*.out 2>/dev/null
+    } > "${PORT_MAP_FILE}.tmp" && mv -f "${PORT_MAP_FILE}.tmp" "$PORT_MAP_FILE"
+    
+    rm -rf "$work_dir"
+}
+
+# Load the stored port map into memory
+port_map_load() {
+    local ip port proto service
+    
+    PORT_MAP=()
+    PORT_MAP_TARGETS=()
+    PORT_MAP_PORTS=""
+    
+    [[ -f "$PORT_MAP_FILE" ]] || return 1
+    
+    while IFS='|' read -r ip port proto service; do
+        case "$ip" in
+            "#PORTS="*)
+                PORT_MAP_PORTS="${ip#\#PORTS=}"
+                ;;
+            "#TARGETS="*)
+                for ip in ${ip#\#TARGETS=}; do
+                    PORT_MAP_TARGETS[$ip]=1
+                done
+                ;;
+            *)
+                [[ -z "$ip" ]] && continue
+                PORT_MAP[$ip]="${PORT_MAP[$ip]:+${PORT_MAP[$ip]} }${port}/${proto}/${service}"
+                ;;
+        esac
+    done < "$PORT_MAP_FILE"
+    
+    return 0
+}
+
+# Check that the stored map is recent and covers the requested targets/ports
+port_map_is_fresh() {
+    local targets_file="$1"
+    local ports="$2"
+    local max_age="${PORT_MAP_MAX_AGE:-300}"
+    
+    [[ -f "$PORT_MAP_FILE" ]] || return 1
+    
+    local now mtime
+    printf -v now '%(%s)T' -1
+    mtime=$(stat -c %Y "$PORT_MAP_FILE" 2>/dev/null) || return 1
+    ((now - mtime <= max_age)) || return 1
+    
+    port_map_load || return 1
+    
+    local -A covered=()
+    local port ip
+    local IFS=','
+    for port in $PORT_MAP_PORTS; do
+        covered[$port]=1
+    done
+    for port in $ports; do
+        [[ -n "${covered[$port]}" ]] || return 1
+    done
+    
+    while read -r ip; do
+        [[ -z "$ip" || -n "${PORT_MAP_TARGETS[$ip]}" ]] || return 1
+    done < "$targets_file"
+    
+    return 0
+}
+
+# Make sure an up-to-date port map exists for every authorized host
+# The scan covers PORTS_TO_SCAN and VPN_PORTS together so every module
+# that needs port data can reuse the same result
+port_scan_ensure() {
+    local hosts_file="${1:-${SCRIPT_DIR}/config/hosts.conf}"
+    local default_ports=$(merge_port_lists "${PORTS_TO_SCAN:-22,80,443,3306,5432,8080}" \
+        "${VPN_PORTS:-1194,500,4500,1723}")
+    local ports=$(merge_port_lists "$default_ports" "$2")
+    
+    local targets_file=$(mktemp)
+    grep -v '^#' "$hosts_file" | grep -v '^[[:space:]]*$' | cut -d'|' -f1 > "$targets_file"
+    
+    if port_map_is_fresh "$targets_file" "$ports"; then
+        rm -f "$targets_file"
+        return 0
+    fi
+    
+    # The collector scans the authorized hosts on the default ports; let it
+    # refresh the shared map when that covers this request
+    if [[ "$hosts_file" == "${SCRIPT_DIR}/config/hosts.conf" && "$ports" == "$default_ports" ]] && \
+        collector_query refresh ports > /dev/null && port_map_is_fresh "$targets_file" "$ports"; then
+        rm -f "$targets_file"
+        return 0
+    fi
+    
+    port_scan_run "$targets_file" "$ports"
+    local status=$?
+    rm -f "$targets_file"
+    
+    port_map_load
+    return $status
+}
+
+# Print open ports of a host restricted to a port list
+# Output: PORT|PROTO|SERVICE lines
+port_map_lookup() {
+    local ip="$1"
+    local ports="$2"
+    local -A wanted=()
+    local entry port
+    
+    local IFS=','
+    for port in $ports; do
+        wanted[$port]=1
+    done
+    
+    IFS=' '
+    for entry in ${PORT_MAP[$ip]}; do
+        port="${entry%%/*}"
+        if [[ -z "$ports" ]] || [[ -n "${wanted[$port]}" ]]; then
+            echo "${entry//\//|}"
+        fi
+    done
+}
@@ -1,50 +1,411 @@
 #!/usr/bin/perl
 # SIM-RED EXTENDIDO - HTML Report Generator
 # Generates HTML reports from network monitoring data
+#
+# The data file is parsed and the report written in a single streaming
+# pass: each section is emitted as its lines are read, so memory use does
+# not grow with the number of devices or alerts. A JSON sidecar with the
+# same data is written in the same pass.
+#
+# Usage:
+#   report_generator.pl [options] <data_file> [output.html]
+#       The output defaults to report.html; "-" writes the HTML to stdout.
+#
+# Options:
+#   --page-size N    Rows shown per page in large sections (default: 100;
+#                    0 writes every row inline, e.g. for PDF conversion)
+#   --json FILE      JSON sidecar (default: output name with .json)
+#   --no-json        Do not write the JSON sidecar
 
 use strict;
 use warnings;
+use JSON::PP;
 use POSIX qw(strftime);
 
+my %opt = (
+    'page-size' => 100,
+    'json'      => undef,
+    'no-json'   => 0,
+);
+
+while (@ARGV && $ARGV[0] =~ /^--([\w-]+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = $1 eq 'no-json' ? 1 : shift @ARGV;
+}
+
 # Get report data file from command line
-my $data_file = $ARGV[0] || die "Usage: $0 <data_file>\n";
+my $data_file = $ARGV[0] || die "Usage: $0 [--page-size N] [--json FILE|--no-json] <data_file> [output_file]\n";
 my $output_file = $ARGV[1] || "report.html";
+my $page_size = $opt{'page-size'} =~ /^\d+$/ ? $opt{'page-size'} : 100;
+
+my $json_file = $opt{json};
+if (!defined $json_file && !$opt{'no-json'} && $output_file ne '-') {
+    ($json_file = $output_file) =~ s/\.html?$//;
+    $json_file .= '.json';
+}
+$json_file = undef if $opt{'no-json'};
+
+# Section layout: position in the page, title, table columns and the JSON
+# field of each column, the fields written as JSON numbers (null when the
+# collector had no value) and the line a
+# collector writes when it has nothing to report (shown in the HTML, left
+# out of the JSON). Sections without columns have their own renderer.
+# Sections are written in the order they appear in the data file; the
+# "order" keeps the page in the usual order (SUMMARY first, TIMINGS last).
+my %SECTIONS = (
+    SUMMARY  => { order => 1, title => '📊 Resumen Ejecutivo' },
+    DEVICES  => { order => 2, title => '💻 Dispositivos Conectados', paged => 1,
+                  columns => ['IP', 'MAC', 'Hostname', 'Estado'],
+                  fields  => [qw(ip mac hostname status)] },
+    SPOOFING => { order => 3, title => '🛡️ Detección de Suplantación',
+                  empty   => qr/^No se detectaron/ },
+    VPN      => { order => 4, title => '🔐 Detección de VPN/Proxy',
+                  columns => ['IP', 'Indicadores', 'Probabilidad'],
+                  fields  => [qw(ip indicators probability)] },
+    LATENCY  => { order => 5, title => '⚡ Latencia de Red',
+                  columns => ['Host', 'Mín (ms)', 'Promedio (ms)', 'Máx (ms)', 'Estado'],
+                  fields  => [qw(host min avg max status)],
+                  numeric => {min => 1, avg => 1, max => 1} },
+    TRAFFIC  => { order => 6, title => '📈 Tráfico de Red',
+                  columns => ['Interfaz', 'Subida', 'Bajada', 'Total'],
+                  fields  => [qw(interface upload download total)] },
+    PORTS    => { order => 7, title => '🔌 Puertos Abiertos', paged => 1,
+                  columns => ['Host', 'Puerto', 'Servicio', 'Estado'],
+                  fields  => [qw(host port service status)],
+                  numeric => {port => 1} },
+    ALERTS   => { order => 8, title => '🚨 Alertas Recientes', paged => 1,
+                  empty   => qr/^Sin alertas recientes$/ },
+    TIMINGS  => { order => 9, title => '⏱️ Tiempos de Recopilación',
+                  columns => ['Etapa', 'Tiempo (s)', 'Estado'],
+                  fields  => [qw(stage seconds status)],
+                  numeric => {seconds => 1} },
+);
+
+# Cells of a table row: [text, class]; an empty list skips the line
+my %ROW_CELLS = (
+    DEVICES => sub {
+        my ($ip, $mac, $hostname, $status) = @_;
+        return ([$ip], [$mac], [$hostname], [$status, status_class($status, 'OK', 'WARNING')]);
+    },
+    LATENCY => sub {
+        my ($host, $min, $avg, $max, $status) = @_;
+        
+        # Ensure numeric values for comparison (avoid "max" string errors)
+        $min = 0 unless defined $min && $min =~ /^\d+\.?\d*$/;
+        $avg = 0 unless defined $avg && $avg =~ /^\d+\.?\d*$/;
+        $max = 0 unless defined $max && $max =~ /^\d+\.?\d*$/;
+        
+        my $status_class = $avg < 50 ? 'status-ok' :
+                          $avg < 100 ? 'status-warning' : 'status-error';
+        return ([$host], [$min], [$avg, $status_class], [$max], [$status, $status_class]);
+    },
+    PORTS => sub {
+        my ($host, $port, $service, $status) = @_;
+        return ([$host], [$port], [$service], [$status, status_class($status, 'ESPERADO')]);
+    },
+    TIMINGS => sub {
+        my ($stage, $seconds, $status) = @_;
+        return () unless defined $status;
+        return ([$stage], [$seconds], [$status, status_class($status, 'OK')]);
+    },
+);
+
+my $json = JSON::PP->new->canonical;
+my $NUMBER = qr/^-?(?:0|[1-9]\d*)(?:\.\d+)?$/;    # valid as a JSON number
+my $timestamp = strftime("%Y-%m-%d %H:%M:%S", localtime);
+
+# Open outputs (written to temporary files and renamed when complete)
+my ($out, $json_out);
+if ($output_file eq '-') {
+    $out = \*STDOUT;
+} else {
+    open($out, '>', "$output_file.tmp") or die "Cannot write to $output_file: $!\n";
+}
+binmode($out, ':raw');
+
+if (defined $json_file) {
+    open($json_out, '>', "$json_file.tmp") or die "Cannot write to $json_file: $!\n";
+    print $json_out '{"generated":', json_str($timestamp),
+        ',"source":', json_str($data_file), ',"sections":{';
+}
 
-# Read data file
 open(my $fh, '<', $data_file) or die "Cannot open $data_file: $!\n";
-my @lines = <$fh>;
-close($fh);
 
-# Parse data sections
-my %data;
-my $current_section = '';
+print $out html_head($timestamp);
 
-foreach my $line (@lines) {
+# Parse and emit sections on the fly
+my $current;         # state of the open section
+my %seen;            # section name -> occurrences
+my %counts;          # JSON key -> rows
+my $paged_sections = 0;
+my $first_section = 1;
+
+while (my $line = <$fh>) {
     chomp $line;
     
     if ($line =~ /^\[(\w+)\]$/) {
-        $current_section = $1;
-        $data{$current_section} = [];
-    } elsif ($current_section && $line =~ /\S/) {
-        push @{$data{$current_section}}, $line;
+        section_end($current) if $current;
+        $current = section_begin($1);
+    } elsif ($current && $line =~ /\S/) {
+        section_line($current, $line);
+    }
+}
+section_end($current) if $current;
+close($fh);
+
+print $out html_foot($paged_sections);
+
+if ($json_out) {
+    print $json_out '},"counts":', $json->encode(\%counts), "}\n";
+    close($json_out) or die "Cannot write to $json_file: $!\n";
+    rename("$json_file.tmp", $json_file) or die "Cannot rename $json_file.tmp: $!\n";
+}
+
+if ($output_file ne '-') {
+    close($out) or die "Cannot write to $output_file: $!\n";
+    rename("$output_file.tmp", $output_file) or die "Cannot rename $output_file.tmp: $!\n";
+    print "HTML report generated: $output_file\n";
+    print "JSON data generated: $json_file\n" if defined $json_file;
+}
+
+# ========== STREAMING ==========
+
+sub esc {
+    my ($text) = @_;
+    return '' unless defined $text;
+    return $text unless $text =~ /[&<>"]/;
+    $text =~ s/&/&amp;/g;
+    $text =~ s/</&lt;/g;
+    $text =~ s/>/&gt;/g;
+    $text =~ s/"/&quot;/g;
+    return $text;
+}
+
+# JSON string; the rows are flat records of strings and numbers, written
+# by hand to avoid JSON::PP's per-value overhead on large sections
+sub json_str {
+    my ($text) = @_;
+    return '""' unless defined $text;
+    if ($text =~ /["\\\x00-\x1f]/) {
+        $text =~ s/(["\\])/\\$1/g;
+        $text =~ s/([\x00-\x1f])/sprintf('\\u%04x', ord($1))/ge;
     }
+    return qq{"$text"};
 }
 
-# Generate HTML
-my $html = generate_html(\%data);
+# Value of a JSON number field: the number, or null (N/A, empty...)
+sub json_number {
+    my ($value) = @_;
+    return defined $value && $value =~ $NUMBER ? $value : 'null';
+}
 
-# Write output
-open(my $out, '>', $output_file) or die "Cannot write to $output_file: $!\n";
-print $out $html;
-close($out);
+# JSON object from (key, value) pairs, keys already in JSON order; the
+# fields in %$numeric are written as numbers
+sub json_record {
+    my ($numeric, @pairs) = @_;
+    my @members;
+    while (my ($key, $value) = splice(@pairs, 0, 2)) {
+        push @members, qq{"$key":} . ($numeric && $numeric->{$key} ? json_number($value) : json_str($value));
+    }
+    return '{' . join(',', @members) . '}';
+}
 
-print "HTML report generated: $output_file\n";
+sub status_class {
+    my ($status, $ok, $warning) = @_;
+    $status = '' unless defined $status;
+    return 'status-ok' if $status eq $ok;
+    return 'status-warning' if !defined $warning || $status eq $warning;
+    return 'status-error';
+}
 
-# HTML generation function
-sub generate_html {
-    my ($data) = @_;
+# Start a section: HTML header and JSON key
+sub section_begin {
+    my ($name) = @_;
+    my $layout = $SECTIONS{$name} || {};
+    
+    # A repeated section gets its own JSON key (NAME_2, NAME_3...)
+    my $key = $seen{$name}++ ? "${name}_$seen{$name}" : $name;
+    
+    my $s = {
+        name   => $name,
+        key    => $key,
+        layout => $layout,
+        rows   => 0,
+        items  => 0,
+        known  => exists $SECTIONS{$name},
+    };
+    
+    if ($json_out) {
+        print $json_out ',' unless $first_section;
+        print $json_out json_str($key), ':', ($name eq 'SUMMARY' ? '{' : '[');
+    }
+    $first_section = 0;
+    
+    return $s unless $s->{known};
     
-    my $timestamp = strftime("%Y-%m-%d %H:%M:%S", localtime);
+    print $out qq{            <div class="section" style="order: $layout->{order}">\n};
+    print $out qq{                <h2>$layout->{title}</h2>\n};
+    
+    if ($layout->{paged}) {
+        $paged_sections++;
+        print $out qq{                <details class="paged" open>\n};
+        print $out qq{                    <summary>Mostrar / ocultar</summary>\n};
+    }
+    
+    if ($layout->{columns}) {
+        my $head = join('', map { "\n                            <th>" . esc($_) . "</th>" } @{$layout->{columns}});
+        print $out <<HTML;
+                <table>
+                    <thead>
+                        <tr>$head
+                        </tr>
+                    </thead>
+                    <tbody class="rows">
+HTML
+        $s->{close_rows} = "                    </tbody>\n";
+        $s->{close_block} = "                </table>\n";
+    } elsif ($name eq 'SUMMARY') {
+        print $out qq{                <div class="stats">\n};
+        $s->{close_rows} = "                </div>\n";
+    } elsif ($name eq 'ALERTS') {
+        print $out qq{                <div class="rows">\n};
+        $s->{close_rows} = "                </div>\n";
+    }
+    
+    return $s;
+}
+
+# One data line of the open section
+sub section_line {
+    my ($s, $line) = @_;
+    my $name = $s->{name};
+    my $layout = $s->{layout};
+    my $to_json = $json_out && !($layout->{empty} && $line =~ $layout->{empty});
+    
+    if ($name eq 'SUMMARY') {
+        return unless $line =~ /^(.+?):\s*(.+)$/;
+        my ($label, $value) = ($1, $2);
+        json_item($s, json_str($label) . ':' . ($value =~ $NUMBER ? $value : json_str($value))) if $to_json;
+        emit_row($s, "                    <div class=\"stat-card\">\n"
+                   . "                        <h3>" . esc($value) . "</h3>\n"
+                   . "                        <p>" . esc($label) . "</p>\n"
+                   . "                    </div>\n");
+    } elsif ($name eq 'SPOOFING') {
+        json_item($s, json_str($line)) if $to_json;
+        
+        # The first line tells whether anything was found
+        if ($s->{rows} == 0) {
+            $s->{clean} = $line =~ /No se detectaron/;
+            print $out $s->{clean} ? <<'HTML' : <<'HTML';
+                <div class="alert alert-success">
+                    ✓ No se detectaron intentos de suplantación de IP o MAC
+                </div>
+HTML
+                <div class="alert alert-danger">
+                    ⚠️ Se detectaron posibles intentos de suplantación:
+                </div>
+                <pre>
+HTML
+            $s->{close_rows} = "                </pre>\n" unless $s->{clean};
+        }
+        $s->{rows}++;
+        print $out esc($line), "\n" unless $s->{clean};
+    } elsif ($name eq 'ALERTS') {
+        if ($to_json) {
+            my @alert = $line =~ /^\[([^\]]+)\] \[([A-Z]+)\] ?(.*)$/ ?
+                (level => $2, message => $3, time => $1) : (message => $line);
+            json_item($s, json_record(undef, @alert));
+        }
+        
+        my $alert_class = $line =~ /ERROR|CRITICAL/i ? 'alert-danger' :
+                         $line =~ /WARNING/i ? 'alert-warning' : 'alert-success';
+        emit_row($s, "                <div class=\"alert $alert_class\">\n"
+                   . "                    " . esc($line) . "\n"
+                   . "                </div>\n");
+    } elsif ($layout->{columns}) {
+        my @values = split(/\|/, $line);
+        my @cells = $ROW_CELLS{$name} ? $ROW_CELLS{$name}->(@values) : map { [$_] } @values[0 .. $#{$layout->{columns}}];
+        return unless @cells;
+        
+        if ($to_json) {
+            my $fields = $layout->{fields};
+            json_item($s, json_record($layout->{numeric},
+                map { ($fields->[$_], $values[$_]) } 0 .. $#$fields));
+        }
+        
+        my $row = "                        <tr>\n";
+        foreach my $cell (@cells) {
+            my $class = $cell->[1] ? qq{ class="$cell->[1]"} : '';
+            $row .= "                            <td$class>" . esc($cell->[0]) . "</td>\n";
+        }
+        emit_row($s, $row . "                        </tr>\n");
+    } else {
+        # Unknown section: kept in the JSON only
+        json_item($s, json_str($line)) if $to_json;
+        $s->{rows}++;
+    }
+}
+
+# Write a row; past the first page of a large section, rows go into inert
+# <template> pages that the browser neither lays out nor renders until the
+# reader scrolls to them
+sub emit_row {
+    my ($s, $html) = @_;
+    my $n = $s->{rows}++;
+    
+    if ($s->{layout}{paged} && $page_size && $n > 0 && $n % $page_size == 0) {
+        print $out $n == $page_size ? $s->{close_rows} : "                    </template>\n";
+        print $out qq{                    <template class="page">\n};
+    }
+    print $out $html;
+}
+
+sub json_item {
+    my ($s, $item) = @_;
+    print $json_out ',' if $s->{items}++;
+    print $json_out $item;
+}
+
+# Close a section: rows, pager and JSON value
+sub section_end {
+    my ($s) = @_;
+    my $layout = $s->{layout};
+    
+    $counts{$s->{key}} = $s->{items};
+    print $json_out ($s->{name} eq 'SUMMARY' ? '}' : ']') if $json_out;
+    return unless $s->{known};
+    
+    if ($s->{name} eq 'SPOOFING' && $s->{rows} == 0) {
+        print $out <<'HTML';
+                <div class="alert alert-success">
+                    ✓ No se detectaron intentos de suplantación de IP o MAC
+                </div>
+HTML
+    }
+    
+    if ($layout->{paged} && $page_size && $s->{rows} > $page_size) {
+        print $out "                    </template>\n";
+    } elsif ($s->{close_rows}) {
+        print $out $s->{close_rows};
+    }
+    print $out $s->{close_block} if $s->{close_block};
+    
+    if ($layout->{paged}) {
+        my $pages = $page_size ? int(($s->{rows} + $page_size - 1) / $page_size) : 1;
+        print $out qq{                    <p class="row-count">$s->{rows} registros};
+        print $out qq{ en $pages páginas de $page_size} if $pages > 1;
+        print $out "</p>\n";
+        print $out qq{                    <button type="button" class="more">Cargar más</button>\n} if $pages > 1;
+        print $out "                </details>\n";
+    }
+    
+    print $out "            </div>\n";
+}
+
+# ========== PAGE ==========
+
+sub html_head {
+    my ($timestamp) = @_;
     
     my $html = <<'HTML';
 <!DOCTYPE html>
@@ -95,6 +456,8 @@ sub generate_html {
         
         .content {
             padding: 30px;
+            display: flex;
+            flex-direction: column;
         }
         
         .section {
@@ -208,6 +571,28 @@ sub generate_html {
             margin-top: 30px;
         }
         
+        .paged summary {
+            cursor: pointer;
+            color: #667eea;
+            font-weight: 600;
+            margin-bottom: 10px;
+        }
+        
+        .row-count {
+            margin-top: 10px;
+            color: #666;
+        }
+        
+        .more {
+            margin-top: 10px;
+            padding: 8px 20px;
+            border: none;
+            border-radius: 5px;
+            background: #667eea;
+            color: white;
+            cursor: pointer;
+        }
+        
         pre {
             background: #f4f4f4;
             padding: 15px;
@@ -231,40 +616,13 @@ HTML
         <div class="content">
 HTML
 
-    # Add sections based on data
-    if (exists $data->{SUMMARY}) {
-        $html .= generate_summary_section($data->{SUMMARY});
-    }
-    
-    if (exists $data->{DEVICES}) {
-        $html .= generate_devices_section($data->{DEVICES});
-    }
-    
-    if (exists $data->{SPOOFING}) {
-        $html .= generate_spoofing_section($data->{SPOOFING});
-    }
-    
-    if (exists $data->{VPN}) {
-        $html .= generate_vpn_section($data->{VPN});
-    }
-    
-    if (exists $data->{LATENCY}) {
-        $html .= generate_latency_section($data->{LATENCY});
-    }
-    
-    if (exists $data->{TRAFFIC}) {
-        $html .= generate_traffic_section($data->{TRAFFIC});
-    }
-    
-    if (exists $data->{PORTS}) {
-        $html .= generate_ports_section($data->{PORTS});
-    }
-    
-    if (exists $data->{ALERTS}) {
-        $html .= generate_alerts_section($data->{ALERTS});
-    }
+    return $html;
+}
 
-    $html .= <<'HTML';
+sub html_foot {
+    my ($paged_sections) = @_;
+    
+    my $html = <<'HTML';
         </div>
         
         <footer>
@@ -272,303 +630,40 @@ HTML
             <p>Generado automáticamente por report_generator.pl</p>
         </footer>
     </div>
-</body>
-</html>
-HTML
-
-    return $html;
-}
-
-sub generate_summary_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>📊 Resumen Ejecutivo</h2>
-                <div class="stats">
-HTML
-    
-    foreach my $line (@$data) {
-        if ($line =~ /^(.+?):\s*(.+)$/) {
-            my ($label, $value) = ($1, $2);
-            $html .= <<HTML;
-                    <div class="stat-card">
-                        <h3>$value</h3>
-                        <p>$label</p>
-                    </div>
-HTML
-        }
-    }
-    
-    $html .= <<'HTML';
-                </div>
-            </div>
 HTML
-    
-    return $html;
-}
 
-sub generate_devices_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>💻 Dispositivos Conectados</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>IP</th>
-                            <th>MAC</th>
-                            <th>Hostname</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-HTML
-    
-    foreach my $line (@$data) {
-        my ($ip, $mac, $hostname, $status) = split(/\|/, $line);
-        my $status_class = $status eq 'OK' ? 'status-ok' : 
-                          $status eq 'WARNING' ? 'status-warning' : 'status-error';
-        
-        $html .= <<HTML;
-                        <tr>
-                            <td>$ip</td>
-                            <td>$mac</td>
-                            <td>$hostname</td>
-                            <td class="$status_class">$status</td>
-                        </tr>
-HTML
-    }
-    
-    $html .= <<'HTML';
-                    </tbody>
-                </table>
-            </div>
-HTML
-    
-    return $html;
-}
-
-sub generate_spoofing_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>🛡️ Detección de Suplantación</h2>
-HTML
-    
-    if (@$data == 0 || $data->[0] =~ /No se detectaron/) {
-        $html .= <<'HTML';
-                <div class="alert alert-success">
-                    ✓ No se detectaron intentos de suplantación de IP o MAC
-                </div>
-HTML
-    } else {
-        $html .= <<'HTML';
-                <div class="alert alert-danger">
-                    ⚠️ Se detectaron posibles intentos de suplantación:
-                </div>
-                <pre>
+    # Load the next page of a large section when its button scrolls into
+    # view (or is clicked)
+    $html .= <<'HTML' if $paged_sections;
+    <script>
+        document.querySelectorAll('.paged').forEach(function (section) {
+            var rows = section.querySelector('.rows');
+            var pages = Array.prototype.slice.call(section.querySelectorAll('template.page'));
+            var more = section.querySelector('.more');
+            if (!more) return;
+            
+            function next() {
+                var page = pages.shift();
+                if (page) rows.appendChild(page.content);
+                if (!pages.length) {
+                    more.hidden = true;
+                    if (observer) observer.disconnect();
+                }
+            }
+            
+            var observer = 'IntersectionObserver' in window ? new IntersectionObserver(function (entries) {
+                if (entries[0].isIntersecting && section.open) next();
+            }, { rootMargin: '400px' }) : null;
+            if (observer) observer.observe(more);
+            more.addEventListener('click', next);
+        });
+    </script>
 HTML
-        foreach my $line (@$data) {
-            $html .= "$line\n";
-        }
-        $html .= <<'HTML';
-                </pre>
-HTML
-    }
-    
-    $html .= "            </div>\n";
-    return $html;
-}
 
-sub generate_vpn_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>🔐 Detección de VPN/Proxy</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>IP</th>
-                            <th>Indicadores</th>
-                            <th>Probabilidad</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-HTML
-    
-    foreach my $line (@$data) {
-        my ($ip, $indicators, $probability) = split(/\|/, $line);
-        $html .= <<HTML;
-                        <tr>
-                            <td>$ip</td>
-                            <td>$indicators</td>
-                            <td>$probability</td>
-                        </tr>
-HTML
-    }
-    
     $html .= <<'HTML';
-                    </tbody>
-                </table>
-            </div>
-HTML
-    
-    return $html;
-}
-
-sub generate_latency_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>⚡ Latencia de Red</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Host</th>
-                            <th>Mín (ms)</th>
-                            <th>Promedio (ms)</th>
-                            <th>Máx (ms)</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-HTML
-    
-    foreach my $line (@$data) {
-        my ($host, $min, $avg, $max, $status) = split(/\|/, $line);
-        
-        # Ensure numeric values for comparison (avoid "max" string errors)
-        $min = ($min =~ /^\d+\.?\d*$/) ? $min : 0;
-        $avg = ($avg =~ /^\d+\.?\d*$/) ? $avg : 0;
-        $max = ($max =~ /^\d+\.?\d*$/) ? $max : 0;
-        
-        my $status_class = $avg < 50 ? 'status-ok' : 
-                          $avg < 100 ? 'status-warning' : 'status-error';
-        
-        $html .= <<HTML;
-                        <tr>
-                            <td>$host</td>
-                            <td>$min</td>
-                            <td class="$status_class">$avg</td>
-                            <td>$max</td>
-                            <td class="$status_class">$status</td>
-                        </tr>
-HTML
-    }
-    
-    $html .= <<'HTML';
-                    </tbody>
-                </table>
-            </div>
-HTML
-    
-    return $html;
-}
-
-sub generate_traffic_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>📈 Tráfico de Red</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Interfaz</th>
-                            <th>Subida</th>
-                            <th>Bajada</th>
-                            <th>Total</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-HTML
-    
-    foreach my $line (@$data) {
-        my ($iface, $upload, $download, $total) = split(/\|/, $line);
-        $html .= <<HTML;
-                        <tr>
-                            <td>$iface</td>
-                            <td>$upload</td>
-                            <td>$download</td>
-                            <td>$total</td>
-                        </tr>
-HTML
-    }
-    
-    $html .= <<'HTML';
-                    </tbody>
-                </table>
-            </div>
-HTML
-    
-    return $html;
-}
-
-sub generate_ports_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>🔌 Puertos Abiertos</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Host</th>
-                            <th>Puerto</th>
-                            <th>Servicio</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-HTML
-    
-    foreach my $line (@$data) {
-        my ($host, $port, $service, $status) = split(/\|/, $line);
-        my $status_class = $status eq 'ESPERADO' ? 'status-ok' : 'status-warning';
-        
-        $html .= <<HTML;
-                        <tr>
-                            <td>$host</td>
-                            <td>$port</td>
-                            <td>$service</td>
-                            <td class="$status_class">$status</td>
-                        </tr>
-HTML
-    }
-    
-    $html .= <<'HTML';
-                    </tbody>
-                </table>
-            </div>
+</body>
+</html>
 HTML
-    
-    return $html;
-}
 
-sub generate_alerts_section {
-    my ($data) = @_;
-    
-    my $html = <<'HTML';
-            <div class="section">
-                <h2>🚨 Alertas Recientes</h2>
-HTML
-    
-    foreach my $line (@$data) {
-        my $alert_class = $line =~ /ERROR|CRITICAL/i ? 'alert-danger' :
-                         $line =~ /WARNING/i ? 'alert-warning' : 'alert-success';
-        
-        $html .= <<HTML;
-                <div class="alert $alert_class">
-                    $line
-                </div>
-HTML
-    }
-    
-    $html .= "            </div>\n";
     return $html;
 }
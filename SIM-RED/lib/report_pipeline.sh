@@ -0,0 +1,199 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - Report Collection Pipeline
+# Runs the report collectors as concurrent stages that share one ARP
+# snapshot, with a timeout per stage and the wall time of each stage
+
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+source "${SCRIPT_DIR}/lib/common.sh"
+source "${SCRIPT_DIR}/lib/network_utils.sh"
+source "${SCRIPT_DIR}/lib/host_registry.sh"
+
+REPORT_PIPELINE_LIB="${BASH_SOURCE[0]}"
+REPORT_STAGE_DIR=""
+
+# Start a stage in the background
+# Usage: report_stage_start NAME TIMEOUT FUNCTION [ARGS...]
+# Output goes to REPORT_STAGE_DIR/NAME.out as it is produced, so a stage
+# that times out still leaves its partial result behind
+report_stage_start() {
+    local name="$1"
+    local limit="$2"
+    shift 2
+    
+    (
+        local start="${EPOCHREALTIME/[.,]/}"
+        
+        # timeout signals the whole process group (ping, arp-scan, ...)
+        timeout --kill-after=2 "$limit" bash -c \
+            'source "$0"; "$@"' "$REPORT_PIPELINE_LIB" "$@" \
+            > "${REPORT_STAGE_DIR}/${name}.out" 2>/dev/null < /dev/null
+        local rc=$?
+        
+        local elapsed=$(( ${EPOCHREALTIME/[.,]/} - start ))
+        local status="OK"
+        
+        if ((rc == 124 || rc == 137)); then
+            status="TIMEOUT"
+        elif ((rc != 0)); then
+            status="FAILED"
+        fi
+        
+        printf '%s|%d.%03d|%s\n' "$name" $((elapsed / 1000000)) $((elapsed % 1000000 / 1000)) \
+            "$status" > "${REPORT_STAGE_DIR}/${name}.time"
+    ) &
+}
+
+# Collect every report section
+# Output: .dat sections in a fixed order followed by [TIMINGS]
+# (STAGE|SECONDS|STATUS, with STATUS OK, TIMEOUT or FAILED)
+report_collect_all() {
+    local stage_timeout="${REPORT_STAGE_TIMEOUT:-60}"
+    local log_file="${1:-${SCRIPT_DIR}/logs/system.log}"
+    local stage
+    
+    REPORT_STAGE_DIR=$(mktemp -d)
+    export REPORT_STAGE_DIR
+    export REPORT_ARP_SNAPSHOT="${REPORT_STAGE_DIR}/arp.out"
+    
+    local start="${EPOCHREALTIME/[.,]/}"
+    
+    # One ARP snapshot (a single arp-scan) shared by every stage
+    report_stage_start arp "$stage_timeout" get_arp_table
+    
+    # The latency probe does not need ARP data: it runs alongside the scan
+    report_stage_start performance "$stage_timeout" collect_performance_data "$stage_timeout"
+    wait
+    
+    # Scan cut off before producing output: fall back to the kernel table
+    if [[ ! -s "$REPORT_ARP_SNAPSHOT" ]] && [[ -r /proc/net/arp ]]; then
+        awk 'NR > 1 && $3 != "0x0" && $4 != "00:00:00:00:00:00" {print $1 "|" $4}' \
+            /proc/net/arp > "$REPORT_ARP_SNAPSHOT"
+    fi
+    
+    report_stage_start devices "$stage_timeout" collect_device_data
+    report_stage_start security "$stage_timeout" collect_security_data
+    wait
+    
+    local elapsed=$(( ${EPOCHREALTIME/[.,]/} - start ))
+    
+    for stage in devices security performance; do
+        cat "${REPORT_STAGE_DIR}/${stage}.out" 2>/dev/null
+    done
+    
+    echo ""
+    echo "[TIMINGS]"
+    for stage in arp devices security performance; do
+        if [[ -f "${REPORT_STAGE_DIR}/${stage}.time" ]]; then
+            cat "${REPORT_STAGE_DIR}/${stage}.time"
+            
+            if [[ "$(cut -d'|' -f3 "${REPORT_STAGE_DIR}/${stage}.time")" != "OK" ]]; then
+                log_message "WARNING" "Report stage '$stage' did not finish, using partial data" "$log_file"
+            fi
+        fi
+    done
+    printf 'total|%d.%03d|OK\n' $((elapsed / 1000000)) $((elapsed % 1000000 / 1000))
+    
+    rm -rf "$REPORT_STAGE_DIR"
+}
+
+# Device inventory from the shared ARP snapshot
+collect_device_data() {
+    echo "[SUMMARY]"
+    
+    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
+    registry_load "$hosts_file"
+    
+    echo "Total Hosts Autorizados: ${#REG_HOST_ORDER[@]}"
+    
+    local -a arp_lines=()
+    [[ -f "$REPORT_ARP_SNAPSHOT" ]] && mapfile -t arp_lines < "$REPORT_ARP_SNAPSHOT"
+    echo "Dispositivos Conectados: ${#arp_lines[@]}"
+    
+    echo ""
+    echo "[DEVICES]"
+    
+    local line ip mac hostname
+    for line in "${arp_lines[@]}"; do
+        IFS='|' read -r ip mac <<< "$line"
+        hostname="${REG_HOST_NAME[$ip]}"
+        
+        if [[ -z "$hostname" ]]; then
+            echo "$ip|$mac|Desconocido|WARNING"
+        else
+            echo "$ip|$mac|$hostname|OK"
+        fi
+    done
+}
+
+# Duplicate IP/MAC check and recent alerts
+collect_security_data() {
+    echo ""
+    echo "[SPOOFING]"
+    
+    # Simplified spoofing check on the shared snapshot
+    awk -F'|' '
+    {
+        ip_count[$1]++
+        mac_count[$2]++
+    }
+    END {
+        found = 0
+        for (ip in ip_count) {
+            if (ip_count[ip] > 1) {
+                print "IP duplicada: " ip
+                found = 1
+            }
+        }
+        for (mac in mac_count) {
+            if (mac_count[mac] > 1) {
+                print "MAC duplicada: " mac
+                found = 1
+            }
+        }
+        if (found == 0) {
+            print "No se detectaron anomalías"
+        }
+    }' "${REPORT_ARP_SNAPSHOT:-/dev/null}" 2>/dev/null
+    
+    echo ""
+    echo "[ALERTS]"
+    
+    # Recent alerts from the logs
+    if [[ -f "${SCRIPT_DIR}/logs/spoofing.log" ]]; then
+        tail -10 "${SCRIPT_DIR}/logs/spoofing.log" | grep "ALERT" || echo "Sin alertas recientes"
+    else
+        echo "Sin alertas recientes"
+    fi
+}
+
+# Latency of the first hosts, taken from the collector's latest sweep when
+# it is recent and probed concurrently otherwise
+# The sweep deadline stays below the stage timeout so unreachable or slow
+# hosts are cut off by the probe engine instead of the stage being killed
+collect_performance_data() {
+    local stage_timeout="${1:-${REPORT_STAGE_TIMEOUT:-60}}"
+    local hosts_file="${SCRIPT_DIR}/config/hosts.conf"
+    
+    echo ""
+    echo "[LATENCY]"
+    
+    local first_hosts=$(load_authorized_hosts "$hosts_file" | head -5)
+    local sample=""
+    
+    if sample=$(collector_query get latency --max-age "${MONITOR_INTERVAL:-60}"); then
+        sample=$(awk -F'|' 'NR == FNR {wanted[$1]; next} $1 in wanted' \
+            <(echo "$first_hosts") - <<< "$sample")
+    fi
+    
+    if [[ -z "$sample" && -n "$first_hosts" ]]; then
+        LATENCY_SWEEP_DEADLINE=$((stage_timeout > 10 ? stage_timeout - 5 : stage_timeout / 2 + 1))
+        sample=$(echo "$first_hosts" | probe_latency_batch 4)
+    fi
+    
+    local ip hostname avg min max mdev status
+    while IFS='|' read -r ip hostname avg min max mdev status; do
+        [[ -z "$ip" || "$status" == "UNREACHABLE" ]] && continue
+        echo "$hostname|$min|$avg|$max|$status"
+    done <<< "$sample"
+}
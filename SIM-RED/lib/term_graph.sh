@@ -0,0 +1,546 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - Incremental Terminal Graphs
+# Fixed-size numeric ring buffers and in-place line, bar and histogram
+# widgets (the graphs of graph_ascii.awk). Each widget remembers what it
+# drew, so an update only moves the cursor to the cells that changed:
+# many series can be redrawn several times per second without clearing
+# the screen or spawning processes.
+#
+# Values are stored as integers in hundredths (12.34 -> 1234).
+# Drawing functions append to GRAPH_OUT; graph_flush writes it out.
+
+# Ring buffers (one per series, GRAPH_RING_SIZE slots each)
+declare -gA GRAPH_RING=()        # SERIES:SLOT -> value in hundredths
+declare -gA GRAPH_RING_SIZE=()   # SERIES -> slots
+declare -gA GRAPH_RING_POS=()    # SERIES -> next slot to write
+declare -gA GRAPH_RING_COUNT=()  # SERIES -> values stored
+declare -gA GRAPH_RING_TOTAL=()  # SERIES -> sum of the stored values
+declare -gA GRAPH_RING_MAX=()    # SERIES -> largest stored value
+declare -gA GRAPH_RING_LABEL=()  # SERIES -> label used by bar charts
+
+# Widgets
+declare -gA GRAPH_W=()           # ID:FIELD -> type, row, col, width, height, series, scale, max, stat
+declare -gA GRAPH_CELL=()        # ID:INDEX -> what is on screen for a column (line) or row (bar, hist)
+declare -gA GRAPH_DIRTY=()       # ID -> line graph columns to recompute
+declare -gA GRAPH_HIST=()        # ID:BIN -> values in a histogram bin
+declare -gA GRAPH_WATCH=()       # SERIES -> widgets notified on push
+
+GRAPH_CHAR="${GRAPH_CHAR:-█}"
+GRAPH_OUT=""
+
+# ========== VALUES ==========
+
+# Parse a non-negative decimal ("12", "0.5", "103.27") into hundredths (REPLY)
+graph_value() {
+    local value="$1"
+    local frac=""
+    
+    [[ -n "$value" && "$value" != *[!0-9.]* && "$value" != .* && "$value" != *.*.* ]] || return 1
+    [[ "$value" == *.* ]] && frac="${value#*.}"
+    frac="${frac}00"
+    REPLY=$(( 10#${value%%.*} * 100 + 10#${frac:0:2} ))
+}
+
+# Format hundredths as a decimal string (REPLY)
+graph_format() {
+    printf -v REPLY '%d.%02d' $(($1 / 100)) $(($1 % 100))
+}
+
+# Smallest 1-2-5 step that is >= the value (REPLY, hundredths)
+# Rounding the scale keeps it stable while the maximum moves a little
+graph_nice_scale() {
+    local value="$1"
+    local step=1
+    
+    while true; do
+        ((value <= step)) && { REPLY=$step; return 0; }
+        ((value <= step * 2)) && { REPLY=$((step * 2)); return 0; }
+        ((value <= step * 5)) && { REPLY=$((step * 5)); return 0; }
+        ((step *= 10))
+    done
+}
+
+# Bar of N cells (REPLY)
+graph_bar() {
+    printf -v REPLY '%*s' "$1" ''
+    REPLY="${REPLY// /$GRAPH_CHAR}"
+}
+
+# ========== RING BUFFERS ==========
+
+# Create (or reset) a series: graph_ring_init SERIES SIZE [LABEL]
+graph_ring_init() {
+    local series="$1"
+    local size="$2"
+    local slot
+    
+    for ((slot = 0; slot < ${GRAPH_RING_SIZE[$series]:-0}; slot++)); do
+        unset "GRAPH_RING[$series:$slot]"
+    done
+    
+    GRAPH_RING_SIZE[$series]=$size
+    GRAPH_RING_POS[$series]=0
+    GRAPH_RING_COUNT[$series]=0
+    GRAPH_RING_TOTAL[$series]=0
+    GRAPH_RING_MAX[$series]=0
+    GRAPH_RING_LABEL[$series]="${3:-$series}"
+}
+
+# Append a value, evicting the oldest one when the ring is full
+graph_ring_push() {
+    local series="$1"
+    local size="${GRAPH_RING_SIZE[$series]}"
+    local pos="${GRAPH_RING_POS[$series]}"
+    local old="" value slot max id
+    
+    [[ -n "$size" ]] || return 1
+    graph_value "$2" || return 1
+    value=$REPLY
+    
+    if ((GRAPH_RING_COUNT[$series] == size)); then
+        old="${GRAPH_RING[$series:$pos]}"
+        ((GRAPH_RING_TOTAL[$series] -= old))
+    else
+        ((GRAPH_RING_COUNT[$series]++))
+    fi
+    
+    GRAPH_RING[$series:$pos]=$value
+    ((GRAPH_RING_TOTAL[$series] += value))
+    GRAPH_RING_POS[$series]=$(( (pos + 1) % size ))
+    
+    # The maximum only needs a rescan when it is the value evicted
+    max="${GRAPH_RING_MAX[$series]}"
+    if ((value >= max)); then
+        GRAPH_RING_MAX[$series]=$value
+    elif [[ -n "$old" ]] && ((old == max)); then
+        max=0
+        for ((slot = 0; slot < size; slot++)); do
+            ((GRAPH_RING[$series:$slot] > max)) && max=${GRAPH_RING[$series:$slot]}
+        done
+        GRAPH_RING_MAX[$series]=$max
+    fi
+    
+    for id in ${GRAPH_WATCH[$series]}; do
+        graph_widget_touch "$id" "$pos" "$old" "$value"
+    done
+    return 0
+}
+
+# Newest value of a series (REPLY, hundredths)
+graph_ring_latest() {
+    local series="$1"
+    local size="${GRAPH_RING_SIZE[$series]}"
+    
+    ((${GRAPH_RING_COUNT[$series]:-0} > 0)) || return 1
+    REPLY="${GRAPH_RING[$series:$(( (GRAPH_RING_POS[$series] + size - 1) % size ))]}"
+}
+
+# Mean of the stored values (REPLY, hundredths)
+graph_ring_avg() {
+    local series="$1"
+    
+    ((${GRAPH_RING_COUNT[$series]:-0} > 0)) || return 1
+    REPLY=$(( GRAPH_RING_TOTAL[$series] / GRAPH_RING_COUNT[$series] ))
+}
+
+# ========== WIDGETS ==========
+
+# Create a widget at a screen position:
+#   graph_widget_init ID TYPE ROW COL WIDTH HEIGHT SERIES...
+# line: one series, one column per ring slot (WIDTH must match the ring
+#       size); plotted in sweep mode, the newest value moves to the right
+#       and wraps, so each new value changes only a few columns
+# hist: one series, HEIGHT bins of the values in its ring
+# bar:  one row per series with its latest value (or its mean with
+#       GRAPH_W[ID:stat]=avg)
+graph_widget_init() {
+    local id="$1" type="$2" row="$3" col="$4" width="$5" height="$6"
+    shift 6
+    local series
+    
+    case "$type" in
+        line)
+            [[ "${GRAPH_RING_SIZE[$1]}" == "$width" ]] || return 1
+            ((height >= 2)) || return 1
+            ;;
+        hist)
+            [[ -n "${GRAPH_RING_SIZE[$1]}" ]] || return 1
+            ;;
+        bar)
+            (($# > 0)) || return 1
+            ;;
+        *)
+            return 1
+            ;;
+    esac
+    
+    GRAPH_W[$id:type]=$type
+    GRAPH_W[$id:row]=$row
+    GRAPH_W[$id:col]=$col
+    GRAPH_W[$id:width]=$width
+    GRAPH_W[$id:height]=$height
+    GRAPH_W[$id:series]="$*"
+    GRAPH_W[$id:scale]=0
+    GRAPH_W[$id:max]=""
+    GRAPH_W[$id:stat]="${GRAPH_W[$id:stat]:-last}"
+    GRAPH_DIRTY[$id]=""
+    
+    if [[ "$type" != "bar" ]]; then
+        for series in $1; do
+            [[ " ${GRAPH_WATCH[$series]} " == *" $id "* ]] || GRAPH_WATCH[$series]+=" $id"
+        done
+    fi
+}
+
+# Record the effect of a push on a widget (called by graph_ring_push)
+graph_widget_touch() {
+    local id="$1" slot="$2" old="$3" value="$4"
+    local width="${GRAPH_W[$id:width]}"
+    local scale="${GRAPH_W[$id:scale]}"
+    local bins="${GRAPH_W[$id:height]}"
+    local bin
+    
+    case "${GRAPH_W[$id:type]}" in
+        line)
+            # New point, its neighbours and the gap that follows it
+            GRAPH_DIRTY[$id]+=" $(( (slot + width - 1) % width )) $slot $(( (slot + 1) % width )) $(( (slot + 2) % width ))"
+            ;;
+        hist)
+            # Not drawn yet, or the update will rescale and rebin anyway
+            ((scale > 0)) || return 0
+            if [[ -n "$old" ]]; then
+                bin=$((old * bins / scale))
+                ((bin >= bins)) && bin=$((bins - 1))
+                ((GRAPH_HIST[$id:$bin]--))
+            fi
+            bin=$((value * bins / scale))
+            ((bin >= bins)) && bin=$((bins - 1))
+            ((GRAPH_HIST[$id:$bin]++))
+            ;;
+    esac
+}
+
+# Value a bar chart shows for a series (REPLY)
+graph_bar_value() {
+    if [[ "${GRAPH_W[$1:stat]}" == "avg" ]]; then
+        graph_ring_avg "$2"
+    else
+        graph_ring_latest "$2"
+    fi
+}
+
+# Scale a widget needs for its current data (REPLY, hundredths)
+graph_widget_scale() {
+    local id="$1"
+    local series max=0
+    
+    if [[ "${GRAPH_W[$id:type]}" == "bar" ]]; then
+        for series in ${GRAPH_W[$id:series]}; do
+            graph_bar_value "$id" "$series" && ((REPLY > max)) && max=$REPLY
+        done
+    else
+        max="${GRAPH_RING_MAX[${GRAPH_W[$id:series]}]}"
+    fi
+    
+    # Same maximum as the last update: same scale
+    if [[ "$max" == "${GRAPH_W[$id:max]}" ]]; then
+        REPLY="${GRAPH_W[$id:scale]}"
+        return 0
+    fi
+    
+    graph_nice_scale "$max"
+    ((REPLY == GRAPH_W[$id:scale])) && GRAPH_W[$id:max]=$max
+    return 0
+}
+
+# Draw a widget completely: frame, labels and data
+graph_widget_draw() {
+    local id="$1"
+    
+    graph_widget_scale "$id"
+    GRAPH_W[$id:scale]=$REPLY
+    GRAPH_W[$id:max]=""
+    GRAPH_DIRTY[$id]=""
+    
+    case "${GRAPH_W[$id:type]}" in
+        line) graph_line_draw "$id" ;;
+        bar)  graph_bar_draw "$id" ;;
+        hist) graph_hist_draw "$id" ;;
+    esac
+}
+
+# Draw only what changed since the last draw or update
+# A new scale moves every cell, so it falls back to a full draw
+graph_widget_update() {
+    local id="$1"
+    
+    graph_widget_scale "$id"
+    if ((REPLY != GRAPH_W[$id:scale])); then
+        graph_widget_draw "$id"
+        return 0
+    fi
+    
+    case "${GRAPH_W[$id:type]}" in
+        line) graph_line_update "$id" ;;
+        bar)  graph_bar_rows "$id" ;;
+        hist) graph_hist_rows "$id" ;;
+    esac
+}
+
+# Write the pending output in a single call
+graph_flush() {
+    printf '%s' "$GRAPH_OUT"
+    GRAPH_OUT=""
+}
+
+# Append text at a screen position
+graph_at() {
+    GRAPH_OUT+=$'\e['"$1;$2H$3"
+}
+
+# ========== LINE GRAPH ==========
+
+# Load the state of a line graph into the caller's locals: series, width,
+# height, span, scale, pos, count and full
+graph_line_state() {
+    series="${GRAPH_W[$1:series]}"
+    width="${GRAPH_W[$1:width]}"
+    height="${GRAPH_W[$1:height]}"
+    span=$((height - 1))
+    scale="${GRAPH_W[$1:scale]}"
+    pos="${GRAPH_RING_POS[$series]}"
+    count="${GRAPH_RING_COUNT[$series]}"
+    full=$((count == width))
+}
+
+# Describe column X as "Y TOP" (REPLY): the point row and the first row
+# of its connector, or empty when the column has no value
+# Uses the locals set by graph_line_state
+graph_line_column() {
+    local x="$1"
+    local y top n ny
+    
+    # Once the ring is full the oldest slot is shown as the gap
+    if ((full ? x == pos : x >= count)); then
+        REPLY=""
+        return 0
+    fi
+    
+    y=$(( span - GRAPH_RING[$series:$x] * span / scale ))
+    top=$y
+    
+    # Vertical connector towards a higher neighbour
+    for n in $(( (x + width - 1) % width )) $(( (x + 1) % width )); do
+        ((full ? n == pos : n >= count)) && continue
+        ny=$(( span - GRAPH_RING[$series:$n] * span / scale ))
+        ((ny + 1 < top)) && top=$((ny + 1))
+    done
+    
+    REPLY="$y $top"
+}
+
+# Axes, labels and every column
+graph_line_draw() {
+    local id="$1"
+    local row="${GRAPH_W[$id:row]}"
+    local col="${GRAPH_W[$id:col]}"
+    local series width height span scale pos count full
+    local x r y top text label axis
+    local -a cells
+    
+    graph_line_state "$id"
+    
+    for ((x = 0; x < width; x++)); do
+        graph_line_column "$x"
+        cells[x]="$REPLY"
+        GRAPH_CELL[$id:$x]="$REPLY"
+    done
+    
+    graph_format "$scale"
+    label="$REPLY"
+    
+    for ((r = 0; r < height; r++)); do
+        if ((r == 0)); then
+            printf -v text '%8s ┤' "$label"
+        elif ((r == span)); then
+            printf -v text '%8s ┤' "0.00"
+        else
+            printf -v text '%8s │' ""
+        fi
+        
+        for ((x = 0; x < width; x++)); do
+            if [[ -z "${cells[x]}" ]]; then
+                text+=" "
+                continue
+            fi
+            y=${cells[x]% *}
+            top=${cells[x]#* }
+            if ((r == y)); then
+                text+="●"
+            elif ((r >= top && r < y)); then
+                text+="│"
+            else
+                text+=" "
+            fi
+        done
+        GRAPH_OUT+=$'\e['"$((row + r));${col}H$text"
+    done
+    
+    printf -v axis '%*s' "$width" ''
+    printf -v text '%8s └%s┘' "" "${axis// /─}"
+    GRAPH_OUT+=$'\e['"$((row + height));${col}H$text"
+}
+
+# Redraw the rows of the dirty columns that changed
+graph_line_update() {
+    local id="$1"
+    local row="${GRAPH_W[$id:row]}"
+    local origin=$(( GRAPH_W[$id:col] + 10 ))
+    local series width height span scale pos count full
+    local x r old new y top first last seen=" "
+    
+    graph_line_state "$id"
+    
+    for x in ${GRAPH_DIRTY[$id]}; do
+        [[ "$seen" == *" $x "* ]] && continue
+        seen+="$x "
+        
+        graph_line_column "$x"
+        new="$REPLY"
+        old="${GRAPH_CELL[$id:$x]}"
+        [[ "$new" == "$old" ]] && continue
+        GRAPH_CELL[$id:$x]="$new"
+        
+        # Rows covered by the old or the new drawing
+        first=$height
+        last=-1
+        y=-1
+        top=$height
+        if [[ -n "$old" ]]; then
+            first=${old#* }
+            last=${old% *}
+        fi
+        if [[ -n "$new" ]]; then
+            y=${new% *}
+            top=${new#* }
+            ((top < first)) && first=$top
+            ((y > last)) && last=$y
+        fi
+        
+        for ((r = first; r <= last; r++)); do
+            if ((r == y)); then
+                GRAPH_OUT+=$'\e['"$((row + r));$((origin + x))H●"
+            elif ((r >= top && r < y)); then
+                GRAPH_OUT+=$'\e['"$((row + r));$((origin + x))H│"
+            else
+                GRAPH_OUT+=$'\e['"$((row + r));$((origin + x))H "
+            fi
+        done
+    done
+    
+    GRAPH_DIRTY[$id]=""
+}
+
+# ========== BAR CHART ==========
+
+# Borders and every row
+graph_bar_draw() {
+    local id="$1"
+    local row="${GRAPH_W[$id:row]}"
+    local col="${GRAPH_W[$id:col]}"
+    local rows n border
+    
+    rows=(${GRAPH_W[$id:series]})
+    for ((n = 0; n < ${#rows[@]}; n++)); do
+        GRAPH_CELL[$id:$n]=""
+    done
+    
+    printf -v border '%*s' $(( GRAPH_W[$id:width] + 21 )) ''
+    graph_at "$row" "$col" "┌${border// /─}┐"
+    graph_at $((row + ${#rows[@]} + 1)) "$col" "└${border// /─}┘"
+    graph_bar_rows "$id"
+}
+
+# Redraw the rows whose bar or value changed
+graph_bar_rows() {
+    local id="$1"
+    local row="${GRAPH_W[$id:row]}"
+    local col="${GRAPH_W[$id:col]}"
+    local width="${GRAPH_W[$id:width]}"
+    local scale="${GRAPH_W[$id:scale]}"
+    local n=0 series len value label text
+    
+    for series in ${GRAPH_W[$id:series]}; do
+        if graph_bar_value "$id" "$series"; then
+            len=$(( REPLY * width / scale ))
+            graph_format "$REPLY"
+            value="$REPLY"
+        else
+            len=0
+            value="N/A"
+        fi
+        
+        if [[ "${GRAPH_CELL[$id:$n]}" != "$len $value" ]]; then
+            GRAPH_CELL[$id:$n]="$len $value"
+            label="${GRAPH_RING_LABEL[$series]}"
+            graph_bar "$len"
+            printf -v text '│%-10s %s%*s %8s │' "${label:0:10}" "$REPLY" $((width - len)) '' "$value"
+            graph_at $((row + n + 1)) "$col" "$text"
+        fi
+        ((n++))
+    done
+}
+
+# ========== HISTOGRAM ==========
+
+# Rebin the whole ring for the current scale and draw every row
+graph_hist_draw() {
+    local id="$1"
+    local series="${GRAPH_W[$id:series]}"
+    local bins="${GRAPH_W[$id:height]}"
+    local scale="${GRAPH_W[$id:scale]}"
+    local slot bin
+    
+    for ((bin = 0; bin < bins; bin++)); do
+        GRAPH_HIST[$id:$bin]=0
+        GRAPH_CELL[$id:$bin]=""
+    done
+    
+    for ((slot = 0; slot < GRAPH_RING_COUNT[$series]; slot++)); do
+        bin=$(( GRAPH_RING[$series:$slot] * bins / scale ))
+        ((bin >= bins)) && bin=$((bins - 1))
+        ((GRAPH_HIST[$id:$bin]++))
+    done
+    
+    graph_hist_rows "$id"
+}
+
+# Redraw the bins whose bar or count changed
+graph_hist_rows() {
+    local id="$1"
+    local row="${GRAPH_W[$id:row]}"
+    local col="${GRAPH_W[$id:col]}"
+    local width="${GRAPH_W[$id:width]}"
+    local bins="${GRAPH_W[$id:height]}"
+    local scale="${GRAPH_W[$id:scale]}"
+    local bin len count from max_bin=0 text
+    
+    for ((bin = 0; bin < bins; bin++)); do
+        ((GRAPH_HIST[$id:$bin] > max_bin)) && max_bin=${GRAPH_HIST[$id:$bin]}
+    done
+    
+    for ((bin = 0; bin < bins; bin++)); do
+        count="${GRAPH_HIST[$id:$bin]}"
+        len=0
+        ((max_bin > 0)) && len=$(( count * width / max_bin ))
+        [[ "${GRAPH_CELL[$id:$bin]}" == "$len $count" ]] && continue
+        GRAPH_CELL[$id:$bin]="$len $count"
+        
+        graph_format $(( bin * scale / bins ))
+        from="$REPLY"
+        graph_format $(( (bin + 1) * scale / bins ))
+        printf -v text '[%8s-%8s] ' "$from" "$REPLY"
+        graph_bar "$len"
+        graph_at $((row + bin)) "$col" "$text$REPLY $count"$'\e[K'
+    done
+}
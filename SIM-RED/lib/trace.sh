@@ -0,0 +1,153 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - Span Tracing
+# Opt-in instrumentation, loaded by common.sh when SIMRED_TRACE is set
+# (to 1, for logs/trace_<date>_<pid>.trc, or to a trace file path).
+# Right before a script calls main, every function of the libraries in
+# SIMRED_TRACE_LIBS (lib/common.sh and lib/network_utils.sh by default),
+# main itself and the external tools in SIMRED_TRACE_TOOLS are wrapped so
+# that each call writes a timed span.
+# Scripts started from a traced one append to the same file, under the
+# span that started them. lib/trace_report.pl summarizes the file.
+#
+# Records (one line per span, times in microseconds since the epoch):
+#   B|PID|ID|PARENT|NAME|START                       main started (kept if
+#                                                    the script exits early)
+#   S|PID|ID|PARENT|NAME|START|DURATION|FORKS|RC     span finished
+# ID is BASHPID.SEQ, PARENT is 0 for a root span. FORKS is the number of
+# processes created during the span; it comes from the last PID handed out
+# by the kernel, so it counts the whole PID namespace.
+
+# Loaded once per process; subshells share the open trace file
+[[ "$TRACE_OWNER" == "$$" ]] && return 0
+
+if [[ -z "$EPOCHREALTIME" ]]; then
+    echo "SIMRED_TRACE requires bash 5 or later (EPOCHREALTIME), tracing disabled" >&2
+    return 1
+fi
+
+TRACE_OWNER=$$
+TRACE_SEQ=0
+TRACE_LIBS="${SIMRED_TRACE_LIBS:-lib/common.sh lib/network_utils.sh}"
+TRACE_TOOLS="${SIMRED_TRACE_TOOLS:-arp-scan arp ip ping nmap date grep awk gawk sed sort cut perl bc timeout}"
+
+if [[ "$SIMRED_TRACE" != */* ]]; then
+    ensure_dir "${SCRIPT_DIR}/logs"
+    printf -v SIMRED_TRACE '%s/logs/trace_%(%Y%m%d_%H%M%S)T_%s.trc' "$SCRIPT_DIR" -1 "$$"
+fi
+export SIMRED_TRACE
+
+if ! exec {TRACE_FD}>>"$SIMRED_TRACE"; then
+    echo "Cannot open trace file: $SIMRED_TRACE, tracing disabled" >&2
+    TRACE_FD=""
+    return 1
+fi
+
+# Fork counter: last PID allocated, wrapping at pid_max
+TRACE_PID_FILE="/proc/sys/kernel/ns_last_pid"
+TRACE_PID_MAX=32768
+if [[ -r "$TRACE_PID_FILE" ]]; then
+    read -r TRACE_PID_MAX < /proc/sys/kernel/pid_max
+else
+    TRACE_PID_FILE=""
+fi
+
+# Run a command as a span
+# Usage: trace_span NAME COMMAND [ARGS...]
+# The span ID is exported as SIMRED_TRACE_PARENT while it runs, so nested
+# calls (and traced scripts started from here) record it as their parent
+trace_span() {
+    local __trace_name="$1"
+    shift
+    
+    # Imported into a shell that did not open the trace file
+    if [[ -z "$TRACE_FD" ]]; then
+        "$@"
+        return
+    fi
+    
+    local __trace_id="${BASHPID}.$((++TRACE_SEQ))"
+    local __trace_parent="${SIMRED_TRACE_PARENT:-0}"
+    local -x SIMRED_TRACE_PARENT="$__trace_id"
+    local __trace_pid0=0 __trace_pid1=0 __trace_rc
+    
+    [[ -n "$TRACE_PID_FILE" ]] && read -r __trace_pid0 < "$TRACE_PID_FILE"
+    local __trace_start="${EPOCHREALTIME/[.,]/}"
+    
+    if [[ "$__trace_name" == *:main ]]; then
+        printf 'B|%s|%s|%s|%s|%s\n' "$$" "$__trace_id" "$__trace_parent" \
+            "$__trace_name" "$__trace_start" >&"$TRACE_FD"
+    fi
+    
+    "$@"
+    __trace_rc=$?
+    
+    local __trace_end="${EPOCHREALTIME/[.,]/}"
+    [[ -n "$TRACE_PID_FILE" ]] && read -r __trace_pid1 < "$TRACE_PID_FILE"
+    
+    printf 'S|%s|%s|%s|%s|%s|%s|%s|%s\n' "$$" "$__trace_id" "$__trace_parent" "$__trace_name" \
+        "$__trace_start" $((__trace_end - __trace_start)) \
+        $(((__trace_pid1 - __trace_pid0 + TRACE_PID_MAX) % TRACE_PID_MAX)) \
+        "$__trace_rc" >&"$TRACE_FD"
+    
+    return $__trace_rc
+}
+
+# Wrap the library functions, main and the external tools
+# Each function NAME is renamed to __traced_NAME and NAME becomes a span
+# around it; exported functions stay usable in child shells
+trace_wrap_functions() {
+    local name line file lib defs attr
+    local -a names=() exported=()
+    
+    # extdebug makes declare -F report the file each function comes from
+    while read -r name line file; do
+        for lib in $TRACE_LIBS; do
+            [[ "$file" == */"$lib" ]] && names+=("$name")
+        done
+    done < <(shopt -s extdebug; declare -F $(compgen -A function))
+    
+    while read -r _ attr name; do
+        [[ "$attr" == *x* ]] && exported+=("$name")
+    done < <(declare -F)
+    
+    declare -F main > /dev/null && names+=("main")
+    ((${#names[@]})) || return 0
+    
+    # Rename every definition in one pass (declare -f puts "NAME () " at
+    # the start of a line, function bodies are indented)
+    defs=$'\n'"$(declare -f "${names[@]}")"
+    for name in "${names[@]}"; do
+        defs="${defs//$'\n'"$name () "/$'\n'"__traced_$name () "}"
+    done
+    eval "$defs"
+    
+    for name in "${names[@]}"; do
+        if [[ "$name" == "main" ]]; then
+            eval "main() { trace_span '${0##*/}:main' __traced_main \"\$@\"; }"
+        else
+            eval "$name() { trace_span '$name' __traced_$name \"\$@\"; }"
+        fi
+    done
+    
+    for name in "${exported[@]}"; do
+        declare -F "__traced_$name" > /dev/null && export -f "__traced_$name"
+    done
+    export -f trace_span
+    
+    # External tools (only the installed ones, so command -v still tells)
+    for name in $TRACE_TOOLS; do
+        type -P "$name" > /dev/null || continue
+        eval "$name() { trace_span 'exec:$name' command $name \"\$@\"; }"
+    done
+}
+
+# Wrap everything when the script is about to run main: by then all the
+# libraries are loaded (and common.sh, sourced again by each of them, has
+# stopped redefining its functions)
+trace_before_main() {
+    [[ "$BASH_COMMAND" == "main" || "$BASH_COMMAND" == "main "* ]] || return 0
+    trap - DEBUG
+    trace_wrap_functions
+}
+
+trap 'trace_before_main' DEBUG
@@ -0,0 +1,148 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Trace Summarizer
+# Reads the span records written with SIMRED_TRACE (see lib/trace.sh),
+# rebuilds the call tree across processes and prints the functions and
+# tools with the most self time (time not spent in a child span). It can
+# also export the spans as Chrome trace events for a flame-graph viewer
+# (chrome://tracing, Perfetto, speedscope).
+#
+# Usage:
+#   trace_report.pl [options] TRACE...
+#
+# Output:
+#   A table of the top spans by self time: calls, self and total time in
+#   ms, average total time and the processes created by the span itself.
+#   Scripts that exited without closing main are reported as unfinished.
+#
+# Options:
+#   --top N          Rows in the table (default: 20)
+#   --chrome FILE    Also write Chrome trace-event JSON to FILE
+
+use strict;
+use warnings;
+use JSON::PP;
+
+my %opt = (
+    top    => 20,
+    chrome => '',
+);
+
+while (@ARGV && $ARGV[0] =~ /^--(\w+)$/ && exists $opt{$1}) {
+    shift @ARGV;
+    $opt{$1} = shift @ARGV;
+}
+
+die "Usage: $0 [--top N] [--chrome FILE] TRACE...\n" unless @ARGV;
+
+my %span;          # id -> {pid, id, parent, name, start, dur, forks, rc}
+my %begun;         # id -> begin record of a main span
+my %last_end;      # pid -> end of its last span (us)
+
+foreach my $file (@ARGV) {
+    open(my $fh, '<', $file) or die "Cannot open $file: $!\n";
+    while (my $line = <$fh>) {
+        chomp $line;
+        my ($type, $pid, $id, $parent, $name, $start, $dur, $forks, $rc) = split /\|/, $line;
+        next unless defined $start && $start =~ /^\d+$/;
+
+        if ($type eq 'B') {
+            $begun{$id} = {pid => $pid, id => $id, parent => $parent, name => $name, start => $start};
+        }
+        elsif ($type eq 'S' && defined $rc) {
+            $span{$id} = {pid => $pid, id => $id, parent => $parent, name => $name,
+                          start => $start, dur => $dur, forks => $forks, rc => $rc};
+            my $end = $start + $dur;
+            $last_end{$pid} = $end if !defined $last_end{$pid} || $end > $last_end{$pid};
+        }
+    }
+    close($fh);
+}
+
+# A main that never finished (exit inside the script) ends with the last
+# span its process wrote
+my $unfinished = 0;
+foreach my $begin (values %begun) {
+    next if $span{$begin->{id}};
+    my $end = $last_end{$begin->{pid}} // $begin->{start};
+    $span{$begin->{id}} = {%$begin, dur => $end - $begin->{start}, forks => 0, rc => '-'};
+    $unfinished++;
+}
+
+die "No spans found\n" unless %span;
+
+# Self time and self forks: what is left after the direct children. Spans
+# of background jobs can overlap their parent, so both are kept >= 0
+my (%child_dur, %child_forks);
+foreach my $s (values %span) {
+    next unless $span{$s->{parent}};
+    $child_dur{$s->{parent}} += $s->{dur};
+    $child_forks{$s->{parent}} += $s->{forks};
+}
+
+my %by_name;       # name -> {calls, self, total, forks}
+my ($first, $last);
+my %pids;
+foreach my $s (values %span) {
+    my $self = $s->{dur} - ($child_dur{$s->{id}} // 0);
+    my $forks = $s->{forks} - ($child_forks{$s->{id}} // 0);
+    my $agg = $by_name{$s->{name}} //= {calls => 0, self => 0, total => 0, forks => 0};
+
+    $agg->{calls}++;
+    $agg->{self} += $self > 0 ? $self : 0;
+    $agg->{total} += $s->{dur};
+    $agg->{forks} += $forks > 0 ? $forks : 0;
+
+    $first = $s->{start} if !defined $first || $s->{start} < $first;
+    $last = $s->{start} + $s->{dur} if !defined $last || $s->{start} + $s->{dur} > $last;
+    $pids{$s->{pid}} = 1;
+}
+
+printf "Trace: %s\n", join(', ', @ARGV);
+printf "%d spans in %d processes over %.1f ms%s\n\n", scalar(keys %span), scalar(keys %pids),
+    ($last - $first) / 1000, $unfinished ? " ($unfinished unfinished)" : '';
+
+printf "%-36s %7s %11s %11s %10s %7s\n", 'Span', 'Calls', 'Self ms', 'Total ms', 'Avg ms', 'Forks';
+my @names = sort { $by_name{$b}{self} <=> $by_name{$a}{self} || $a cmp $b } keys %by_name;
+splice(@names, $opt{top}) if @names > $opt{top};
+foreach my $name (@names) {
+    my $agg = $by_name{$name};
+    printf "%-36s %7d %11.2f %11.2f %10.3f %7d\n", $name, $agg->{calls}, $agg->{self} / 1000,
+        $agg->{total} / 1000, $agg->{total} / $agg->{calls} / 1000, $agg->{forks};
+}
+
+write_chrome($opt{chrome}) if $opt{chrome};
+exit 0;
+
+# Complete events ("X") on a timeline starting at 0; one track per shell
+# (BASHPID), grouped by script process
+sub write_chrome {
+    my ($file) = @_;
+    my @events;
+    my %process_name;
+
+    foreach my $s (sort { $a->{start} <=> $b->{start} } values %span) {
+        my ($tid) = $s->{id} =~ /^(\d+)\./;
+        my $category = $s->{name} =~ /^exec:/ ? 'exec' : $s->{name} =~ /:main$/ ? 'bin' : 'lib';
+        $process_name{$s->{pid}} //= $1 if $s->{name} =~ /^(.+):main$/;
+
+        push @events, {
+            name => $s->{name},
+            cat  => $category,
+            ph   => 'X',
+            ts   => $s->{start} - $first,
+            dur  => $s->{dur},
+            pid  => $s->{pid} + 0,
+            tid  => ($tid // $s->{pid}) + 0,
+            args => {id => $s->{id}, parent => $s->{parent}, forks => $s->{forks}, rc => $s->{rc}},
+        };
+    }
+    foreach my $pid (sort keys %process_name) {
+        push @events, {name => 'process_name', ph => 'M', pid => $pid + 0,
+                       args => {name => "$process_name{$pid} ($pid)"}};
+    }
+
+    open(my $fh, '>', $file) or die "Cannot write $file: $!\n";
+    print $fh JSON::PP->new->canonical->encode({traceEvents => \@events, displayTimeUnit => 'ms'});
+    close($fh);
+    print "\nChrome trace written: $file\n";
+}
@@ -0,0 +1,335 @@
+#!/bin/bash
+# SIM-RED EXTENDIDO - High-Resolution Traffic Sampler
+# Reads /proc/net/dev once per tick, keeps per-interface rate ring buffers
+# and rolls them up into the per-minute traffic history
+
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+source "${SCRIPT_DIR}/lib/common.sh"
+
+TRAFFIC_LIVE_FILE="${SCRIPT_DIR}/data/traffic_live.dat"
+TRAFFIC_HISTORY_FILE="${SCRIPT_DIR}/data/traffic_history.dat"
+TRAFFIC_SAMPLER_PID="${SCRIPT_DIR}/data/traffic_sampler.pid"
+
+# Ring buffers (one per interface, TRAFFIC_RING_SIZE slots each)
+# Slot format: "TS RX_BPS TX_BPS RX_PPS TX_PPS RX_ERR TX_ERR RX_DROP TX_DROP"
+# Rates are per second; errors and drops are counts during the tick
+declare -gA TRAFFIC_RING=()        # IFACE:SLOT -> sample
+declare -gA TRAFFIC_RING_POS=()    # IFACE -> next slot to write
+declare -gA TRAFFIC_RING_COUNT=()  # IFACE -> samples stored
+declare -ga SAMPLER_IFACES=()      # Interfaces in /proc/net/dev order
+
+# Sampler state
+# Counter format: "RX_BYTES RX_PACKETS RX_ERRS RX_DROP TX_BYTES TX_PACKETS TX_ERRS TX_DROP"
+declare -gA SAMPLER_COUNTERS=()    # IFACE -> counters from the last read
+declare -gA SAMPLER_PREV=()        # IFACE -> counters from the previous tick
+declare -gA SAMPLER_BASE=()        # IFACE -> counters at the start of the current minute
+declare -gA SAMPLER_PEAK=()        # IFACE -> "RX_PEAK TX_PEAK" bytes/s in the current minute
+SAMPLER_PREV_US=0
+SAMPLER_MINUTE=0
+SAMPLER_FULL_MINUTE=false
+
+# Read every interface counter with a single read of /proc/net/dev
+sampler_read_counters() {
+    local -a lines fields
+    local line name
+    
+    SAMPLER_COUNTERS=()
+    mapfile -t -s 2 lines < /proc/net/dev 2>/dev/null || return 1
+    
+    for line in "${lines[@]}"; do
+        name="${line%%:*}"
+        name="${name//[[:space:]]/}"
+        [[ -z "$name" || "$name" == "lo" ]] && continue
+        
+        fields=(${line#*:})
+        SAMPLER_COUNTERS[$name]="${fields[0]} ${fields[1]} ${fields[2]} ${fields[3]} ${fields[8]} ${fields[9]} ${fields[10]} ${fields[11]}"
+        [[ -z "${TRAFFIC_RING_POS[$name]+set}" ]] && sampler_add_iface "$name"
+    done
+    
+    return 0
+}
+
+# Register a new interface and its ring buffer
+sampler_add_iface() {
+    local iface="$1"
+    
+    SAMPLER_IFACES+=("$iface")
+    TRAFFIC_RING_POS[$iface]=0
+    TRAFFIC_RING_COUNT[$iface]=0
+    SAMPLER_PEAK[$iface]="0 0"
+}
+
+# Convert an interval in seconds (1, 0.5, 2.25) to microseconds (stored in REPLY)
+sampler_interval_us() {
+    local seconds="$1"
+    local whole="${seconds%%.*}"
+    local frac=""
+    
+    [[ "$seconds" == *.* ]] && frac="${seconds#*.}"
+    frac="${frac}000000"
+    REPLY=$(( 10#${whole:-0} * 1000000 + 10#${frac:0:6} ))
+    ((REPLY > 0)) || REPLY=1000000
+}
+
+# Take one sample: update rates, ring buffers and the minute rollup
+sampler_tick() {
+    local now_us="${EPOCHREALTIME/[.,]/}"
+    local now=$((now_us / 1000000))
+    local size="${TRAFFIC_RING_SIZE:-120}"
+    local iface i delta pos
+    local -a prev curr rates peak
+    
+    sampler_read_counters || return 1
+    
+    local elapsed=$((now_us - SAMPLER_PREV_US))
+    ((elapsed > 0)) || elapsed=1
+    
+    # Minute boundary: emit the rollup of the minute that just ended
+    local minute=$((now / 60))
+    if ((minute != SAMPLER_MINUTE)); then
+        if ((SAMPLER_MINUTE != 0)) && [[ "$SAMPLER_FULL_MINUTE" == true ]]; then
+            sampler_rollup "$now"
+        fi
+        ((SAMPLER_MINUTE != 0)) && SAMPLER_FULL_MINUTE=true
+        SAMPLER_MINUTE=$minute
+        
+        for iface in "${SAMPLER_IFACES[@]}"; do
+            SAMPLER_BASE[$iface]="${SAMPLER_COUNTERS[$iface]}"
+            SAMPLER_PEAK[$iface]="0 0"
+        done
+    fi
+    
+    for iface in "${SAMPLER_IFACES[@]}"; do
+        curr=(${SAMPLER_COUNTERS[$iface]})
+        [[ ${#curr[@]} -eq 8 ]] || continue
+        
+        if [[ -z "${SAMPLER_PREV[$iface]}" ]]; then
+            SAMPLER_PREV[$iface]="${SAMPLER_COUNTERS[$iface]}"
+            [[ -z "${SAMPLER_BASE[$iface]}" ]] && SAMPLER_BASE[$iface]="${SAMPLER_COUNTERS[$iface]}"
+            continue
+        fi
+        
+        prev=(${SAMPLER_PREV[$iface]})
+        rates=()
+        
+        for ((i = 0; i < 8; i++)); do
+            delta=$((curr[i] - prev[i]))
+            ((delta < 0)) && delta=0    # Counter reset
+            
+            # Bytes and packets as rates per second, errors and drops as counts
+            case $i in
+                0|1|4|5) rates[i]=$((delta * 1000000 / elapsed)) ;;
+                *) rates[i]=$delta ;;
+            esac
+        done
+        
+        pos=${TRAFFIC_RING_POS[$iface]}
+        TRAFFIC_RING[$iface:$pos]="$now ${rates[0]} ${rates[4]} ${rates[1]} ${rates[5]} ${rates[2]} ${rates[6]} ${rates[3]} ${rates[7]}"
+        TRAFFIC_RING_POS[$iface]=$(( (pos + 1) % size ))
+        ((TRAFFIC_RING_COUNT[$iface] < size)) && ((TRAFFIC_RING_COUNT[$iface]++))
+        
+        peak=(${SAMPLER_PEAK[$iface]})
+        ((rates[0] > peak[0])) && peak[0]=${rates[0]}
+        ((rates[4] > peak[1])) && peak[1]=${rates[4]}
+        SAMPLER_PEAK[$iface]="${peak[0]} ${peak[1]}"
+        
+        SAMPLER_PREV[$iface]="${SAMPLER_COUNTERS[$iface]}"
+    done
+    
+    SAMPLER_PREV_US=$now_us
+    return 0
+}
+
+# Write the per-minute totals to the history, the time-series store and
+# the streaming anomaly detector (one process per minute, not per sample)
+sampler_rollup() {
+    local now="$1"
+    local log_file="${2:-${LOG_FILE:-${SCRIPT_DIR}/logs/traffic.log}}"
+    local history="" series="" samples=""
+    local iface rx tx
+    local -a base curr peak
+    
+    for iface in "${SAMPLER_IFACES[@]}"; do
+        [[ -n "${SAMPLER_BASE[$iface]}" ]] || continue
+        base=(${SAMPLER_BASE[$iface]})
+        curr=(${SAMPLER_COUNTERS[$iface]})
+        peak=(${SAMPLER_PEAK[$iface]})
+        
+        rx=$((curr[0] - base[0]))
+        tx=$((curr[4] - base[4]))
+        ((rx < 0)) && rx=0
+        ((tx < 0)) && tx=0
+        
+        history+="$now|$iface|$rx|$tx"$'\n'
+        series+="traffic.$iface $now $rx $tx"$'\n'
+        samples+="traffic.${iface}.rx $now $rx"$'\n'"traffic.${iface}.tx $now $tx"$'\n'
+        samples+="traffic.${iface}.rx_peak $now ${peak[0]}"$'\n'"traffic.${iface}.tx_peak $now ${peak[1]}"$'\n'
+        
+        log_message "INFO" "Traffic rate on $iface: RX=$rx/min TX=$tx/min (peak RX=${peak[0]}/s TX=${peak[1]}/s)" "$log_file"
+    done
+    
+    [[ -n "$history" ]] || return 0
+    
+    printf '%s' "$history" >> "$TRAFFIC_HISTORY_FILE"
+    printf '%s' "$series" | tsdb_append -
+    printf '%s' "$samples" | anomaly_observe
+}
+
+# Publish the ring buffers for other processes (oldest sample first)
+# Format: #UPDATED=TS INTERVAL=SECONDS SIZE=N, then
+# IFACE|TS|RX_BPS|TX_BPS|RX_PPS|TX_PPS|RX_ERR|TX_ERR|RX_DROP|TX_DROP lines
+sampler_write_live() {
+    local interval="$1"
+    local size="${TRAFFIC_RING_SIZE:-120}"
+    local out iface slot count i
+    
+    printf -v out '#UPDATED=%(%s)T INTERVAL=%s SIZE=%s\n' -1 "$interval" "$size"
+    
+    for iface in "${SAMPLER_IFACES[@]}"; do
+        count=${TRAFFIC_RING_COUNT[$iface]}
+        slot=$(( (TRAFFIC_RING_POS[$iface] - count + size) % size ))
+        
+        for ((i = 0; i < count; i++)); do
+            out+="$iface|${TRAFFIC_RING[$iface:$slot]// /|}"$'\n'
+            slot=$(( (slot + 1) % size ))
+        done
+    done
+    
+    printf '%s' "$out" > "$TRAFFIC_LIVE_FILE"
+}
+
+# Load the buffers published by a running sampler into TRAFFIC_RING
+# SAMPLER_PEAK is set to the highest rates found in the buffers
+traffic_live_load() {
+    local live_file="${1:-$TRAFFIC_LIVE_FILE}"
+    local iface ts rx tx rest count header
+    local -a peak
+    
+    TRAFFIC_RING=()
+    TRAFFIC_RING_POS=()
+    TRAFFIC_RING_COUNT=()
+    SAMPLER_IFACES=()
+    
+    [[ -f "$live_file" ]] || return 1
+    
+    while IFS='|' read -r iface ts rx tx rest; do
+        if [[ "$iface" == \#* ]]; then
+            for header in $iface; do
+                [[ "$header" == SIZE=* ]] && TRAFFIC_RING_SIZE="${header#SIZE=}"
+            done
+            continue
+        fi
+        [[ -z "$iface" || -z "$rest" ]] && continue
+        [[ -z "${TRAFFIC_RING_POS[$iface]+set}" ]] && sampler_add_iface "$iface"
+        
+        count=${TRAFFIC_RING_COUNT[$iface]}
+        TRAFFIC_RING[$iface:$count]="$ts $rx $tx ${rest//|/ }"
+        TRAFFIC_RING_COUNT[$iface]=$((count + 1))
+        TRAFFIC_RING_POS[$iface]=$(( (count + 1) % ${TRAFFIC_RING_SIZE:-120} ))
+        
+        peak=(${SAMPLER_PEAK[$iface]})
+        ((rx > peak[0])) && peak[0]=$rx
+        ((tx > peak[1])) && peak[1]=$tx
+        SAMPLER_PEAK[$iface]="${peak[0]} ${peak[1]}"
+    done < "$live_file"
+    
+    return 0
+}
+
+# Latest sample of an interface (stored in REPLY, empty if none)
+traffic_ring_latest() {
+    local iface="$1"
+    local size="${TRAFFIC_RING_SIZE:-120}"
+    
+    REPLY=""
+    ((${TRAFFIC_RING_COUNT[$iface]:-0} > 0)) || return 1
+    REPLY="${TRAFFIC_RING[$iface:$(( (TRAFFIC_RING_POS[$iface] - 1 + size) % size ))]}"
+}
+
+# Check if a background sampler is running
+traffic_sampler_running() {
+    local pid
+    
+    [[ -f "$TRAFFIC_SAMPLER_PID" ]] || return 1
+    read -r pid < "$TRAFFIC_SAMPLER_PID"
+    [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null
+}
+
+# Sampling loop
+# mode: display (redraw the table every tick) or daemon (no output)
+traffic_sampler_run() {
+    local mode="${1:-display}"
+    local interval="${TRAFFIC_SAMPLE_INTERVAL:-1}"
+    local sleep_fd now_us remaining timeout
+    
+    sampler_interval_us "$interval"
+    local interval_us=$REPLY
+    
+    ensure_dir "$(dirname "$TRAFFIC_LIVE_FILE")" || return 1
+    
+    # Descriptor that never receives data: read -t on it sleeps without forking
+    exec {sleep_fd}<> <(:)
+    
+    sampler_tick || return 1
+    local next_us=$((SAMPLER_PREV_US + interval_us))
+    
+    while true; do
+        now_us="${EPOCHREALTIME/[.,]/}"
+        remaining=$((next_us - now_us))
+        
+        if ((remaining > 0)); then
+            printf -v timeout '%d.%06d' $((remaining / 1000000)) $((remaining % 1000000))
+            read -r -t "$timeout" -u "$sleep_fd"
+        fi
+        
+        sampler_tick || return 1
+        sampler_write_live "$interval"
+        log_flush_due
+        
+        # Keep a fixed cadence; resynchronize if a tick overran
+        ((next_us += interval_us))
+        ((next_us < SAMPLER_PREV_US)) && next_us=$((SAMPLER_PREV_US + interval_us))
+        
+        [[ "$mode" == "display" ]] && traffic_render "$interval"
+    done
+}
+
+# Draw the live rate table without spawning processes
+traffic_render() {
+    local interval="$1"
+    local iface now
+    local -a sample peak
+    local rx tx rx_peak tx_peak
+    
+    printf '\033[H\033[2J'
+    print_header "Monitoreo de Tráfico en Tiempo Real"
+    
+    printf -v now '%(%Y-%m-%d %H:%M:%S)T' -1
+    echo "Hora: $now"
+    echo "Intervalo de muestreo: ${interval}s (resumen en el historial cada minuto)"
+    echo ""
+    
+    print_separator
+    printf "${BOLD}%-12s %12s %12s %9s %9s %6s %6s %12s %12s${NC}\n" \
+        "Interfaz" "RX/s" "TX/s" "Pkt RX/s" "Pkt TX/s" "Err" "Drop" "Pico RX/s" "Pico TX/s"
+    print_separator
+    
+    for iface in "${SAMPLER_IFACES[@]}"; do
+        traffic_ring_latest "$iface" || continue
+        sample=($REPLY)
+        peak=(${SAMPLER_PEAK[$iface]:-0 0})
+        
+        bytes_to_human "${sample[1]}"; rx=$REPLY
+        bytes_to_human "${sample[2]}"; tx=$REPLY
+        bytes_to_human "${peak[0]}"; rx_peak=$REPLY
+        bytes_to_human "${peak[1]}"; tx_peak=$REPLY
+        
+        printf "%-12s %12s %12s %9d %9d %6d %6d %12s %12s\n" \
+            "$iface" "$rx" "$tx" "${sample[3]}" "${sample[4]}" \
+            $((sample[5] + sample[6])) $((sample[7] + sample[8])) "$rx_peak" "$tx_peak"
+    done
+    
+    print_separator
+    print_color "$YELLOW" "⚠ Presiona Ctrl+C para detener"
+}
@@ -0,0 +1,488 @@
+#!/usr/bin/perl
+# SIM-RED EXTENDIDO - Binary Time-Series Store
+# Append-only, fixed-width segments (one file per series) for latency and
+# traffic history, with import/export to the pipe-delimited .dat format
+#
+# Segment layout (little endian):
+#   header  128 bytes: magic "SIMRTS01", version (u16), columns (u16),
+#                      record size (u32), first timestamp (i64),
+#                      last timestamp (i64), column names (NUL padded)
+#   records fixed size: timestamp (i64) + one double per column
+#
+# Usage:
+#   tsdb.pl [--dir DIR] append SERIES TS VALUE [VALUE...]
+#   tsdb.pl [--dir DIR] append -            (lines "SERIES TS VALUE..." on stdin)
+#   tsdb.pl [--dir DIR] create SERIES COL1,COL2,...
+#   tsdb.pl [--dir DIR] tail SERIES N
+#   tsdb.pl [--dir DIR] range SERIES FROM TO
+#   tsdb.pl [--dir DIR] list [PREFIX]
+#   tsdb.pl [--dir DIR] info SERIES
+#   tsdb.pl [--dir DIR] import latency|traffic FILE
+#   tsdb.pl [--dir DIR] export latency|traffic [FILE]
+
+use strict;
+use warnings;
+use File::Basename qw(dirname);
+use File::Path qw(make_path);
+use Cwd qw(abs_path);
+use Fcntl qw(:flock);
+
+my $MAGIC       = 'SIMRTS01';
+my $VERSION     = 1;
+my $HEADER_SIZE = 128;
+my $NAMES_SIZE  = $HEADER_SIZE - 32;
+
+# Known series layouts
+my %SCHEMAS = (
+    latency => [qw(avg min max stddev)],
+    traffic => [qw(rx tx)],
+    dns     => [qw(p50 p95 nxdomain servfail timeout)],
+    host    => [qw(up down up_pkts down_pkts)],
+);
+
+my $script_dir = dirname(dirname(abs_path($0)));
+my $tsdb_dir = $ENV{TSDB_DIR} || "$script_dir/data/tsdb";
+
+if (@ARGV >= 2 && $ARGV[0] eq '--dir') {
+    shift @ARGV;
+    $tsdb_dir = shift @ARGV;
+}
+
+my $command = shift @ARGV || usage();
+
+my %commands = (
+    append => \&cmd_append,
+    create => \&cmd_create,
+    tail   => \&cmd_tail,
+    range  => \&cmd_range,
+    list   => \&cmd_list,
+    info   => \&cmd_info,
+    import => \&cmd_import,
+    export => \&cmd_export,
+);
+
+usage() unless $commands{$command};
+exit($commands{$command}->(@ARGV) || 0);
+
+sub usage {
+    die "Usage: $0 [--dir DIR] append|create|tail|range|list|info|import|export ...\n";
+}
+
+# Segment helpers
+
+sub series_path {
+    my ($series) = @_;
+    die "Invalid series name: $series\n" unless $series =~ /^[\w.:-]+$/;
+    return "$tsdb_dir/$series.ts";
+}
+
+sub default_columns {
+    my ($series, $count) = @_;
+    my ($family) = split /\./, $series;
+    my $schema = $SCHEMAS{$family};
+    return [@$schema] if $schema && @$schema == $count;
+    return [map { "v$_" } 1 .. $count];
+}
+
+sub read_header {
+    my ($fh, $path) = @_;
+    my $raw;
+    seek($fh, 0, 0);
+    read($fh, $raw, $HEADER_SIZE) == $HEADER_SIZE or die "Truncated header: $path\n";
+
+    my ($magic, $version, $ncols, $recsize, $first_ts, $last_ts, $names) =
+        unpack("a8 v v V q< q< a$NAMES_SIZE", $raw);
+    die "Not a SIM-RED series: $path\n" unless $magic eq $MAGIC;
+
+    $names =~ s/\0+$//;
+    return {
+        version  => $version,
+        ncols    => $ncols,
+        recsize  => $recsize,
+        first_ts => $first_ts,
+        last_ts  => $last_ts,
+        columns  => [split /,/, $names],
+    };
+}
+
+sub write_header {
+    my ($fh, $header) = @_;
+    my $names = join(',', @{$header->{columns}});
+    die "Too many columns\n" if length($names) > $NAMES_SIZE;
+
+    my $raw = pack("a8 v v V q< q< a$NAMES_SIZE",
+        $MAGIC, $VERSION, $header->{ncols}, $header->{recsize},
+        $header->{first_ts}, $header->{last_ts}, $names);
+    sysseek($fh, 0, 0);
+    syswrite($fh, $raw) == $HEADER_SIZE or die "Cannot write header: $!\n";
+}
+
+sub create_series {
+    my ($series, $columns) = @_;
+    my $path = series_path($series);
+    make_path($tsdb_dir) unless -d $tsdb_dir;
+
+    open(my $fh, '+>', $path) or die "Cannot create $path: $!\n";
+    binmode($fh);
+    write_header($fh, {
+        ncols    => scalar(@$columns),
+        recsize  => 8 * (1 + @$columns),
+        first_ts => 0,
+        last_ts  => 0,
+        columns  => $columns,
+    });
+    close($fh);
+    return $path;
+}
+
+# Open a segment for reading, memory-mapped when PerlIO supports it
+sub open_reader {
+    my ($series) = @_;
+    my $path = series_path($series);
+    return unless -f $path;
+
+    my $fh;
+    open($fh, '<:mmap', $path) or open($fh, '<:raw', $path)
+        or die "Cannot open $path: $!\n";
+    my $header = read_header($fh, $path);
+    my $count = int(((-s $path) - $HEADER_SIZE) / $header->{recsize});
+    return ($fh, $header, $count);
+}
+
+sub read_record {
+    my ($fh, $header, $index) = @_;
+    my $raw;
+    seek($fh, $HEADER_SIZE + $index * $header->{recsize}, 0);
+    read($fh, $raw, $header->{recsize}) == $header->{recsize} or return;
+    return unpack("q< d<$header->{ncols}", $raw);
+}
+
+sub read_timestamp {
+    my ($fh, $header, $index) = @_;
+    my $raw;
+    seek($fh, $HEADER_SIZE + $index * $header->{recsize}, 0);
+    read($fh, $raw, 8);
+    return unpack('q<', $raw);
+}
+
+# First record index with timestamp >= $ts (binary search)
+sub lower_bound {
+    my ($fh, $header, $count, $ts) = @_;
+    my ($lo, $hi) = (0, $count);
+    while ($lo < $hi) {
+        my $mid = int(($lo + $hi) / 2);
+        if (read_timestamp($fh, $header, $mid) < $ts) {
+            $lo = $mid + 1;
+        } else {
+            $hi = $mid;
+        }
+    }
+    return $lo;
+}
+
+sub format_record {
+    my ($ts, @values) = @_;
+    return join('|', $ts, map { sprintf('%.15g', $_) } @values);
+}
+
+# Append records to one series; returns the number written
+# Records not newer than the last stored timestamp are skipped (append-only)
+sub append_records {
+    my ($series, $records) = @_;
+    return 0 unless @$records;
+
+    my $path = series_path($series);
+    create_series($series, default_columns($series, scalar(@{$records->[0]}) - 1))
+        unless -f $path;
+
+    open(my $fh, '+<', $path) or die "Cannot open $path: $!\n";
+    binmode($fh);
+    flock($fh, LOCK_EX) or die "Cannot lock $path: $!\n";
+    my $header = read_header($fh, $path);
+
+    my $buffer = '';
+    my $written = 0;
+    my $count = int(((-s $path) - $HEADER_SIZE) / $header->{recsize});
+
+    foreach my $record (@$records) {
+        my ($ts, @values) = @$record;
+        if (@values != $header->{ncols}) {
+            warn "Skipping record with " . scalar(@values) . " values for $series ($header->{ncols} expected)\n";
+            next;
+        }
+        next if ($count + $written) > 0 && $ts <= $header->{last_ts};
+
+        $buffer .= pack("q< d<$header->{ncols}", $ts, @values);
+        $header->{first_ts} = $ts if ($count + $written) == 0;
+        $header->{last_ts} = $ts;
+        $written++;
+    }
+
+    if ($written) {
+        # Keep the file a whole number of records even after a torn write
+        sysseek($fh, $HEADER_SIZE + $count * $header->{recsize}, 0);
+        syswrite($fh, $buffer) == length($buffer) or die "Cannot append to $path: $!\n";
+        truncate($fh, $HEADER_SIZE + ($count + $written) * $header->{recsize});
+        write_header($fh, $header);
+    }
+
+    close($fh);
+    return $written;
+}
+
+# Merge records into one series in timestamp order; returns the number
+# written. Unlike append_records, records older than the last stored one
+# are kept, so a .dat history can be imported after live samples; a
+# timestamp already stored keeps its stored values
+sub merge_records {
+    my ($series, $records) = @_;
+    return 0 unless @$records;
+
+    my $path = series_path($series);
+    my @sorted = sort { $a->[0] <=> $b->[0] } @$records;
+    return append_records($series, \@sorted) unless -f $path;
+
+    open(my $fh, '+<', $path) or die "Cannot open $path: $!\n";
+    binmode($fh);
+    flock($fh, LOCK_EX) or die "Cannot lock $path: $!\n";
+    my $header = read_header($fh, $path);
+    my $count = int(((-s $path) - $HEADER_SIZE) / $header->{recsize});
+
+    # Newer than everything stored: a plain append
+    if (!$count || $sorted[0][0] > $header->{last_ts}) {
+        close($fh);
+        return append_records($series, \@sorted);
+    }
+
+    my $stored = '';
+    sysseek($fh, $HEADER_SIZE, 0);
+    sysread($fh, $stored, $count * $header->{recsize}) == $count * $header->{recsize}
+        or die "Cannot read $path: $!\n";
+
+    # Two-way merge of the stored records and the new ones
+    my ($buffer, $written, $i, $last) = ('', 0, 0, undef);
+    foreach my $record (@sorted) {
+        my ($ts, @values) = @$record;
+        if (@values != $header->{ncols}) {
+            warn "Skipping record with " . scalar(@values) . " values for $series ($header->{ncols} expected)\n";
+            next;
+        }
+        while ($i < $count) {
+            my $ts_stored = unpack('q<', substr($stored, $i * $header->{recsize}, 8));
+            last if $ts_stored > $ts;
+            $buffer .= substr($stored, $i++ * $header->{recsize}, $header->{recsize});
+            $last = $ts_stored;
+        }
+        next if defined $last && $ts <= $last;
+
+        $buffer .= pack("q< d<$header->{ncols}", $ts, @values);
+        $last = $ts;
+        $written++;
+    }
+    $buffer .= substr($stored, $i * $header->{recsize}) if $i < $count;
+
+    if ($written) {
+        sysseek($fh, $HEADER_SIZE, 0);
+        syswrite($fh, $buffer) == length($buffer) or die "Cannot rewrite $path: $!\n";
+        truncate($fh, $HEADER_SIZE + length($buffer));
+        $header->{first_ts} = unpack('q<', $buffer);
+        $header->{last_ts} = unpack('q<', substr($buffer, -$header->{recsize}, 8));
+        write_header($fh, $header);
+    }
+
+    close($fh);
+    return $written;
+}
+
+sub parse_number {
+    my ($value) = @_;
+    return 0 unless defined $value && $value =~ /^-?[\d.]+(?:[eE][-+]?\d+)?$/;
+    return $value + 0;
+}
+
+# Commands
+
+sub cmd_append {
+    my ($series, @args) = @_;
+    usage() unless defined $series;
+
+    if ($series eq '-') {
+        my %batches;
+        my @order;
+        while (my $line = <STDIN>) {
+            my ($name, $ts, @values) = split ' ', $line;
+            next unless defined $ts;
+            push @order, $name unless $batches{$name};
+            push @{$batches{$name}}, [int($ts), map { parse_number($_) } @values];
+        }
+        append_records($_, $batches{$_}) foreach @order;
+        return 0;
+    }
+
+    my ($ts, @values) = @args;
+    usage() unless defined $ts && @values;
+    append_records($series, [[int($ts), map { parse_number($_) } @values]]);
+    return 0;
+}
+
+sub cmd_create {
+    my ($series, $columns) = @_;
+    usage() unless defined $columns;
+    create_series($series, [split /,/, $columns]) unless -f series_path($series);
+    return 0;
+}
+
+sub cmd_tail {
+    my ($series, $n) = @_;
+    usage() unless defined $series;
+    $n = 10 unless defined $n && $n =~ /^\d+$/;
+
+    my ($fh, $header, $count) = open_reader($series);
+    return 1 unless $fh;
+
+    my $start = $count > $n ? $count - $n : 0;
+    for my $i ($start .. $count - 1) {
+        my @record = read_record($fh, $header, $i);
+        print format_record(@record), "\n" if @record;
+    }
+    close($fh);
+    return 0;
+}
+
+sub cmd_range {
+    my ($series, $from, $to) = @_;
+    usage() unless defined $to;
+
+    my ($fh, $header, $count) = open_reader($series);
+    return 1 unless $fh;
+
+    for (my $i = lower_bound($fh, $header, $count, $from); $i < $count; $i++) {
+        my @record = read_record($fh, $header, $i);
+        last if !@record || $record[0] > $to;
+        print format_record(@record), "\n";
+    }
+    close($fh);
+    return 0;
+}
+
+sub list_series {
+    my ($prefix) = @_;
+    $prefix = '' unless defined $prefix;
+    opendir(my $dh, $tsdb_dir) or return ();
+    my @series = sort map { /^(.+)\.ts$/ ? $1 : () } readdir($dh);
+    closedir($dh);
+    return grep { index($_, $prefix) == 0 } @series;
+}
+
+sub cmd_list {
+    my ($prefix) = @_;
+    print "$_\n" foreach list_series($prefix);
+    return 0;
+}
+
+sub cmd_info {
+    my ($series) = @_;
+    usage() unless defined $series;
+
+    my ($fh, $header, $count) = open_reader($series);
+    return 1 unless $fh;
+    close($fh);
+
+    print "series=$series\n";
+    print "columns=", join(',', @{$header->{columns}}), "\n";
+    print "records=$count\n";
+    print "first_ts=$header->{first_ts}\n";
+    print "last_ts=$header->{last_ts}\n";
+    return 0;
+}
+
+# Import .dat history, merged with the records already stored (safe to
+# re-run, and to run after live samples were appended). Leaves an
+# .imported.KIND marker so callers import each history once
+sub cmd_import {
+    my ($kind, $file) = @_;
+    usage() unless defined $file && $SCHEMAS{$kind};
+
+    open(my $in, '<', $file) or die "Cannot open $file: $!\n";
+    my %batches;
+
+    while (my $line = <$in>) {
+        chomp $line;
+        my @fields = split /\|/, $line;
+        next unless @fields && $fields[0] =~ /^\d+$/;
+
+        if ($kind eq 'latency') {
+            push @{$batches{latency}}, [$fields[0], map { parse_number($fields[$_]) } 1 .. 4];
+        } else {
+            next unless defined $fields[1] && $fields[1] =~ /^[\w.:-]+$/;
+            push @{$batches{"traffic.$fields[1]"}},
+                [$fields[0], parse_number($fields[2]), parse_number($fields[3])];
+        }
+    }
+    close($in);
+
+    my $total = 0;
+    $total += merge_records($_, $batches{$_}) foreach sort keys %batches;
+
+    make_path($tsdb_dir) unless -d $tsdb_dir;
+    if (open(my $marker, '>', "$tsdb_dir/.imported.$kind")) {
+        print $marker "$file\n";
+        close($marker);
+    }
+    print "Imported $total records from $file\n";
+    return 0;
+}
+
+# Export back to the .dat text format used by the AWK/Perl consumers
+sub cmd_export {
+    my ($kind, $file) = @_;
+    usage() unless defined $kind && $SCHEMAS{$kind};
+
+    my $out = \*STDOUT;
+    if (defined $file) {
+        open($out, '>', $file) or die "Cannot write $file: $!\n";
+    }
+
+    if ($kind eq 'latency') {
+        my ($fh, $header, $count) = open_reader('latency');
+        if ($fh) {
+            for my $i (0 .. $count - 1) {
+                my @record = read_record($fh, $header, $i);
+                print $out format_record(@record), "\n";
+            }
+            close($fh);
+        }
+    } else {
+        # Merge all interfaces by timestamp: TS|IFACE|RX|TX
+        my @cursors;
+        foreach my $series (list_series('traffic.')) {
+            my ($fh, $header, $count) = open_reader($series);
+            next unless $fh && $count;
+            my @first = read_record($fh, $header, 0);
+            push @cursors, {
+                iface  => substr($series, length('traffic.')),
+                fh     => $fh,
+                header => $header,
+                count  => $count,
+                index  => 0,
+                record => \@first,
+            };
+        }
+
+        while (@cursors) {
+            my ($next) = sort { $a->{record}[0] <=> $b->{record}[0] } @cursors;
+            my ($ts, @values) = @{$next->{record}};
+            print $out join('|', $ts, $next->{iface}, map { sprintf('%.15g', $_) } @values), "\n";
+
+            if (++$next->{index} < $next->{count}) {
+                $next->{record} = [read_record($next->{fh}, $next->{header}, $next->{index})];
+            } else {
+                close($next->{fh});
+                @cursors = grep { $_ != $next } @cursors;
+            }
+        }
+    }
+
+    close($out) if defined $file;
+    return 0;
+}
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Métricas Actuales para la Documentación
+Resume los históricos de data/, el último informe de reports/ y las
+alertas de logs/ como una sección más del modelo de contenido.
+
+La agregación es incremental: por cada archivo se guarda un cursor
+(inodo y desplazamiento) junto con los totales acumulados, así cada
+construcción solo lee los bytes añadidos desde la anterior.
+"""
+
+import glob
+import html
+import json
+import os
+import re
+from datetime import datetime
+
+from build_cache import CACHE_DIR
+
+ESTADO_FILE = os.path.join(CACHE_DIR, 'metricas.json')
+
+LATENCIA_FILE = os.path.join('data', 'latency_history.dat')
+TRAFICO_FILE = os.path.join('data', 'traffic_history.dat')
+INFORMES_GLOB = os.path.join('reports', 'report_*.dat')
+LOGS_GLOB = os.path.join('logs', '*.log')
+
+# Puntos de las gráficas y días de resumen diario que se conservan
+PUNTOS_GRAFICA = 60
+DIAS_RESUMEN = 7
+
+NIVELES_ALERTA = ('CRITICAL', 'ALERT', 'ERROR', 'WARNING')
+LINEA_LOG = re.compile(r'^\[([^\]]+)\] \[([A-Z]+)\] ?(.*)$')
+
+# ========== LECTURA INCREMENTAL ==========
+
+def _lineas_nuevas(path, cursor):
+    """
+    Líneas completas añadidas a path desde el cursor.
+    Devuelve (líneas, cursor nuevo, reiniciado); reiniciado es True si el
+    archivo fue sustituido (rotación) o truncado y se leyó desde el inicio.
+    Una última línea sin salto de línea se deja para la próxima lectura.
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        offset = cursor.get('offset', 0)
+        reiniciado = cursor.get('inode') != st.st_ino or st.st_size < offset
+        if reiniciado:
+            offset = 0
+
+        f.seek(offset)
+        lineas = []
+        for linea in f:
+            if not linea.endswith(b'\n'):
+                break
+            offset += len(linea)
+            lineas.append(linea[:-1].decode('utf-8', errors='replace'))
+
+    return lineas, {'inode': st.st_ino, 'offset': offset}, reiniciado
+
+def _numero(texto):
+    """float de un campo; None si está vacío o es N/A"""
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+def _dia(epoch):
+    return datetime.fromtimestamp(epoch).strftime('%Y-%m-%d')
+
+def _recortar(datos):
+    """Limita la serie de la gráfica y los días del resumen"""
+    datos['serie'] = datos['serie'][-PUNTOS_GRAFICA:]
+    for dia in sorted(datos['dias'])[:-DIAS_RESUMEN]:
+        del datos['dias'][dia]
+
+# ========== AGREGADORES ==========
+
+def _latencia_vacia():
+    return {'muestras': 0, 'suma': 0.0, 'min': None, 'max': None,
+            'primera': None, 'ultima': None, 'ultimo_avg': None,
+            'serie': [], 'dias': {}}
+
+def _agregar_latencia(datos, lineas):
+    """Líneas EPOCH|AVG|MIN|MAX|STDDEV de latency_history.dat"""
+    for linea in lineas:
+        campos = linea.split('|')
+        if len(campos) < 4 or not campos[0].isdigit():
+            continue
+        epoch = int(campos[0])
+        avg, minimo, maximo = (_numero(c) for c in campos[1:4])
+        if avg is None:
+            continue
+
+        datos['muestras'] += 1
+        datos['suma'] += avg
+        if minimo is not None and (datos['min'] is None or minimo < datos['min']):
+            datos['min'] = minimo
+        if maximo is not None and (datos['max'] is None or maximo > datos['max']):
+            datos['max'] = maximo
+        if datos['primera'] is None:
+            datos['primera'] = epoch
+        datos['ultima'] = epoch
+        datos['ultimo_avg'] = avg
+        datos['serie'].append(avg)
+
+        dia = datos['dias'].setdefault(_dia(epoch), [0.0, 0])
+        dia[0] += avg
+        dia[1] += 1
+
+    _recortar(datos)
+
+def _trafico_vacio():
+    return {'primera': None, 'ultima': None, 'interfaces': {}}
+
+def _agregar_trafico(datos, lineas):
+    """Líneas EPOCH|INTERFAZ|RX|TX (bytes por minuto) de traffic_history.dat"""
+    for linea in lineas:
+        campos = linea.split('|')
+        if len(campos) < 4 or not campos[0].isdigit():
+            continue
+        epoch = int(campos[0])
+        rx, tx = _numero(campos[2]), _numero(campos[3])
+        if rx is None or tx is None:
+            continue
+
+        iface = datos['interfaces'].setdefault(campos[1], {
+            'minutos': 0, 'rx': 0, 'tx': 0, 'pico': 0, 'serie': [], 'dias': {}})
+        iface['minutos'] += 1
+        iface['rx'] += int(rx)
+        iface['tx'] += int(tx)
+        iface['pico'] = max(iface['pico'], int(rx + tx))
+        iface['serie'].append(int(rx + tx))
+
+        dia = iface['dias'].setdefault(_dia(epoch), [0, 0])
+        dia[0] += int(rx)
+        dia[1] += int(tx)
+
+        if datos['primera'] is None:
+            datos['primera'] = epoch
+        datos['ultima'] = epoch
+
+    for iface in datos['interfaces'].values():
+        _recortar(iface)
+
+def _agregar_log(datos, lineas):
+    """Registros "[FECHA] [NIVEL] mensaje" de un log"""
+    for linea in lineas:
+        m = LINEA_LOG.match(linea)
+        if not m:
+            continue
+        fecha, nivel, mensaje = m.groups()
+        datos['niveles'][nivel] = datos['niveles'].get(nivel, 0) + 1
+        if nivel in NIVELES_ALERTA[:2]:
+            datos['ultima_alerta'] = [fecha, mensaje]
+
+def _leer_informe(path):
+    """Secciones [NOMBRE] de un report_*.dat, cada una como lista de líneas"""
+    secciones = {}
+    actual = None
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for linea in f:
+            linea = linea.rstrip('\n')
+            m = re.match(r'^\[(.+)\]$', linea)
+            if m:
+                actual = secciones.setdefault(m.group(1), [])
+            elif actual is not None and linea:
+                actual.append(linea)
+
+    resumen = [l.split(': ', 1) for l in secciones.get('SUMMARY', []) if ': ' in l]
+    dispositivos = [l.split('|') for l in secciones.get('DEVICES', [])]
+    return {
+        'archivo': os.path.basename(path),
+        'resumen': resumen,
+        'desconocidos': [d[:2] for d in dispositivos if len(d) >= 4 and d[3] != 'OK'],
+        'spoofing': secciones.get('SPOOFING', []),
+        'latencia': [l.split('|') for l in secciones.get('LATENCY', []) if l.count('|') >= 4],
+        'tiempos': [l.split('|') for l in secciones.get('TIMINGS', []) if l.count('|') >= 2]
+    }
+
+# ========== ESTADO PERSISTENTE ==========
+
+def _cargar_estado(estado_file):
+    try:
+        with open(estado_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _guardar_estado(estado, estado_file):
+    """Escribe los cursores y totales de forma atómica"""
+    os.makedirs(os.path.dirname(estado_file) or '.', exist_ok=True)
+    tmp_file = estado_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, estado_file)
+
+def _actualizar_fuente(fuentes, path, vacio, agregar, conservar=False):
+    """
+    Lee lo nuevo de una fuente y acumula sus totales.
+    conservar: mantener los totales si el archivo rota (logs); si no, un
+    archivo sustituido o truncado se vuelve a resumir desde cero
+    """
+    fuente = fuentes.get(path) or {'cursor': {}, 'datos': vacio()}
+    lineas, cursor, reiniciado = _lineas_nuevas(path, fuente['cursor'])
+
+    if reiniciado and fuente['cursor'] and not conservar:
+        fuente['datos'] = vacio()
+
+    agregar(fuente['datos'], lineas)
+    fuente['cursor'] = cursor
+    fuentes[path] = fuente
+    return len(lineas)
+
+def actualizar(estado_file=ESTADO_FILE):
+    """
+    Incorpora los datos nuevos de cada fuente y guarda los cursores.
+    Devuelve el estado agregado.
+    """
+    estado = _cargar_estado(estado_file)
+    fuentes = estado.setdefault('fuentes', {})
+    nuevas = 0
+
+    if os.path.exists(LATENCIA_FILE):
+        nuevas += _actualizar_fuente(fuentes, LATENCIA_FILE, _latencia_vacia, _agregar_latencia)
+    if os.path.exists(TRAFICO_FILE):
+        nuevas += _actualizar_fuente(fuentes, TRAFICO_FILE, _trafico_vacio, _agregar_trafico)
+
+    logs = sorted(glob.glob(LOGS_GLOB))
+    for path in logs:
+        nuevas += _actualizar_fuente(fuentes, path, lambda: {'niveles': {}, 'ultima_alerta': None},
+                                     _agregar_log, conservar=True)
+
+    # Fuentes que ya no existen (logs borrados, históricos eliminados)
+    for path in list(fuentes):
+        if not os.path.exists(path):
+            del fuentes[path]
+
+    # Último informe: se relee solo si cambió
+    informes = sorted(glob.glob(INFORMES_GLOB))
+    if informes:
+        st = os.stat(informes[-1])
+        firma = [informes[-1], st.st_size, st.st_mtime_ns]
+        if estado.get('informe', {}).get('firma') != firma:
+            estado['informe'] = {'firma': firma, 'datos': _leer_informe(informes[-1])}
+    else:
+        estado.pop('informe', None)
+
+    _guardar_estado(estado, estado_file)
+    print(f"📈 Métricas actualizadas: {nuevas} registro(s) nuevo(s)")
+    return estado
+
+# ========== SECCIÓN DEL DOCUMENTO ==========
+
+def _texto(valor):
+    """Dato leído de un archivo, escapado para el marcado del modelo"""
+    return html.escape(str(valor), quote=False)
+
+def _fecha(epoch):
+    return datetime.fromtimestamp(epoch).strftime('%d/%m/%Y %H:%M')
+
+def _bytes(n):
+    """Cantidad de bytes en la unidad más legible"""
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024:
+            return f'{n:.0f} {unidad}' if unidad == 'B' else f'{n:.1f} {unidad}'
+        n /= 1024
+    return f'{n:.1f} TB'
+
+def _bloques_latencia(datos):
+    if not datos['muestras']:
+        return []
+    promedio = datos['suma'] / datos['muestras']
+    bloques = [
+        ('apartado', '⏱️ Latencia de la red'),
+        ('tabla', ['Muestras', 'Periodo', 'Mínima', 'Promedio', 'Máxima', 'Última'], [[
+            str(datos['muestras']),
+            f"{_fecha(datos['primera'])} – {_fecha(datos['ultima'])}",
+            f"{datos['min']:.2f} ms" if datos['min'] is not None else 'N/A',
+            f'{promedio:.2f} ms',
+            f"{datos['max']:.2f} ms" if datos['max'] is not None else 'N/A',
+            f"{datos['ultimo_avg']:.2f} ms"
+        ]]),
+        ('grafica', f'Latencia promedio, últimas {len(datos["serie"])} mediciones', datos['serie'], 'ms')
+    ]
+    dias = sorted(datos['dias'].items())
+    if dias:
+        bloques.append(('tabla', ['Día', 'Mediciones', 'Promedio'],
+                        [[dia, str(n), f'{suma / n:.2f} ms'] for dia, (suma, n) in dias]))
+    return bloques
+
+def _bloques_trafico(datos):
+    if not datos['interfaces']:
+        return []
+    filas = []
+    bloques = [('apartado', '📶 Tráfico por interfaz')]
+    for nombre, iface in sorted(datos['interfaces'].items()):
+        minutos = iface['minutos']
+        filas.append([_texto(nombre), str(minutos), _bytes(iface['rx']), _bytes(iface['tx']),
+                      f"{_bytes((iface['rx'] + iface['tx']) / minutos)}/min",
+                      f"{_bytes(iface['pico'])}/min"])
+    bloques.append(('tabla', ['Interfaz', 'Minutos', 'RX total', 'TX total', 'Media', 'Pico'], filas))
+    bloques.append(('p', f"Periodo: {_fecha(datos['primera'])} – {_fecha(datos['ultima'])}"))
+    bloques.append(('tabla', ['Día', 'Interfaz', 'RX', 'TX'],
+                    [[dia, _texto(nombre), _bytes(rx), _bytes(tx)]
+                     for nombre, iface in sorted(datos['interfaces'].items())
+                     for dia, (rx, tx) in sorted(iface['dias'].items())]))
+    for nombre, iface in sorted(datos['interfaces'].items()):
+        bloques.append(('grafica', f'{_texto(nombre)}: bytes por minuto (RX+TX), últimos {len(iface["serie"])} minutos',
+                        iface['serie'], 'B'))
+    return bloques
+
+def _bloques_alertas(logs):
+    filas = []
+    for path, datos in sorted(logs.items()):
+        niveles = datos['niveles']
+        if not any(niveles.get(n) for n in NIVELES_ALERTA):
+            continue
+        ultima = datos['ultima_alerta']
+        filas.append([_texto(os.path.basename(path))] + [str(niveles.get(n, 0)) for n in NIVELES_ALERTA] +
+                     [_texto(f'{ultima[0]}: {ultima[1]}') if ultima else '-'])
+    if not filas:
+        return [('apartado', '🚨 Alertas registradas'), ('p', 'Sin avisos ni alertas en los logs.')]
+    return [('apartado', '🚨 Alertas registradas'),
+            ('tabla', ['Log', *NIVELES_ALERTA, 'Última alerta'], filas)]
+
+def _bloques_informe(informe):
+    bloques = [('apartado', f"📋 Último informe ({_texto(informe['archivo'])})")]
+    etiquetas = [(f'{_texto(clave)}:', _texto(valor)) for clave, valor in informe['resumen']]
+    etiquetas.append(('Dispositivos desconocidos:', str(len(informe['desconocidos']))))
+    bloques.append(('etiquetas', etiquetas))
+    if informe['desconocidos']:
+        bloques.append(('tabla', ['IP', 'MAC'], [[_texto(c) for c in fila] for fila in informe['desconocidos']]))
+    if informe['spoofing']:
+        bloques.append(('lista', [_texto(l) for l in informe['spoofing']]))
+    if informe['latencia']:
+        bloques.append(('tabla', ['Host', 'Mínima (ms)', 'Promedio (ms)', 'Máxima (ms)', 'Estado'],
+                        [[_texto(c) for c in fila[:5]] for fila in informe['latencia']]))
+    if informe['tiempos']:
+        bloques.append(('tabla', ['Etapa', 'Segundos', 'Estado'], [[_texto(c) for c in fila[:3]] for fila in informe['tiempos']]))
+    return bloques
+
+def seccion_estado(estado):
+    """Sección "Estado actual" en el formato de contenido_simred"""
+    fuentes = estado.get('fuentes', {})
+    bloques = [('p', 'Resumen generado a partir de los históricos de <code>data/</code>, '
+                     'el último informe de <code>reports/</code> y los logs del sistema.')]
+
+    if LATENCIA_FILE in fuentes:
+        bloques += _bloques_latencia(fuentes[LATENCIA_FILE]['datos'])
+    if TRAFICO_FILE in fuentes:
+        bloques += _bloques_trafico(fuentes[TRAFICO_FILE]['datos'])
+    if 'informe' in estado:
+        bloques += _bloques_informe(estado['informe']['datos'])
+    bloques += _bloques_alertas({path: f['datos'] for path, f in fuentes.items() if path.endswith('.log')})
+
+    return {'id': 'estado', 'titulo': '📈 Estado Actual de la Red', 'bloques': bloques}
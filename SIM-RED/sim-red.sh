@@ -107,6 +107,16 @@ check_initial_requirements() {
     # Auto-detect network configuration
     auto_detect_network "yes"
     
+    # Start the collector daemon (it probes nothing until a module asks for
+    # data) so modules can reuse its results. A daemon started here is
+    # stopped when the menu exits, also on a fatal signal. No INT handler:
+    # Ctrl+C in a module must return to the menu
+    if [[ "${COLLECTOR_AUTOSTART:-yes}" == "yes" ]] && \
+        [[ "$(collector_start 2>/dev/null)" == "Collector started"* ]]; then
+        COLLECTOR_OWNED="yes"
+        trap 'stop_owned_collector' EXIT
+    fi
+    
     if [[ -f "$req_script" ]]; then
         # Run requirements check
         bash "$req_script"
@@ -149,8 +159,18 @@ run_feature() {
     fi
 }
 
+# Stop the collector daemon if this menu started it
+stop_owned_collector() {
+    if [[ "$COLLECTOR_OWNED" == "yes" ]]; then
+        collector_stop > /dev/null 2>&1
+        COLLECTOR_OWNED=""
+    fi
+    log_flush
+}
+
 # Exit program
 exit_program() {
+    stop_owned_collector
     clear
     print_header "SIM-RED EXTENDIDO"
     echo ""
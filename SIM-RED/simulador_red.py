@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SIM-RED EXTENDIDO - Red Simulada para Benchmarks
+Genera una instalación de SIM-RED con una red sintética de N hosts, sin
+tocar la red real:
+
+- config/hosts.conf y config/schedule.conf con N hosts autorizados
+- una tabla ARP (IP|MAC) con hosts conectados, desconocidos, MACs que no
+  coinciden y casos de suplantación, que get_arp_table lee a través de
+  SIMRED_ARP_SOURCE
+- ping y nmap simulados (respuestas deterministas por dirección)
+- históricos de varios meses: latency_history.dat, traffic_history.dat,
+  series del almacén binario, estado del detector incremental, vínculos
+  IP/MAC y un informe .dat para report_generator.pl
+
+Uso: python3 simulador_red.py DESTINO [--hosts N] [--meses N] [--semilla N]
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import shutil
+import stat
+import subprocess
+import sys
+import time
+
+# Partes de la instalación que se copian al árbol simulado
+ARBOL = ('bin', 'lib', 'config', 'sim-red.sh')
+
+INTERFACES = ('sim0', 'sim1')
+
+# Proporciones de la tabla ARP simulada
+CONECTADOS = 0.9          # hosts autorizados presentes en la tabla
+DESCONOCIDOS = 0.05       # dispositivos no autorizados (sobre N)
+MAC_DISTINTA = 0.01       # hosts autorizados que responden con otra MAC
+
+# Horarios de schedule.conf y su peso
+HORARIOS = (('Mon-Sun', '00:00', '23:59', 7),
+            ('Mon-Fri', '08:00', '18:00', 2),
+            ('Sat-Sun', '10:00', '14:00', 1))
+
+PING_SIMULADO = r'''#!/bin/bash
+# ping simulado (benchmark de SIM-RED): latencia fija por dirección,
+# uno de cada 20 hosts no responde; SIMRED_PING_RETARDO segundos de espera
+count=1
+while (($# > 1)); do
+    case "$1" in
+        -c) count="$2"; shift 2 ;;
+        -[Wwis]) shift 2 ;;
+        *) shift ;;
+    esac
+done
+host="$1"
+IFS=. read -r a b c d <<< "$host"
+n=$(( (${c:-0} * 256 + ${d:-0}) ))
+[[ -n "$SIMRED_PING_RETARDO" ]] && read -r -t "$SIMRED_PING_RETARDO" <> <(:)
+
+echo "PING $host ($host) 56(84) bytes of data."
+if ((n % 20 == 7)); then
+    echo ""
+    echo "--- $host ping statistics ---"
+    echo "$count packets transmitted, 0 received, 100% packet loss, time 0ms"
+    exit 1
+fi
+
+ms=$((n % 90 + 1))
+for ((i = 1; i <= count; i++)); do
+    echo "64 bytes from $host: icmp_seq=$i ttl=$((n % 3 == 0 ? 128 : 64)) time=$ms.$((i % 10))00 ms"
+done
+echo ""
+echo "--- $host ping statistics ---"
+echo "$count packets transmitted, $count received, 0% packet loss, time ${count}000ms"
+echo "rtt min/avg/max/mdev = $ms.000/$ms.450/$ms.900/0.287 ms"
+'''
+
+NMAP_SIMULADO = r'''#!/bin/bash
+# nmap simulado (benchmark de SIM-RED): salida -oG con puertos abiertos
+# fijos por dirección
+ports="" targets=""
+while (($# > 0)); do
+    case "$1" in
+        -p) ports="$2"; shift 2 ;;
+        -iL) targets="$2"; shift 2 ;;
+        -oG|--min-hostgroup) shift 2 ;;
+        *) shift ;;
+    esac
+done
+
+declare -A service=([21]=ftp [22]=ssh [23]=telnet [53]=domain [80]=http [443]=https
+    [500]=isakmp [1194]=openvpn [1723]=pptp [3306]=mysql [4500]=nat-t-ike
+    [5432]=postgresql [8080]=http-proxy)
+
+echo "# Nmap 7.94 scan initiated as: nmap -oG - (simulado)"
+IFS=',' read -ra port_list <<< "$ports"
+while read -r host; do
+    [[ -z "$host" ]] && continue
+    IFS=. read -r a b c d <<< "$host"
+    n=$(( ${c:-0} * 256 + ${d:-0} ))
+    open=""
+    for port in "${port_list[@]}"; do
+        if (( (n + port) % 7 == 0 )); then
+            open+="${open:+, }$port/open/tcp//${service[$port]:-unknown}///"
+        fi
+    done
+    [[ -n "$open" ]] && printf 'Host: %s ()\tPorts: %s\n' "$host" "$open"
+done < "$targets"
+echo "# Nmap done"
+'''
+
+def subred_para(hosts):
+    """Red /N más pequeña (desde 10.20.0.0) con sitio para los hosts y los desconocidos"""
+    necesarios = int(hosts * (1 + DESCONOCIDOS)) + 8
+    prefijo = 30
+    while prefijo > 8 and 2 ** (32 - prefijo) - 2 < necesarios:
+        prefijo -= 1
+    return ipaddress.ip_network(f'10.20.0.0/{prefijo}')
+
+def _mac(indice, prefijo='02:53:52'):
+    return f'{prefijo}:{indice >> 16 & 0xff:02x}:{indice >> 8 & 0xff:02x}:{indice & 0xff:02x}'
+
+def generar_inventario(hosts, semilla=1):
+    """Lista de hosts autorizados: (ip, mac, nombre, días, inicio, fin)"""
+    rnd = random.Random(semilla)
+    red = subred_para(hosts)
+    direcciones = red.hosts()
+    pesos = [h[3] for h in HORARIOS]
+
+    inventario = []
+    for i in range(hosts):
+        dias, inicio, fin, _ = rnd.choices(HORARIOS, pesos)[0]
+        inventario.append((str(next(direcciones)), _mac(i + 1), f'HOST-{i + 1:05d}', dias, inicio, fin))
+    return red, inventario
+
+def generar_tabla_arp(red, inventario, semilla=1):
+    """
+    Tabla ARP simulada (IP|MAC): la mayoría de los hosts autorizados, unos
+    pocos con otra MAC, dispositivos desconocidos al final de la subred,
+    una IP con dos MACs y una MAC con dos IPs
+    """
+    rnd = random.Random(semilla + 1)
+    filas = []
+    for ip, mac, *_ in inventario:
+        if rnd.random() >= CONECTADOS:
+            continue
+        if rnd.random() < MAC_DISTINTA:
+            mac = _mac(rnd.randrange(1 << 24), '0a:bb:cc')
+        filas.append((ip, mac))
+
+    libres = list(red.hosts())[len(inventario):]
+    desconocidos = min(len(libres) - 1, max(1, int(len(inventario) * DESCONOCIDOS)))
+    for i in range(desconocidos):
+        filas.append((str(libres[i]), _mac(i + 1, '0e:de:5c')))
+
+    if len(filas) >= 2:
+        filas.append((filas[0][0], '0e:ba:d0:00:00:01'))
+        filas.append((str(libres[desconocidos]), filas[1][1]))
+    return filas
+
+def escribir_configuracion(destino, red, inventario):
+    """hosts.conf, schedule.conf y ajustes del benchmark al final de config.conf"""
+    config = os.path.join(destino, 'config')
+
+    with open(os.path.join(config, 'hosts.conf'), 'w') as f:
+        f.write('# SIM-RED EXTENDIDO - Authorized Hosts Configuration (red simulada)\n')
+        f.write('# Format: IP|MAC|HOSTNAME|DESCRIPTION\n')
+        for ip, mac, nombre, *_ in inventario:
+            f.write(f'{ip}|{mac}|{nombre}|Equipo simulado\n')
+
+    with open(os.path.join(config, 'schedule.conf'), 'w') as f:
+        f.write('# SIM-RED EXTENDIDO - Access Schedule Configuration (red simulada)\n')
+        f.write('# Format: IP|DAYS|START_TIME|END_TIME\n')
+        for ip, _, _, dias, inicio, fin in inventario:
+            f.write(f'{ip}|{dias}|{inicio}|{fin}\n')
+
+    with open(os.path.join(config, 'config.conf'), 'a') as f:
+        f.write('\n# Red simulada (simulador_red.py): sin colector ni barrido ARP real\n')
+        f.write(f'SUBNET="{red}"\n')
+        f.write(f'NETWORK_INTERFACE="{INTERFACES[0]}"\n')
+        f.write('COLLECTOR_ENABLED="no"\n')
+        f.write('COLLECTOR_AUTOSTART="no"\n')
+        f.write('ARP_SWEEP_ENABLED="no"\n')
+        f.write('LATENCY_PING_COUNT=3\n')
+
+def escribir_simuladores(destino):
+    """ping y nmap simulados en sim/bin (se anteponen al PATH)"""
+    directorio = os.path.join(destino, 'sim', 'bin')
+    os.makedirs(directorio, exist_ok=True)
+    for nombre, codigo in (('ping', PING_SIMULADO), ('nmap', NMAP_SIMULADO)):
+        ruta = os.path.join(directorio, nombre)
+        with open(ruta, 'w') as f:
+            f.write(codigo)
+        os.chmod(ruta, os.stat(ruta).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return directorio
+
+def escribir_historicos(destino, inventario, meses, ahora, semilla=1):
+    """latency_history.dat (cada hora) y traffic_history.dat (cada minuto)"""
+    rnd = random.Random(semilla + 2)
+    datos = os.path.join(destino, 'data')
+    inicio = ahora - meses * 30 * 86400
+
+    with open(os.path.join(datos, 'latency_history.dat'), 'w') as f:
+        for ts in range(inicio - inicio % 3600, ahora, 3600):
+            avg = 20 + 10 * rnd.random()
+            f.write(f'{ts}|{avg:.2f}|{avg * 0.4:.2f}|{avg * 2.5:.2f}|{avg * 0.3:.2f}\n')
+
+    # Tráfico proporcional al número de hosts, con ciclo diario
+    base = 20000 * max(1, len(inventario))
+    with open(os.path.join(datos, 'traffic_history.dat'), 'w') as f:
+        for ts in range(inicio - inicio % 60, ahora, 60):
+            hora = ts // 3600 % 24
+            carga = 0.3 + 0.7 * (8 <= hora < 20)
+            lineas = []
+            for iface in INTERFACES:
+                rx = int(base * carga * (0.8 + 0.4 * rnd.random()))
+                lineas.append(f'{ts}|{iface}|{rx}|{rx // 4}\n')
+            f.writelines(lineas)
+
+def escribir_informe(destino, inventario, filas_arp):
+    """Informe .dat como el de generate_report.sh, con todos los hosts"""
+    autorizados = {ip: nombre for ip, _, nombre, *_ in inventario}
+    ruta = os.path.join(destino, 'data', 'bench_report.dat')
+
+    with open(ruta, 'w') as f:
+        f.write('[SUMMARY]\n')
+        f.write(f'Total Hosts Autorizados: {len(inventario)}\n')
+        f.write(f'Dispositivos Conectados: {len(filas_arp)}\n\n[DEVICES]\n')
+        for ip, mac in filas_arp:
+            nombre = autorizados.get(ip)
+            f.write(f'{ip}|{mac}|{nombre}|OK\n' if nombre else f'{ip}|{mac}|Desconocido|WARNING\n')
+        f.write('\n[SPOOFING]\nNo se detectaron anomalías\n\n[ALERTS]\nSin alertas recientes\n\n[LATENCY]\n')
+        for ip, _, nombre, *_ in inventario:
+            n = int(ip.split('.')[2]) * 256 + int(ip.split('.')[3])
+            if n % 20 != 7:
+                ms = n % 90 + 1
+                f.write(f'{nombre}|{ms}.000|{ms}.450|{ms}.900|{"OK" if ms <= 50 else "MEDIUM"}\n')
+        f.write('\n[TIMINGS]\ntotal|0.000|OK\n')
+    return ruta
+
+def sembrar_estado(destino, inventario, filas_arp, meses, ahora):
+    """
+    Estado de una instalación en uso: series del almacén binario, detector
+    incremental con muestras por host y un mes de vínculos IP/MAC diarios
+    """
+    lib = os.path.join(destino, 'lib')
+    datos = os.path.join(destino, 'data')
+
+    for tipo, archivo in (('latency', 'latency_history.dat'), ('traffic', 'traffic_history.dat')):
+        subprocess.run(['perl', os.path.join(lib, 'tsdb.pl'), '--dir', os.path.join(datos, 'tsdb'),
+                        'import', tipo, os.path.join(datos, archivo)],
+                       check=True, stdout=subprocess.DEVNULL)
+
+    muestras = []
+    for k in range(12):
+        ts = ahora - (12 - k) * 3600
+        muestras.append(f'latency.avg {ts} {20 + k % 5}\n')
+        for ip, *_ in inventario:
+            muestras.append(f'latency.host.{ip} {ts} {int(ip.split(".")[3]) % 90 + 1 + k % 3}\n')
+    subprocess.run(['perl', os.path.join(lib, 'anomaly_detector.pl'), 'observe'],
+                   input=''.join(muestras), text=True, check=True, stdout=subprocess.DEVNULL)
+
+    # Una instantánea diaria; cada día falta un 5 % distinto de los equipos
+    rnd = random.Random(len(inventario))
+    dias = min(30, meses * 30)
+    for dia in range(dias, 0, -1):
+        instantanea = ''.join(f'{ip}|{mac}\n' for ip, mac in filas_arp if rnd.random() >= 0.05)
+        subprocess.run(['perl', os.path.join(lib, 'arp_bindings.pl'), 'observe', str(ahora - dia * 86400)],
+                       input=instantanea, text=True, check=True, stdout=subprocess.DEVNULL)
+
+def crear_red_simulada(destino, hosts, meses=3, semilla=1, origen=None):
+    """
+    Copia la instalación en destino y genera la red simulada.
+    Devuelve las variables de entorno con las que se ejecutan los módulos.
+    """
+    origen = origen or os.path.dirname(os.path.abspath(__file__))
+    if os.path.exists(destino):
+        shutil.rmtree(destino)
+    os.makedirs(destino)
+
+    for parte in ARBOL:
+        ruta = os.path.join(origen, parte)
+        if os.path.isdir(ruta):
+            shutil.copytree(ruta, os.path.join(destino, parte), ignore=shutil.ignore_patterns('__pycache__'))
+        else:
+            shutil.copy2(ruta, destino)
+    for directorio in ('data', 'logs', 'reports'):
+        os.makedirs(os.path.join(destino, directorio), exist_ok=True)
+
+    ahora = int(time.time())
+    red, inventario = generar_inventario(hosts, semilla)
+    filas_arp = generar_tabla_arp(red, inventario, semilla)
+
+    escribir_configuracion(destino, red, inventario)
+    simuladores = escribir_simuladores(destino)
+
+    tabla_arp = os.path.join(destino, 'sim', 'arp_table.dat')
+    with open(tabla_arp, 'w') as f:
+        f.writelines(f'{ip}|{mac}\n' for ip, mac in filas_arp)
+
+    escribir_historicos(destino, inventario, meses, ahora, semilla)
+    escribir_informe(destino, inventario, filas_arp)
+    sembrar_estado(destino, inventario, filas_arp, meses, ahora)
+
+    return {
+        'PATH': simuladores + os.pathsep + os.environ.get('PATH', ''),
+        'SIMRED_ARP_SOURCE': tabla_arp,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera una instalación de SIM-RED con una red simulada')
+    parser.add_argument('destino', help='directorio de la instalación simulada (se reemplaza)')
+    parser.add_argument('--hosts', type=int, default=100, help='hosts autorizados (por defecto, 100)')
+    parser.add_argument('--meses', type=int, default=3, help='meses de históricos (por defecto, 3)')
+    parser.add_argument('--semilla', type=int, default=1, help='semilla de los datos aleatorios')
+    args = parser.parse_args()
+
+    entorno = crear_red_simulada(args.destino, args.hosts, args.meses, args.semilla)
+
+    print(f"✅ Red simulada con {args.hosts} hosts en: {args.destino}")
+    print("   Para ejecutar un módulo contra ella:")
+    print(f"   cd {args.destino} && PATH={entorno['PATH'].split(os.pathsep)[0]}:$PATH "
+          f"SIMRED_ARP_SOURCE={entorno['SIMRED_ARP_SOURCE']} bash bin/check_devices.sh")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())